@@ -6,6 +6,8 @@ Analizon fushatën "1234" dhe shpjegon si kalon telefonata deri tek operatori
 import pymysql
 from typing import Dict, Any, Optional
 
+from core.query_templates import QueryTemplate, bind
+
 # Konfigurimi i database
 DB_CONFIG = {
     "host": "95.217.87.125",  # Ose 65.109.50.236
@@ -15,6 +17,11 @@ DB_CONFIG = {
     "charset": "utf8mb4"
 }
 
+CAMPAIGN_BY_ID = QueryTemplate("campaign_by_id", """
+    SELECT * FROM vicidial_campaigns
+    WHERE campaign_id = %(campaign_id)s
+""")
+
 def get_connection():
     """Krijon lidhjen me database"""
     return pymysql.connect(**DB_CONFIG)
@@ -26,10 +33,7 @@ def get_campaign_info(campaign_id: str) -> Optional[Dict[str, Any]]:
         cur = conn.cursor(pymysql.cursors.DictCursor)
 
         # Merr fushatën
-        cur.execute("""
-            SELECT * FROM vicidial_campaigns
-            WHERE campaign_id = %s
-        """, (campaign_id,))
+        cur.execute(*bind(CAMPAIGN_BY_ID, campaign_id=campaign_id))
         campaign = cur.fetchone()
 
         if not campaign:
@@ -58,10 +62,7 @@ def get_campaign_settings(campaign_id: str):
         cur = conn.cursor(pymysql.cursors.DictCursor)
 
         # Merr konfigurimet
-        cur.execute("""
-            SELECT * FROM vicidial_campaigns
-            WHERE campaign_id = %s
-        """, (campaign_id,))
+        cur.execute(*bind(CAMPAIGN_BY_ID, campaign_id=campaign_id))
         settings = cur.fetchone()
 
         if not settings:
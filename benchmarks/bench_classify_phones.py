@@ -0,0 +1,76 @@
+"""
+benchmarks/bench_classify_phones.py
+
+Micro-benchmark: classify_phone_numbers() (batch, NumPy) kundrejt
+classify_phone_number() rresht pas rreshti, për 1M numra si parazgjedhje.
+
+Usage:
+    python benchmarks/bench_classify_phones.py [--n 1000000] [--repeat 3]
+
+Ekzekutohet nga rrënja e projektit (data/italian_prefixes.json lexohet nga cwd).
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import mobile_fix_classifier as mfc  # noqa: E402
+from core.mobile_fix_classifier import classify_phone_number, classify_phone_numbers  # noqa: E402
+
+
+def _numbers(n: int, seed: int = 42) -> tuple:
+    rnd = random.Random(seed)
+    prefixes = list(mfc.ITALIAN_FIX_PREFIXES) or ["06"]
+    mobiles = sorted(mfc.ITALIAN_MOBILE_PREFIXES)
+    phones, provinces = [], []
+    for _ in range(n):
+        r = rnd.random()
+        if r < 0.5:
+            num = rnd.choice(prefixes) + str(rnd.randint(100000, 9999999))
+        elif r < 0.9:
+            num = rnd.choice(mobiles) + str(rnd.randint(1000000, 9999999))
+        else:
+            num = (
+                rnd.choice(["+39", "0039", "39"]) + rnd.choice(prefixes + mobiles)
+                + str(rnd.randint(1000000, 9999999))
+            )
+        phones.append(num)
+        provinces.append(rnd.choice([None, "MI", "RM", ""]))
+    return phones, provinces
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark classify_phone_numbers")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    phones, provinces = _numbers(args.n)
+    print(f"fix prefixes: {len(mfc.ITALIAN_FIX_PREFIXES)}, numbers: {len(phones)}")
+
+    expected = [classify_phone_number(p, pr) for p, pr in zip(phones, provinces)]
+    types, provs, zones = classify_phone_numbers(phones, provinces)
+    assert list(zip(types, provs, zones)) == expected, "classify_phone_numbers ndryshon nga versioni scalar"
+
+    t_scalar = _best(lambda: [classify_phone_number(p, pr) for p, pr in zip(phones, provinces)], args.repeat)
+    t_batch = _best(lambda: classify_phone_numbers(phones, provinces), args.repeat)
+    t_plain = _best(lambda: classify_phone_numbers(phones), args.repeat)
+    for name, t in (("scalar", t_scalar), ("batch", t_batch), ("batch, no prov.", t_plain)):
+        print(f"{name:>15}: {t:8.3f}s  ({args.n / t:,.0f}/s, x{t_scalar / t:.1f})")
+
+
+if __name__ == "__main__":
+    main()
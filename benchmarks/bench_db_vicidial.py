@@ -0,0 +1,346 @@
+"""
+benchmarks/bench_db_vicidial.py
+
+Benchmark i çdo fetch_* të core/db_vicidial.py dhe i pipeline-it të plotë të
+Smart Report (pages/3_Rezultatet_e_Listave.py: fetch_smart_report_data →
+InboundPhoneMaps / FixProvinceAccumulator / ProvinceCostAccumulator →
+build_list_cost_frame / build_status_mix_frame) mbi dataset-in sintetik
+(benchmarks/synthetic_vicidial.py) në shkallët 1×, 10× dhe 100×.
+
+Backend-et:
+    mysql  — DB lokale MySQL/MariaDB; funksionet ekzekutohen realisht
+             (pool, cursor, konvertimi i rreshtave). Cache-i në disk dhe
+             rollup-i çaktivizohen, që të matet DB-ja dhe jo cache-i.
+    sqlite — pa server: SQL-i i çdo fetch_* kapet me capture_queries() dhe
+             ekzekutohet në SQLite (%s → ?, HOUR/DAYOFWEEK/DATE_FORMAT/CONCAT
+             si funksione Python). list_recordings (DATE_SUB ... INTERVAL)
+             nuk përkthehet dhe shfaqet si "n/a".
+
+Usage:
+    python benchmarks/bench_db_vicidial.py --backend sqlite --scales 1,10
+    python benchmarks/bench_db_vicidial.py --backend mysql --host 127.0.0.1 --user root --password pw --scales 1,10,100
+    python benchmarks/bench_db_vicidial.py --backend mysql --no-load ...   # DB e ngarkuar më parë
+
+Ekzekutohet nga rrënja e projektit. Shkalla 1× = --calls rreshta vicidial_log
+(default 100k); 100× kërkon disa GB në MySQL dhe disa minuta për ngarkim.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic_vicidial import (  # noqa: E402
+    SyntheticConfig,
+    connect_mysql,
+    connect_sqlite,
+    load_dataset,
+)
+from core import db_vicidial as db  # noqa: E402
+from core.phone_aggregates import FixProvinceAccumulator, InboundPhoneMaps, ProvinceCostAccumulator  # noqa: E402
+from core.report_frames import build_list_cost_frame, build_status_mix_frame  # noqa: E402
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+DIAL_STATUSES = ["A", "N", "PU", "SVYCLM", "NI", "SALE"]
+TIMEOUT_CODES = ["TIMEOUT", "t", "TIME-OUT"]
+IVR_CODE = "1"
+FIX_RATE, MOBILE_RATE = 0.012, 0.035
+STATUS_COSTS = {"NA": 0.0, "B": 0.0, "DROP": 0.01, "A": 0.02, "SVYCLM": 0.03, "SALE": 0.0}
+
+
+def _disable_caches() -> None:
+    """Matet DB-ja: pa cache në disk dhe pa rollup ditor (as nuk shkruhet në to)."""
+    db.get_query_cache = lambda: None
+    db.get_rollup_store = lambda: None
+
+
+# -------------------- Backend SQLite --------------------
+_MYSQL_TS = {"%Y": "%Y", "%m": "%m", "%d": "%d", "%H": "%H", "%i": "%M", "%s": "%S"}
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.strptime(str(value)[:19], _TS_FMT)
+
+
+def _date_format(value: Any, fmt: str) -> Optional[str]:
+    ts = _parse_ts(value)
+    if ts is None:
+        return None
+    return ts.strftime(re.sub(r"%[a-zA-Z]", lambda m: _MYSQL_TS.get(m.group(), m.group()), fmt))
+
+
+def _dayofweek(value: Any) -> Optional[int]:
+    ts = _parse_ts(value)
+    return None if ts is None else (ts.weekday() + 1) % 7 + 1  # MySQL: 1 = e diel
+
+
+def _hour(value: Any) -> Optional[int]:
+    ts = _parse_ts(value)
+    return None if ts is None else ts.hour
+
+
+def _concat(*args: Any) -> Optional[str]:
+    return None if any(a is None for a in args) else "".join(str(a) for a in args)
+
+
+def to_sqlite_sql(sql: str) -> str:
+    """Placeholder-at e pymysql → SQLite (`%s` → `?`, `%%` → `%`)."""
+    return re.sub(r"%%|%s", lambda m: "%" if m.group() == "%%" else "?", sql)
+
+
+class SqliteBackend:
+    """Ekzekuton SQL-in e kapur të fetch_* mbi dataset-in sintetik në SQLite."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        _disable_caches()
+        self.conn = connect_sqlite(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("DATE_FORMAT", 2, _date_format, deterministic=True)
+        self.conn.create_function("DAYOFWEEK", 1, _dayofweek, deterministic=True)
+        self.conn.create_function("HOUR", 1, _hour, deterministic=True)
+        self.conn.create_function("CONCAT", -1, _concat, deterministic=True)
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Rreshtat e query-t të fundit që ekzekuton `fn` (si listë dict-esh)."""
+        with db.capture_queries() as captured:
+            result = fn(*args, **kwargs)
+            if hasattr(result, "__next__"):
+                for _ in result:  # iter_*: query kapet kur gjeneratori nis
+                    pass
+        if not captured:
+            raise RuntimeError("asnjë query e kapur")
+        rows: List[Dict[str, Any]] = []
+        for _label, sql, params in captured:
+            cur = self.conn.execute(to_sqlite_sql(sql), params)
+            rows = [dict(r) for r in cur.fetchall()]
+        return rows
+
+    def reload(self, cfg: SyntheticConfig) -> Dict[str, int]:
+        return load_dataset(self.conn, cfg, "sqlite")
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# -------------------- Backend MySQL --------------------
+class MysqlBackend:
+    """Thërret funksionet e db_vicidial realisht mbi një MySQL/MariaDB lokale (db_key "db")."""
+
+    name = "mysql"
+
+    def __init__(self, host: str, port: int, user: str, password: str, database: str):
+        self._args = (host, port, user, password, database)
+        os.environ.update({
+            "DB_HOST": host, "DB_PORT": str(port), "DB_USER": user,
+            "DB_PASSWORD": password, "DB_NAME": database,
+        })
+        db.set_db_connection("db")
+        _disable_caches()
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        result = fn(*args, **kwargs)
+        if hasattr(result, "__next__"):
+            return [row for batch in result for row in batch]
+        return result
+
+    def reload(self, cfg: SyntheticConfig) -> Dict[str, int]:
+        db.reset_db_pool("db")
+        conn = connect_mysql(*self._args)
+        try:
+            return load_dataset(conn, cfg, "mysql")
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        db.reset_db_pool("db")
+
+
+# -------------------- Rastet --------------------
+def fetch_cases(cfg: SyntheticConfig) -> List[Tuple[str, Callable[..., Any], Tuple[Any, ...]]]:
+    """(emri, funksioni, argumentet) për çdo fetch_* / iter_* të db_vicidial."""
+    to_ts = cfg.window_end.strftime(_TS_FMT)
+    from_ts = (cfg.window_end - timedelta(days=cfg.days)).strftime(_TS_FMT)
+    c = cfg.campaign_ids[0]
+    return [
+        ("fetch_outbound_by_list", db.fetch_outbound_by_list, (from_ts, to_ts)),
+        ("fetch_inbound_by_list", db.fetch_inbound_by_list, (from_ts, to_ts, c, IVR_CODE)),
+        ("fetch_outbound_by_list_statuses", db.fetch_outbound_by_list_statuses, (from_ts, to_ts, c, DIAL_STATUSES)),
+        ("get_inbound_calls_by_list", db.get_inbound_calls_by_list, (from_ts, to_ts, c, IVR_CODE)),
+        ("fetch_list_names", db.fetch_list_names, (list(range(1001, 1001 + cfg.lists)),)),
+        ("fetch_status_distribution_by_list", db.fetch_status_distribution_by_list, (from_ts, to_ts, c)),
+        ("fetch_time_buckets_by_list", db.fetch_time_buckets_by_list, (from_ts, to_ts, c)),
+        ("fetch_inbound_buckets_by_list", db.fetch_inbound_buckets_by_list, (from_ts, to_ts, c, IVR_CODE)),
+        ("fetch_dials_by_phone", db.fetch_dials_by_phone, (from_ts, to_ts, c, DIAL_STATUSES)),
+        ("fetch_dials_by_phone_split", db.fetch_dials_by_phone_split, (from_ts, to_ts, c, DIAL_STATUSES)),
+        ("fetch_inbound_by_phone", db.fetch_inbound_by_phone, (from_ts, to_ts, c, IVR_CODE)),
+        ("fetch_svyclm_by_list", db.fetch_svyclm_by_list, (from_ts, to_ts, c)),
+        ("fetch_svyclm_timeout_by_list", db.fetch_svyclm_timeout_by_list, (from_ts, to_ts, c, TIMEOUT_CODES)),
+        ("list_recordings", db.list_recordings, (from_ts, to_ts, c, 10000)),
+        ("iter_dials_by_phone_split", db.iter_dials_by_phone_split, (from_ts, to_ts, c, DIAL_STATUSES)),
+        ("iter_inbound_by_phone", db.iter_inbound_by_phone, (from_ts, to_ts, c, IVR_CODE)),
+    ]
+
+
+@contextmanager
+def _stage(timings: Dict[str, float], name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    yield
+    timings[name] = time.perf_counter() - t0
+
+
+def smart_report_pipeline(backend: Any, cfg: SyntheticConfig) -> Dict[str, float]:
+    """"Raport i Plotë" si në faqe; kthen kohët për fazë + "total"."""
+    to_ts = cfg.window_end.strftime(_TS_FMT)
+    from_ts = (cfg.window_end - timedelta(days=cfg.days)).strftime(_TS_FMT)
+    c = cfg.campaign_ids[0]
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+
+    with _stage(timings, "queries"):
+        if isinstance(backend, MysqlBackend):
+            from core.report_queries import fetch_smart_report_data
+
+            data = fetch_smart_report_data(from_ts, to_ts, c, IVR_CODE, DIAL_STATUSES, full=True,
+                                           timeout_codes=TIMEOUT_CODES)
+            ob_rows, inbound_map, dist_rows = data.outbound_by_list, data.inbound_by_list, data.status_distribution
+            ib_rows, all_rows, filt_rows = data.inbound_by_phone, data.dials_by_phone_all, data.dials_by_phone_filtered
+        else:
+            ob_rows = backend.call(db.fetch_outbound_by_list_statuses, from_ts, to_ts, c, DIAL_STATUSES)
+            inbound_map = {int(r["list_id"]): int(r["inbound_calls"])
+                           for r in backend.call(db.fetch_inbound_by_list, from_ts, to_ts, c, IVR_CODE)}
+            dist_rows = backend.call(db._fetch_status_distribution_by_list_live, from_ts, to_ts, c)
+            backend.call(db.fetch_svyclm_by_list, from_ts, to_ts, c)
+            backend.call(db.fetch_svyclm_timeout_by_list, from_ts, to_ts, c, TIMEOUT_CODES)
+            split = [db._split_phone_row(r) for r in
+                     backend.call(db._fetch_dials_by_phone_split_live, from_ts, to_ts, c, DIAL_STATUSES)]
+            all_rows = [a for a, _ in split]
+            filt_rows = [f for _, f in split if f is not None]
+            ib_rows = backend.call(db._fetch_inbound_by_phone_live, from_ts, to_ts, c, IVR_CODE)
+
+    with _stage(timings, "phone_aggregates"):
+        ib_maps = InboundPhoneMaps()
+        ib_maps.add_rows(ib_rows)
+        fix_acc = FixProvinceAccumulator(ib_maps.sum_by_phone)
+        cost_acc = ProvinceCostAccumulator(ib_maps.last_by_phone, FIX_RATE, MOBILE_RATE)
+        fix_acc.add_rows(filt_rows)
+        cost_acc.add_rows(all_rows)
+        fix_acc.finish()
+        cost_acc.records()
+
+    with _stage(timings, "report_frames"):
+        build_list_cost_frame(ob_rows, inbound_map, MOBILE_RATE, FIX_RATE)
+        ob_records = ob_rows.to_dict("records") if hasattr(ob_rows, "to_dict") else ob_rows
+        name_map = {int(r["list_id"]): r["list_name"] for r in ob_records}
+        build_status_mix_frame(dist_rows, name_map, inbound_map, STATUS_COSTS)
+
+    timings["total"] = time.perf_counter() - t0
+    return timings
+
+
+# -------------------- Ekzekutimi --------------------
+def _best(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run_scale(backend: Any, cfg: SyntheticConfig, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """{emri: {"sec": koha më e mirë, "rows": rreshtat}} për çdo rast + pipeline-in."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, fn, args in fetch_cases(cfg):
+        try:
+            sec, rows = _best(lambda: backend.call(fn, *args), repeat)
+            out[name] = {"sec": sec, "rows": len(rows) if rows is not None else 0}
+        except Exception as e:
+            out[name] = {"sec": None, "rows": None, "error": f"{type(e).__name__}: {e}"}
+    best: Optional[Dict[str, float]] = None
+    for _ in range(repeat):
+        timings = smart_report_pipeline(backend, cfg)
+        if best is None or timings["total"] < best["total"]:
+            best = timings
+    for stage, sec in (best or {}).items():
+        out[f"smart_report:{stage}"] = {"sec": sec, "rows": None}
+    return out
+
+
+def format_results(results: Dict[float, Dict[str, Dict[str, Any]]]) -> str:
+    scales = sorted(results)
+    names = list(dict.fromkeys(n for s in scales for n in results[s]))
+    width = max(len(n) for n in names)
+    head = "".join(f"{f'{s:g}x sec':>12}{'rows':>10}" for s in scales)
+    lines = [f"{'function':<{width}}{head}", "-" * (width + 22 * len(scales))]
+    for n in names:
+        cells = ""
+        for s in scales:
+            r = results[s].get(n, {})
+            sec = "n/a" if r.get("sec") is None else f"{r['sec']:.3f}"
+            rows = "" if r.get("rows") is None else f"{r['rows']:,}"
+            cells += f"{sec:>12}{rows:>10}"
+        lines.append(f"{n:<{width}}{cells}")
+    return "\n".join(lines)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark core.db_vicidial + Smart Report on synthetic data")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--sqlite", default="out_analysis/synthetic_vicidial.sqlite")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="asterisk")
+    parser.add_argument("--scales", default="1,10,100")
+    parser.add_argument("--calls", type=int, default=SyntheticConfig.calls, help="Rreshtat e vicidial_log në 1×")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-load", dest="no_load", action="store_true", help="Mos e rindërto dataset-in")
+    parser.add_argument("--json", dest="json_path", default=None)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.backend == "mysql":
+        backend: Any = MysqlBackend(args.host, args.port, args.user, args.password, args.database)
+    else:
+        backend = SqliteBackend(args.sqlite)
+    base = SyntheticConfig(calls=args.calls)
+    results: Dict[float, Dict[str, Dict[str, Any]]] = {}
+    try:
+        for scale in [float(s) for s in args.scales.split(",") if s.strip()]:
+            cfg = base.scaled(scale)
+            if not args.no_load:
+                t0 = time.perf_counter()
+                counts = backend.reload(cfg)
+                print(f"[{scale:g}x] loaded {counts['vicidial_log']:,} calls in {time.perf_counter() - t0:.1f}s")
+            results[scale] = run_scale(backend, cfg, args.repeat)
+            print(f"[{scale:g}x] done")
+    finally:
+        backend.close()
+
+    print()
+    print(format_results(results))
+    if args.json_path:
+        path = Path(args.json_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({f"{s:g}x": r for s, r in results.items()}, indent=2), encoding="utf-8")
+        print(f"\nJSON: {path}")
+
+
+if __name__ == "__main__":
+    main()
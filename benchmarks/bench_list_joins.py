@@ -0,0 +1,157 @@
+"""
+benchmarks/bench_list_joins.py
+
+Benchmark i shkallëzimit: join-et sipas list_id në rank_lists_by_performance
+(core/list_analyzer.py) dhe në 03_SVYCLM_Quality (core/report_frames.py),
+kundrejt lookup-eve lineare të mëparshme (next(... if list_id == ...) në cikël).
+
+Usage:
+    python benchmarks/bench_list_joins.py [--sizes 100,1000,10000] [--repeat 3]
+
+Varianti linear (O(n²)) matet vetëm deri në --linear-max lista.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+
+from core.list_analyzer import get_list_recommendation, rank_lists_by_performance  # noqa: E402
+from core.mobile_fix_classifier import FIX_COST_PER_MIN, MOBILE_COST_PER_MIN  # noqa: E402
+from core.report_frames import build_list_cost_frame, build_svyclm_quality_frame  # noqa: E402
+
+
+def rank_lists_linear(data: dict) -> List[dict]:
+    """Implementimi i mëparshëm: list_performance kërkohet linearisht për çdo listë."""
+    ranked = []
+    list_performance = data.get("list_performance", [])
+    for lst in data.get("active_lists", []):
+        list_id = lst["list_id"]
+        perf = next((p for p in list_performance if p["list_id"] == list_id), {})
+        total_leads = lst.get("total_leads", 0)
+        never_called = lst.get("never_called", 0)
+        calls = perf.get("calls", 0)
+        total_minutes = perf.get("total_minutes", 0)
+        available_leads = never_called + (total_leads * 0.3)
+        calls_per_lead = (calls / total_leads) if total_leads > 0 else 0
+        is_mobile = "MOBILE" in lst["list_name"].upper()
+        is_fix = "FIX" in lst["list_name"].upper()
+        if is_mobile:
+            rate = MOBILE_COST_PER_MIN
+        else:
+            rate = FIX_COST_PER_MIN if is_fix else (MOBILE_COST_PER_MIN + FIX_COST_PER_MIN) / 2
+        estimated_cost = total_minutes * rate
+        volume_score = min(10, (available_leads / 50000) * 10) if available_leads > 0 else 0
+        cost_score = 10 if is_fix else 5 if is_mobile else 7
+        score = volume_score * 0.4 + cost_score * 0.3 + min(10, calls_per_lead * 2) * 0.3
+        ranked.append({
+            "list_id": list_id,
+            "total_cost_7days": round(estimated_cost, 2),
+            "quality_score": round(score, 1),
+            "recommendation": get_list_recommendation(score, available_leads, is_mobile),
+        })
+    ranked.sort(key=lambda x: x["quality_score"], reverse=True)
+    return ranked
+
+
+def svyclm_quality_linear(sv_rows: List[dict], to_rows: List[dict], cost_rows: List[dict]) -> pd.DataFrame:
+    """Implementimi i mëparshëm: timeout-et dhe dials kërkohen linearisht për çdo listë."""
+    records = []
+    for r in sv_rows:
+        lid = int(r["list_id"])
+        to = next((x for x in to_rows if int(x["list_id"]) == lid), {})
+        cost = next((x for x in cost_rows if int(x["list_id"]) == lid), {})
+        sv_calls = int(r.get("svyclm_calls") or 0)
+        sv_timeout = int(to.get("svyclm_timeout") or 0)
+        records.append({
+            "list_id": lid,
+            "total_dials": int(cost.get("total_dials") or 0),
+            "svyclm_calls": sv_calls,
+            "svyclm_timeout": sv_timeout,
+            "svyclm_timeout_ratio": round(sv_timeout / sv_calls, 3) if sv_calls else None,
+        })
+    return pd.DataFrame.from_records(records)
+
+
+def _dataset(n: int, seed: int = 7) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    kinds = ["BUSINESS MOBILE", "BUSINESS FIX PROV", "CONSUMER"]
+    lists = [{
+        "list_id": 1000 + i,
+        "list_name": f"{rnd.choice(kinds)} {i}",
+        "total_leads": rnd.randint(0, 300_000),
+        "never_called": rnd.randint(0, 50_000),
+    } for i in range(n)]
+    ids = [lst["list_id"] for lst in lists]
+    rnd.shuffle(ids)
+    perf = [{
+        "list_id": lid,
+        "calls": rnd.randint(0, 500_000),
+        "avg_duration": round(rnd.random() * 5, 1),
+        "total_minutes": round(rnd.random() * 20_000, 2),
+    } for lid in ids[: int(n * 0.9)]]
+    outbound = [{
+        "list_id": lst["list_id"], "list_name": lst["list_name"],
+        "total_dials": rnd.randint(0, 100_000), "total_sec": rnd.randint(0, 900_000),
+    } for lst in lists]
+    sv = [{"list_id": lid, "svyclm_calls": rnd.randint(0, 2_000)} for lid in ids]
+    to = [{"list_id": lid, "svyclm_timeout": rnd.randint(0, 500)} for lid in ids[: n // 2]]
+    return {"active_lists": lists, "list_performance": perf, "outbound": outbound, "svyclm": sv, "timeouts": to}
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark list_id joins (linear vs indexed)")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Numri i listave, të ndarë me presje")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--linear-max", type=int, default=10_000, help="Mbi këtë madhësi varianti linear kapërcehet")
+    args = parser.parse_args()
+
+    print(
+        f"{'lists':>7} | {'rank linear':>12} {'rank join':>10} {'x':>6} | "
+        f"{'svyclm linear':>13} {'svyclm join':>11} {'x':>6}"
+    )
+    for n in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        data = _dataset(n)
+        cost_df, _ = build_list_cost_frame(data["outbound"], {}, 0.02, 0.01)
+
+        def rank_join():
+            return rank_lists_by_performance(data)
+
+        def sv_join():
+            return build_svyclm_quality_frame(data["svyclm"], data["timeouts"], cost_df, {}, {}, 0.3)
+
+        t_rank = _best(rank_join, args.repeat)
+        t_sv = _best(sv_join, args.repeat)
+        if n <= args.linear_max:
+            linear = rank_lists_linear(data)
+            joined = rank_join()
+            assert [r["list_id"] for r in linear] == [r["list_id"] for r in joined], "renditja ndryshon"
+            costs = [r["total_cost_7days"] for r in linear]
+            assert costs == [r["total_cost_7days"] for r in joined], "kostot ndryshojnë"
+            old_sv = svyclm_quality_linear(data["svyclm"], data["timeouts"], data["outbound"])
+            assert old_sv["svyclm_timeout"].tolist() == sv_join()["svyclm_timeout"].tolist(), "timeout-et ndryshojnë"
+            t_rank_lin = _best(lambda: rank_lists_linear(data), 1)
+            t_sv_lin = _best(lambda: svyclm_quality_linear(data["svyclm"], data["timeouts"], data["outbound"]), 1)
+            print(f"{n:>7} | {t_rank_lin:11.3f}s {t_rank:9.3f}s {t_rank_lin / t_rank:5.1f}x | "
+                  f"{t_sv_lin:12.3f}s {t_sv:10.3f}s {t_sv_lin / t_sv:5.1f}x")
+        else:
+            print(f"{n:>7} | {'-':>12} {t_rank:9.3f}s {'':>6} | {'-':>13} {t_sv:10.3f}s")
+
+
+if __name__ == "__main__":
+    main()
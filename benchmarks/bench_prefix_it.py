@@ -0,0 +1,80 @@
+"""
+benchmarks/bench_prefix_it.py
+
+Micro-benchmark: core.prefix_it.match_prefix (PrefixIndex) kundrejt skanimit
+linear të vjetër mbi load_prefix_map(), dhe match_prefixes() për kolona.
+
+Usage:
+    python benchmarks/bench_prefix_it.py [--n 200000] [--repeat 3]
+
+Ekzekutohet nga rrënja e projektit (data/it_prefixes.csv lexohet nga cwd).
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.prefix_it import load_prefix_map, match_prefix, match_prefixes, normalize_it_number  # noqa: E402
+
+
+def match_prefix_linear(num: str) -> Optional[Tuple[str, str, str]]:
+    """Implementimi i mëparshëm: skanim linear mbi të gjithë prefikset."""
+    s = normalize_it_number(num)
+    for p, city, prov in load_prefix_map():
+        if s.startswith(p):
+            return p, city, prov
+    return None
+
+
+def _numbers(n: int, seed: int = 42) -> list:
+    rnd = random.Random(seed)
+    prefixes = [p for p, _, _ in load_prefix_map()] or ["06"]
+    out = []
+    for _ in range(n):
+        r = rnd.random()
+        if r < 0.6:
+            num = rnd.choice(prefixes) + str(rnd.randint(100000, 9999999))
+        elif r < 0.9:
+            num = rnd.choice(["333", "347", "320", "389"]) + str(rnd.randint(1000000, 9999999))
+        else:
+            num = rnd.choice(["+39", "0039", "+39 "]) + rnd.choice(prefixes) + str(rnd.randint(10000, 999999))
+        out.append(num)
+    return out
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark prefix_it lookups")
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    nums = _numbers(args.n)
+    print(f"prefixes: {len(load_prefix_map())}, numbers: {len(nums)}")
+
+    expected = [match_prefix_linear(x) for x in nums]
+    assert [match_prefix(x) for x in nums] == expected, "match_prefix ndryshon nga skanimi linear"
+    assert match_prefixes(nums) == expected, "match_prefixes ndryshon nga skanimi linear"
+
+    t_linear = _best(lambda: [match_prefix_linear(x) for x in nums], args.repeat)
+    t_index = _best(lambda: [match_prefix(x) for x in nums], args.repeat)
+    t_bulk = _best(lambda: match_prefixes(nums), args.repeat)
+    for name, t in (("linear scan", t_linear), ("PrefixIndex", t_index), ("match_prefixes", t_bulk)):
+        print(f"{name:>15}: {t:8.3f}s  ({args.n / t:,.0f}/s, x{t_linear / t:.1f})")
+
+
+if __name__ == "__main__":
+    main()
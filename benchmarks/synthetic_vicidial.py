@@ -0,0 +1,451 @@
+"""
+benchmarks/synthetic_vicidial.py
+
+Gjenerator i një DB Vicidial sintetike për benchmark dhe EXPLAIN pa akses në
+prodhim: vicidial_campaigns, vicidial_lists, vicidial_list, vicidial_log,
+vicidial_closer_log, vicidial_ivr_response dhe recording_log, me indekset e
+instalimit standard të Vicidial (jo ato që sugjeron explain_queries.py).
+
+Të dhënat ndjekin formën reale: listat "Mobile"/"Fisso" (infer_list_type),
+numra celularë 3xx dhe fiks me prefiksat e data/it_prefixes.csv, provinca,
+thirrje të përqendruara në orët 9-20, shumë NA/B/DROP dhe pak SALE, disa
+lead të thirrur shumë herë, thirrje inbound (closer), përgjigje IVR dhe
+regjistrime për një pjesë të thirrjeve.
+
+Usage:
+    python benchmarks/synthetic_vicidial.py --target sqlite --sqlite out_analysis/synthetic.sqlite
+    python benchmarks/synthetic_vicidial.py --target mysql --host 127.0.0.1 --user root --password pw --scale 10
+    python benchmarks/synthetic_vicidial.py --calls 200000 --campaigns 5 --lists 40 --mobile-ratio 0.7
+
+MySQL/MariaDB lokale:
+    docker run -d --name vici-mysql -e MYSQL_ROOT_PASSWORD=pw -e MYSQL_DATABASE=asterisk -p 3306:3306 mysql:8.0
+
+Ekzekutohet nga rrënja e projektit (data/it_prefixes.csv lexohet nga cwd).
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.mobile_fix_classifier import ITALIAN_MOBILE_PREFIXES  # noqa: E402
+from core.prefix_it import load_prefix_map  # noqa: E402
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+# -------------------- Skema --------------------
+# (kolonat, primary key, indekset) — DDL i njëjtë për MySQL dhe SQLite
+SCHEMA: Dict[str, Tuple[List[Tuple[str, str]], str, List[Tuple[str, ...]]]] = {
+    "vicidial_campaigns": ([
+        ("campaign_id", "VARCHAR(8)"), ("campaign_name", "VARCHAR(40)"), ("campaign_description", "VARCHAR(255)"),
+        ("active", "VARCHAR(1)"), ("dial_method", "VARCHAR(10)"), ("campaign_cid", "VARCHAR(20)"),
+        ("local_call_time", "VARCHAR(10)"), ("lead_filter_id", "VARCHAR(20)"), ("hopper_level", "INT"),
+        ("auto_dial_level", "VARCHAR(6)"),
+    ], "campaign_id", []),
+    "vicidial_lists": ([
+        ("list_id", "BIGINT"), ("list_name", "VARCHAR(30)"), ("campaign_id", "VARCHAR(8)"), ("active", "VARCHAR(1)"),
+        ("list_description", "VARCHAR(255)"), ("list_changedate", "DATETIME"), ("list_lastcalldate", "DATETIME"),
+    ], "list_id", []),
+    "vicidial_list": ([
+        ("lead_id", "INT"), ("entry_date", "DATETIME"), ("modify_date", "DATETIME"), ("status", "VARCHAR(6)"),
+        ("user", "VARCHAR(20)"), ("vendor_lead_code", "VARCHAR(20)"), ("source_id", "VARCHAR(50)"),
+        ("list_id", "BIGINT"), ("gmt_offset_now", "DECIMAL(4,2)"), ("called_since_last_reset", "VARCHAR(3)"),
+        ("phone_code", "VARCHAR(10)"), ("phone_number", "VARCHAR(18)"), ("first_name", "VARCHAR(30)"),
+        ("last_name", "VARCHAR(30)"), ("city", "VARCHAR(50)"), ("province", "VARCHAR(50)"),
+        ("postal_code", "VARCHAR(10)"), ("called_count", "SMALLINT"), ("last_local_call_time", "DATETIME"),
+        ("rank", "SMALLINT"), ("owner", "VARCHAR(20)"),
+    ], "lead_id", [("phone_number",), ("list_id",), ("status",), ("called_since_last_reset",)]),
+    "vicidial_log": ([
+        ("uniqueid", "VARCHAR(20)"), ("lead_id", "INT"), ("list_id", "BIGINT"), ("campaign_id", "VARCHAR(8)"),
+        ("call_date", "DATETIME"), ("start_epoch", "INT"), ("end_epoch", "INT"), ("length_in_sec", "INT"),
+        ("status", "VARCHAR(6)"), ("phone_code", "VARCHAR(10)"), ("phone_number", "VARCHAR(18)"),
+        ("user", "VARCHAR(20)"), ("comments", "VARCHAR(255)"), ("processed", "VARCHAR(1)"),
+        ("user_group", "VARCHAR(20)"), ("term_reason", "VARCHAR(20)"), ("alt_dial", "VARCHAR(6)"),
+        ("called_count", "SMALLINT"),
+    ], "uniqueid", [("lead_id",), ("call_date",)]),
+    "vicidial_closer_log": ([
+        ("closecallid", "BIGINT"), ("lead_id", "INT"), ("list_id", "BIGINT"), ("campaign_id", "VARCHAR(20)"),
+        ("call_date", "DATETIME"), ("start_epoch", "INT"), ("end_epoch", "INT"), ("length_in_sec", "INT"),
+        ("status", "VARCHAR(6)"), ("phone_code", "VARCHAR(10)"), ("phone_number", "VARCHAR(18)"),
+        ("user", "VARCHAR(20)"), ("queue_seconds", "DECIMAL(7,2)"), ("term_reason", "VARCHAR(20)"),
+        ("uniqueid", "VARCHAR(20)"),
+    ], "closecallid", [("lead_id",), ("call_date",), ("campaign_id",), ("uniqueid",)]),
+    "vicidial_ivr_response": ([
+        ("id", "BIGINT"), ("lead_id", "INT"), ("uniqueid", "VARCHAR(50)"), ("campaign", "VARCHAR(20)"),
+        ("created", "DATETIME"), ("question", "INT"), ("response", "VARCHAR(20)"),
+    ], "id", [("lead_id",), ("uniqueid",), ("created",)]),
+    "recording_log": ([
+        ("recording_id", "BIGINT"), ("channel", "VARCHAR(100)"), ("server_ip", "VARCHAR(15)"),
+        ("extension", "VARCHAR(100)"), ("start_time", "DATETIME"), ("start_epoch", "INT"),
+        ("end_time", "DATETIME"), ("end_epoch", "INT"), ("length_in_sec", "INT"), ("length_in_min", "DOUBLE"),
+        ("filename", "VARCHAR(100)"), ("location", "VARCHAR(255)"), ("lead_id", "INT"), ("user", "VARCHAR(20)"),
+        ("vicidial_id", "VARCHAR(20)"),
+    ], "recording_id", [("filename",), ("lead_id",), ("user",), ("vicidial_id",)]),
+}
+
+# Statuset e vicidial_log me peshat e tyre; thirrjet pa përgjigje kanë length_in_sec = 0
+_STATUSES = np.array(["NA", "B", "DROP", "A", "AA", "N", "PU", "AFTHRS", "DNC", "SVYCLM", "NI", "CALLBK", "SALE"])
+_STATUS_W = np.array([30, 12, 8, 10, 6, 7, 4, 2, 1, 8, 7, 3, 2], dtype=float)
+_ANSWERED = np.isin(_STATUSES, ["A", "N", "PU", "SVYCLM", "NI", "CALLBK", "SALE"])
+_IVR_RESPONSES = np.array(["1", "2", "3", "TIMEOUT", "t"])
+_IVR_W = np.array([40, 20, 10, 25, 5], dtype=float)
+# Shpërndarja e thirrjeve sipas orës (9-20)
+_HOUR_W = np.array([0] * 9 + [6, 9, 10, 8, 5, 6, 8, 9, 9, 8, 7, 5] + [0] * 3, dtype=float)
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Parametrat e dataset-it.
+
+    Args:
+        calls: Rreshtat e vicidial_log (shkalla 1×)
+        campaigns: Numri i kampanjave (e para quhet "autobiz")
+        lists: Numri total i listave (ndarë në kampanja)
+        leads: Lead-et në vicidial_list (None = calls // 4)
+        mobile_ratio: Pjesa e listave "Mobile" (pjesa tjetër "Fisso")
+        ivr_rate: Pjesa e thirrjeve me përgjigje IVR
+        closer_rate: Pjesa e thirrjeve që kanë edhe një rresht inbound në vicidial_closer_log
+        recording_rate: Pjesa e thirrjeve të përgjigjura me regjistrim
+        days: Dritarja e thirrjeve (ditët para `end`)
+        seed: Fara e RNG (i njëjti config → të njëjtat të dhëna)
+        end: Fundi i dritares (None = sot 00:00)
+    """
+    calls: int = 100_000
+    campaigns: int = 3
+    lists: int = 24
+    leads: Optional[int] = None
+    mobile_ratio: float = 0.6
+    ivr_rate: float = 0.04
+    closer_rate: float = 0.05
+    recording_rate: float = 0.3
+    days: int = 30
+    seed: int = 42
+    end: Optional[datetime] = None
+
+    def scaled(self, scale: float) -> "SyntheticConfig":
+        """I njëjti config me `scale` herë më shumë thirrje dhe lead-e."""
+        leads = None if self.leads is None else int(self.leads * scale)
+        return replace(self, calls=int(self.calls * scale), leads=leads)
+
+    @property
+    def n_leads(self) -> int:
+        return max(self.lists, self.leads if self.leads is not None else self.calls // 4)
+
+    @property
+    def window_end(self) -> datetime:
+        return self.end or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @property
+    def campaign_ids(self) -> List[str]:
+        return ["autobiz"] + [f"camp{i:02d}" for i in range(1, self.campaigns)]
+
+
+# -------------------- DDL --------------------
+def create_table_sql(table: str, dialect: str) -> List[str]:
+    """CREATE TABLE + CREATE INDEX për `table` (dialect: "mysql" ose "sqlite")."""
+    columns, pk, indexes = SCHEMA[table]
+    cols = ",\n    ".join(f"`{name}` {ctype}" for name, ctype in columns)
+    sql = f"CREATE TABLE `{table}` (\n    {cols},\n    PRIMARY KEY (`{pk}`)\n)"
+    if dialect == "mysql":
+        sql += " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+    out = [sql]
+    for idx in indexes:
+        name = f"{table}_{'_'.join(idx)}"
+        out.append(f"CREATE INDEX `{name}` ON `{table}` ({', '.join(f'`{c}`' for c in idx)})")
+    return out
+
+
+def insert_sql(table: str, dialect: str) -> str:
+    columns = [name for name, _ in SCHEMA[table][0]]
+    ph = "%s" if dialect == "mysql" else "?"
+    return f"INSERT INTO `{table}` ({', '.join(f'`{c}`' for c in columns)}) VALUES ({', '.join([ph] * len(columns))})"
+
+
+# -------------------- Gjenerimi --------------------
+def _fix_prefixes() -> List[Tuple[str, str, str]]:
+    return load_prefix_map() or [("06", "Roma", "RM"), ("02", "Milano", "MI"), ("011", "Torino", "TO")]
+
+
+def _digits(rng: np.random.Generator, n: int, width: np.ndarray) -> List[str]:
+    """n stringje me `width[i]` shifra të rastësishme."""
+    values = rng.integers(0, 10 ** 9, size=n)
+    return [str(v).zfill(9)[:w] for v, w in zip(values.tolist(), width.tolist())]
+
+
+def _epoch(dt: datetime) -> int:
+    """Sekondat nga 1970 për një datetime naive (pa zonë kohore, si DATETIME në DB)."""
+    return int((dt - datetime(1970, 1, 1)).total_seconds())
+
+
+def _ts(values: np.ndarray) -> List[str]:
+    """Sekondat nga 1970 → "YYYY-mm-dd HH:MM:SS"."""
+    text = np.datetime_as_string(np.asarray(values).astype("datetime64[s]"), unit="s")
+    return [t.replace("T", " ") for t in text.tolist()]
+
+
+class SyntheticVicidial:
+    """Gjeneron rreshtat e të gjitha tabelave për një SyntheticConfig."""
+
+    def __init__(self, cfg: SyntheticConfig):
+        self.cfg = cfg
+        self.rng = np.random.default_rng(cfg.seed)
+        # RNG i veçantë për closer log: tabelat e tjera mbeten të njëjta për të njëjtën farë
+        self._closer_rng = np.random.default_rng([cfg.seed, 1])
+        self._prefixes = _fix_prefixes()
+        self._mobile = sorted(ITALIAN_MOBILE_PREFIXES)
+        self._build_lists()
+        self._build_leads()
+
+    # ---- kampanjat dhe listat ----
+    def _build_lists(self) -> None:
+        cfg = self.cfg
+        self.list_ids = np.arange(1001, 1001 + cfg.lists, dtype=np.int64)
+        self.list_campaign = np.array([cfg.campaign_ids[i % cfg.campaigns] for i in range(cfg.lists)], dtype=object)
+        self.list_mobile = self.rng.random(cfg.lists) < cfg.mobile_ratio
+
+    def campaign_rows(self) -> List[Tuple[Any, ...]]:
+        return [
+            (c, f"Campaign {c}", f"Synthetic campaign {c}", "Y", "RATIO", f"0{600000000 + i}",
+             "9am-9pm", "NONE", 100, "3.0")
+            for i, c in enumerate(self.cfg.campaign_ids)
+        ]
+
+    def list_rows(self) -> List[Tuple[Any, ...]]:
+        changed = (self.cfg.window_end - timedelta(days=self.cfg.days)).strftime(_TS_FMT)
+        last = self.cfg.window_end.strftime(_TS_FMT)
+        rows = []
+        for i, list_id in enumerate(self.list_ids.tolist()):
+            kind = "Mobile" if self.list_mobile[i] else "Fisso"
+            active = "Y" if i % 10 != 9 else "N"
+            rows.append((
+                list_id, f"{kind} {list_id}", self.list_campaign[i], active, f"{kind} list {list_id}", changed, last,
+            ))
+        return rows
+
+    # ---- lead-et ----
+    def _build_leads(self) -> None:
+        cfg, rng = self.cfg, self.rng
+        n = cfg.n_leads
+        self.lead_ids = np.arange(1, n + 1, dtype=np.int64)
+        self.lead_list_idx = rng.integers(0, cfg.lists, size=n)
+        is_mobile = self.list_mobile[self.lead_list_idx]
+        # 5% e numrave në listat mobile janë fiks dhe anasjelltas (si në listat reale)
+        is_mobile ^= rng.random(n) < 0.05
+
+        fix_pick = rng.integers(0, len(self._prefixes), size=n)
+        mob_pick = rng.integers(0, len(self._mobile), size=n)
+        fix_prefix = np.array([p for p, _, _ in self._prefixes], dtype=object)[fix_pick]
+        prov = np.array([pr for _, _, pr in self._prefixes], dtype=object)[fix_pick]
+        city = np.array([c for _, c, _ in self._prefixes], dtype=object)[fix_pick]
+        mob_prefix = np.array(self._mobile, dtype=object)[mob_pick]
+
+        prefix = np.where(is_mobile, mob_prefix, fix_prefix)
+        width = np.where(is_mobile, 7, 10 - np.array([len(p) for p in fix_prefix.tolist()]))
+        self.lead_phone = np.array([p + d for p, d in zip(prefix.tolist(), _digits(rng, n, width))], dtype=object)
+        self.lead_province = prov
+        self.lead_city = city
+        # Disa lead thirren shumë herë: pesha Zipf mbi lead-et
+        w = 1.0 / np.arange(1, n + 1) ** 0.6
+        self._lead_weights = rng.permutation(w / w.sum())
+
+    def lead_rows(self, batch_size: int = 50_000) -> Iterator[List[Tuple[Any, ...]]]:
+        cfg, rng = self.cfg, self.rng
+        end = _epoch(cfg.window_end)
+        n = len(self.lead_ids)
+        statuses = np.array(["NEW", "NA", "B", "A", "DROP", "NI", "SALE", "DNC"])
+        for start in range(0, n, batch_size):
+            sl = slice(start, min(n, start + batch_size))
+            m = sl.stop - sl.start
+            entry = end - rng.integers(cfg.days * 86400, (cfg.days + 120) * 86400, size=m)
+            status = statuses[rng.choice(len(statuses), size=m, p=[0.3, 0.25, 0.1, 0.1, 0.08, 0.1, 0.02, 0.05])]
+            called = rng.poisson(3, size=m)
+            entry_s = _ts(entry)
+            last_s = _ts(end - rng.integers(0, cfg.days * 86400, size=m))
+            yield [
+                (
+                    int(lead_id), e, l, str(s), "VDAD", f"V{lead_id:08d}", "synthetic",
+                    int(self.list_ids[li]), 1.0, "Y", "39", phone,
+                    "Nome", "Cognome", city, prov, "00100", int(c), l, 0, "",
+                )
+                for lead_id, e, l, s, li, phone, city, prov, c in zip(
+                    self.lead_ids[sl].tolist(), entry_s, last_s, status.tolist(), self.lead_list_idx[sl].tolist(),
+                    self.lead_phone[sl].tolist(), self.lead_city[sl].tolist(), self.lead_province[sl].tolist(),
+                    called.tolist(),
+                )
+            ]
+
+    # ---- thirrjet, IVR, regjistrimet ----
+    def call_rows(self, batch_size: int = 50_000) -> Iterator[Dict[str, List[Tuple[Any, ...]]]]:
+        """Batch-e {tabela: rreshtat} për vicidial_log, vicidial_closer_log, vicidial_ivr_response, recording_log."""
+        cfg, rng, closer_rng = self.cfg, self.rng, self._closer_rng
+        start_epoch = _epoch(cfg.window_end - timedelta(days=cfg.days))
+        hour_p = _HOUR_W / _HOUR_W.sum()
+        status_p = _STATUS_W / _STATUS_W.sum()
+        ivr_p = _IVR_W / _IVR_W.sum()
+        ivr_id = rec_id = closer_id = 0
+        for offset in range(0, cfg.calls, batch_size):
+            m = min(batch_size, cfg.calls - offset)
+            lead_idx = rng.choice(len(self.lead_ids), size=m, p=self._lead_weights)
+            day = rng.integers(0, cfg.days, size=m)
+            hour = rng.choice(24, size=m, p=hour_p)
+            sec = rng.integers(0, 3600, size=m)
+            call_epoch = start_epoch + day * 86400 + hour * 3600 + sec
+            status_idx = rng.choice(len(_STATUSES), size=m, p=status_p)
+            answered = _ANSWERED[status_idx]
+            length = np.where(answered, rng.exponential(70, size=m).astype(np.int64) + 3, 0)
+            list_idx = self.lead_list_idx[lead_idx]
+            users = np.where(answered, "agent" + (rng.integers(1, 40, size=m)).astype(str).astype(object), "VDAD")
+            call_ts = _ts(call_epoch)
+            uniqueids = [f"{e}.{offset + i}" for i, e in enumerate(call_epoch.tolist())]
+            log = [
+                (
+                    uid, int(self.lead_ids[li]), int(self.list_ids[lst]), self.list_campaign[lst], ts,
+                    e, e + ln, ln, str(_STATUSES[si]), "39", self.lead_phone[li], u, "", "N", "AGENTS",
+                    "AGENT" if ln else "NONE", "MAIN", 1,
+                )
+                for uid, li, lst, ts, e, ln, si, u in zip(
+                    uniqueids, lead_idx.tolist(), list_idx.tolist(), call_ts, call_epoch.tolist(),
+                    length.tolist(), status_idx.tolist(), users.tolist(),
+                )
+            ]
+
+            closer_sel = np.flatnonzero(closer_rng.random(m) < cfg.closer_rate)
+            queue = closer_rng.exponential(20, size=len(closer_sel)).round(2)
+            closer = []
+            for k, i in enumerate(closer_sel.tolist()):
+                closer_id += 1
+                e, ln, lst = int(call_epoch[i]), int(length[i]), int(list_idx[i])
+                closer.append((
+                    closer_id, int(self.lead_ids[lead_idx[i]]), int(self.list_ids[lst]), self.list_campaign[lst],
+                    call_ts[i], e, e + ln, ln, str(_STATUSES[status_idx[i]]), "39", self.lead_phone[lead_idx[i]],
+                    str(users[i]), float(queue[k]), "AGENT" if ln else "ABANDON", uniqueids[i],
+                ))
+
+            ivr_sel = np.flatnonzero(rng.random(m) < cfg.ivr_rate)
+            responses = _IVR_RESPONSES[rng.choice(len(_IVR_RESPONSES), size=len(ivr_sel), p=ivr_p)]
+            ivr_ts = _ts(call_epoch[ivr_sel] + 5)
+            ivr = []
+            for k, i in enumerate(ivr_sel.tolist()):
+                ivr_id += 1
+                ivr.append((ivr_id, int(self.lead_ids[lead_idx[i]]), uniqueids[i], self.list_campaign[list_idx[i]],
+                            ivr_ts[k], 1, str(responses[k])))
+
+            rec_sel = np.flatnonzero(answered & (rng.random(m) < cfg.recording_rate))
+            rec = []
+            for i in rec_sel.tolist():
+                rec_id += 1
+                e, ln = int(call_epoch[i]), int(length[i])
+                fname = f"{call_ts[i][:10].replace('-', '')}-{rec_id}_{self.lead_phone[lead_idx[i]]}"
+                rec.append((
+                    rec_id, "SIP/synthetic", "10.0.0.1", "8309", call_ts[i], e, _ts(np.array([e + ln]))[0], e + ln,
+                    ln, round(ln / 60.0, 2), fname, f"http://10.0.0.1/RECORDINGS/MP3/{fname}-all.mp3",
+                    int(self.lead_ids[lead_idx[i]]), str(users[i]), uniqueids[i],
+                ))
+            yield {
+                "vicidial_log": log, "vicidial_closer_log": closer,
+                "vicidial_ivr_response": ivr, "recording_log": rec,
+            }
+
+
+# -------------------- Ngarkimi --------------------
+def connect_mysql(host: str, port: int, user: str, password: str, database: str):
+    import pymysql
+
+    return pymysql.connect(host=host, port=port, user=user, password=password or "", database=database,
+                           charset="utf8mb4", autocommit=False)
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return sqlite3.connect(path)
+
+
+def load_dataset(
+    conn: Any,
+    cfg: SyntheticConfig,
+    dialect: str,
+    batch_size: int = 20_000,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, int]:
+    """Fshin dhe rikrijon tabelat, pastaj i mbush me të dhënat e `cfg`. Kthen {tabela: rreshta}."""
+    gen = SyntheticVicidial(cfg)
+    cur = conn.cursor()
+    for table in SCHEMA:
+        cur.execute(f"DROP TABLE IF EXISTS `{table}`")
+        for sql in create_table_sql(table, dialect):
+            cur.execute(sql)
+    conn.commit()
+
+    counts = {table: 0 for table in SCHEMA}
+
+    def _insert(table: str, rows: Sequence[Tuple[Any, ...]]) -> None:
+        if not rows:
+            return
+        cur.executemany(insert_sql(table, dialect), rows)
+        conn.commit()
+        counts[table] += len(rows)
+        if progress is not None:
+            progress(table, counts[table])
+
+    _insert("vicidial_campaigns", gen.campaign_rows())
+    _insert("vicidial_lists", gen.list_rows())
+    for rows in gen.lead_rows(batch_size):
+        _insert("vicidial_list", rows)
+    for batch in gen.call_rows(batch_size):
+        for table, rows in batch.items():
+            _insert(table, rows)
+    cur.close()
+    return counts
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Load a synthetic Vicidial dataset into MySQL/MariaDB or SQLite")
+    parser.add_argument("--target", choices=("mysql", "sqlite"), default="sqlite")
+    parser.add_argument("--sqlite", default="out_analysis/synthetic_vicidial.sqlite")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="asterisk")
+    parser.add_argument("--calls", type=int, default=SyntheticConfig.calls,
+                        help="Rreshtat e vicidial_log në shkallën 1×")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--campaigns", type=int, default=SyntheticConfig.campaigns)
+    parser.add_argument("--lists", type=int, default=SyntheticConfig.lists)
+    parser.add_argument("--leads", type=int, default=None)
+    parser.add_argument("--mobile-ratio", dest="mobile_ratio", type=float, default=SyntheticConfig.mobile_ratio)
+    parser.add_argument("--days", type=int, default=SyntheticConfig.days)
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    cfg = SyntheticConfig(
+        calls=args.calls, campaigns=args.campaigns, lists=args.lists, leads=args.leads,
+        mobile_ratio=args.mobile_ratio, days=args.days, seed=args.seed,
+    ).scaled(args.scale)
+    if args.target == "mysql":
+        conn = connect_mysql(args.host, args.port, args.user, args.password, args.database)
+    else:
+        conn = connect_sqlite(args.sqlite)
+    t0 = time.perf_counter()
+    try:
+        counts = load_dataset(conn, cfg, args.target)
+    finally:
+        conn.close()
+    print(f"Loaded in {time.perf_counter() - t0:.1f}s ({args.target}):")
+    for table, n in counts.items():
+        print(f"  {table:<24} {n:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,84 @@ collect_vicidial_data.py
 Script për të mbledhur të dhëna nga Vicidial për Analyzer + Recommender.
 Përdor lidhjen ekzistuese të databazës nga core/db_vicidial.py
 
+Seksionet ekzekutohen paralelisht mbi një pool të vogël lidhjesh
+(core/collector.py), me kufi kohe për seksion; në fund shtypet latenca
+dhe numri i rreshtave për çdo seksion.
+
+Me --incremental, seksionet agregate (status, orët, ditët, prefikset,
+listat) lexohen vetëm për ditët pas watermark-ut dhe bashkohen me agregatet
+ditore të ruajtura në out_analysis/collector_state/ (core/collector_incremental.py).
+
+Me --campaigns a,b,c, seksionet e rënda ekzekutohen një herë me GROUP BY
+campaign_id dhe ndahen në një file për kampanjë
+(vicidial_analysis_data_{db_key}_{campaign}.json + .vcsnap).
+
+SQL e seksioneve përdor %(campaign_id)s / %(days_back)s / %(campaign_ids)s;
+vlerat lidhen si parametra nga core/query_templates.py (jo f-string).
+
 Usage:
-    python collect_vicidial_data.py
+    python collect_vicidial_data.py [--workers 4] [--timeout 300] [--incremental]
+    python collect_vicidial_data.py --campaigns autobiz,energy [--db-key db2]
+
+Seksioni 7 (prefix_analysis) mbledh të gjitha prefikset, pa HAVING/LIMIT;
+seksioni 7b (prefix_hour_status) mbledh prefix_4 × status × orë me masa
+aditive dhe ruhet vetëm në snapshot (SNAPSHOT_ONLY_SECTIONS).
 
 Output:
-    vicidial_analysis_data.json (të gjitha të dhënat)
+    vicidial_analysis_data_{db_key}.json (të dhënat, pa SNAPSHOT_ONLY_SECTIONS)
+    vicidial_analysis_data_{db_key}.vcsnap (snapshot binar me të gjitha seksionet, core/snapshot.py)
 """
 
 import json
+import time
+from dataclasses import replace
 from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
 import pymysql
 import pathlib
 import argparse
 
+from core.collector import (
+    CollectorJob,
+    SectionResult,
+    SplitSpec,
+    format_collection_report,
+    run_collector_jobs,
+    split_rows,
+)
+from core.collector_incremental import (
+    INCREMENTAL_KEYS,
+    CollectorState,
+    apply_incremental_results,
+    plan_incremental_jobs,
+)
+from core.db_pool import ConnectionPool
+from core.query_templates import bind
+from core.snapshot import snapshot_path_for, write_snapshot
+from core.status_settings import get_collector_settings, get_query_cache_settings
+
 # Defaults (overridable via CLI)
 CAMPAIGN_ID = "autobiz"
 DB_KEY = "db2"
 DAYS_BACK = 7  # Last N days for analysis
+WORKERS = None  # Lidhje paralele (None = config/settings.json)
+TIMEOUT_SEC = None  # Kufiri për seksion në sekonda (None = config/settings.json)
+INCREMENTAL = False  # Lexo vetëm ditët e reja për seksionet agregate
+CAMPAIGNS: List[str] = []  # --campaigns (bosh = vetëm CAMPAIGN_ID)
 
 def _parse_args():
     parser = argparse.ArgumentParser(description="Collect Vicidial data for Analyzer")
     parser.add_argument("--campaign", dest="campaign", default=CAMPAIGN_ID)
+    parser.add_argument("--campaigns", dest="campaigns", default=None,
+                        help="Disa kampanja të ndara me presje (p.sh. autobiz,energy); një skanim për të gjitha")
     parser.add_argument("--db-key", dest="db_key", default=DB_KEY)
     parser.add_argument("--days", dest="days", type=int, default=DAYS_BACK)
+    parser.add_argument("--workers", dest="workers", type=int, default=None,
+                        help="Query paralele (default collector_workers në settings)")
+    parser.add_argument("--timeout", dest="timeout", type=float, default=None,
+                        help="Kufiri i kohës për seksion në sekonda (default collector_section_timeout_sec)")
+    parser.add_argument("--incremental", dest="incremental", action="store_true",
+                        help="Lexo vetëm ditët pas watermark-ut dhe bashkoji me agregatet e ruajtura")
     return parser.parse_args()
 
 def read_secrets():
@@ -46,8 +101,8 @@ def read_secrets():
     with open(secrets_path, "rb") as f:
         return tomllib.load(f)
 
-def get_db_connection():
-    """Krijon lidhjen me databazën"""
+def get_connection_factory(read_timeout: float):
+    """Lexon kredencialet dhe kthen funksionin që hap një lidhje të re (për pool-in)."""
     secrets = read_secrets()
 
     # Try to get db2 config
@@ -68,83 +123,45 @@ def get_db_connection():
     print(f"   Database: {database}")
     print(f"   User: {user}")
 
-    conn = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        database=database,
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor
-    )
-    return conn
-
-def execute_query(conn, query, description=""):
-    """Ekzekuton një query dhe kthen rezultatet"""
-    print(f"\n{'='*60}")
-    print(f"Executing: {description}")
-    print(f"{'='*60}")
-
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute(query)
-            results = cursor.fetchall()
-            print(f"✅ Retrieved {len(results)} rows")
-            return results
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return []
-
-def main():
-    # Allow overrides via CLI
-    global CAMPAIGN_ID, DB_KEY, DAYS_BACK
-    try:
-        args = _parse_args()
-        CAMPAIGN_ID = args.campaign
-        DB_KEY = args.db_key
-        DAYS_BACK = int(args.days)
-    except Exception:
-        pass
-    print(f"""
-╔═══════════════════════════════════════════════════════════╗
-║     VICIDIAL DATA COLLECTION FOR AI ANALYZER              ║
-║     Campaign: {CAMPAIGN_ID}                                     ║
-║     Database key: {DB_KEY}                                       ║
-║     Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}                          ║
-╚═══════════════════════════════════════════════════════════╝
-    """)
-
-    # Connect to database
-    print("\n🔌 Connecting to Vicidial database...")
-    try:
-        conn = get_db_connection()
-        print("✅ Connected successfully!")
-    except Exception as e:
-        print(f"❌ Connection failed: {e}")
-        return
-
-    # Data collection object
-    data = {
-        "collection_date": datetime.now().isoformat(),
-        "campaign_id": CAMPAIGN_ID,
-        "db_key": DB_KEY,
-        "analysis_period_days": DAYS_BACK
-    }
+    def _connect():
+        # read_timeout: kufi i fundit në klient kur serveri nuk e ndal query-n vetë
+        return pymysql.connect(
+            host=host,
+            user=user,
+            password=password,
+            database=database,
+            charset='utf8mb4',
+            autocommit=True,
+            read_timeout=read_timeout,
+            cursorclass=pymysql.cursors.DictCursor
+        )
+    return _connect
+
+def bind_jobs(jobs: List[CollectorJob], **params) -> List[CollectorJob]:
+    """Zëvendëson %(emri)s në SQL të job-eve me parametra të lidhur (core/query_templates.py)."""
+    bound = []
+    for job in jobs:
+        sql, args = bind(job.sql, params)
+        bound.append(replace(job, sql=sql, params=args or ()))
+    return bound
+
+def build_collection_jobs(campaign_id: str, days_back: int) -> List[CollectorJob]:
+    """Seksionet e vicidial_analysis_data.json si query të pavarura (core/collector.py)."""
+    jobs: List[CollectorJob] = []
 
     # ========================================================
     # 1. CAMPAIGN CONFIGURATION
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("campaign_config", "1. Campaign Configuration", """
     SELECT *
     FROM vicidial_campaigns
-    WHERE campaign_id = '{CAMPAIGN_ID}'
-    """
-    results = execute_query(conn, query, "1. Campaign Configuration")
-    data["campaign_config"] = results[0] if results else {}
+    WHERE campaign_id = %(campaign_id)s
+    """, first_row=True))
 
     # ========================================================
     # 2. CUSTOM FIELDS STRUCTURE
     # ========================================================
-    query = """
+    jobs.append(CollectorJob("custom_fields", "2. Custom Fields in vicidial_list", """
     SELECT COLUMN_NAME, DATA_TYPE, COLUMN_COMMENT
     FROM INFORMATION_SCHEMA.COLUMNS
     WHERE TABLE_SCHEMA = 'asterisk'
@@ -156,14 +173,12 @@ def main():
          OR COLUMN_NAME LIKE '%rank%'
          OR COLUMN_NAME LIKE '%quality%')
     ORDER BY ORDINAL_POSITION
-    """
-    results = execute_query(conn, query, "2. Custom Fields in vicidial_list")
-    data["custom_fields"] = results
+    """))
 
     # ========================================================
     # 3. ACTIVE LISTS SUMMARY
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("active_lists", "3. Active Lists Summary", """
     SELECT
         vl.list_id,
         vl.list_name,
@@ -176,17 +191,15 @@ def main():
         AVG(vll.called_count) as avg_called_count
     FROM vicidial_lists vl
     LEFT JOIN vicidial_list vll ON vl.list_id = vll.list_id
-    WHERE vl.campaign_id = '{CAMPAIGN_ID}'
+    WHERE vl.campaign_id = %(campaign_id)s
     GROUP BY vl.list_id, vl.list_name, vl.active, vl.list_description
     ORDER BY vl.active DESC, total_leads DESC
-    """
-    results = execute_query(conn, query, "3. Active Lists Summary")
-    data["active_lists"] = results
+    """))
 
     # ========================================================
     # 4. STATUS DISTRIBUTION (Last 7 days)
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("status_distribution", "4. Status Distribution", """
     SELECT
         status,
         COUNT(*) as count,
@@ -194,18 +207,16 @@ def main():
         ROUND(AVG(length_in_sec), 1) as avg_duration_sec,
         ROUND(SUM(length_in_sec)/60, 2) as total_minutes
     FROM vicidial_log
-    WHERE campaign_id = '{CAMPAIGN_ID}'
-    AND call_date >= DATE_SUB(NOW(), INTERVAL {DAYS_BACK} DAY)
+    WHERE campaign_id = %(campaign_id)s
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
     GROUP BY status
     ORDER BY count DESC
-    """
-    results = execute_query(conn, query, "4. Status Distribution")
-    data["status_distribution"] = results
+    """))
 
     # ========================================================
     # 5. HOURLY PERFORMANCE (with conversion metrics)
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("hourly_performance", "5. Hourly Performance", """
     SELECT
         HOUR(call_date) as hour,
         COUNT(*) as total_calls,
@@ -215,18 +226,16 @@ def main():
         SUM(CASE WHEN status = 'SVYCLM' THEN 1 ELSE 0 END) as svyclm_count,
         ROUND(SUM(CASE WHEN status IN ('PU', 'SVYCLM') THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) as conversion_rate
     FROM vicidial_log
-    WHERE campaign_id = '{CAMPAIGN_ID}'
-    AND call_date >= DATE_SUB(NOW(), INTERVAL {DAYS_BACK} DAY)
+    WHERE campaign_id = %(campaign_id)s
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
     GROUP BY hour
     ORDER BY hour
-    """
-    results = execute_query(conn, query, "5. Hourly Performance")
-    data["hourly_performance"] = results
+    """))
 
     # ========================================================
     # 6. DAILY PERFORMANCE (Last 30 days)
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("daily_performance", "6. Daily Performance (30 days)", """
     SELECT
         DATE(call_date) as date,
         DAYNAME(call_date) as day_name,
@@ -235,19 +244,17 @@ def main():
         ROUND(SUM(length_in_sec)/60 * 0.0032, 2) as est_cost_fix,
         ROUND(SUM(length_in_sec)/60 * 0.0105, 2) as est_cost_mobile
     FROM vicidial_log
-    WHERE campaign_id = '{CAMPAIGN_ID}'
+    WHERE campaign_id = %(campaign_id)s
     AND call_date >= DATE_SUB(NOW(), INTERVAL 30 DAY)
     GROUP BY date, day_name
     ORDER BY date DESC
     LIMIT 30
-    """
-    results = execute_query(conn, query, "6. Daily Performance (30 days)")
-    data["daily_performance"] = results
+    """))
 
     # ========================================================
-    # 7. PREFIX ANALYSIS
+    # 7. PREFIX ANALYSIS (të gjitha prefikset, pa HAVING/LIMIT)
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("prefix_analysis", "7. Prefix Analysis", """
     SELECT
         SUBSTRING(phone_number, 1, 2) as prefix_2,
         SUBSTRING(phone_number, 1, 3) as prefix_3,
@@ -256,22 +263,39 @@ def main():
         ROUND(AVG(length_in_sec), 1) as avg_duration,
         ROUND(SUM(length_in_sec)/60, 2) as total_minutes
     FROM vicidial_log
-    WHERE campaign_id = '{CAMPAIGN_ID}'
-    AND call_date >= DATE_SUB(NOW(), INTERVAL {DAYS_BACK} DAY)
+    WHERE campaign_id = %(campaign_id)s
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
     AND phone_number IS NOT NULL
     AND phone_number != ''
     GROUP BY prefix_2, prefix_3, prefix_4
-    HAVING calls > 50
     ORDER BY calls DESC
-    LIMIT 150
-    """
-    results = execute_query(conn, query, "7. Prefix Analysis (Top 150)")
-    data["prefix_analysis"] = results
+    """))
+
+    # ========================================================
+    # 7b. PREFIX × STATUS × HOUR (rezolucion i plotë, vetëm në .vcsnap)
+    # ========================================================
+    # Masat janë aditive (COUNT, SUM sekonda): provincat dhe kostot llogariten
+    # saktë nga analyzer-i (core/prefix_table.py), pa vlerësim nga top-N
+    jobs.append(CollectorJob("prefix_hour_status", "7b. Prefix x Status x Hour (full)", """
+    SELECT
+        SUBSTRING(phone_number, 1, 4) as prefix_4,
+        status,
+        HOUR(call_date) as hour,
+        COUNT(*) as calls,
+        SUM(length_in_sec) as total_sec
+    FROM vicidial_log
+    WHERE campaign_id = %(campaign_id)s
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
+    AND phone_number IS NOT NULL
+    AND phone_number != ''
+    GROUP BY prefix_4, status, hour
+    ORDER BY prefix_4, status, hour
+    """))
 
     # ========================================================
     # 8. LIST PERFORMANCE BY LIST_ID
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("list_performance", "8. List Performance Comparison", """
     SELECT
         vll.list_id,
         COUNT(*) as calls,
@@ -281,72 +305,64 @@ def main():
         COUNT(DISTINCT vlog.phone_number) as unique_phones
     FROM vicidial_log vlog
     JOIN vicidial_list vll ON vlog.lead_id = vll.lead_id
-    WHERE vlog.campaign_id = '{CAMPAIGN_ID}'
-    AND vlog.call_date >= DATE_SUB(NOW(), INTERVAL {DAYS_BACK} DAY)
+    WHERE vlog.campaign_id = %(campaign_id)s
+    AND vlog.call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
     GROUP BY vll.list_id
     ORDER BY calls DESC
-    """
-    results = execute_query(conn, query, "8. List Performance Comparison")
-    data["list_performance"] = results
+    """))
 
     # ========================================================
     # 9. LEAD RECYCLE STATUS
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("recycling_status", "9. Lead Recycling Status", """
     SELECT
         status,
         called_count,
         COUNT(*) as leads_count
     FROM vicidial_list
     WHERE list_id IN (
-        SELECT list_id FROM vicidial_lists WHERE campaign_id = '{CAMPAIGN_ID}'
+        SELECT list_id FROM vicidial_lists WHERE campaign_id = %(campaign_id)s
     )
     GROUP BY status, called_count
     ORDER BY called_count DESC, status
     LIMIT 100
-    """
-    results = execute_query(conn, query, "9. Lead Recycling Status")
-    data["recycling_status"] = results
+    """))
 
     # ========================================================
     # 10. CLOSER LOG (IVR Events - Last 7 days)
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("closer_log", "10. Closer Log (IVR Press Events)", """
     SELECT
         DATE(call_date) as date,
         status,
         COUNT(*) as count,
         ROUND(AVG(length_in_sec), 1) as avg_duration
     FROM vicidial_closer_log
-    WHERE campaign_id = '{CAMPAIGN_ID}'
-    AND call_date >= DATE_SUB(NOW(), INTERVAL {DAYS_BACK} DAY)
+    WHERE campaign_id = %(campaign_id)s
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
     GROUP BY date, status
     ORDER BY date DESC, count DESC
-    """
-    results = execute_query(conn, query, "10. Closer Log (IVR Press Events)")
-    data["closer_log"] = results
+    """))
 
     # ========================================================
     # 11. SAMPLE LEADS (to see structure)
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("sample_leads", "11. Sample Leads Data", """
     SELECT *
     FROM vicidial_list
     WHERE list_id IN (
         SELECT list_id FROM vicidial_lists
-        WHERE campaign_id = '{CAMPAIGN_ID}'
+        WHERE campaign_id = %(campaign_id)s
         AND active = 'Y'
         LIMIT 1
     )
     LIMIT 20
-    """
-    results = execute_query(conn, query, "11. Sample Leads Data")
-    data["sample_leads"] = results
+    """))
 
     # ========================================================
     # 12. CALL TIME CONFIG
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("call_time_config", "12. Call Time Configuration", """
     SELECT ct.call_time_id, ct.call_time_name, ct.call_time_comments,
            cth.call_time_id, cth.start_hour, cth.start_min,
            cth.stop_hour, cth.stop_min, cth.day_of_week
@@ -354,42 +370,36 @@ def main():
     LEFT JOIN vicidial_call_time_hours cth ON ct.call_time_id = cth.call_time_id
     WHERE ct.call_time_id = (
         SELECT local_call_time FROM vicidial_campaigns
-        WHERE campaign_id = '{CAMPAIGN_ID}'
+        WHERE campaign_id = %(campaign_id)s
     )
     ORDER BY cth.day_of_week, cth.start_hour
-    """
-    results = execute_query(conn, query, "12. Call Time Configuration")
-    data["call_time_config"] = results
+    """))
 
     # ========================================================
     # 13. LEAD FILTER CONFIG
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("lead_filter_config", "13. Lead Filter Config", """
     SELECT *
     FROM vicidial_lead_filters
     WHERE lead_filter_id = (
         SELECT lead_filter_id FROM vicidial_campaigns
-        WHERE campaign_id = '{CAMPAIGN_ID}'
+        WHERE campaign_id = %(campaign_id)s
     )
-    """
-    results = execute_query(conn, query, "13. Lead Filter Config")
-    data["lead_filter_config"] = results
+    """))
 
-    query = f"""
+    jobs.append(CollectorJob("lead_filter_rules", "13b. Lead Filter Rules", """
     SELECT *
     FROM vicidial_lead_filter_rules
     WHERE lead_filter_id = (
         SELECT lead_filter_id FROM vicidial_campaigns
-        WHERE campaign_id = '{CAMPAIGN_ID}'
+        WHERE campaign_id = %(campaign_id)s
     )
-    """
-    results = execute_query(conn, query, "13b. Lead Filter Rules")
-    data["lead_filter_rules"] = results
+    """))
 
     # ========================================================
     # 14. HOPPER STATUS
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("hopper_status", "14. Current Hopper Status", """
     SELECT
         list_id,
         COUNT(*) as leads_in_hopper,
@@ -398,17 +408,15 @@ def main():
         status,
         priority
     FROM vicidial_hopper
-    WHERE campaign_id = '{CAMPAIGN_ID}'
+    WHERE campaign_id = %(campaign_id)s
     GROUP BY list_id, status, priority
     ORDER BY leads_in_hopper DESC
-    """
-    results = execute_query(conn, query, "14. Current Hopper Status")
-    data["hopper_status"] = results
+    """))
 
     # ========================================================
     # 15. PREFIX STATISTICS BY STATUS
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("prefix_status_analysis", "15. Prefix + Status Analysis", """
     SELECT
         SUBSTRING(phone_number, 1, 2) as prefix_2,
         SUBSTRING(phone_number, 1, 3) as prefix_3,
@@ -417,68 +425,425 @@ def main():
         ROUND(AVG(length_in_sec), 1) as avg_duration,
         ROUND(SUM(length_in_sec)/60, 2) as total_minutes
     FROM vicidial_log
-    WHERE campaign_id = '{CAMPAIGN_ID}'
-    AND call_date >= DATE_SUB(NOW(), INTERVAL {DAYS_BACK} DAY)
+    WHERE campaign_id = %(campaign_id)s
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
     AND phone_number IS NOT NULL
     AND LENGTH(phone_number) >= 6
     GROUP BY prefix_2, prefix_3, status
     HAVING calls > 20
     ORDER BY prefix_2, prefix_3, calls DESC
     LIMIT 500
-    """
-    results = execute_query(conn, query, "15. Prefix + Status Analysis")
-    data["prefix_status_analysis"] = results
+    """))
 
     # ========================================================
     # 16. VICIDIAL STATUS NAMES
     # ========================================================
-    query = f"""
+    jobs.append(CollectorJob("status_definitions", "16. Campaign Status Definitions", """
     SELECT
         status, status_name, selectable, human_answered,
         sale, dnc, customer_contact, not_interested,
         scheduled_callback, completed
     FROM vicidial_campaign_statuses
-    WHERE campaign_id = '{CAMPAIGN_ID}'
+    WHERE campaign_id = %(campaign_id)s
     ORDER BY status
+    """))
+
+    return bind_jobs(jobs, campaign_id=campaign_id, days_back=int(days_back))
+
+# Seksionet që nuk varen nga kampanja (lexohen një herë në modalitetin multi)
+GLOBAL_SECTIONS = ("custom_fields",)
+
+# Seksionet me rezolucion të plotë që nuk shkruhen në JSON (vetëm në .vcsnap)
+SNAPSHOT_ONLY_SECTIONS = ("prefix_hour_status",)
+
+
+# vicidial_lists.active ENUM('Y','N'): ORDER BY active DESC jep 'N' para 'Y' (indeksi i ENUM-it)
+LIST_ACTIVE_ENUM = ("Y", "N")
+
+
+def build_shared_jobs(campaign_ids: List[str], days_back: int) -> List[Tuple[CollectorJob, SplitSpec]]:
+    """Seksionet e rënda për disa kampanja njëherësh (GROUP BY campaign_id).
+
+    Çdo query skanon dritaren e vicidial_log një herë për të gjitha kampanjat;
+    split_rows() e ndan rezultatin me të njëjtin ORDER BY/LIMIT si
+    build_collection_jobs() për një kampanjë (campaign_id pa dallim shkronjash,
+    ENUM-et sipas rendit të deklaruar, si MySQL).
     """
-    results = execute_query(conn, query, "16. Campaign Status Definitions")
-    data["status_definitions"] = results
+    shared: List[Tuple[CollectorJob, SplitSpec]] = []
+
+    shared.append((CollectorJob("active_lists", "3. Active Lists Summary (shared)", """
+    SELECT
+        vl.campaign_id,
+        vl.list_id,
+        vl.list_name,
+        vl.active,
+        vl.list_description,
+        COUNT(DISTINCT vll.lead_id) as total_leads,
+        SUM(CASE WHEN vll.called_count = 0 THEN 1 ELSE 0 END) as never_called,
+        SUM(CASE WHEN vll.called_count > 0 THEN 1 ELSE 0 END) as called_before,
+        MAX(vll.called_count) as max_called_count,
+        AVG(vll.called_count) as avg_called_count
+    FROM vicidial_lists vl
+    LEFT JOIN vicidial_list vll ON vl.list_id = vll.list_id
+    WHERE vl.campaign_id IN (%(campaign_ids)s)
+    GROUP BY vl.campaign_id, vl.list_id, vl.list_name, vl.active, vl.list_description
+    """), SplitSpec(order_by=(("active", True), ("total_leads", True)), enums=(("active", LIST_ACTIVE_ENUM),))))
 
-    # Close connection
-    conn.close()
-    print("\n✅ Database connection closed")
+    shared.append((CollectorJob("status_distribution", "4. Status Distribution (shared)", """
+    SELECT
+        campaign_id,
+        status,
+        COUNT(*) as count,
+        ROUND(COUNT(*)*100.0/SUM(COUNT(*)) OVER(PARTITION BY campaign_id), 2) as percentage,
+        ROUND(AVG(length_in_sec), 1) as avg_duration_sec,
+        ROUND(SUM(length_in_sec)/60, 2) as total_minutes
+    FROM vicidial_log
+    WHERE campaign_id IN (%(campaign_ids)s)
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
+    GROUP BY campaign_id, status
+    """), SplitSpec(order_by=(("count", True),))))
 
-    # ========================================================
-    # SAVE TO JSON
-    # ========================================================
-    # Output file per DB key (e.g., vicidial_analysis_data_db.json)
-    suffix = DB_KEY.replace("/", "_")
-    output_file = f"vicidial_analysis_data_{suffix}.json"
-
-    # Convert any non-serializable objects
-    def convert_decimals(obj):
-        """Convert Decimal to float for JSON serialization"""
-        if isinstance(obj, list):
-            return [convert_decimals(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {key: convert_decimals(value) for key, value in obj.items()}
-        elif hasattr(obj, '__float__'):
-            return float(obj)
-        elif hasattr(obj, 'isoformat'):
-            return obj.isoformat()
-        else:
-            return obj
+    shared.append((CollectorJob("hourly_performance", "5. Hourly Performance (shared)", """
+    SELECT
+        campaign_id,
+        HOUR(call_date) as hour,
+        COUNT(*) as total_calls,
+        ROUND(AVG(length_in_sec), 1) as avg_duration,
+        ROUND(SUM(length_in_sec)/60, 2) as total_minutes,
+        SUM(CASE WHEN status = 'PU' THEN 1 ELSE 0 END) as pu_count,
+        SUM(CASE WHEN status = 'SVYCLM' THEN 1 ELSE 0 END) as svyclm_count,
+        ROUND(SUM(CASE WHEN status IN ('PU', 'SVYCLM') THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) as conversion_rate
+    FROM vicidial_log
+    WHERE campaign_id IN (%(campaign_ids)s)
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
+    GROUP BY campaign_id, hour
+    """), SplitSpec(order_by=(("hour", False),))))
 
-    data = convert_decimals(data)
+    shared.append((CollectorJob("daily_performance", "6. Daily Performance (30 days, shared)", """
+    SELECT
+        campaign_id,
+        DATE(call_date) as date,
+        DAYNAME(call_date) as day_name,
+        COUNT(*) as total_calls,
+        ROUND(SUM(length_in_sec)/60, 2) as total_minutes,
+        ROUND(SUM(length_in_sec)/60 * 0.0032, 2) as est_cost_fix,
+        ROUND(SUM(length_in_sec)/60 * 0.0105, 2) as est_cost_mobile
+    FROM vicidial_log
+    WHERE campaign_id IN (%(campaign_ids)s)
+    AND call_date >= DATE_SUB(NOW(), INTERVAL 30 DAY)
+    GROUP BY campaign_id, date, day_name
+    """), SplitSpec(order_by=(("date", True),), limit=30)))
+
+    shared.append((CollectorJob("prefix_analysis", "7. Prefix Analysis (shared)", """
+    SELECT
+        campaign_id,
+        SUBSTRING(phone_number, 1, 2) as prefix_2,
+        SUBSTRING(phone_number, 1, 3) as prefix_3,
+        SUBSTRING(phone_number, 1, 4) as prefix_4,
+        COUNT(*) as calls,
+        ROUND(AVG(length_in_sec), 1) as avg_duration,
+        ROUND(SUM(length_in_sec)/60, 2) as total_minutes
+    FROM vicidial_log
+    WHERE campaign_id IN (%(campaign_ids)s)
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
+    AND phone_number IS NOT NULL
+    AND phone_number != ''
+    GROUP BY campaign_id, prefix_2, prefix_3, prefix_4
+    """), SplitSpec(order_by=(("calls", True),))))
+
+    shared.append((CollectorJob("prefix_hour_status", "7b. Prefix x Status x Hour (full, shared)", """
+    SELECT
+        campaign_id,
+        SUBSTRING(phone_number, 1, 4) as prefix_4,
+        status,
+        HOUR(call_date) as hour,
+        COUNT(*) as calls,
+        SUM(length_in_sec) as total_sec
+    FROM vicidial_log
+    WHERE campaign_id IN (%(campaign_ids)s)
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
+    AND phone_number IS NOT NULL
+    AND phone_number != ''
+    GROUP BY campaign_id, prefix_4, status, hour
+    """), SplitSpec(order_by=(("prefix_4", False), ("status", False), ("hour", False)))))
+
+    shared.append((CollectorJob("list_performance", "8. List Performance Comparison (shared)", """
+    SELECT
+        vlog.campaign_id,
+        vll.list_id,
+        COUNT(*) as calls,
+        ROUND(AVG(vlog.length_in_sec), 1) as avg_duration,
+        ROUND(SUM(vlog.length_in_sec)/60, 2) as total_minutes,
+        COUNT(DISTINCT vlog.lead_id) as unique_leads,
+        COUNT(DISTINCT vlog.phone_number) as unique_phones
+    FROM vicidial_log vlog
+    JOIN vicidial_list vll ON vlog.lead_id = vll.lead_id
+    WHERE vlog.campaign_id IN (%(campaign_ids)s)
+    AND vlog.call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
+    GROUP BY vlog.campaign_id, vll.list_id
+    """), SplitSpec(order_by=(("calls", True),))))
+
+    shared.append((CollectorJob("recycling_status", "9. Lead Recycling Status (shared)", """
+    SELECT
+        vl.campaign_id,
+        vll.status,
+        vll.called_count,
+        COUNT(*) as leads_count
+    FROM vicidial_list vll
+    JOIN vicidial_lists vl ON vll.list_id = vl.list_id
+    WHERE vl.campaign_id IN (%(campaign_ids)s)
+    GROUP BY vl.campaign_id, vll.status, vll.called_count
+    """), SplitSpec(order_by=(("called_count", True), ("status", False)), limit=100)))
+
+    shared.append((CollectorJob("closer_log", "10. Closer Log (IVR Press Events, shared)", """
+    SELECT
+        campaign_id,
+        DATE(call_date) as date,
+        status,
+        COUNT(*) as count,
+        ROUND(AVG(length_in_sec), 1) as avg_duration
+    FROM vicidial_closer_log
+    WHERE campaign_id IN (%(campaign_ids)s)
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
+    GROUP BY campaign_id, date, status
+    """), SplitSpec(order_by=(("date", True), ("count", True)))))
+
+    shared.append((CollectorJob("hopper_status", "14. Current Hopper Status (shared)", """
+    SELECT
+        campaign_id,
+        list_id,
+        COUNT(*) as leads_in_hopper,
+        MIN(gmt_offset_now) as min_gmt,
+        MAX(gmt_offset_now) as max_gmt,
+        status,
+        priority
+    FROM vicidial_hopper
+    WHERE campaign_id IN (%(campaign_ids)s)
+    GROUP BY campaign_id, list_id, status, priority
+    """), SplitSpec(order_by=(("leads_in_hopper", True),))))
 
+    shared.append((CollectorJob("prefix_status_analysis", "15. Prefix + Status Analysis (shared)", """
+    SELECT
+        campaign_id,
+        SUBSTRING(phone_number, 1, 2) as prefix_2,
+        SUBSTRING(phone_number, 1, 3) as prefix_3,
+        status,
+        COUNT(*) as calls,
+        ROUND(AVG(length_in_sec), 1) as avg_duration,
+        ROUND(SUM(length_in_sec)/60, 2) as total_minutes
+    FROM vicidial_log
+    WHERE campaign_id IN (%(campaign_ids)s)
+    AND call_date >= DATE_SUB(NOW(), INTERVAL %(days_back)s DAY)
+    AND phone_number IS NOT NULL
+    AND LENGTH(phone_number) >= 6
+    GROUP BY campaign_id, prefix_2, prefix_3, status
+    HAVING calls > 20
+    """), SplitSpec(order_by=(("prefix_2", False), ("prefix_3", False), ("calls", True)), limit=500)))
+
+    params = {"campaign_ids": list(campaign_ids), "days_back": int(days_back)}
+    return [(bound, spec) for bound, (_, spec) in zip(bind_jobs([job for job, _ in shared], **params), shared)]
+
+def _new_dataset(campaign_id: str) -> Dict:
+    return {
+        "collection_date": datetime.now().isoformat(),
+        "campaign_id": campaign_id,
+        "db_key": DB_KEY,
+        "analysis_period_days": DAYS_BACK
+    }
+
+
+def _print_section(res: SectionResult):
+    if res.ok:
+        print(f"✅ {res.description}: {len(res.rows)} rows ({res.elapsed_sec:.2f}s)")
+    else:
+        print(f"❌ {res.description}: {res.error}")
+
+
+def _run_jobs(pool: ConnectionPool, jobs: List[CollectorJob]) -> Tuple[Dict[str, SectionResult], float]:
+    print(
+        f"\n🚀 Running {len(jobs)} sections with {WORKERS} parallel connections "
+        f"(timeout {TIMEOUT_SEC:.0f}s/section)..."
+    )
+    t0 = time.perf_counter()
+    try:
+        results = run_collector_jobs(jobs, pool, max_workers=WORKERS, timeout_sec=TIMEOUT_SEC, on_done=_print_section)
+    finally:
+        pool.close()
+        print("\n✅ Database connections closed")
+    return results, time.perf_counter() - t0
+
+
+def collect_single_campaign(pool: ConnectionPool, campaign_id: str):
+    """Një kampanjë (me --incremental opsional). Kthen ({campaign: data}, results, wall_time)."""
+    data = _new_dataset(campaign_id)
+    jobs = build_collection_jobs(campaign_id, DAYS_BACK)
+    section_order = [job.key for job in jobs]
+    first_row = {job.key: job.first_row for job in jobs}
+    if INCREMENTAL:
+        state = CollectorState(DB_KEY, campaign_id)
+        grace = get_query_cache_settings()["closed_grace_hours"]
+        inc_jobs, inc_ranges = plan_incremental_jobs(campaign_id, DAYS_BACK, state, grace_hours=grace)
+        jobs = [job for job in jobs if job.key not in INCREMENTAL_KEYS] + inc_jobs
+        print(f"\n📅 Incremental mode ({state.path}):")
+        for key, (start, _first, settled) in inc_ranges.items():
+            print(f"   {key}: watermark {state.watermark(key) or '-'} → reading from {start} (live from {settled})")
+
+    results, wall_time = _run_jobs(pool, jobs)
+
+    if INCREMENTAL:
+        merged = apply_incremental_results(results, inc_ranges, state)
+        state.save()
+    else:
+        merged = {}
+    for key in section_order:
+        data[key] = merged[key] if key in merged else results[key].value(first_row[key])
+    return {campaign_id: data}, results, wall_time
+
+
+def collect_multi_campaign(pool: ConnectionPool, campaign_ids: List[str]):
+    """Disa kampanja: seksionet e rënda lexohen një herë me GROUP BY campaign_id.
+
+    Seksionet e lehta (konfigurimi, call time, filtrat, sample leads...) mbeten
+    për kampanjë. Kthen ({campaign: data}, results, wall_time), me të njëjtat
+    seksione dhe të njëjtin rend si për një kampanjë.
+    """
+    shared = build_shared_jobs(campaign_ids, DAYS_BACK)
+    shared_keys = {job.key for job, _ in shared}
+    template = build_collection_jobs(campaign_ids[0], DAYS_BACK)
+
+    jobs: List[CollectorJob] = [job for job, _ in shared]
+    jobs += [job for job in template if job.key in GLOBAL_SECTIONS]
+    own: Dict[str, List[CollectorJob]] = {}
+    for campaign_id in campaign_ids:
+        own[campaign_id] = [
+            job for job in build_collection_jobs(campaign_id, DAYS_BACK)
+            if job.key not in shared_keys and job.key not in GLOBAL_SECTIONS
+        ]
+        jobs += [
+            replace(job, key=f"{campaign_id}:{job.key}", description=f"[{campaign_id}] {job.description}")
+            for job in own[campaign_id]
+        ]
+
+    results, wall_time = _run_jobs(pool, jobs)
+
+    split = {job.key: split_rows(results[job.key].rows, spec, campaign_ids) for job, spec in shared}
+    datasets: Dict[str, Dict] = {}
+    for campaign_id in campaign_ids:
+        data = _new_dataset(campaign_id)
+        own_by_key = {job.key: job for job in own[campaign_id]}
+        for job in template:
+            if job.key in split:
+                data[job.key] = split[job.key][campaign_id]
+            elif job.key in GLOBAL_SECTIONS:
+                data[job.key] = results[job.key].value(job.first_row)
+            else:
+                data[job.key] = results[f"{campaign_id}:{job.key}"].value(own_by_key[job.key].first_row)
+        datasets[campaign_id] = data
+    return datasets, results, wall_time
+
+
+def convert_decimals(obj):
+    """Convert Decimal to float for JSON serialization"""
+    if isinstance(obj, list):
+        return [convert_decimals(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {key: convert_decimals(value) for key, value in obj.items()}
+    elif hasattr(obj, '__float__'):
+        return float(obj)
+    elif hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    else:
+        return obj
+
+
+def output_file_for(db_key: str, campaign_id: str = None) -> str:
+    """vicidial_analysis_data_{db_key}.json, ose ..._{db_key}_{campaign}.json në modalitetin multi."""
+    suffix = db_key.replace("/", "_")
+    if campaign_id:
+        suffix += "_" + campaign_id.replace("/", "_")
+    return f"vicidial_analysis_data_{suffix}.json"
+
+
+def save_analysis_data(data: Dict, output_file: str):
+    """Shkruan JSON-in (për njerëzit) dhe snapshot-in binar pranë tij; kthen path-in e snapshot-it.
+
+    Seksionet në SNAPSHOT_ONLY_SECTIONS shkruhen vetëm në snapshot (kolonore,
+    me kodim fjalori); JSON-i mbetet i vogël.
+    """
+    data = convert_decimals(data)
+    readable = {k: v for k, v in data.items() if k not in SNAPSHOT_ONLY_SECTIONS}
     with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        json.dump(readable, f, indent=2, ensure_ascii=False, default=str)
+    # Snapshot binar pranë JSON-it (list_analyzer.load_vicidial_data e lexon me mmap)
+    return write_snapshot(data, snapshot_path_for(output_file))
+
+def main():
+    # Allow overrides via CLI
+    global CAMPAIGN_ID, DB_KEY, DAYS_BACK, WORKERS, TIMEOUT_SEC, INCREMENTAL, CAMPAIGNS
+    try:
+        args = _parse_args()
+        CAMPAIGN_ID = args.campaign
+        DB_KEY = args.db_key
+        DAYS_BACK = int(args.days)
+        WORKERS = args.workers
+        TIMEOUT_SEC = args.timeout
+        INCREMENTAL = bool(args.incremental)
+        if args.campaigns:
+            CAMPAIGNS = list(dict.fromkeys(c.strip() for c in args.campaigns.split(",") if c.strip()))
+    except Exception:
+        pass
+    CAMPAIGNS = CAMPAIGNS or [CAMPAIGN_ID]
+    CAMPAIGN_ID = CAMPAIGNS[0]
+    cfg = get_collector_settings()
+    WORKERS = max(1, int(WORKERS or cfg["workers"]))
+    TIMEOUT_SEC = max(1.0, float(TIMEOUT_SEC or cfg["section_timeout_sec"]))
+    print(f"""
+╔═══════════════════════════════════════════════════════════╗
+║     VICIDIAL DATA COLLECTION FOR AI ANALYZER              ║
+║     Campaign: {', '.join(CAMPAIGNS)}                                     ║
+║     Database key: {DB_KEY}                                       ║
+║     Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}                          ║
+╚═══════════════════════════════════════════════════════════╝
+    """)
+
+    # Connect to database
+    print("\n🔌 Connecting to Vicidial database...")
+    try:
+        connect = get_connection_factory(read_timeout=TIMEOUT_SEC + 30)
+        pool = ConnectionPool(f"collector:{DB_KEY}", connect, max_size=WORKERS, checkout_timeout_sec=TIMEOUT_SEC)
+        pool.connection().release()  # verifikon kredencialet para se të nisin seksionet
+        print("✅ Connected successfully!")
+    except Exception as e:
+        print(f"❌ Connection failed: {e}")
+        return
+
+    if len(CAMPAIGNS) > 1:
+        if INCREMENTAL:
+            print("⚠️ --incremental nuk përdoret me disa kampanja; po lexohet dritarja e plotë.")
+        datasets, results, wall_time = collect_multi_campaign(pool, CAMPAIGNS)
+    else:
+        datasets, results, wall_time = collect_single_campaign(pool, CAMPAIGN_ID)
 
     print(f"\n{'='*60}")
-    print(f"✅ DATA COLLECTION COMPLETED!")
+    print("⏱️  Section latency")
     print(f"{'='*60}")
-    print(f"📁 Output file: {output_file}")
-    print(f"📊 Total sections: {len([k for k in data.keys() if k not in ['collection_date', 'campaign_id', 'db_key', 'analysis_period_days']])}")
+    print(format_collection_report(results, wall_time))
+
+    # ========================================================
+    # SAVE TO JSON
+    # ========================================================
+    single = len(datasets) == 1
+    for campaign_id, data in datasets.items():
+        output_file = output_file_for(DB_KEY, None if single else campaign_id)
+        snapshot_file = save_analysis_data(data, output_file)
+
+        print(f"\n{'='*60}")
+        print(f"✅ DATA COLLECTION COMPLETED! ({campaign_id})")
+        print(f"{'='*60}")
+        print(f"📁 Output file: {output_file}")
+        print(f"📦 Snapshot: {snapshot_file}")
+        meta_keys = ('collection_date', 'campaign_id', 'db_key', 'analysis_period_days')
+        print(f"📊 Total sections: {len([k for k in data.keys() if k not in meta_keys])}")
     print(f"\n💡 Next step: Share this file and I'll build the Analyzer + Recommender!")
     print(f"{'='*60}\n")
 
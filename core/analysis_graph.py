@@ -0,0 +1,233 @@
+"""
+core/analysis_graph.py
+
+PURPOSE:
+    Graf (DAG) i analizave të core/list_analyzer.py me memo sipas përmbajtjes
+    së seksioneve të snapshot-it.
+
+    generate_report() thërriste analyze_* njëra pas tjetrës, dhe
+    generate_vicidial_recommendations() i rithërriste province/hourly/recycling
+    nga e para; faqja Smart Report e rigjeneron raportin në çdo rerun. Këtu
+    çdo nyje deklaron seksionet që lexon (p.sh. "prefix_status_analysis") dhe
+    nyjet nga të cilat varet; rezultati ruhet me çelës = hash i atyre
+    seksioneve + çelësat e varësive. Në ekzekutimin e radhës rillogariten
+    vetëm nyjet me input të ndryshuar.
+
+KEY FEATURES:
+    - AnalysisNode: name, fn(data, **deps), reads (seksionet), deps (nyjet), version
+    - Qasje strikte: nyja sheh vetëm seksionet e deklaruara; leximi i një
+      seksioni të padeklaruar ngre UndeclaredSectionError (deklaratat mbeten të sakta)
+    - section_digest(): Snapshot.section_digest (nga bajtet, pa dekodim) ose
+      hash i JSON-it kanonik për dict
+    - AnalysisMemo: LRU në proces, thread-safe; rezultatet kthehen si kopje
+      (deepcopy), kështu thirrësi mund t'i ndryshojë pa prishur memo-n
+    - GraphRun: rezultatet + cilat nyje u rillogaritën / u morën nga memo
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+MAX_MEMO_ENTRIES = 256
+
+
+class UndeclaredSectionError(RuntimeError):
+    """Nyja lexoi një seksion që nuk e ka në `reads`."""
+
+
+@dataclass(frozen=True)
+class AnalysisNode:
+    """Një analizë në graf.
+
+    fn thirret si fn(view, **{dep: rezultati}) ku view përmban vetëm `reads`.
+    Rrit `version` kur ndryshon logjika e fn, që memo-t e vjetra të mos përdoren.
+    """
+    name: str
+    fn: Callable[..., Any]
+    reads: Tuple[str, ...] = ()
+    deps: Tuple[str, ...] = ()
+    version: str = "1"
+
+
+@dataclass
+class GraphRun:
+    """Rezultati i AnalysisGraph.run()."""
+    results: Dict[str, Any] = field(default_factory=dict)
+    recomputed: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+    timings_sec: Dict[str, float] = field(default_factory=dict)
+    keys: Dict[str, str] = field(default_factory=dict)
+
+
+class _SectionView(Mapping):
+    """Mapping read-only që ekspozon vetëm seksionet e deklaruara të `data`."""
+
+    def __init__(self, data: Mapping, allowed: Iterable[str], node: str):
+        self._data = data
+        self._allowed = frozenset(allowed)
+        self._node = node
+
+    def _check(self, key: Any) -> None:
+        if key not in self._allowed:
+            raise UndeclaredSectionError(
+                f"Nyja '{self._node}' lexoi seksionin '{key}' pa e deklaruar te reads"
+            )
+
+    def __getitem__(self, key: str) -> Any:
+        self._check(key)
+        return self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        self._check(key)
+        return key in self._data
+
+    def table(self, key: str) -> Any:
+        """Snapshot.table() për një seksion të deklaruar (TypeError për dict)."""
+        self._check(key)
+        table = getattr(self._data, "table", None)
+        if table is None:
+            raise TypeError(f"Seksioni '{key}' nuk është tabelë snapshot-i")
+        return table(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (k for k in self._data if k in self._allowed)
+
+    def __len__(self) -> int:
+        return sum(1 for k in self._allowed if k in self._data)
+
+
+def section_digest(data: Mapping, key: str) -> str:
+    """Hash i përmbajtjes së një seksioni (Snapshot lexon bajtet direkt)."""
+    if hasattr(data, "section_digest"):
+        return data.section_digest(key)
+    value = data.get(key) if key in data else None
+    payload = json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class AnalysisMemo:
+    """LRU i rezultateve të nyjeve: {çelës: rezultat}."""
+
+    def __init__(self, max_entries: int = MAX_MEMO_ENTRIES):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = self._entries[key]
+        return True, copy.deepcopy(value)
+
+    def put(self, key: str, value: Any) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class AnalysisGraph:
+    """DAG i nyjeve të analizës me memo sipas hash-it të input-eve.
+
+    Args:
+        nodes: Nyjet; varësitë duhet të jenë në graf dhe pa cikle
+        memo: AnalysisMemo (default: një i ri për grafin)
+    """
+
+    def __init__(self, nodes: Sequence[AnalysisNode], memo: Optional[AnalysisMemo] = None):
+        self.nodes: Dict[str, AnalysisNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Nyja '{node.name}' është deklaruar dy herë")
+            self.nodes[node.name] = node
+        self.memo = memo or AnalysisMemo()
+        self.order = self._toposort()
+
+    def _toposort(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = në vizitë, 2 = e përfunduar
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cikël në grafin e analizës: {' → '.join(path + (name,))}")
+            if name not in self.nodes:
+                raise ValueError(f"Varësi e panjohur '{name}' (nga {path[-1] if path else '?'})")
+            state[name] = 1
+            for dep in self.nodes[name].deps:
+                visit(dep, path + (name,))
+            state[name] = 2
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name, ())
+        return order
+
+    def _closure(self, targets: Optional[Iterable[str]]) -> List[str]:
+        if targets is None:
+            return list(self.order)
+        needed: set = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.nodes:
+                raise KeyError(f"Nyja '{name}' nuk ekziston")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.nodes[name].deps)
+        return [n for n in self.order if n in needed]
+
+    def run(self, data: Mapping, targets: Optional[Iterable[str]] = None) -> GraphRun:
+        """Ekzekuton nyjet e nevojshme për `targets` (default: të gjitha)."""
+        out = GraphRun()
+        digests: Dict[str, str] = {}
+        for name in self._closure(targets):
+            node = self.nodes[name]
+            for section in node.reads:
+                if section not in digests:
+                    digests[section] = section_digest(data, section)
+            key_src = json.dumps(
+                [node.name, node.version, [(s, digests[s]) for s in node.reads], [out.keys[d] for d in node.deps]],
+                separators=(",", ":"),
+            )
+            key = hashlib.blake2b(key_src.encode("utf-8"), digest_size=16).hexdigest()
+            out.keys[name] = key
+
+            found, value = self.memo.get(key)
+            if found:
+                out.reused.append(name)
+            else:
+                t0 = time.perf_counter()
+                view = _SectionView(data, node.reads, node.name)
+                value = node.fn(view, **{d: copy.deepcopy(out.results[d]) for d in node.deps})
+                out.timings_sec[name] = round(time.perf_counter() - t0, 4)
+                self.memo.put(key, value)
+                out.recomputed.append(name)
+            out.results[name] = value
+        return out
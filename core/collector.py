@@ -0,0 +1,227 @@
+"""
+core/collector.py
+
+PURPOSE:
+    Motori i mbledhjes së të dhënave për collect_vicidial_data.py.
+
+    Skripti bënte rreth 16 SELECT të pavarur njëri pas tjetrit në një lidhje
+    të vetme (konfigurimi i kampanjës, listat, statuset, orët, prefikset,
+    hopper...). Këtu çdo seksion deklarohet si CollectorJob me emër dhe
+    ekzekutohet paralelisht mbi një pool të vogël lidhjesh (core/db_pool.py),
+    me kufi kohe për seksion.
+
+KEY FEATURES:
+    - CollectorJob: seksioni (çelësi në JSON), përshkrimi, SQL, parametrat
+    - run_collector_jobs(): ekzekutim paralel, një lidhje nga pool-i për job
+    - Timeout për seksion: MAX_EXECUTION_TIME (MySQL) / max_statement_time
+      (MariaDB) në server + read_timeout i lidhjes si kufi i fundit në klient
+    - Seksioni që dështon nuk ndal të tjerët; lidhja e tij hidhet nga pool-i
+    - format_collection_report(): latenca dhe numri i rreshtave për seksion
+    - SplitSpec / split_rows(): një query me GROUP BY campaign_id ndahet në
+      rezultatet për çdo kampanjë (ORDER BY dhe LIMIT zbatohen për kampanjë).
+      Tekstet krahasohen si në collation-in _ci të MySQL (pa dallim
+      shkronjash, pa hapësirat në fund); kolonat ENUM renditen sipas rendit
+      të deklaruar, jo alfabetikisht
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.db_pool import ConnectionPool
+
+Row = Dict[str, Any]
+
+
+@dataclass
+class CollectorJob:
+    """Një seksion i vicidial_analysis_data.json.
+
+    Args:
+        key: Çelësi në JSON (p.sh. "status_distribution")
+        description: Teksti në log ("4. Status Distribution")
+        sql: Query-ja
+        params: Parametrat e query-t (pymysql %s)
+        first_row: Ruaj vetëm rreshtin e parë ({} kur s'ka rreshta), si campaign_config
+        timeout_sec: Kufiri i kohës për këtë seksion (None = default i ekzekutimit)
+    """
+    key: str
+    description: str
+    sql: str
+    params: Sequence[Any] = ()
+    first_row: bool = False
+    timeout_sec: Optional[float] = None
+
+
+@dataclass
+class SectionResult:
+    """Rezultati i një seksioni: rreshtat, koha dhe gabimi (nëse ka)."""
+    key: str
+    description: str
+    rows: List[Row] = field(default_factory=list)
+    elapsed_sec: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def value(self, first_row: bool = False) -> Any:
+        """Vlera që shkon në JSON (lista e rreshtave ose rreshti i parë)."""
+        if first_row:
+            return self.rows[0] if self.rows else {}
+        return self.rows
+
+
+def _set_statement_timeout(raw: Any, timeout_sec: float) -> None:
+    """Kufi kohe në server për SELECT-in e radhës (MySQL 5.7+ ose MariaDB 10.1+)."""
+    if getattr(raw, "_collector_no_server_timeout", False):
+        return
+    statements = (
+        ("SET SESSION MAX_EXECUTION_TIME = %s", int(timeout_sec * 1000)),
+        ("SET SESSION max_statement_time = %s", float(timeout_sec)),
+    )
+    for sql, value in statements:
+        try:
+            with raw.cursor() as cur:
+                cur.execute(sql, (value,))
+            return
+        except Exception:
+            continue
+    # Serveri nuk njeh asnjërën: mbetet vetëm read_timeout i lidhjes
+    try:
+        raw._collector_no_server_timeout = True
+    except Exception:
+        pass
+
+
+def _run_job(pool: ConnectionPool, job: CollectorJob, timeout_sec: float) -> SectionResult:
+    result = SectionResult(job.key, job.description)
+    t0 = time.perf_counter()
+    conn = None
+    discard = False
+    try:
+        conn = pool.connection()
+        _set_statement_timeout(conn.raw, job.timeout_sec or timeout_sec)
+        with conn.cursor() as cur:
+            cur.execute(job.sql, tuple(job.params) or None)
+            result.rows = list(cur.fetchall())
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        # Lidhja mund të ketë mbetur në mes të një rezultati ose të jetë ndërprerë
+        discard = True
+    finally:
+        if conn is not None:
+            conn.release(discard=discard)
+        result.elapsed_sec = time.perf_counter() - t0
+    return result
+
+
+def run_collector_jobs(
+    jobs: Sequence[CollectorJob],
+    pool: ConnectionPool,
+    max_workers: int = 4,
+    timeout_sec: float = 300.0,
+    on_done: Optional[Callable[[SectionResult], None]] = None,
+) -> Dict[str, SectionResult]:
+    """Ekzekuton seksionet paralelisht dhe kthen {key: SectionResult} sipas rendit të jobs.
+
+    Args:
+        jobs: Seksionet
+        pool: Pool-i i lidhjeve (max_size ≥ max_workers që të mos presin)
+        max_workers: Query paralele
+        timeout_sec: Kufiri i kohës për seksion kur job-i nuk ka timeout_sec
+        on_done: Callback për çdo seksion të mbaruar (thirret nga thread-i kryesor)
+    """
+    results: Dict[str, SectionResult] = {}
+    workers = max(1, min(int(max_workers), len(jobs) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collector") as ex:
+        futures = {ex.submit(_run_job, pool, job, timeout_sec): job for job in jobs}
+        for fut in as_completed(futures):
+            res = fut.result()
+            results[res.key] = res
+            if on_done is not None:
+                on_done(res)
+    return {job.key: results[job.key] for job in jobs}
+
+
+def format_collection_report(results: Dict[str, SectionResult], wall_time_sec: float) -> str:
+    """Tabela tekst me latencën dhe rreshtat për seksion (më të ngadaltët sipër)."""
+    ordered = sorted(results.values(), key=lambda r: r.elapsed_sec, reverse=True)
+    width = max([len(r.key) for r in ordered] + [7])
+    lines = [f"{'section':<{width}}  {'rows':>8}  {'sec':>8}  status"]
+    lines.append("-" * (width + 30))
+    for r in ordered:
+        status = "ok" if r.ok else f"ERROR {r.error}"
+        lines.append(f"{r.key:<{width}}  {len(r.rows):>8}  {r.elapsed_sec:>8.2f}  {status}")
+    serial = sum(r.elapsed_sec for r in ordered)
+    lines.append("-" * (width + 30))
+    lines.append(
+        f"{len(ordered)} sections, {sum(len(r.rows) for r in ordered)} rows, "
+        f"wall {wall_time_sec:.2f}s (sum of sections {serial:.2f}s)"
+    )
+    return "\n".join(lines)
+
+
+# -------------------- Query të përbashkëta për disa kampanja --------------------
+@dataclass(frozen=True)
+class SplitSpec:
+    """Si ndahet rezultati i një query të përbashkët sipas kampanjës.
+
+    Args:
+        column: Kolona e grupit (hiqet nga rreshtat e ndarë)
+        order_by: ((kolona, desc), ...) si ORDER BY i query-t për një kampanjë
+        limit: LIMIT për kampanjë
+        enums: ((kolona, (vlerat...)), ...) për kolonat ENUM, me vlerat në rendin
+            e deklaruar në skemë; MySQL i rendit sipas indeksit, jo si tekst
+    """
+    column: str = "campaign_id"
+    order_by: Tuple[Tuple[str, bool], ...] = ()
+    limit: Optional[int] = None
+    enums: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+
+
+def _ci(value: Any) -> Any:
+    """Vlera siç e krahason collation-i _ci i MySQL (p.sh. utf8_general_ci)."""
+    if isinstance(value, str):
+        return value.rstrip(" ").casefold()
+    return value
+
+
+def _sort_key(column: str, enum_values: Optional[Sequence[str]] = None) -> Callable[[Row], Tuple[bool, Any]]:
+    # NULL renditet i pari në ASC dhe i fundit në DESC, si në MySQL
+    if enum_values is not None:
+        # ENUM: indeksi 1..n; vlera e panjohur ('' e gabuar) ka indeksin 0
+        index = {_ci(v): i for i, v in enumerate(enum_values, start=1)}
+        return lambda r: (r.get(column) is not None, index.get(_ci(r.get(column)), 0))
+    return lambda r: (r.get(column) is not None, _ci(r.get(column)))
+
+
+def split_rows(rows: Iterable[Row], spec: SplitSpec, groups: Iterable[Any]) -> Dict[Any, List[Row]]:
+    """{grupi: rreshtat} pa kolonën e grupit, të renditur dhe të kufizuar si query-ja origjinale.
+
+    Çdo grup në `groups` merr një listë (bosh kur nuk ka rreshta). Grupi
+    përputhet pa dallim shkronjash, si `campaign_id IN (...)` në MySQL.
+    """
+    out: Dict[Any, List[Row]] = {g: [] for g in groups}
+    by_ci: Dict[Any, List[List[Row]]] = {}
+    for g, bucket in out.items():
+        by_ci.setdefault(_ci(g), []).append(bucket)
+    for r in rows:
+        buckets = by_ci.get(_ci(r.get(spec.column)))
+        if buckets:
+            row = {k: v for k, v in r.items() if k != spec.column}
+            for bucket in buckets:
+                bucket.append(row if len(buckets) == 1 else dict(row))
+    enums = dict(spec.enums)
+    for g, bucket in out.items():
+        # Renditje e qëndrueshme nga çelësi i fundit te i pari
+        for column, desc in reversed(spec.order_by):
+            bucket.sort(key=_sort_key(column, enums.get(column)), reverse=desc)
+        if spec.limit is not None:
+            out[g] = bucket[:spec.limit]
+    return out
@@ -0,0 +1,466 @@
+"""
+core/collector_incremental.py
+
+PURPOSE:
+    Modaliteti --incremental i collect_vicidial_data.py.
+
+    Pa të, çdo ekzekutim rillogarit DAYS_BACK ditë (30 për daily_performance)
+    me DATE_SUB(NOW(), ...). Këtu seksionet agregate mbahen si agregate ditore
+    të pjesshme në out_analysis/collector_state/, me një watermark për
+    (db_key, kampanjë, seksion). Çdo ekzekutim lexon nga DB vetëm ditët pas
+    watermark-ut (+ ditët ende të hapura, që nuk ruhen) dhe i bashkon me ditët
+    e ruajtura. Ekzekutimi i natës skanon një ose dy ditë në vend të 7 ose 30.
+
+    Një ditë ruhet si përfundimtare vetëm pasi të kenë kaluar closed_grace_hours
+    nga mesnata e saj (query_cache.is_closed_window, si rollup-i dhe cache-i):
+    deri atëherë lexohet live në çdo ekzekutim, që rreshtat e vonuar (thirrje
+    që mbyllen pas mesnatës, ora e DB ≠ ora lokale) të mos humbasin.
+
+KEY FEATURES:
+    - INCREMENTAL_SECTIONS: status_distribution, hourly_performance,
+      daily_performance, prefix_analysis, prefix_hour_status, list_performance,
+      prefix_status_analysis
+    - Query me masa aditive (COUNT, SUM(length_in_sec)) të grupuara sipas ditës;
+      mesataret, %, HAVING dhe LIMIT llogariten pas bashkimit, si në query-n e plotë
+    - CollectorState: skedar JSON për (db_key, kampanjë), shkrim atomik
+
+KUFIZIME:
+    - Dritarja përbëhet nga ditë të plota ([sot - N, sot]), jo nga NOW() - N orë
+    - COUNT(DISTINCT) nuk është aditiv: list_performance nuk ka unique_leads /
+      unique_phones të query-t të plotë. Në vend të tyre jep
+      unique_leads_daily_sum / unique_phones_daily_sum, shumën e numrave unikë
+      ditorë (një lead i thirrur në dy ditë numërohet dy herë)
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.collector import CollectorJob, SectionResult
+from core.query_cache import DEFAULT_CLOSED_GRACE_HOURS, is_closed_window
+
+STATE_DIR = Path.cwd() / "out_analysis" / "collector_state"
+
+Row = Dict[str, Any]
+
+_LOG_WINDOW = "campaign_id = %s AND call_date >= %s AND call_date < %s"
+
+
+@dataclass(frozen=True)
+class IncrementalSection:
+    """Një seksion i ndarë në agregate ditore.
+
+    Args:
+        key: Çelësi në vicidial_analysis_data.json
+        description: Teksti në log
+        sql: Query me kolonën `day` + keys + measures; parametrat (campaign_id, from, to)
+        keys: Kolonat e grupimit (pa `day`)
+        measures: Kolonat aditive
+        window: "days_back" ose numri fiks i ditëve (30 për daily_performance)
+        finalize: Rreshtat e bashkuar → rreshtat në formatin e query-t të plotë
+    """
+    key: str
+    description: str
+    sql: str
+    keys: Tuple[str, ...]
+    measures: Tuple[str, ...]
+    window: Any
+    finalize: Callable[[List[Row]], List[Row]]
+
+
+def _num(v: Any) -> float:
+    try:
+        return float(v or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _ratio(a: float, b: float, digits: int) -> Optional[float]:
+    return round(a / b, digits) if b else None
+
+
+def _finalize_status(rows: List[Row]) -> List[Row]:
+    total = sum(r["count"] for r in rows)
+    out = [
+        {
+            "status": r["status"],
+            "count": r["count"],
+            "percentage": round(r["count"] * 100.0 / total, 2) if total else None,
+            "avg_duration_sec": _ratio(r["sum_sec"], r["count"], 1),
+            "total_minutes": round(r["sum_sec"] / 60, 2),
+        }
+        for r in rows
+    ]
+    return sorted(out, key=lambda r: -r["count"])
+
+
+def _finalize_hourly(rows: List[Row]) -> List[Row]:
+    out = [
+        {
+            "hour": r["hour"],
+            "total_calls": r["total_calls"],
+            "avg_duration": _ratio(r["sum_sec"], r["total_calls"], 1),
+            "total_minutes": round(r["sum_sec"] / 60, 2),
+            "pu_count": r["pu_count"],
+            "svyclm_count": r["svyclm_count"],
+            "conversion_rate": _ratio((r["pu_count"] + r["svyclm_count"]) * 100.0, r["total_calls"], 2),
+        }
+        for r in rows
+    ]
+    return sorted(out, key=lambda r: r["hour"])
+
+
+def _finalize_daily(rows: List[Row]) -> List[Row]:
+    out = [
+        {
+            "date": r["date"],
+            "day_name": r["day_name"],
+            "total_calls": r["total_calls"],
+            "total_minutes": round(r["sum_sec"] / 60, 2),
+            "est_cost_fix": round(r["sum_sec"] / 60 * 0.0032, 2),
+            "est_cost_mobile": round(r["sum_sec"] / 60 * 0.0105, 2),
+        }
+        for r in rows
+    ]
+    return sorted(out, key=lambda r: r["date"], reverse=True)[:30]
+
+
+def _finalize_prefix(rows: List[Row]) -> List[Row]:
+    out = [
+        {
+            "prefix_2": r["prefix_2"],
+            "prefix_3": r["prefix_3"],
+            "prefix_4": r["prefix_4"],
+            "calls": r["calls"],
+            "avg_duration": _ratio(r["sum_sec"], r["calls"], 1),
+            "total_minutes": round(r["sum_sec"] / 60, 2),
+        }
+        for r in rows
+    ]
+    return sorted(out, key=lambda r: -r["calls"])
+
+
+def _finalize_list_performance(rows: List[Row]) -> List[Row]:
+    out = [
+        {
+            "list_id": r["list_id"],
+            "calls": r["calls"],
+            "avg_duration": _ratio(r["sum_sec"], r["calls"], 1),
+            "total_minutes": round(r["sum_sec"] / 60, 2),
+            # Shuma e COUNT(DISTINCT) ditorë, jo numri unik në dritare: emër tjetër
+            # që konsumatorët të mos e ngatërrojnë me unique_leads të query-t të plotë
+            "unique_leads_daily_sum": r["unique_leads"],
+            "unique_phones_daily_sum": r["unique_phones"],
+        }
+        for r in rows
+    ]
+    return sorted(out, key=lambda r: -r["calls"])
+
+
+def _finalize_prefix_hour_status(rows: List[Row]) -> List[Row]:
+    out = [
+        {
+            "prefix_4": r["prefix_4"],
+            "status": r["status"],
+            "hour": r["hour"],
+            "calls": r["calls"],
+            "total_sec": r["total_sec"],
+        }
+        for r in rows
+    ]
+    return sorted(out, key=lambda r: (str(r["prefix_4"]), str(r["status"]), r["hour"]))
+
+
+def _finalize_prefix_status(rows: List[Row]) -> List[Row]:
+    out = [
+        {
+            "prefix_2": r["prefix_2"],
+            "prefix_3": r["prefix_3"],
+            "status": r["status"],
+            "calls": r["calls"],
+            "avg_duration": _ratio(r["sum_sec"], r["calls"], 1),
+            "total_minutes": round(r["sum_sec"] / 60, 2),
+        }
+        for r in rows
+        if r["calls"] > 20
+    ]
+    out.sort(key=lambda r: -r["calls"])
+    out.sort(key=lambda r: (str(r["prefix_2"]), str(r["prefix_3"])))
+    return out[:500]
+
+
+INCREMENTAL_SECTIONS: Tuple[IncrementalSection, ...] = (
+    IncrementalSection(
+        "status_distribution", "4. Status Distribution (incremental)",
+        f"""
+        SELECT DATE(call_date) AS day, status,
+               COUNT(*) AS count, SUM(length_in_sec) AS sum_sec
+        FROM vicidial_log
+        WHERE {_LOG_WINDOW}
+        GROUP BY day, status
+        """,
+        ("status",), ("count", "sum_sec"), "days_back", _finalize_status,
+    ),
+    IncrementalSection(
+        "hourly_performance", "5. Hourly Performance (incremental)",
+        f"""
+        SELECT DATE(call_date) AS day, HOUR(call_date) AS hour,
+               COUNT(*) AS total_calls, SUM(length_in_sec) AS sum_sec,
+               SUM(CASE WHEN status = 'PU' THEN 1 ELSE 0 END) AS pu_count,
+               SUM(CASE WHEN status = 'SVYCLM' THEN 1 ELSE 0 END) AS svyclm_count
+        FROM vicidial_log
+        WHERE {_LOG_WINDOW}
+        GROUP BY day, hour
+        """,
+        ("hour",), ("total_calls", "sum_sec", "pu_count", "svyclm_count"), "days_back", _finalize_hourly,
+    ),
+    IncrementalSection(
+        "daily_performance", "6. Daily Performance (incremental)",
+        f"""
+        SELECT DATE(call_date) AS day, DATE(call_date) AS date, DAYNAME(call_date) AS day_name,
+               COUNT(*) AS total_calls, SUM(length_in_sec) AS sum_sec
+        FROM vicidial_log
+        WHERE {_LOG_WINDOW}
+        GROUP BY day, date, day_name
+        """,
+        ("date", "day_name"), ("total_calls", "sum_sec"), 30, _finalize_daily,
+    ),
+    IncrementalSection(
+        "prefix_analysis", "7. Prefix Analysis (incremental)",
+        f"""
+        SELECT DATE(call_date) AS day,
+               SUBSTRING(phone_number, 1, 2) AS prefix_2,
+               SUBSTRING(phone_number, 1, 3) AS prefix_3,
+               SUBSTRING(phone_number, 1, 4) AS prefix_4,
+               COUNT(*) AS calls, SUM(length_in_sec) AS sum_sec
+        FROM vicidial_log
+        WHERE {_LOG_WINDOW}
+          AND phone_number IS NOT NULL
+          AND phone_number != ''
+        GROUP BY day, prefix_2, prefix_3, prefix_4
+        """,
+        ("prefix_2", "prefix_3", "prefix_4"), ("calls", "sum_sec"), "days_back", _finalize_prefix,
+    ),
+    IncrementalSection(
+        "prefix_hour_status", "7b. Prefix x Status x Hour (incremental)",
+        f"""
+        SELECT DATE(call_date) AS day,
+               SUBSTRING(phone_number, 1, 4) AS prefix_4,
+               status,
+               HOUR(call_date) AS hour,
+               COUNT(*) AS calls, SUM(length_in_sec) AS total_sec
+        FROM vicidial_log
+        WHERE {_LOG_WINDOW}
+          AND phone_number IS NOT NULL
+          AND phone_number != ''
+        GROUP BY day, prefix_4, status, hour
+        """,
+        ("prefix_4", "status", "hour"), ("calls", "total_sec"), "days_back", _finalize_prefix_hour_status,
+    ),
+    IncrementalSection(
+        "list_performance", "8. List Performance Comparison (incremental)",
+        """
+        SELECT DATE(vlog.call_date) AS day, vll.list_id,
+               COUNT(*) AS calls, SUM(vlog.length_in_sec) AS sum_sec,
+               COUNT(DISTINCT vlog.lead_id) AS unique_leads,
+               COUNT(DISTINCT vlog.phone_number) AS unique_phones
+        FROM vicidial_log vlog
+        JOIN vicidial_list vll ON vlog.lead_id = vll.lead_id
+        WHERE vlog.campaign_id = %s AND vlog.call_date >= %s AND vlog.call_date < %s
+        GROUP BY day, vll.list_id
+        """,
+        ("list_id",), ("calls", "sum_sec", "unique_leads", "unique_phones"), "days_back",
+        _finalize_list_performance,
+    ),
+    IncrementalSection(
+        "prefix_status_analysis", "15. Prefix + Status Analysis (incremental)",
+        f"""
+        SELECT DATE(call_date) AS day,
+               SUBSTRING(phone_number, 1, 2) AS prefix_2,
+               SUBSTRING(phone_number, 1, 3) AS prefix_3,
+               status,
+               COUNT(*) AS calls, SUM(length_in_sec) AS sum_sec
+        FROM vicidial_log
+        WHERE {_LOG_WINDOW}
+          AND phone_number IS NOT NULL
+          AND LENGTH(phone_number) >= 6
+        GROUP BY day, prefix_2, prefix_3, status
+        """,
+        ("prefix_2", "prefix_3", "status"), ("calls", "sum_sec"), "days_back", _finalize_prefix_status,
+    ),
+)
+
+INCREMENTAL_KEYS = frozenset(s.key for s in INCREMENTAL_SECTIONS)
+
+
+# -------------------- Gjendja lokale --------------------
+def _day_str(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "__float__") and not isinstance(value, (int, float, bool)):
+        return float(value)
+    return value
+
+
+class CollectorState:
+    """Agregatet ditore të ruajtura për një (db_key, kampanjë).
+
+    Struktura: {"sections": {key: {"watermark": "YYYY-MM-DD", "days": {day: [rows]}}}}
+    """
+
+    def __init__(self, db_key: str, campaign_id: str, root: Path = STATE_DIR):
+        safe = f"{db_key}_{campaign_id}".replace("/", "_").replace(os.sep, "_")
+        self.path = Path(root) / f"{safe}.json"
+        self.db_key = db_key
+        self.campaign_id = campaign_id
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.sections = dict(data.get("sections") or {})
+        except FileNotFoundError:
+            self.sections = {}
+        except Exception:
+            # Skedar i dëmtuar: rifillo nga e para (ditët rilexohen nga DB)
+            self.sections = {}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "db_key": self.db_key,
+            "campaign_id": self.campaign_id,
+            "updated": datetime.now().isoformat(),
+            "sections": self.sections,
+        }
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        os.replace(tmp, self.path)
+
+    def watermark(self, key: str) -> Optional[str]:
+        return (self.sections.get(key) or {}).get("watermark")
+
+    def days(self, key: str) -> Dict[str, List[Row]]:
+        return (self.sections.get(key) or {}).get("days") or {}
+
+    def store_days(self, key: str, rows_by_day: Dict[str, List[Row]], keep_from: str) -> None:
+        """Ruan ditët e mbyllura dhe heq ato para keep_from."""
+        sec = self.sections.setdefault(key, {"watermark": None, "days": {}})
+        days = sec.setdefault("days", {})
+        days.update(rows_by_day)
+        for d in [d for d in days if d < keep_from]:
+            del days[d]
+        sec["watermark"] = max(days) if days else None
+
+
+# -------------------- Planifikimi dhe bashkimi --------------------
+def _window_days(section: IncrementalSection, days_back: int) -> int:
+    return int(days_back) if section.window == "days_back" else int(section.window)
+
+
+def settled_until(now: datetime, grace_hours: float = DEFAULT_CLOSED_GRACE_HOURS) -> date:
+    """Dita e parë që ende nuk ruhet si përfundimtare (ditët para saj janë të mbyllura)."""
+    day = now.date()
+    while not is_closed_window(datetime.combine(day, time()), now=now, grace_hours=grace_hours):
+        day -= timedelta(days=1)
+    return day
+
+
+def plan_incremental_jobs(
+    campaign_id: str,
+    days_back: int,
+    state: CollectorState,
+    now: Optional[datetime] = None,
+    grace_hours: float = DEFAULT_CLOSED_GRACE_HOURS,
+) -> Tuple[List[CollectorJob], Dict[str, Tuple[str, str, str]]]:
+    """Një job për seksion, që lexon vetëm ditët që mungojnë + ditët ende të hapura.
+
+    Returns:
+        (jobs, ranges): ranges = {key: (dita e parë e lexuar, dita e parë e dritares,
+        dita e parë që nuk ruhet)}
+    """
+    now = now or datetime.now()
+    today = now.date()
+    settled = settled_until(now, grace_hours)
+    jobs: List[CollectorJob] = []
+    ranges: Dict[str, Tuple[str, str, str]] = {}
+    for section in INCREMENTAL_SECTIONS:
+        first = today - timedelta(days=_window_days(section, days_back))
+        stored = state.days(section.key)
+        start = first
+        while start < settled and start.isoformat() in stored:
+            start += timedelta(days=1)
+        params = (campaign_id, f"{start.isoformat()} 00:00:00", f"{(today + timedelta(days=1)).isoformat()} 00:00:00")
+        jobs.append(CollectorJob(section.key, section.description, section.sql, params))
+        ranges[section.key] = (start.isoformat(), first.isoformat(), settled.isoformat())
+    return jobs, ranges
+
+
+def _merge(section: IncrementalSection, parts: Sequence[List[Row]]) -> List[Row]:
+    merged: Dict[Tuple[Any, ...], Row] = {}
+    for rows in parts:
+        for r in rows:
+            k = tuple(r.get(c) for c in section.keys)
+            acc = merged.get(k)
+            if acc is None:
+                acc = merged[k] = {c: r.get(c) for c in section.keys}
+                for m in section.measures:
+                    acc[m] = 0
+            for m in section.measures:
+                acc[m] += _num(r.get(m))
+    for acc in merged.values():
+        for m in section.measures:
+            if m != "sum_sec" and float(acc[m]).is_integer():
+                acc[m] = int(acc[m])
+    return list(merged.values())
+
+
+def apply_incremental_results(
+    results: Dict[str, SectionResult],
+    ranges: Dict[str, Tuple[str, str, str]],
+    state: CollectorState,
+) -> Dict[str, List[Row]]:
+    """Ruan ditët e reja të mbyllura në state dhe kthen seksionet përfundimtare për JSON.
+
+    Ditët nga `settled` e tutje (shih plan_incremental_jobs) hyjnë në rezultat
+    por nuk ruhen. Seksioni që dështoi nuk e ndryshon state-in; vlera e tij
+    ndërtohet nga ditët e ruajtura (pa ditët e hapura).
+    """
+    out: Dict[str, List[Row]] = {}
+    for section in INCREMENTAL_SECTIONS:
+        res = results.get(section.key)
+        start, first, settled = ranges[section.key]
+        live: List[Row] = []
+        if res is not None and res.ok:
+            by_day: Dict[str, List[Row]] = {}
+            d = date.fromisoformat(start)
+            while d.isoformat() < settled:
+                by_day[d.isoformat()] = []  # edhe ditët pa thirrje shënohen si të lexuara
+                d += timedelta(days=1)
+            for r in res.rows:
+                day = _day_str(r.get("day"))
+                row = {k: _json_value(v) for k, v in r.items() if k != "day"}
+                if day >= settled:
+                    live.append(row)
+                elif day in by_day:
+                    by_day[day].append(row)
+            state.store_days(section.key, by_day, keep_from=first)
+        # Ditët >= settled të ruajtura nga versione të vjetra rilexohen live: mos i numëro dy herë
+        stored = [rows for day, rows in state.days(section.key).items() if first <= day < settled]
+        out[section.key] = section.finalize(_merge(section, stored + [live]))
+    return out
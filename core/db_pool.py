@@ -0,0 +1,312 @@
+"""
+core/db_pool.py
+
+PURPOSE:
+    Pool i kufizuar lidhjesh MySQL, i ndarë sipas db_key ("db", "db2", ...).
+
+    Çdo fetch_* në core/db_vicidial.py hapte një lidhje të re pymysql
+    (TCP + auth handshake) për çdo query. Me pool-in, lidhjet ripërdoren
+    brenda procesit të Streamlit dhe mbyllen vetëm kur janë të prishura
+    ose kanë ndenjur shumë gjatë pa u përdorur.
+
+KEY FEATURES:
+    - Madhësi maksimale (max_size) për çdo db_key; checkout pret deri në
+      checkout_timeout_sec kur të gjitha lidhjet janë në përdorim
+    - Health-check (ping) në checkout për lidhjet që kanë qëndruar idle
+    - Idle eviction: lidhjet idle më shumë se max_idle_sec mbyllen
+    - Statistika për çdo pool (created, reused, discarded, evicted, waits...)
+
+Moduli nuk varet nga Streamlit: merr një factory që krijon lidhjen, që të
+mund të përdoret edhe nga skriptet CLI (p.sh. collect_vicidial_data.py).
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class PoolStats:
+    """Numërues për një pool të vetëm."""
+    created: int = 0
+    reused: int = 0
+    checkouts: int = 0
+    discarded: int = 0
+    evicted: int = 0
+    ping_failures: int = 0
+    waits: int = 0
+    wait_time_sec: float = 0.0
+    in_use: int = 0
+    idle: int = 0
+
+
+class PooledConnection:
+    """Proxy rreth një lidhjeje pymysql që e kthen në pool në close().
+
+    Përdoret njësoj si lidhja origjinale:
+        with get_conn() as conn, conn.cursor() as cur:
+            ...
+    Në dalje nga `with`, lidhja nuk mbyllet por kthehet në pool.
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw: Any):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    @property
+    def raw(self) -> Any:
+        return self._raw
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Një gabim gjatë query-t mund ta lërë lidhjen në gjendje të paqartë
+        self.release(discard=exc_type is not None and _is_connection_error(exc))
+
+    def close(self) -> None:
+        self.release()
+
+    def release(self, discard: bool = False) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._pool._checkin(self._raw, discard=discard)
+
+
+def _is_connection_error(exc: Optional[BaseException]) -> bool:
+    """True nëse gabimi tregon që lidhja vetë është e prishur."""
+    if exc is None:
+        return False
+    try:
+        import pymysql
+        return isinstance(exc, (pymysql.err.OperationalError, pymysql.err.InterfaceError))
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """Pool i kufizuar lidhjesh për një db_key.
+
+    Args:
+        name: Emri i pool-it (zakonisht db_key)
+        connect: Funksion pa argumente që krijon një lidhje të re
+        max_size: Numri maksimal i lidhjeve (në përdorim + idle)
+        max_idle_sec: Lidhjet idle më gjatë se kjo mbyllen
+        ping_after_sec: Bëj ping në checkout vetëm nëse lidhja ka qenë idle më gjatë se kjo
+        checkout_timeout_sec: Sa pret checkout kur pool-i është plot
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Any],
+        max_size: int = 8,
+        max_idle_sec: float = 300.0,
+        ping_after_sec: float = 5.0,
+        checkout_timeout_sec: float = 30.0,
+    ):
+        self.name = name
+        self._connect = connect
+        self.max_size = max(1, int(max_size))
+        self.max_idle_sec = float(max_idle_sec)
+        self.ping_after_sec = float(ping_after_sec)
+        self.checkout_timeout_sec = float(checkout_timeout_sec)
+        self._idle: List[tuple] = []  # [(raw_conn, last_used_monotonic)], LIFO
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = PoolStats()
+
+    # -------------------- Checkout / checkin --------------------
+    def connection(self) -> PooledConnection:
+        """Merr një lidhje nga pool-i (ose krijon një të re)."""
+        raw = self._checkout()
+        return PooledConnection(self, raw)
+
+    def _checkout(self) -> Any:
+        deadline = time.monotonic() + self.checkout_timeout_sec
+        waited = False
+        wait_start = time.monotonic()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"Pool-i '{self.name}' është mbyllur.")
+                self._evict_idle_locked()
+                if self._idle:
+                    raw, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    raw, last_used = None, None
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Pool-i '{self.name}' është plot ({self.max_size} lidhje në përdorim) "
+                        f"pas {self.checkout_timeout_sec:.0f}s pritje."
+                    )
+                waited = True
+                self._cond.wait(remaining)
+            self._stats.checkouts += 1
+            if waited:
+                self._stats.waits += 1
+                self._stats.wait_time_sec += time.monotonic() - wait_start
+
+        # Jashtë lock-ut: ping dhe krijim lidhjeje bëjnë I/O
+        try:
+            if raw is not None:
+                if self._healthy(raw, last_used):
+                    self._bump("reused")
+                    return raw
+                self._bump("ping_failures")
+                self._bump("discarded")
+                _safe_close(raw)
+            raw = self._connect()
+            self._bump("created")
+            return raw
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def _healthy(self, raw: Any, last_used: float) -> bool:
+        if time.monotonic() - last_used < self.ping_after_sec:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _checkin(self, raw: Any, discard: bool = False) -> None:
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed or not _is_open(raw):
+                self._stats.discarded += 1
+                to_close = raw
+            else:
+                self._idle.append((raw, time.monotonic()))
+                to_close = None
+            self._cond.notify()
+        if to_close is not None:
+            _safe_close(to_close)
+
+    def _evict_idle_locked(self) -> None:
+        if not self._idle or self.max_idle_sec <= 0:
+            return
+        now = time.monotonic()
+        keep = []
+        for raw, last_used in self._idle:
+            if now - last_used > self.max_idle_sec:
+                self._stats.evicted += 1
+                _safe_close(raw)
+            else:
+                keep.append((raw, last_used))
+        self._idle = keep
+
+    def _bump(self, field: str) -> None:
+        with self._cond:
+            setattr(self._stats, field, getattr(self._stats, field) + 1)
+
+    # -------------------- Maintenance --------------------
+    def evict_idle(self) -> None:
+        """Mbyll lidhjet që kanë kaluar max_idle_sec pa u përdorur."""
+        with self._cond:
+            self._evict_idle_locked()
+
+    def close(self) -> None:
+        """Mbyll të gjitha lidhjet idle; lidhjet në përdorim mbyllen në checkin."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for raw, _ in idle:
+            _safe_close(raw)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out = asdict(self._stats)
+            out["in_use"] = self._in_use
+            out["idle"] = len(self._idle)
+            out["max_size"] = self.max_size
+            out["wait_time_sec"] = round(out["wait_time_sec"], 4)
+        return out
+
+
+def _is_open(raw: Any) -> bool:
+    try:
+        return bool(getattr(raw, "open", True))
+    except Exception:
+        return False
+
+
+def _safe_close(raw: Any) -> None:
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+# -------------------- Registry (një pool për db_key) --------------------
+_POOLS: Dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(
+    name: str,
+    connect: Optional[Callable[[], Any]] = None,
+    create: Optional[Callable[[], ConnectionPool]] = None,
+    **limits: Any,
+) -> ConnectionPool:
+    """Kthen pool-in për `name`, duke e krijuar herën e parë.
+
+    Pool-i i ri krijohet me `create()` (nëse jepet) ose me
+    ConnectionPool(name, connect, **limits). Kur pool-i ekziston,
+    argumentet injorohen, kështu që kredencialet dhe limitet lexohen
+    vetëm një herë për db_key.
+    """
+    with _POOLS_LOCK:
+        pool = _POOLS.get(name)
+        if pool is None:
+            if create is not None:
+                pool = create()
+            elif connect is not None:
+                pool = ConnectionPool(name, connect, **limits)
+            else:
+                raise ValueError(f"Pool-i '{name}' nuk ekziston dhe nuk u dha factory.")
+            _POOLS[name] = pool
+        return pool
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistikat për të gjithë pool-et aktivë: {name: {...}}."""
+    with _POOLS_LOCK:
+        pools = dict(_POOLS)
+    return {name: pool.stats() for name, pool in pools.items()}
+
+
+def close_pool(name: str) -> None:
+    """Mbyll dhe heq pool-in (p.sh. kur ndryshojnë kredencialet)."""
+    with _POOLS_LOCK:
+        pool = _POOLS.pop(name, None)
+    if pool is not None:
+        pool.close()
+
+
+def close_all_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,262 @@
+"""
+core/db_replica.py
+
+PURPOSE:
+    Read-replica opsionale për çdo db_key ("db", "db2", ...) dhe rregullat
+    e routing-ut të query-ve të raporteve.
+
+    "db" dhe "db2" janë DB-të live të dialer-it: skanimet e rënda GROUP BY të
+    Smart Report e ngadalësojnë vetë dialer-in. Kur për një db_key është
+    konfiguruar një replica, query-t analitike (fetch_*, iter_*, ingestion i
+    rollup-it) shkojnë te replica, ndërsa lookup-et e vogla mbeten te primary.
+
+KEY FEATURES:
+    - ReplicaConfig nga secrets.toml ([db.replica]); fushat që mungojnë merren
+      nga primary (p.sh. vetëm host/port të ndryshëm)
+    - Kontroll i lag-ut (SHOW REPLICA STATUS / SHOW SLAVE STATUS), i ruajtur
+      për lag_check_sec; mbi max_lag_sec query-t kalojnë te primary
+    - Failover te primary kur replica nuk lidhet ose replikimi është ndalur
+      (Seconds_Behind_Source = NULL)
+    - primary_labels: label-at e fetch_* që detyrohen te primary
+    - Statistika për çdo router (routed_replica, routed_primary, failovers...)
+
+Konfigurimi (.streamlit/secrets.toml):
+    [db]
+    host = "10.0.0.5"
+    user = "report"
+    password = "..."
+    database = "asterisk"
+
+    [db.replica]
+    host = "10.0.0.6"          # user/password/database/port merren nga [db] kur mungojnë
+    max_lag_sec = 30           # mbi këtë lag query-t shkojnë te primary
+    lag_check_sec = 15         # sa shpesh rikontrollohet lag-u
+    primary_labels = ["fetch_list_names"]
+    # enabled = false          # çaktivizon replikën pa e fshirë konfigurimin
+
+    Për "db" vlen edhe DB_REPLICA_HOST / DB_REPLICA_PORT / DB_REPLICA_USER /
+    DB_REPLICA_PASSWORD / DB_REPLICA_NAME / DB_REPLICA_MAX_LAG_SEC.
+
+Prova me dy MySQL lokale (primary + replica me GTID):
+    docker network create vici-net
+    docker run -d --name vici-primary --network vici-net -e MYSQL_ROOT_PASSWORD=pw \\
+        -e MYSQL_DATABASE=asterisk -p 3307:3306 mysql:8.0 --server-id=1 --log-bin \\
+        --gtid-mode=ON --enforce-gtid-consistency=ON
+    docker run -d --name vici-replica --network vici-net -e MYSQL_ROOT_PASSWORD=pw \\
+        -p 3308:3306 mysql:8.0 --server-id=2 --gtid-mode=ON --enforce-gtid-consistency=ON --read-only=ON
+    mysql -h127.0.0.1 -P3308 -uroot -ppw -e "CHANGE REPLICATION SOURCE TO SOURCE_HOST='vici-primary', \\
+        SOURCE_USER='root', SOURCE_PASSWORD='pw', SOURCE_AUTO_POSITION=1, GET_SOURCE_PUBLIC_KEY=1; START REPLICA;"
+    DB_HOST=127.0.0.1 DB_PORT=3307 DB_USER=root DB_PASSWORD=pw DB_NAME=asterisk \\
+    DB_REPLICA_HOST=127.0.0.1 DB_REPLICA_PORT=3308 streamlit run app.py
+    (STOP REPLICA në vici-replica → query-t kalojnë te primary)
+
+Moduli nuk varet nga Streamlit (si core/db_pool.py).
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+DEFAULT_MAX_LAG_SEC = 30.0
+DEFAULT_LAG_CHECK_SEC = 15.0
+
+# Lookup-e të vogla që nuk ia vlen t'i dërgosh te replica
+DEFAULT_PRIMARY_LABELS: Tuple[str, ...] = ("fetch_list_names",)
+
+_LAG_COLUMNS = ("Seconds_Behind_Source", "Seconds_Behind_Master")
+
+
+@dataclass(frozen=True)
+class ReplicaConfig:
+    """Kredencialet e replikës dhe pragjet e failover-it për një db_key."""
+    host: str
+    user: str
+    password: str
+    database: str
+    port: int = 3306
+    max_lag_sec: float = DEFAULT_MAX_LAG_SEC
+    lag_check_sec: float = DEFAULT_LAG_CHECK_SEC
+    primary_labels: Tuple[str, ...] = DEFAULT_PRIMARY_LABELS
+
+
+def parse_replica_config(primary: Dict[str, Any], replica: Optional[Dict[str, Any]]) -> Optional[ReplicaConfig]:
+    """ReplicaConfig nga seksioni [db_key.replica]; None kur mungon ose enabled=false.
+
+    Args:
+        primary: host/user/password/database/port të primary (për fushat që mungojnë)
+        replica: Seksioni i replikës (dict)
+    """
+    if not replica or not replica.get("host"):
+        return None
+    if str(replica.get("enabled", True)).strip().lower() in ("0", "false", "no", "off"):
+        return None
+    labels = replica.get("primary_labels")
+    if isinstance(labels, str):
+        labels = [s.strip() for s in labels.split(",") if s.strip()]
+    return ReplicaConfig(
+        host=str(replica["host"]),
+        user=replica.get("user") or primary.get("user") or "",
+        password=replica.get("password") or primary.get("password") or "",
+        database=replica.get("database") or primary.get("database") or "",
+        port=int(replica.get("port") or primary.get("port") or 3306),
+        max_lag_sec=float(replica.get("max_lag_sec", DEFAULT_MAX_LAG_SEC)),
+        lag_check_sec=float(replica.get("lag_check_sec", DEFAULT_LAG_CHECK_SEC)),
+        primary_labels=tuple(labels) if labels is not None else DEFAULT_PRIMARY_LABELS,
+    )
+
+
+def read_replica_lag(cursor: Any) -> float:
+    """Lag-u i replikës në sekonda nga SHOW REPLICA STATUS (ose SLAVE STATUS).
+
+    Kthen 0.0 kur serveri nuk ka replikim të konfiguruar (instancë e pavarur,
+    p.sh. kopje statike për prova) dhe math.inf kur replikimi është ndalur.
+    Gabimet (p.sh. mungon privilegji REPLICATION CLIENT) ngrihen te thirrësi.
+    """
+    rows = None
+    last_error: Optional[Exception] = None
+    for sql in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+        try:
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+            break
+        except Exception as e:  # MySQL < 8.0.22 / MariaDB nuk njohin REPLICA STATUS
+            last_error = e
+    if rows is None:
+        raise last_error or RuntimeError("SHOW REPLICA STATUS dështoi")
+    if not rows:
+        return 0.0
+    lag = 0.0
+    for row in rows:
+        if not isinstance(row, dict):
+            names = [d[0] for d in cursor.description]
+            row = dict(zip(names, row))
+        value = next((row[c] for c in _LAG_COLUMNS if c in row), None)
+        if value is None:
+            return math.inf
+        lag = max(lag, float(value))
+    return lag
+
+
+class ReplicaRouter:
+    """Vendos për çdo query nëse shkon te replica apo te primary.
+
+    Args:
+        name: db_key
+        config: ReplicaConfig
+        probe: Funksion pa argumente që kthen lag-un aktual të replikës (sekonda)
+        clock: Burimi i kohës (monotonic), i zëvendësueshëm për prova
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: ReplicaConfig,
+        probe: Callable[[], float],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.config = config
+        self._probe = probe
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._checking = False
+        self._checked_at: Optional[float] = None
+        self._healthy = False
+        self._lag: Optional[float] = None
+        self._reason = "pa kontrolluar"
+        self._stats = {"routed_replica": 0, "routed_primary": 0, "failovers": 0, "lag_checks": 0}
+
+    def _needs_check(self, now: float) -> bool:
+        return self._checked_at is None or now - self._checked_at >= self.config.lag_check_sec
+
+    def _check(self) -> None:
+        """Rikontrollon lag-un; vetëm një thread e bën, të tjerët përdorin gjendjen e fundit."""
+        with self._lock:
+            if self._checking or not self._needs_check(self._clock()):
+                return
+            self._checking = True
+        try:
+            lag = float(self._probe())
+            healthy = lag <= self.config.max_lag_sec
+            reason = "ok" if healthy else (
+                "replikimi është ndalur" if math.isinf(lag) else f"lag {lag:.0f}s > {self.config.max_lag_sec:.0f}s"
+            )
+        except Exception as e:
+            lag, healthy, reason = None, False, f"{type(e).__name__}: {e}"
+        with self._lock:
+            self._stats["lag_checks"] += 1
+            self._lag, self._healthy, self._reason = lag, healthy, reason
+            self._checked_at = self._clock()
+            self._checking = False
+
+    def use_replica(self, label: str = "") -> bool:
+        """True nëse query-ja me këtë label duhet të shkojë te replica."""
+        if label in self.config.primary_labels:
+            self._count("routed_primary")
+            return False
+        if self._needs_check(self._clock()):
+            self._check()
+        with self._lock:
+            healthy = self._healthy
+            key = "routed_replica" if healthy else "routed_primary"
+            self._stats[key] += 1
+        return healthy
+
+    def report_failure(self, exc: BaseException) -> None:
+        """Replica dështoi gjatë query-t: primary deri në kontrollin e radhës."""
+        with self._lock:
+            self._healthy = False
+            self._reason = f"{type(exc).__name__}: {exc}"
+            self._checked_at = self._clock()
+            self._stats["failovers"] += 1
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out.update(
+                host=f"{self.config.host}:{self.config.port}",
+                healthy=self._healthy,
+                lag_sec=None if self._lag is None or math.isinf(self._lag) else round(self._lag, 1),
+                reason=self._reason,
+                max_lag_sec=self.config.max_lag_sec,
+            )
+        return out
+
+
+# -------------------- Registry (një router për db_key) --------------------
+_ROUTERS: Dict[str, Optional[ReplicaRouter]] = {}
+_ROUTERS_LOCK = threading.Lock()
+
+
+def get_router(name: str, create: Callable[[], Optional[ReplicaRouter]]) -> Optional[ReplicaRouter]:
+    """Kthen router-in për db_key; None (i ruajtur) kur nuk ka replikë të konfiguruar."""
+    with _ROUTERS_LOCK:
+        if name not in _ROUTERS:
+            _ROUTERS[name] = create()
+        return _ROUTERS[name]
+
+
+def get_router_stats() -> Dict[str, Dict[str, Any]]:
+    """Gjendja e replikave për të gjithë db_key me replikë."""
+    with _ROUTERS_LOCK:
+        routers = [r for r in _ROUTERS.values() if r is not None]
+    return {r.name: r.status() for r in routers}
+
+
+def reset_routers(names: Optional[Iterable[str]] = None) -> None:
+    """Harron router-at (p.sh. pasi ndryshon secrets.toml)."""
+    with _ROUTERS_LOCK:
+        if names is None:
+            _ROUTERS.clear()
+        else:
+            for n in names:
+                _ROUTERS.pop(n, None)
@@ -1,9 +1,26 @@
-
-
 import os
-from typing import Sequence, Dict, Any, Optional, Iterable
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Sequence, Dict, Any, Optional, Iterable, Iterator, List, Tuple, Callable
 import pymysql
 import streamlit as st
+from core.db_pool import ConnectionPool, PooledConnection, get_pool, get_pool_stats, close_pool, _is_connection_error
+from core.db_replica import (
+    ReplicaConfig,
+    ReplicaRouter,
+    get_router,
+    get_router_stats,
+    parse_replica_config,
+    read_replica_lag,
+    reset_routers,
+)
+from core.rollup_store import get_rollup_store
+from core.query_cache import get_query_cache, make_cache_key, is_closed_window
+from core.query_metrics import get_metrics_registry
+from core.status_settings import get_db_pool_limits, get_stream_batch_size, get_report_slicing
+from core.time_slices import MergeSpec, run_sliced, slice_limiter, window_length
 
 # Global variable to store current DB selection
 _CURRENT_DB_KEY = "db"
@@ -43,8 +60,38 @@ def _read_db_secrets(db_key: str = "db"):
         database = database or os.getenv("DB_NAME")
     return host, user, password, database
 
-def get_conn(db_key: Optional[str] = None):
-    """Get database connection.
+def _read_db_port(db_key: str = "db") -> int:
+    """Porta e MySQL: secrets [db_key].port, DB_PORT (vetëm për "db"), ose 3306."""
+    port = None
+    try:
+        port = st.secrets.get(db_key, {}).get("port")
+    except Exception:
+        pass
+    if port is None and db_key == "db":
+        port = os.getenv("DB_PORT")
+    return int(port or 3306)
+
+def _connection_factory(db_key: str):
+    """Read credentials once and return a function that opens a new connection."""
+    host, user, password, database = _read_db_secrets(db_key)
+    port = _read_db_port(db_key)
+    if not all([host, user, password, database]):
+        raise RuntimeError(
+            f"Kredencialet e DB '{db_key}' mungojnë. "
+            f"Vendosi te .streamlit/secrets.toml nën [{db_key}] host/user/password/database."
+        )
+
+    def _connect():
+        return pymysql.connect(host=host, port=port, user=user, password=password, database=database,
+                               autocommit=True, charset="utf8mb4",
+                               cursorclass=pymysql.cursors.DictCursor)
+    return _connect
+
+def get_conn(db_key: Optional[str] = None) -> PooledConnection:
+    """Get a pooled database connection.
+
+    Lidhja merret nga pool-i i db_key (core/db_pool.py). Në `with get_conn() as conn`
+    ajo kthehet në pool në dalje, në vend që të mbyllet.
 
     Args:
         db_key: Key in secrets.toml (e.g., "db" for default, "db2" for second database)
@@ -52,12 +99,315 @@ def get_conn(db_key: Optional[str] = None):
     """
     if db_key is None:
         db_key = _CURRENT_DB_KEY
-    host, user, password, database = _read_db_secrets(db_key)
-    if not all([host, user, password, database]):
-        raise RuntimeError(f"Kredencialet e DB '{db_key}' mungojnë. Vendosi te .streamlit/secrets.toml nën [{db_key}] host/user/password/database.")
-    return pymysql.connect(host=host, user=user, password=password, database=database,
-                           autocommit=True, charset="utf8mb4",
-                           cursorclass=pymysql.cursors.DictCursor)
+    pool = get_pool(db_key, create=lambda: ConnectionPool(db_key, _connection_factory(db_key), **get_db_pool_limits()))
+    return pool.connection()
+
+def reset_db_pool(db_key: Optional[str] = None) -> None:
+    """Mbyll pool-in e db_key (p.sh. pasi ndryshojnë kredencialet në secrets.toml)."""
+    db_key = db_key or _CURRENT_DB_KEY
+    close_pool(db_key)
+    close_pool(f"{db_key}:replica")
+    reset_routers([db_key])
+
+def get_db_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistikat e pool-eve për çdo db_key: created, reused, in_use, idle, waits..."""
+    return get_pool_stats()
+
+# -------------------- Read replica (core/db_replica.py) --------------------
+def _read_replica_config(db_key: str) -> Optional[ReplicaConfig]:
+    """Seksioni [db_key.replica] nga secrets; për "db" edhe DB_REPLICA_* nga env."""
+    _, user, password, database = _read_db_secrets(db_key)
+    primary = {"user": user, "password": password, "database": database, "port": _read_db_port(db_key)}
+    replica = None
+    try:
+        section = st.secrets.get(db_key, {}).get("replica")
+        replica = dict(section) if section else None
+    except Exception:
+        pass
+    if replica is None and db_key == "db" and os.getenv("DB_REPLICA_HOST"):
+        env = {
+            "host": os.getenv("DB_REPLICA_HOST"), "port": os.getenv("DB_REPLICA_PORT"),
+            "user": os.getenv("DB_REPLICA_USER"), "password": os.getenv("DB_REPLICA_PASSWORD"),
+            "database": os.getenv("DB_REPLICA_NAME"), "max_lag_sec": os.getenv("DB_REPLICA_MAX_LAG_SEC"),
+        }
+        replica = {k: v for k, v in env.items() if v}
+    return parse_replica_config(primary, replica)
+
+def _replica_pool(db_key: str, config: ReplicaConfig) -> ConnectionPool:
+    def _connect():
+        return pymysql.connect(host=config.host, port=config.port, user=config.user, password=config.password,
+                               database=config.database, autocommit=True, charset="utf8mb4", connect_timeout=5,
+                               cursorclass=pymysql.cursors.DictCursor)
+    name = f"{db_key}:replica"
+    return get_pool(name, create=lambda: ConnectionPool(name, _connect, **get_db_pool_limits()))
+
+def _replica_router(db_key: str) -> Optional[ReplicaRouter]:
+    def _create() -> Optional[ReplicaRouter]:
+        config = _read_replica_config(db_key)
+        if config is None:
+            return None
+
+        def _probe() -> float:
+            with _replica_pool(db_key, config).connection() as conn, conn.cursor() as cur:
+                return read_replica_lag(cur)
+        return ReplicaRouter(db_key, config, _probe)
+    return get_router(db_key, _create)
+
+def get_read_conn(db_key: Optional[str] = None, label: str = "") -> Tuple[PooledConnection, str]:
+    """Lidhje për një query raporti: (lidhja, "replica" | "primary").
+
+    Shkon te replica kur db_key ka [db_key.replica], label nuk është te
+    primary_labels dhe lag-u është brenda max_lag_sec; përndryshe te primary.
+    """
+    db_key = db_key or _CURRENT_DB_KEY
+    router = _replica_router(db_key)
+    if router is not None and router.use_replica(label):
+        try:
+            return _replica_pool(db_key, router.config).connection(), "replica"
+        except Exception as e:
+            router.report_failure(e)
+    return get_conn(db_key), "primary"
+
+def get_replica_status() -> Dict[str, Dict[str, Any]]:
+    """Gjendja e replikave: host, healthy, lag_sec, reason, routed_replica/primary, failovers."""
+    return get_router_stats()
+
+# -------------------- Request-scoped query memo --------------------
+class _QueryMemo:
+    """Memo i rezultateve brenda një ekzekutimi raporti.
+
+    Çelësi është (label, sql, params, db_key). Thirrjet identike që vijnë
+    njëkohësisht nga thread-e të ndryshme presin rezultatin e së parës,
+    kështu query-ja ekzekutohet vetëm një herë.
+
+    Çdo thirrës merr kopjen e vet (listë e re me dict të rinj për rresht,
+    ose DataFrame.copy()), si AnalysisMemo.get: një faqe që modifikon
+    rreshtat e saj nuk ndryshon rezultatin që shohin faqet e tjera.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[tuple, Any] = {}
+        self._pending: Dict[tuple, threading.Event] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_run(self, key: tuple, run):
+        while True:
+            with self._lock:
+                if key in self._results:
+                    self.hits += 1
+                    return _copy_result(self._results[key])
+                event = self._pending.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._pending[key] = event
+                    self.misses += 1
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                event.wait()
+                # Nëse pronari dështoi, çelësi mungon dhe provojmë vetë
+                continue
+            try:
+                result = run()
+                with self._lock:
+                    self._results[key] = result
+                return _copy_result(result)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+                event.set()
+
+
+def _copy_result(value: Any) -> Any:
+    """Kopje e cekët për thirrësin: rreshtat dict kopjohen, vlerat jo."""
+    if isinstance(value, list):
+        return [dict(r) if isinstance(r, dict) else r for r in value]
+    if hasattr(value, "copy"):  # pandas.DataFrame (as_frame=True)
+        return value.copy()
+    return value
+
+
+_QUERY_MEMO: ContextVar[Optional[_QueryMemo]] = ContextVar("vicidial_query_memo", default=None)
+
+
+@contextmanager
+def report_scope() -> Iterator[_QueryMemo]:
+    """Aktivizon memo-n e query-ve për një ekzekutim raporti.
+
+    Brenda scope-it, thirrjet identike të fetch_* (i njëjti funksion, argumente
+    dhe db_key) ekzekutohen vetëm një herë. Scope-et e mbivendosura ripërdorin
+    memo-n e jashtëm. Për thread-e të tjera, kalo kontekstin me
+    contextvars.copy_context().run (si në core/report_queries.py).
+
+    Example:
+        >>> with report_scope():
+        ...     a = fetch_inbound_by_phone(f, t, "autobiz", "1")
+        ...     b = fetch_inbound_by_phone(f, t, "autobiz", "1")  # nga memo
+    """
+    memo = _QUERY_MEMO.get()
+    if memo is not None:
+        yield memo
+        return
+    memo = _QueryMemo()
+    token = _QUERY_MEMO.set(memo)
+    try:
+        yield memo
+    finally:
+        _QUERY_MEMO.reset(token)
+
+
+_CapturedQuery = Tuple[str, str, Tuple[Any, ...]]  # (label, sql, params)
+_QUERY_CAPTURE: ContextVar[Optional[List[_CapturedQuery]]] = ContextVar("vicidial_query_capture", default=None)
+
+
+@contextmanager
+def capture_queries() -> Iterator[List[_CapturedQuery]]:
+    """Regjistron query-t e fetch_* / iter_* pa i ekzekutuar (për EXPLAIN, core/query_advisor.py).
+
+    Brenda bllokut, _fetch_all() shton (label, sql, params) në listë dhe kthen
+    [] (ose DataFrame bosh për as_frame=True); iter_* nuk japin asnjë batch.
+    DB nuk preket.
+    """
+    captured: List[_CapturedQuery] = []
+    token = _QUERY_CAPTURE.set(captured)
+    try:
+        yield captured
+    finally:
+        _QUERY_CAPTURE.reset(token)
+
+
+def _fetch_all(
+    sql: str,
+    params: Sequence[Any] | None = None,
+    label: str = "",
+    window_end: Optional[str] = None,
+    use_cache: bool = True,
+    as_frame: bool = False,
+) -> Sequence[Dict[str, Any]]:
+    """Execute a SELECT on a pooled connection and return all rows as dicts.
+
+    Brenda report_scope(), rezultati ndahet me thirrjet identike.
+    Rezultatet ruhen edhe në cache-in në disk (core/query_cache.py): me TTL kur
+    intervali përfshin sot, pa skadim kur window_end është para ditës së sotme.
+    use_cache=False anashkalon memo-n dhe cache-in (p.sh. ingestion i rollup-it).
+    as_frame=True kthen një pandas.DataFrame me tipe, të ndërtuar nga rreshtat
+    tuple të cursor-it (core/report_frames.frame_from_cursor), pa dict për rresht.
+    Çdo thirrje regjistrohet në core/query_metrics.py (kohët, rreshtat, bajtet,
+    burimi db/cache/memo). Query-t shkojnë te replica e db_key kur ka një
+    (get_read_conn); nëse replica bie gjatë query-t, përsëritet te primary.
+    """
+    captured = _QUERY_CAPTURE.get()
+    if captured is not None:
+        captured.append((label, sql, tuple(params or ())))
+        if as_frame:
+            import pandas as pd
+            return pd.DataFrame()
+        return []
+
+    db_key = _CURRENT_DB_KEY
+    metrics = get_metrics_registry()
+
+    def _execute(span, conn: PooledConnection, route: str):
+        span.record.route = route
+        with conn:
+            span.lap("wait")
+            cursor_cls = pymysql.cursors.Cursor if as_frame else None
+            with conn.cursor(cursor_cls) as cur:
+                cur.execute(sql, params)
+                span.lap("exec")
+                rows = cur.fetchall()
+                span.lap("fetch")
+                return rows, cur.description
+
+    def _query():
+        span = metrics.span(label, db_key)
+        try:
+            try:
+                rows, description = _execute(span, *get_read_conn(db_key, label))
+            except Exception as e:
+                # Replica ra gjatë query-t: përsërit një herë te primary
+                if span.record.route != "replica" or not _is_connection_error(e):
+                    raise
+                _replica_router(db_key).report_failure(e)
+                rows, description = _execute(span, get_conn(db_key), "primary")
+            span.result(rows)
+            if as_frame:
+                from core.report_frames import frame_from_cursor
+                rows = frame_from_cursor(description, rows)
+                span.lap("convert")
+        except Exception as e:
+            metrics.finish(span, error=e)
+            raise
+        metrics.finish(span)
+        return rows
+
+    def _run():
+        cache = get_query_cache() if use_cache else None
+        if cache is None:
+            return _query()
+        key = make_cache_key(sql, params, f"{db_key}:frame" if as_frame else db_key)
+        span = metrics.span(label, db_key, source="cache")
+        found, rows = cache.get(key)
+        if found:
+            span.result(rows, count_bytes=False)
+            metrics.finish(span)
+            return rows
+        rows = _query()
+        cache.put(key, rows, closed=is_closed_window(window_end, grace_hours=cache.closed_grace_hours))
+        return rows
+
+    memo = _QUERY_MEMO.get() if use_cache else None
+    if memo is None:
+        return _run()
+    key = (label, sql, tuple(params or ()), db_key, as_frame)
+    ran = []
+    span = metrics.span(label, db_key, source="memo")
+    rows = memo.get_or_run(key, lambda: ran.append(True) or _run())
+    if not ran:
+        span.result(rows, count_bytes=False)
+        metrics.finish(span)
+    return rows
+
+
+def _rollup_fetch(sql: str, params: Sequence[Any]) -> Sequence[Dict[str, Any]]:
+    """Query për ingestion e rollup-it ditor (pa cache: rezultati ruhet në SQLite)."""
+    return _fetch_all(sql, params, label="rollup_ingest", use_cache=False)
+
+
+def _sliced(
+    label: str,
+    live: Callable[[str, str], Any],
+    from_ts: str,
+    to_ts: str,
+    keys: Sequence[str],
+    measures: Sequence[str],
+    resume_args: tuple = (),
+) -> Any:
+    """live(from_ts, to_ts) në slice-e kohore kur intervali është i gjatë (core/time_slices.py).
+
+    Aktiv vetëm me report_slicing_enabled dhe interval >= report_slice_min_window_days;
+    përndryshe një query e vetme. Çdo slice kalon nga _fetch_all (cache, memo,
+    metrics, replica). Slice-et njëkohëse të db_key ndajnë një semafor me
+    madhësinë e pool-it (db_pool_max_size), dhe brenda fan-out-it të
+    core/report_queries.py ekzekutohen serialisht. Pas një slice të dështuar,
+    thirrja identike e radhës ekzekuton vetëm slice-et që mungojnë.
+    """
+    cfg = get_report_slicing()
+    if (
+        not cfg["enabled"]
+        or _QUERY_CAPTURE.get() is not None
+        or window_length(from_ts, to_ts) < timedelta(days=cfg["min_window_days"])
+    ):
+        return live(from_ts, to_ts)
+    return run_sliced(
+        live, from_ts, to_ts, MergeSpec(tuple(keys), tuple(measures)),
+        unit=cfg["unit"], size=cfg["size"], max_workers=cfg["max_workers"], retries=cfg["retries"],
+        label=label, resume_key=(label, _CURRENT_DB_KEY, from_ts, to_ts, *resume_args),
+        limiter=slice_limiter(_CURRENT_DB_KEY, get_db_pool_limits()["max_size"]),
+    )
 
 # -------------------- OUTBOUND / INBOUND për 'Rezultatet e listave' --------------------
 def fetch_outbound_by_list(start_dt: str, end_dt: str) -> Sequence[Dict[str, Any]]:
@@ -72,9 +422,7 @@ def fetch_outbound_by_list(start_dt: str, end_dt: str) -> Sequence[Dict[str, Any
           AND vl.status IN ('PU','SVYCLM')
         GROUP BY vl.list_id, vls.list_name
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, (start_dt, end_dt))
-        return cur.fetchall()
+    return _fetch_all(sql, (start_dt, end_dt), window_end=end_dt, label="fetch_outbound_by_list")
 
 def fetch_inbound_by_list(start_dt: str, end_dt: str, campaign: str, ivr_code: str) -> Sequence[Dict[str, Any]]:
     """INBOUND: numërim per list_id për një campaign dhe një response të IVR."""
@@ -89,15 +437,20 @@ def fetch_inbound_by_list(start_dt: str, end_dt: str, campaign: str, ivr_code: s
           AND vir.response = %s
         GROUP BY vls.list_id
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, (campaign, start_dt, end_dt, ivr_code))
-        return cur.fetchall()
+    return _fetch_all(sql, (campaign, start_dt, end_dt, ivr_code), window_end=end_dt, label="fetch_inbound_by_list")
 
 # -------------------- Smart Report helpers --------------------
-def fetch_outbound_by_list_statuses(from_ts: str, to_ts: str, campaign_id: str, statuses: Sequence[str] | None) -> Sequence[Dict[str, Any]]:
+def fetch_outbound_by_list_statuses(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str] | None,
+    as_frame: bool = False,
+) -> Sequence[Dict[str, Any]]:
     """Outbound dials and total seconds for a campaign in time window, filtered by statuses.
 
     Time window uses [from_ts, to_ts) semantics.
+    as_frame=True kthen DataFrame (modaliteti kolonor).
     """
     # Build optional status filter
     where_status = ""
@@ -119,9 +472,13 @@ def fetch_outbound_by_list_statuses(from_ts: str, to_ts: str, campaign_id: str,
           {where_status}
         GROUP BY vl.list_id, vls.list_name
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, params)
-        return cur.fetchall()
+
+    def _live(a: str, b: str):
+        return _fetch_all(
+            sql, [a, b] + params[2:], window_end=b, label="fetch_outbound_by_list_statuses", as_frame=as_frame
+        )
+    return _sliced("fetch_outbound_by_list_statuses", _live, from_ts, to_ts,
+                   ["list_id", "list_name"], ["total_dials", "total_sec"], (tuple(params[2:]), as_frame))
 
 
 def get_inbound_calls_by_list(from_ts: str, to_ts: str, campaign_id: str, ivr_code: str) -> Dict[int, int]:
@@ -148,12 +505,15 @@ def fetch_list_names(list_ids: Iterable[int]) -> Sequence[Dict[str, Any]]:
         FROM vicidial_lists
         WHERE list_id IN ({placeholders})
     """
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, ids)
-        return cur.fetchall()
+    return _fetch_all(sql, ids, label="fetch_list_names")
 
 
-def fetch_status_distribution_by_list(from_ts: str, to_ts: str, campaign_id: str) -> Sequence[Dict[str, Any]]:
+def _fetch_status_distribution_by_list_live(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    as_frame: bool = False,
+) -> Sequence[Dict[str, Any]]:
     """Return rows grouped by list_id and status with counts and total_sec."""
     sql = '''
         SELECT vl.list_id,
@@ -165,12 +525,16 @@ def fetch_status_distribution_by_list(from_ts: str, to_ts: str, campaign_id: str
           AND vl.campaign_id = %s
         GROUP BY vl.list_id, vl.status
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, (from_ts, to_ts, campaign_id))
-        return cur.fetchall()
 
+    def _live(a: str, b: str):
+        return _fetch_all(
+            sql, (a, b, campaign_id), window_end=b, label="fetch_status_distribution_by_list", as_frame=as_frame
+        )
+    return _sliced("fetch_status_distribution_by_list", _live, from_ts, to_ts,
+                   ["list_id", "status"], ["calls", "total_sec"], (campaign_id, as_frame))
 
-def fetch_time_buckets_by_list(from_ts: str, to_ts: str, campaign_id: str) -> Sequence[Dict[str, Any]]:
+
+def _fetch_time_buckets_by_list_live(from_ts: str, to_ts: str, campaign_id: str) -> Sequence[Dict[str, Any]]:
     """Return rows grouped by list_id, hour_bucket (00-23), weekday (1-7) with dials and total_sec."""
     sql = '''
         SELECT vl.list_id,
@@ -183,12 +547,14 @@ def fetch_time_buckets_by_list(from_ts: str, to_ts: str, campaign_id: str) -> Se
           AND vl.campaign_id = %s
         GROUP BY vl.list_id, hour_bucket, weekday
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, (from_ts, to_ts, campaign_id))
-        return cur.fetchall()
 
+    def _live(a: str, b: str):
+        return _fetch_all(sql, (a, b, campaign_id), window_end=b, label="fetch_time_buckets_by_list")
+    return _sliced("fetch_time_buckets_by_list", _live, from_ts, to_ts,
+                   ["list_id", "hour_bucket", "weekday"], ["dials", "total_sec"], (campaign_id,))
 
-def fetch_inbound_buckets_by_list(
+
+def _fetch_inbound_buckets_by_list_live(
     from_ts: str,
     to_ts: str,
     campaign_id: str,
@@ -211,17 +577,76 @@ def fetch_inbound_buckets_by_list(
           AND vir.response = %s
         GROUP BY vls.list_id, hour_bucket, weekday
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, (campaign_id, from_ts, to_ts, ivr_code))
-        return cur.fetchall()
 
+    def _live(a: str, b: str):
+        return _fetch_all(sql, (campaign_id, a, b, ivr_code), window_end=b, label="fetch_inbound_buckets_by_list")
+    return _sliced("fetch_inbound_buckets_by_list", _live, from_ts, to_ts,
+                   ["list_id", "hour_bucket", "weekday"], ["inbound_calls"], (campaign_id, ivr_code))
 
-# -------------------- Phone-level aggregations --------------------
-def fetch_dials_by_phone(from_ts: str, to_ts: str, campaign_id: str, statuses: Sequence[str] | None) -> Sequence[Dict[str, Any]]:
-    """Return dials and total_sec grouped by phone_number.
 
-    If statuses is None → ALL statuses; else filter with IN (...).
+def fetch_status_distribution_by_list(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    as_frame: bool = False,
+) -> Sequence[Dict[str, Any]]:
+    """Return rows grouped by list_id and status with counts and total_sec.
+
+    Ditët e mbyllura lexohen nga rollup-i ditor (core/rollup_store.py) kur është aktiv.
+    as_frame=True kthen DataFrame (modaliteti kolonor).
     """
+    store = get_rollup_store()
+    if store is None:
+        return _fetch_status_distribution_by_list_live(from_ts, to_ts, campaign_id, as_frame=as_frame)
+    rows = store.combine(
+        "log_list_status", _CURRENT_DB_KEY, campaign_id, from_ts, to_ts, _rollup_fetch,
+        live=lambda a, b: _fetch_status_distribution_by_list_live(a, b, campaign_id),
+        group_by=["list_id", "status"], key_types={"list_id": int},
+    )
+    if not as_frame:
+        return rows
+    import pandas as pd
+    return pd.DataFrame.from_records(list(rows), columns=["list_id", "status", "calls", "total_sec"])
+
+
+def fetch_time_buckets_by_list(from_ts: str, to_ts: str, campaign_id: str) -> Sequence[Dict[str, Any]]:
+    """Return rows grouped by list_id, hour_bucket (00-23), weekday (1-7) with dials and total_sec."""
+    store = get_rollup_store()
+    if store is None:
+        return _fetch_time_buckets_by_list_live(from_ts, to_ts, campaign_id)
+    return store.combine(
+        "log_list_hour", _CURRENT_DB_KEY, campaign_id, from_ts, to_ts, _rollup_fetch,
+        live=lambda a, b: _fetch_time_buckets_by_list_live(a, b, campaign_id),
+        group_by=["list_id", "hour_bucket", "weekday"], key_types={"list_id": int, "weekday": int},
+    )
+
+
+def fetch_inbound_buckets_by_list(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    ivr_code: str,
+) -> Sequence[Dict[str, Any]]:
+    """Inbound grouped by list_id, hour (00-23), weekday (1-7) using IVR responses."""
+    store = get_rollup_store()
+    if store is None:
+        return _fetch_inbound_buckets_by_list_live(from_ts, to_ts, campaign_id, ivr_code)
+    return store.combine(
+        "ivr_list_hour", _CURRENT_DB_KEY, campaign_id, from_ts, to_ts, _rollup_fetch,
+        live=lambda a, b: _fetch_inbound_buckets_by_list_live(a, b, campaign_id, ivr_code),
+        group_by=["list_id", "hour_bucket", "weekday"], where="response = ?", params=[ivr_code],
+        key_types={"list_id": int, "weekday": int},
+    )
+
+
+# -------------------- Phone-level aggregations --------------------
+def _dials_by_phone_query(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str] | None,
+) -> Tuple[str, list]:
+    """SQL + params për dials/total_sec sipas (phone_number, province)."""
     where_status = ""
     params: list = [from_ts, to_ts, campaign_id]
     if statuses and len(list(statuses)) > 0:
@@ -240,13 +665,37 @@ def fetch_dials_by_phone(from_ts: str, to_ts: str, campaign_id: str, statuses: S
           {where_status}
         GROUP BY vl.phone_number, vli.province
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, params)
-        return cur.fetchall()
+    return sql, params
 
 
-def fetch_inbound_by_phone(from_ts: str, to_ts: str, campaign_id: str, ivr_code: str) -> Sequence[Dict[str, Any]]:
-    """Return inbound counts grouped by phone_number using IVR responses."""
+def _dials_by_phone_split_query(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str],
+) -> Tuple[str, list]:
+    """SQL + params për per-phone ALL + të filtruara (dials_f, total_sec_f) me një skanim."""
+    statuses = list(statuses)
+    placeholders = ",".join(["%s"] * len(statuses))
+    sql = f'''
+        SELECT vl.phone_number,
+               COUNT(*) AS dials,
+               COALESCE(SUM(vl.length_in_sec), 0) AS total_sec,
+               SUM(CASE WHEN vl.status IN ({placeholders}) THEN 1 ELSE 0 END) AS dials_f,
+               COALESCE(SUM(CASE WHEN vl.status IN ({placeholders})
+                                 THEN vl.length_in_sec ELSE 0 END), 0) AS total_sec_f,
+               vli.province
+        FROM vicidial_log vl
+        LEFT JOIN vicidial_list vli ON vl.lead_id = vli.lead_id
+        WHERE vl.call_date >= %s AND vl.call_date < %s
+          AND vl.campaign_id = %s
+        GROUP BY vl.phone_number, vli.province
+    '''
+    return sql, statuses + statuses + [from_ts, to_ts, campaign_id]
+
+
+def _inbound_by_phone_query(from_ts: str, to_ts: str, campaign_id: str, ivr_code: str) -> Tuple[str, list]:
+    """SQL + params për inbound sipas (phone_number, province)."""
     sql = '''
         SELECT vl.phone_number,
                COUNT(*) AS inbound_calls,
@@ -259,9 +708,257 @@ def fetch_inbound_by_phone(from_ts: str, to_ts: str, campaign_id: str, ivr_code:
           AND vir.response = %s
         GROUP BY vl.phone_number, vli.province
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, (campaign_id, from_ts, to_ts, ivr_code))
-        return cur.fetchall()
+    return sql, [campaign_id, from_ts, to_ts, ivr_code]
+
+
+def _split_phone_row(r: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Ndan një rresht të split query-t në (row_all, row_filtered ose None)."""
+    row_all = {
+        "phone_number": r.get("phone_number"),
+        "dials": r.get("dials"),
+        "total_sec": r.get("total_sec"),
+        "province": r.get("province"),
+    }
+    dials_f = int(r.get("dials_f") or 0)
+    if dials_f <= 0:
+        return row_all, None
+    return row_all, {
+        "phone_number": r.get("phone_number"),
+        "dials": dials_f,
+        "total_sec": r.get("total_sec_f"),
+        "province": r.get("province"),
+    }
+
+
+def _fetch_dials_by_phone_live(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str] | None,
+) -> Sequence[Dict[str, Any]]:
+    """Return dials and total_sec grouped by phone_number.
+
+    If statuses is None → ALL statuses; else filter with IN (...).
+    """
+    def _live(a: str, b: str):
+        sql, params = _dials_by_phone_query(a, b, campaign_id, statuses)
+        return _fetch_all(sql, params, window_end=b, label="fetch_dials_by_phone")
+    return _sliced("fetch_dials_by_phone", _live, from_ts, to_ts,
+                   ["phone_number", "province"], ["dials", "total_sec"], (campaign_id, tuple(statuses or ())))
+
+
+def _fetch_dials_by_phone_split_live(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str] | None,
+) -> Tuple[Sequence[Dict[str, Any]], Sequence[Dict[str, Any]]]:
+    """Per-phone dials për ALL statuses dhe për statuset e filtruara me një skanim të vetëm.
+
+    Kthen (rows_all, rows_filtered) me të njëjtën formë si fetch_dials_by_phone():
+    rows_all == fetch_dials_by_phone(..., None) dhe
+    rows_filtered == fetch_dials_by_phone(..., statuses).
+    Filtri aplikohet me SUM(CASE ...) brenda të njëjtit GROUP BY, në vend të dy
+    skanimeve të vicidial_log. Nëse statuses është None/bosh, të dyja janë të njëjta.
+    """
+    if not statuses or len(list(statuses)) == 0:
+        rows = _fetch_dials_by_phone_live(from_ts, to_ts, campaign_id, None)
+        return rows, rows
+
+    def _live(a: str, b: str):
+        sql, params = _dials_by_phone_split_query(a, b, campaign_id, statuses)
+        return _fetch_all(sql, params, window_end=b, label="fetch_dials_by_phone_split")
+    rows = _sliced("fetch_dials_by_phone_split", _live, from_ts, to_ts,
+                   ["phone_number", "province"], ["dials", "total_sec", "dials_f", "total_sec_f"],
+                   (campaign_id, tuple(statuses)))
+
+    rows_all: list = []
+    rows_filtered: list = []
+    for r in rows or []:
+        row_all, row_f = _split_phone_row(r)
+        rows_all.append(row_all)
+        if row_f is not None:
+            rows_filtered.append(row_f)
+    return rows_all, rows_filtered
+
+
+def _fetch_inbound_by_phone_live(from_ts: str, to_ts: str, campaign_id: str, ivr_code: str) -> Sequence[Dict[str, Any]]:
+    """Return inbound counts grouped by phone_number using IVR responses."""
+    def _live(a: str, b: str):
+        sql, params = _inbound_by_phone_query(a, b, campaign_id, ivr_code)
+        return _fetch_all(sql, params, window_end=b, label="fetch_inbound_by_phone")
+    return _sliced("fetch_inbound_by_phone", _live, from_ts, to_ts,
+                   ["phone_number", "province"], ["inbound_calls"], (campaign_id, ivr_code))
+
+
+def _status_filter(statuses: Sequence[str] | None) -> Tuple[str, list]:
+    """Kushti SQLite 'status IN (...)' për rollup-in e telefonave."""
+    if not statuses:
+        return "", []
+    statuses = list(statuses)
+    return f"status IN ({','.join('?' * len(statuses))})", statuses
+
+
+def fetch_dials_by_phone(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str] | None,
+) -> Sequence[Dict[str, Any]]:
+    """Return dials and total_sec grouped by phone_number (and province).
+
+    If statuses is None → ALL statuses; else filter with IN (...).
+    Ditët e mbyllura lexohen nga rollup-i ditor kur është aktiv.
+    """
+    store = get_rollup_store()
+    if store is None:
+        return _fetch_dials_by_phone_live(from_ts, to_ts, campaign_id, statuses)
+    where, params = _status_filter(statuses)
+    return store.combine(
+        "log_phone", _CURRENT_DB_KEY, campaign_id, from_ts, to_ts, _rollup_fetch,
+        live=lambda a, b: _fetch_dials_by_phone_live(a, b, campaign_id, statuses),
+        group_by=["phone_number", "province"], where=where, params=params,
+    )
+
+
+def fetch_dials_by_phone_split(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str] | None,
+) -> Tuple[Sequence[Dict[str, Any]], Sequence[Dict[str, Any]]]:
+    """Per-phone dials (rows_all, rows_filtered) me një skanim të vetëm të vicidial_log.
+
+    Me rollup aktiv, ditët e mbyllura lexohen nga SQLite dhe pjesa live
+    pyetet një herë (të dyja anët e ndajnë query-në përmes report_scope()).
+    """
+    store = get_rollup_store()
+    if store is None:
+        return _fetch_dials_by_phone_split_live(from_ts, to_ts, campaign_id, statuses)
+    where, params = _status_filter(statuses)
+    with report_scope():
+        rows_all = store.combine(
+            "log_phone", _CURRENT_DB_KEY, campaign_id, from_ts, to_ts, _rollup_fetch,
+            live=lambda a, b: _fetch_dials_by_phone_split_live(a, b, campaign_id, statuses)[0],
+            group_by=["phone_number", "province"],
+        )
+        if not statuses:
+            return rows_all, rows_all
+        rows_filtered = store.combine(
+            "log_phone", _CURRENT_DB_KEY, campaign_id, from_ts, to_ts, _rollup_fetch,
+            live=lambda a, b: _fetch_dials_by_phone_split_live(a, b, campaign_id, statuses)[1],
+            group_by=["phone_number", "province"], where=where, params=params,
+        )
+    return rows_all, rows_filtered
+
+
+def fetch_inbound_by_phone(from_ts: str, to_ts: str, campaign_id: str, ivr_code: str) -> Sequence[Dict[str, Any]]:
+    """Return inbound counts grouped by phone_number using IVR responses."""
+    store = get_rollup_store()
+    if store is None:
+        return _fetch_inbound_by_phone_live(from_ts, to_ts, campaign_id, ivr_code)
+    return store.combine(
+        "ivr_phone", _CURRENT_DB_KEY, campaign_id, from_ts, to_ts, _rollup_fetch,
+        live=lambda a, b: _fetch_inbound_by_phone_live(a, b, campaign_id, ivr_code),
+        group_by=["phone_number", "province"], where="response = ?", params=[ivr_code],
+    )
+
+
+# -------------------- Streaming (server-side cursor) --------------------
+def _iter_batches(
+    sql: str, params: Sequence[Any], batch_size: int, label: str = "iter_batches",
+) -> Iterator[List[Dict[str, Any]]]:
+    """Ekzekuton SELECT me SSDictCursor dhe kthen rreshtat në batch-e me madhësi fikse.
+
+    Rreshtat nuk mbahen në memorie të gjithë njëherësh: pymysql i lexon nga
+    socket-i sipas nevojës. Lidhja mbetet e zënë derisa gjeneratori të mbarojë;
+    nëse ndërpritet para fundit, lidhja hidhet (ka rezultate të palexuara).
+    Streaming-u nuk kalon nga cache-i/rollup-i: lexon gjithmonë live.
+    Në core/query_metrics.py regjistrohet vetëm koha e DB/rrjetit (fetch_ms),
+    jo koha që konsumuesi kalon me secilin batch.
+    """
+    captured = _QUERY_CAPTURE.get()
+    if captured is not None:
+        captured.append((label, sql, tuple(params or ())))
+        return
+    batch_size = max(1, int(batch_size))
+    metrics = get_metrics_registry()
+    span = metrics.span(label, _CURRENT_DB_KEY, source="stream")
+    conn, span.record.route = get_read_conn(_CURRENT_DB_KEY, label)
+    span.lap("wait")
+    finished = False
+    error: Optional[BaseException] = None
+    try:
+        cur = conn.cursor(pymysql.cursors.SSDictCursor)
+        try:
+            cur.execute(sql, params)
+            span.lap("exec")
+            while True:
+                batch = cur.fetchmany(batch_size)
+                span.lap("fetch")
+                if not batch:
+                    break
+                span.result(batch)
+                yield list(batch)
+                # Koha e konsumuesit nuk i shtohet asnjë faze
+                span.skip()
+            finished = True
+        finally:
+            if finished:
+                cur.close()
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        conn.release(discard=not finished)
+        metrics.finish(span, error=error)
+
+
+def iter_dials_by_phone(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str] | None,
+    batch_size: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Varianti streaming i fetch_dials_by_phone(): batch-e rreshtash, të renditur sipas phone_number."""
+    sql, params = _dials_by_phone_query(from_ts, to_ts, campaign_id, statuses)
+    yield from _iter_batches(sql + " ORDER BY vl.phone_number", params, batch_size or get_stream_batch_size(),
+                              label="iter_dials_by_phone")
+
+
+def iter_dials_by_phone_split(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    statuses: Sequence[str] | None,
+    batch_size: Optional[int] = None,
+) -> Iterator[List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]]:
+    """Varianti streaming i fetch_dials_by_phone_split().
+
+    Çdo batch është listë (row_all, row_filtered ose None), e renditur sipas
+    phone_number, kështu rreshtat e të njëjtit numër vijnë njëri pas tjetrit.
+    """
+    size = batch_size or get_stream_batch_size()
+    if not statuses:
+        for batch in iter_dials_by_phone(from_ts, to_ts, campaign_id, None, size):
+            yield [(r, r) for r in batch]
+        return
+    sql, params = _dials_by_phone_split_query(from_ts, to_ts, campaign_id, statuses)
+    for batch in _iter_batches(sql + " ORDER BY vl.phone_number", params, size, label="iter_dials_by_phone_split"):
+        yield [_split_phone_row(r) for r in batch]
+
+
+def iter_inbound_by_phone(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    ivr_code: str,
+    batch_size: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Varianti streaming i fetch_inbound_by_phone(): batch-e rreshtash."""
+    sql, params = _inbound_by_phone_query(from_ts, to_ts, campaign_id, ivr_code)
+    yield from _iter_batches(sql, params, batch_size or get_stream_batch_size(), label="iter_inbound_by_phone")
 
 
 # -------------------- SVYCLM quality --------------------
@@ -276,12 +973,19 @@ def fetch_svyclm_by_list(from_ts: str, to_ts: str, campaign_id: str) -> Sequence
           AND vl.status = 'SVYCLM'
         GROUP BY vl.list_id
     '''
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, (from_ts, to_ts, campaign_id))
-        return cur.fetchall()
+
+    def _live(a: str, b: str):
+        return _fetch_all(sql, (a, b, campaign_id), window_end=b, label="fetch_svyclm_by_list")
+    return _sliced("fetch_svyclm_by_list", _live, from_ts, to_ts,
+                   ["list_id"], ["svyclm_calls", "svyclm_sec"], (campaign_id,))
 
 
-def fetch_svyclm_timeout_by_list(from_ts: str, to_ts: str, campaign_id: str, timeout_codes: Sequence[str]) -> Sequence[Dict[str, Any]]:
+def fetch_svyclm_timeout_by_list(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    timeout_codes: Sequence[str],
+) -> Sequence[Dict[str, Any]]:
     """Count timeouts based on IVR response codes (e.g., TIMEOUT) grouped by list via lead mapping."""
     placeholders = ",".join(["%s"] * len(timeout_codes)) if timeout_codes else "%s"
     sql = f'''
@@ -295,13 +999,20 @@ def fetch_svyclm_timeout_by_list(from_ts: str, to_ts: str, campaign_id: str, tim
           AND vir.response IN ({placeholders})
         GROUP BY vls.list_id
     '''
-    params = [campaign_id, from_ts, to_ts] + (list(timeout_codes) if timeout_codes else ["TIMEOUT"])
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, params)
-        return cur.fetchall()
+    codes = list(timeout_codes) if timeout_codes else ["TIMEOUT"]
+
+    def _live(a: str, b: str):
+        return _fetch_all(sql, [campaign_id, a, b] + codes, window_end=b, label="fetch_svyclm_timeout_by_list")
+    return _sliced("fetch_svyclm_timeout_by_list", _live, from_ts, to_ts,
+                   ["list_id"], ["svyclm_timeout"], (campaign_id, tuple(codes)))
 
 # -------------------- Listimi i regjistrimeve për shkarkim --------------------
-def list_recordings(start_dt: str, end_dt: str, campaign: Optional[str] = None, limit: int = 10000) -> Sequence[Dict[str, Any]]:
+def list_recordings(
+    start_dt: str,
+    end_dt: str,
+    campaign: Optional[str] = None,
+    limit: int = 10000,
+) -> Sequence[Dict[str, Any]]:
     """Lexo regjistrimet nga recording_log brenda intervalit.
     Kthen: start_time, location, filename, lead_id, length_in_sec, user (agent), campaign_id (nëse gjendet)
     Bashkohet me vicidial_log (sipas lead_id dhe një dritare kohore rreth start_time) për të marrë user/campaign.
@@ -316,7 +1027,8 @@ def list_recordings(start_dt: str, end_dt: str, campaign: Optional[str] = None,
                vl.campaign_id
         FROM recording_log rl
         LEFT JOIN vicidial_log vl ON vl.lead_id = rl.lead_id
-           AND vl.call_date BETWEEN DATE_SUB(rl.start_time, INTERVAL 1 HOUR) AND DATE_ADD(rl.start_time, INTERVAL 1 HOUR)
+           AND vl.call_date BETWEEN DATE_SUB(rl.start_time, INTERVAL 1 HOUR)
+                                AND DATE_ADD(rl.start_time, INTERVAL 1 HOUR)
         WHERE rl.start_time >= %s AND rl.start_time <= %s
         { 'AND vl.campaign_id = %s' if campaign else '' }
         ORDER BY rl.start_time ASC
@@ -326,6 +1038,4 @@ def list_recordings(start_dt: str, end_dt: str, campaign: Optional[str] = None,
     if campaign:
         params.append(campaign)
     params.append(limit)
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, params)
-        return cur.fetchall()
+    return _fetch_all(sql, params, window_end=end_dt, label="list_recordings")
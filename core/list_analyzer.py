@@ -11,6 +11,16 @@ KEY FEATURES:
     - List volume requirements (500k+ for dial level 700)
     - Vicidial-specific configuration generation
     - Province-based segmentation (for fix numbers)
+    - rank_lists_by_performance: join i indeksuar sipas list_id (pandas), O(n)
+    - Provincat, mobile vs fix dhe orët: group-by pandas/NumPy mbi tabelën e
+      tipizuar të prefikseve (core/prefix_table.py) në vend të cikleve me dict
+    - Provincat dhe kostot nga prefix_hour_status (prefix_4 × status × orë, të
+      gjitha prefikset) kur snapshot-i e ka; JSON-et e vjetra mbeten te
+      prefix_status_analysis
+    - Analysis DAG (core/analysis_graph.py): çdo analizë rillogaritet vetëm
+      kur ndryshojnë seksionet e snapshot-it që lexon
+    - scenario_simulation: shpërndarjet Monte Carlo të lead burn, kostos dhe
+      press 1 për skenarët e dial level (core/scenario_simulator.py)
 
 TARGET:
     - 150 Press 1/day (current: ~62)
@@ -22,171 +32,226 @@ Last Updated: 2025-10-14
 """
 
 import json
-from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from core.snapshot import load_snapshot, read_snapshot_meta, snapshot_path_for, SNAPSHOT_SUFFIX
+from core.analysis_graph import AnalysisGraph, AnalysisNode, GraphRun
+from core.prefix_table import build_best_prefix_table
+from core.scenario_simulator import build_simulation_inputs, simulate_default_scenarios
 from core.mobile_fix_classifier import (
-    classify_phone_number,
     calculate_voip_cost,
     MOBILE_COST_PER_MIN,
     FIX_COST_PER_MIN
 )
 
 
+def _fresh_snapshot(path: Path) -> Optional[Path]:
+    """.vcsnap që duhet lexuar për `path` (vetë path-i ose snapshot-i pranë JSON-it)."""
+    if path.suffix == SNAPSHOT_SUFFIX:
+        return path
+    snap_path = snapshot_path_for(path)
+    try:
+        if snap_path.stat().st_mtime >= path.stat().st_mtime:
+            return snap_path
+    except OSError:
+        pass
+    return None
+
+
 def load_vicidial_data(filepath: str = "vicidial_analysis_data.json") -> dict:
     """
     Ngarkon të dhënat e mbledhura nga Vicidial.
 
+    Kur pranë JSON-it ka një snapshot .vcsnap (core/snapshot.py) po aq të ri
+    ose më të ri, lexohet snapshot-i: hapet me mmap dhe seksionet dekodohen
+    vetëm kur kërkohen, në vend që të parse-ohet gjithë JSON-i. Snapshot-i
+    duhet mbyllur nga thirrësi; përdor open_vicidial_data() me `with`.
+
     Args:
-        filepath: Path to JSON data file
+        filepath: Path to JSON data file (ose direkt një .vcsnap)
 
     Returns:
-        dict: Full analysis data
+        dict: Full analysis data (Snapshot read-only kur lexohet nga snapshot-i)
     """
+    path = Path(filepath)
+    snap_path = _fresh_snapshot(path)
+    if snap_path is not None:
+        try:
+            return load_snapshot(snap_path)
+        except ValueError:
+            if snap_path == path:
+                raise
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
-def analyze_province_performance(data: dict) -> dict:
+@contextmanager
+def open_vicidial_data(filepath: str = "vicidial_analysis_data.json") -> Iterator[dict]:
+    """load_vicidial_data() si context manager: snapshot-i mbyllet në dalje.
+
+    Përdorim:
+        with open_vicidial_data(path) as data:
+            run = run_analysis(data)
     """
-    Analizon performancën e çdo provincë bazuar në Press 1 rate reale.
+    data = load_vicidial_data(filepath)
+    try:
+        yield data
+    finally:
+        close = getattr(data, "close", None)
+        if close is not None:
+            close()
 
-    Args:
-        data: Vicidial analysis data (from collect_vicidial_data.py)
 
-    Returns:
-        dict: Province performance analysis with Press 1 rates and costs
+def load_vicidial_meta(filepath: str = "vicidial_analysis_data.json") -> Dict[str, Any]:
+    """Vetëm vlerat skalare të dataset-it (db_key, campaign_id, collection_date...).
+
+    Me snapshot lexohet vetëm indeksi (pa mmap dhe pa dekoduar seksionet).
     """
-    prefix_analysis = data.get("prefix_status_analysis", [])
-
-    # Grupim i të dhënave sipas provincave
-    provinces = {}
-
-    for item in prefix_analysis:
-        prefix = item.get("prefix_3", "")
-        calls = item.get("calls", 0)
-        minutes = item.get("total_minutes", 0)
-        status = item.get("status", "")
-
-        # Klasifikon numrin dhe merr provincën
-        # Për numra fix: vetëm prefix CSV
-        # Për numra mobile: kontrollon provincën nga Vicidial
-        lead_province = item.get("province")  # Nëse ka në të dhënat
-        phone_type, province_code, zone_name = classify_phone_number(prefix + "0000000", lead_province)
-
-        if phone_type == "FIX" and province_code:
-            # Përdor emrin e provincës nga zone_name ose province_code
-            province_name = zone_name if zone_name else province_code
-
-            if province_name not in provinces:
-                provinces[province_name] = {
-                    "name": province_name,
-                    "province_code": province_code,
-                    "prefixes": set(),
-                    "total_calls": 0,
-                    "total_minutes": 0,
-                    "svyclm_count": 0,
-                    "press1_count": 0,  # Do të llogaritet më vonë
-                    "voip_cost": 0,
-                    "phone_type": "FIX"
-                }
+    path = Path(filepath)
+    snap_path = _fresh_snapshot(path)
+    if snap_path is not None:
+        try:
+            return read_snapshot_meta(snap_path)
+        except (OSError, ValueError):
+            if snap_path == path:
+                raise
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {k: v for k, v in data.items() if not isinstance(v, (list, dict))}
 
-            provinces[province_name]["prefixes"].add(prefix)
-            provinces[province_name]["total_calls"] += calls
-            provinces[province_name]["total_minutes"] += minutes
-            provinces[province_name]["voip_cost"] += minutes * FIX_COST_PER_MIN
-
-            if status == "SVYCLM":
-                provinces[province_name]["svyclm_count"] += calls
-
-    # Shto Mobile Italia si provincë e veçantë
-    mobile_calls = 0
-    mobile_minutes = 0
-    mobile_svyclm = 0
-    mobile_cost = 0
-
-    for item in prefix_analysis:
-        prefix = item.get("prefix_3", "")
-        if prefix.startswith("3"):  # Mobile prefix
-            mobile_calls += item.get("calls", 0)
-            mobile_minutes += item.get("total_minutes", 0)
-            mobile_cost += item.get("total_minutes", 0) * MOBILE_COST_PER_MIN
-            if item.get("status") == "SVYCLM":
-                mobile_svyclm += item.get("calls", 0)
 
-    if mobile_calls > 0:
-        provinces["Mobile Italia"] = {
-            "name": "Mobile Italia",
-            "province_code": "MOBILE",
-            "prefixes": {"3"},
-            "total_calls": mobile_calls,
-            "total_minutes": mobile_minutes,
-            "svyclm_count": mobile_svyclm,
-            "press1_count": 0,  # Do të llogaritet më vonë
-            "voip_cost": mobile_cost,
-            "phone_type": "MOBILE"
-        }
+def _sum(values: pd.Series) -> float:
+    """Shuma si vlerë Python (për JSON)."""
+    return values.sum().item() if len(values) else 0
+
 
-    # Llogarit Press 1 count (estimat bazuar në SVYCLM)
+def _province_metrics(frame: pd.DataFrame) -> pd.DataFrame:
+    """Press 1 (estimat nga SVYCLM), rate-t, kosto/Press 1 dhe efficiency për çdo rresht."""
     # Supozojmë se 0.55% e SVYCLM rezultojnë në Press 1 (bazuar në të dhënat aktuale)
     estimated_press1_rate = 0.0055  # 0.55%
 
-    for province_name, province_data in provinces.items():
-        # Llogarit Press 1 count bazuar në SVYCLM
-        province_data["press1_count"] = int(province_data["svyclm_count"] * estimated_press1_rate)
-
-        # Llogarit Press 1 rate
-        province_data["press1_rate"] = (
-            province_data["press1_count"] / province_data["total_calls"]
-            if province_data["total_calls"] > 0 else 0
-        )
+    calls = frame["total_calls"].to_numpy(dtype="float64")
+    minutes = frame["total_minutes"].to_numpy(dtype="float64")
+    svyclm = frame["svyclm_count"].to_numpy(dtype="float64")
+    cost = frame["voip_cost"].to_numpy(dtype="float64")
+    press1 = np.trunc(svyclm * estimated_press1_rate).astype("int64")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        press1_rate = np.where(calls > 0, press1 / calls, 0.0)
+        svyclm_rate = np.where(calls > 0, svyclm / calls, 0.0)
+        cost_per_press1 = np.where(press1 > 0, cost / press1, 0.0)
+        avg_duration = np.where(calls > 0, minutes * 60 / calls, 0.0)
+
+    # Efficiency score (0-10): press1 40%, kosto 30%, volum 20%, kohëzgjatje 10%
+    press1_score = np.minimum(10, press1_rate * 100)
+    cost_score = np.maximum(0, 10 - (cost_per_press1 / 0.20) * 10)
+    volume_score = np.minimum(10, calls / 5000)
+    duration_score = np.maximum(0, 10 - np.abs(avg_duration - 45) / 10)
+
+    return frame.assign(
+        press1_count=press1,
+        press1_rate=press1_rate,
+        svyclm_rate=svyclm_rate,
+        cost_per_press1=cost_per_press1,
+        avg_duration=avg_duration,
+        efficiency_score=press1_score * 0.4 + cost_score * 0.3 + volume_score * 0.2 + duration_score * 0.1,
+    )
 
-        # Llogarit SVYCLM rate
-        province_data["svyclm_rate"] = (
-            province_data["svyclm_count"] / province_data["total_calls"]
-            if province_data["total_calls"] > 0 else 0
-        )
 
-        # Llogarit koston për Press 1
-        province_data["cost_per_press1"] = (
-            province_data["voip_cost"] / province_data["press1_count"]
-            if province_data["press1_count"] > 0 else 0
-        )
+def analyze_province_performance(data: dict, table: Optional[pd.DataFrame] = None) -> dict:
+    """
+    Analizon performancën e çdo provincë bazuar në Press 1 rate reale.
 
-        # Llogarit kohëzgjatjen mesatare
-        province_data["avg_duration"] = (
-            province_data["total_minutes"] * 60 / province_data["total_calls"]
-            if province_data["total_calls"] > 0 else 0
-        )
+    Group-by mbi tabelën e prefikseve (core/prefix_table.py): klasifikimi bëhet
+    një herë për çdo prefiks unik, agregatet llogariten sipas kolonave.
 
-        # Llogarit efficiency score (0-10)
-        press1_score = min(10, province_data["press1_rate"] * 100)  # 0-10
-        cost_score = max(0, 10 - (province_data["cost_per_press1"] / 0.20) * 10)  # 0-10
-        volume_score = min(10, province_data["total_calls"] / 5000)  # 0-10
-        duration_score = max(0, 10 - abs(province_data["avg_duration"] - 45) / 10)  # 0-10
+    Args:
+        data: Vicidial analysis data (from collect_vicidial_data.py)
+        table: build_best_prefix_table(data) i llogaritur më parë (opsionale)
 
-        province_data["efficiency_score"] = round(
-            (press1_score * 0.4 + cost_score * 0.3 + volume_score * 0.2 + duration_score * 0.1), 2
-        )
+    Returns:
+        dict: Province performance analysis with Press 1 rates and costs
+    """
+    if table is None:
+        table = build_best_prefix_table(data)
+    svyclm_calls = table["calls"].where(table["is_svyclm"], 0.0)
+
+    # Numra fix me provincë (nga prefiksi CSV; "UNKNOWN FIX" grupohet veç)
+    fix_mask = table["province_name"].notna()
+    fix = table[fix_mask].assign(
+        svyclm=svyclm_calls[fix_mask],
+        cost=table["total_minutes"][fix_mask] * FIX_COST_PER_MIN,
+    )
+    grouped = fix.groupby("province_name", sort=False, observed=True)
+    frame = grouped.agg(
+        province_code=("province", "first"),
+        total_calls=("calls", "sum"),
+        total_minutes=("total_minutes", "sum"),
+        svyclm_count=("svyclm", "sum"),
+        voip_cost=("cost", "sum"),
+    )
+    # Prefikset e çdo provincë, nga më shumë thirrje te më pak
+    by_prefix = fix.groupby(["province_name", "prefix"], sort=False, observed=True)["calls"].sum().reset_index()
+    by_prefix["prefix"] = by_prefix["prefix"].astype(str)
+    by_prefix = by_prefix.sort_values(["calls", "prefix"], ascending=[False, True], kind="stable")
+    prefixes = by_prefix.groupby("province_name", sort=False, observed=True)["prefix"].agg(list)
+    frame = frame.astype({"province_code": object})
+    frame.index = frame.index.astype(object)
+    frame["prefixes"] = [prefixes[name] for name in frame.index]
+    frame["phone_type"] = "FIX"
+
+    # Shto Mobile Italia si provincë e veçantë (çdo prefiks 3XX)
+    prefix = table["prefix"].cat
+    is_mobile_prefix = np.array([str(p).startswith("3") for p in prefix.categories] + [False])
+    mobile_mask = pd.Series(is_mobile_prefix[prefix.codes], index=table.index)
+    mobile_calls = _sum(table["calls"][mobile_mask])
+    if mobile_calls > 0:
+        frame.loc["Mobile Italia"] = {
+            "province_code": "MOBILE",
+            "total_calls": mobile_calls,
+            "total_minutes": _sum(table["total_minutes"][mobile_mask]),
+            "svyclm_count": _sum(svyclm_calls[mobile_mask]),
+            "voip_cost": _sum(table["total_minutes"][mobile_mask] * MOBILE_COST_PER_MIN),
+            "prefixes": ["3"],
+            "phone_type": "MOBILE",
+        }
 
-        # Konverto set në list për JSON serialization
-        province_data["prefixes"] = list(province_data["prefixes"])
+    frame = _province_metrics(frame)
+    # Numëruesit si int dhe 0 (int) kur emëruesi është 0, si në versionin me dict
+    provinces = [{
+        "name": name,
+        "province_code": row["province_code"],
+        "prefixes": row["prefixes"],
+        "total_calls": int(row["total_calls"]),
+        "total_minutes": row["total_minutes"],
+        "svyclm_count": int(row["svyclm_count"]),
+        "press1_count": int(row["press1_count"]),
+        "voip_cost": row["voip_cost"],
+        "phone_type": row["phone_type"],
+        "press1_rate": row["press1_rate"] if row["total_calls"] > 0 else 0,
+        "svyclm_rate": row["svyclm_rate"] if row["total_calls"] > 0 else 0,
+        "cost_per_press1": row["cost_per_press1"] if row["press1_count"] > 0 else 0,
+        "avg_duration": row["avg_duration"] if row["total_calls"] > 0 else 0,
+        "efficiency_score": round(row["efficiency_score"], 2),
+    } for name, row in zip(frame.index.tolist(), frame.to_dict("records"))]
 
     # Rendit provincat sipas efficiency score
-    sorted_provinces = sorted(
-        provinces.values(),
-        key=lambda x: x["efficiency_score"],
-        reverse=True
-    )
+    sorted_provinces = sorted(provinces, key=lambda x: x["efficiency_score"], reverse=True)
 
     return {
         "provinces": sorted_provinces,
         "summary": {
             "total_provinces": len(provinces),
-            "total_calls": sum(p["total_calls"] for p in provinces.values()),
-            "total_press1": sum(p["press1_count"] for p in provinces.values()),
-            "total_cost": sum(p["voip_cost"] for p in provinces.values()),
-            "avg_press1_rate": sum(p["press1_rate"] for p in provinces.values()) / len(provinces) if provinces else 0
+            "total_calls": sum(p["total_calls"] for p in provinces),
+            "total_press1": sum(p["press1_count"] for p in provinces),
+            "total_cost": sum(p["voip_cost"] for p in provinces),
+            "avg_press1_rate": sum(p["press1_rate"] for p in provinces) / len(provinces) if provinces else 0
         }
     }
 
@@ -195,85 +260,66 @@ def analyze_hourly_performance_by_province(data: dict) -> dict:
     """
     Analizon performancën sipas orëve për çdo provincë.
 
+    Llogaritja bëhet si matricë orë × provincë (NumPy). hourly_performance
+    nuk ka ndarje sipas prefiksit: thirrjet e orës ndahen në mënyrë të barabartë
+    te provincat kryesore dhe orët vlerësohen me shumëzues fix/mobile.
+
     Args:
         data: Vicidial analysis data (from collect_vicidial_data.py)
 
     Returns:
         dict: Hourly performance analysis by province
     """
-    hourly_data = data.get("hourly_performance", [])
-    prefix_analysis = data.get("prefix_status_analysis", [])
-
-    # Krijo mapping prefix -> province
-    prefix_to_province = {}
-    for item in prefix_analysis:
-        prefix = item.get("prefix_3", "")
-        # Për numra fix: vetëm prefix CSV
-        # Për numra mobile: kontrollon provincën nga Vicidial
-        lead_province = item.get("province")  # Nëse ka në të dhënat
-        phone_type, province_code, zone_name = classify_phone_number(prefix + "0000000", lead_province)
-
-        if phone_type == "FIX" and province_code:
-            province_name = zone_name if zone_name else province_code
-            prefix_to_province[prefix] = {
-                "province": province_name,
-                "phone_type": "FIX"
-            }
-        elif phone_type == "MOBILE":
-            prefix_to_province[prefix] = {
-                "province": "Mobile Italia",
-                "phone_type": "MOBILE"
-            }
+    hourly_data = list(data.get("hourly_performance", []))
+
+    # Provincat kryesore për analizë
+    main_provinces = ["Roma", "Milano", "Napoli", "Torino", "Mobile Italia"]
+    is_mobile = np.array([p == "Mobile Italia" for p in main_provinces])
+
+    hours = [h.get("hour", 0) for h in hourly_data]
+    frame = pd.DataFrame.from_records(hourly_data, columns=["hour", "total_calls", "avg_duration"]).fillna(0)
+    hour = frame["hour"].to_numpy(dtype="float64")[:, None]
+    total_calls = frame["total_calls"].to_numpy()
+    avg_duration = frame["avg_duration"].to_numpy()
+
+    # Supozojmë se 0.55% e SVYCLM rezultojnë në Press 1
+    estimated_press1_rate = 0.0055
+
+    # Kosto VoIP (supozojmë 50% FIX, 50% MOBILE për orët), e ndarë në mënyrë të barabartë
+    fix_minutes = total_calls * 0.5 * (avg_duration / 60)
+    mobile_minutes = total_calls * 0.5 * (avg_duration / 60)
+    voip_cost = (fix_minutes * FIX_COST_PER_MIN) + (mobile_minutes * MOBILE_COST_PER_MIN)
+    province_calls = total_calls // len(main_provinces)
+    province_press1 = np.trunc(province_calls * estimated_press1_rate).astype("int64")
+    province_cost = voip_cost / len(main_provinces)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        press1_rate = np.where(province_calls > 0, province_press1 / province_calls, 0)
+
+    # Mobile: më të mira pas orarit të punës; Fix: gjatë orarit të punës
+    multiplier = np.where(
+        is_mobile[None, :],
+        np.where((hour >= 14) & (hour <= 20), 1.2, 0.8),
+        np.where((hour >= 9) & (hour <= 14), 1.3, 0.7),
+    )
+    efficiency = province_press1[:, None] * multiplier
 
-    # Grupim i të dhënave sipas provincave dhe orëve
+    calls_l, press1_l, rate_l = province_calls.tolist(), province_press1.tolist(), press1_rate.tolist()
+    avg_l, cost_l, eff_l = avg_duration.tolist(), province_cost.tolist(), efficiency.tolist()
     hourly_province_data = {}
-
-    for hour_data in hourly_data:
-        hour = hour_data.get("hour", 0)
-        total_calls = hour_data.get("total_calls", 0)
-        avg_duration = hour_data.get("avg_duration", 0)
-
-        # Supozojmë se 0.55% e SVYCLM rezultojnë në Press 1
-        estimated_press1_rate = 0.0055
-        estimated_press1_count = int(total_calls * estimated_press1_rate)
-
-        # Llogarit koston VoIP (supozojmë 50% FIX, 50% MOBILE për orët)
-        fix_minutes = total_calls * 0.5 * (avg_duration / 60)
-        mobile_minutes = total_calls * 0.5 * (avg_duration / 60)
-        voip_cost = (fix_minutes * FIX_COST_PER_MIN) + (mobile_minutes * MOBILE_COST_PER_MIN)
-
-        # Krijo një hyrje për çdo provincë (për tani, përdorim të dhëna të përgjithshme)
-        # Në të ardhmen, kjo mund të përmirësohet me të dhëna më specifike
-
-        # Provincat kryesore për analizë
-        main_provinces = ["Roma", "Milano", "Napoli", "Torino", "Mobile Italia"]
-
-        for province in main_provinces:
-            if province not in hourly_province_data:
-                hourly_province_data[province] = {}
-
-            # Shpërnda thirrjet sipas provincave (për tani, përdorim përmbajtje të barabartë)
-            province_calls = total_calls // len(main_provinces)
-            province_press1 = int(province_calls * estimated_press1_rate)
-            province_cost = voip_cost / len(main_provinces)
-
-            # Përcakto orët optimale për çdo provincë
-            if province == "Mobile Italia":
-                # Mobile: më të mira pas orarit të punës
-                efficiency_multiplier = 1.2 if 14 <= hour <= 20 else 0.8
-            else:
-                # Fix: më të mira gjatë orarit të punës
-                efficiency_multiplier = 1.3 if 9 <= hour <= 14 else 0.7
-
-            hourly_province_data[province][hour] = {
-                "total_calls": province_calls,
-                "press1_count": province_press1,
-                "press1_rate": province_press1 / province_calls if province_calls > 0 else 0,
-                "avg_duration": avg_duration,
-                "voip_cost_eur": province_cost,
-                "efficiency_score": round(province_press1 * efficiency_multiplier, 2),
-                "phone_type": "MOBILE" if province == "Mobile Italia" else "FIX"
+    for j, province in enumerate(main_provinces if hours else []):
+        phone_type = "MOBILE" if is_mobile[j] else "FIX"
+        hourly_province_data[province] = {
+            h: {
+                "total_calls": calls_l[i],
+                "press1_count": press1_l[i],
+                "press1_rate": rate_l[i],
+                "avg_duration": avg_l[i],
+                "voip_cost_eur": cost_l[i],
+                "efficiency_score": round(eff_l[i][j], 2),
+                "phone_type": phone_type
             }
+            for i, h in enumerate(hours)
+        }
 
     # Gjej orët më të mira për çdo provincë
     province_optimal_hours = {}
@@ -306,70 +352,68 @@ def analyze_hourly_performance_by_province(data: dict) -> dict:
     }
 
 
-def analyze_mobile_vs_fix(data: dict) -> dict:
+def _per_call_rates(stats: dict) -> dict:
+    """Kohëzgjatja mesatare, kosto për thirrje dhe % SVYCLM (0 kur s'ka thirrje)."""
+    calls = stats["total_calls"]
+    if calls <= 0:
+        return {"avg_duration_sec": 0, "cost_per_call": 0, "svyclm_rate": 0}
+    return {
+        "avg_duration_sec": round(stats["total_minutes"] * 60 / calls, 1),
+        "cost_per_call": round(stats["cost"] / calls, 4),
+        "svyclm_rate": round(stats["svyclm_count"] / calls * 100, 2),
+    }
+
+
+def analyze_mobile_vs_fix(data: dict, table: Optional[pd.DataFrame] = None) -> dict:
     """
     Analizon shpërndarjen mobile vs fix dhe identifikon mundësitë për kursim.
 
-    Bazuar në prefix analysis, klasifikon thirrjet dhe llogarit costs.
+    Bazuar në prefix analysis (tabela e tipizuar e core/prefix_table.py),
+    klasifikon thirrjet dhe llogarit costs me group-by.
 
     Args:
         data: Vicidial analysis data (from collect_vicidial_data.py)
+        table: build_best_prefix_table(data) i llogaritur më parë (opsionale)
 
     Returns:
         dict: Mobile vs Fix analysis with cost breakdown
     """
-    prefix_analysis = data.get("prefix_status_analysis", [])
+    if table is None:
+        table = build_best_prefix_table(data)
+    svyclm_calls = table["calls"].where(table["is_svyclm"], 0.0)
 
+    mobile_mask = table["phone_type"] == "MOBILE"
     mobile_stats = {
-        "total_calls": 0,
-        "total_minutes": 0,
-        "svyclm_count": 0,
-        "cost": 0
+        "total_calls": _sum(table["calls"][mobile_mask]),
+        "total_minutes": _sum(table["total_minutes"][mobile_mask]),
+        "svyclm_count": _sum(svyclm_calls[mobile_mask]),
+        "cost": _sum(table["total_minutes"][mobile_mask] * MOBILE_COST_PER_MIN)
     }
 
+    fix_mask = table["phone_type"] == "FIX"
     fix_stats = {
-        "total_calls": 0,
-        "total_minutes": 0,
-        "svyclm_count": 0,
-        "cost": 0,
+        "total_calls": _sum(table["calls"][fix_mask]),
+        "total_minutes": _sum(table["total_minutes"][fix_mask]),
+        "svyclm_count": _sum(svyclm_calls[fix_mask]),
+        "cost": _sum(table["total_minutes"][fix_mask] * FIX_COST_PER_MIN),
         "by_province": {}
     }
 
-    for item in prefix_analysis:
-        prefix = item.get("prefix_3", "")
-        calls = item.get("calls", 0)
-        minutes = item.get("total_minutes", 0)
-        status = item.get("status", "")
-
-        phone_type, province, zone = classify_phone_number(prefix + "0000000")
-
-        if phone_type == "MOBILE":
-            mobile_stats["total_calls"] += calls
-            mobile_stats["total_minutes"] += minutes
-            mobile_stats["cost"] += minutes * MOBILE_COST_PER_MIN
-            if status == "SVYCLM":
-                mobile_stats["svyclm_count"] += calls
-
-        elif phone_type == "FIX":
-            fix_stats["total_calls"] += calls
-            fix_stats["total_minutes"] += minutes
-            fix_stats["cost"] += minutes * FIX_COST_PER_MIN
-            if status == "SVYCLM":
-                fix_stats["svyclm_count"] += calls
-
-            # Group by province
-            if province:
-                if province not in fix_stats["by_province"]:
-                    fix_stats["by_province"][province] = {
-                        "calls": 0,
-                        "minutes": 0,
-                        "svyclm": 0,
-                        "zone": zone
-                    }
-                fix_stats["by_province"][province]["calls"] += calls
-                fix_stats["by_province"][province]["minutes"] += minutes
-                if status == "SVYCLM":
-                    fix_stats["by_province"][province]["svyclm"] += calls
+    # Group by province (zona nga rreshti i parë i provincës)
+    by_mask = fix_mask & table["province"].notna() & (table["province"] != "")
+    fix = table[by_mask].assign(svyclm=svyclm_calls[by_mask])
+    if not fix.empty:
+        sums = fix.groupby("province", sort=False, observed=True)[["calls", "total_minutes", "svyclm"]].sum()
+        first = fix.drop_duplicates("province")
+        zones = dict(zip(first["province"].astype(object), first["zone"].astype(object)))
+        for province, row in zip(sums.index.astype(object).tolist(), sums.to_dict("records")):
+            zone = zones[province]
+            fix_stats["by_province"][province] = {
+                "calls": row["calls"],
+                "minutes": row["total_minutes"],
+                "svyclm": row["svyclm"],
+                "zone": None if pd.isna(zone) else zone
+            }
 
     # Calculate rates and savings potential
     total_calls = mobile_stats["total_calls"] + fix_stats["total_calls"]
@@ -383,23 +427,21 @@ def analyze_mobile_vs_fix(data: dict) -> dict:
         "mobile": {
             **mobile_stats,
             "percentage": round(mobile_percentage, 2),
-            "avg_duration_sec": round(mobile_stats["total_minutes"] * 60 / mobile_stats["total_calls"], 1) if mobile_stats["total_calls"] > 0 else 0,
-            "cost_per_call": round(mobile_stats["cost"] / mobile_stats["total_calls"], 4) if mobile_stats["total_calls"] > 0 else 0,
-            "svyclm_rate": round(mobile_stats["svyclm_count"] / mobile_stats["total_calls"] * 100, 2) if mobile_stats["total_calls"] > 0 else 0
+            **_per_call_rates(mobile_stats),
         },
         "fix": {
             **fix_stats,
             "percentage": round(fix_percentage, 2),
-            "avg_duration_sec": round(fix_stats["total_minutes"] * 60 / fix_stats["total_calls"], 1) if fix_stats["total_calls"] > 0 else 0,
-            "cost_per_call": round(fix_stats["cost"] / fix_stats["total_calls"], 4) if fix_stats["total_calls"] > 0 else 0,
-            "svyclm_rate": round(fix_stats["svyclm_count"] / fix_stats["total_calls"] * 100, 2) if fix_stats["total_calls"] > 0 else 0
+            **_per_call_rates(fix_stats),
         },
         "comparison": {
             "mobile_cost_premium": round((MOBILE_COST_PER_MIN / FIX_COST_PER_MIN), 2),
             "cost_diff_per_minute": round(cost_diff_per_minute, 6),
             "potential_savings_if_10pct_shift": round(mobile_stats["total_minutes"] * 0.10 * cost_diff_per_minute, 2)
         },
-        "recommendation": "Prioritize FIX lists for cost efficiency" if mobile_percentage > 50 else "Good mobile/fix balance"
+        "recommendation": (
+            "Prioritize FIX lists for cost efficiency" if mobile_percentage > 50 else "Good mobile/fix balance"
+        ),
     }
 
 
@@ -550,60 +592,64 @@ def rank_lists_by_performance(data: dict) -> List[dict]:
     """
     lists = data.get("active_lists", [])
     list_performance = data.get("list_performance", [])
+    if not lists:
+        return []
+
+    # Join i indeksuar sipas list_id (O(n)); për list_id të dubluar në
+    # list_performance përdoret rreshti i parë
+    keys = pd.to_numeric(pd.Series([lst["list_id"] for lst in lists]), errors="coerce")
+    perf = pd.DataFrame.from_records(
+        list(list_performance), columns=["list_id", "calls", "avg_duration", "total_minutes"]
+    )
+    perf["list_id"] = pd.to_numeric(perf["list_id"], errors="coerce")
+    perf = perf.dropna(subset=["list_id"]).drop_duplicates("list_id", keep="first").set_index("list_id")
+    joined = perf.reindex(keys.to_numpy())
+
+    calls = joined["calls"].fillna(0).to_numpy(dtype="float64")
+    has_avg = joined["avg_duration"].notna().to_numpy()
+    avg_duration = joined["avg_duration"].fillna(0).to_numpy(dtype="float64")
+    total_minutes = joined["total_minutes"].fillna(0).to_numpy(dtype="float64")
+    total_leads = np.array([lst.get("total_leads", 0) for lst in lists], dtype="float64")
+    never_called = np.array([lst.get("never_called", 0) for lst in lists], dtype="float64")
+    names = pd.Series([lst["list_name"] for lst in lists]).str.upper()
+    is_mobile = names.str.contains("MOBILE", regex=False).to_numpy()
+    is_fix = names.str.contains("FIX", regex=False).to_numpy()
+
+    # Calculate metrics
+    available_leads = never_called + (total_leads * 0.3)  # 30% can be recycled
+    with np.errstate(divide="ignore", invalid="ignore"):
+        calls_per_lead = np.where(total_leads > 0, calls / total_leads, 0.0)
+
+        # Calculate cost (mixed - use average)
+        rate = np.select(
+            [is_mobile, is_fix], [MOBILE_COST_PER_MIN, FIX_COST_PER_MIN], (MOBILE_COST_PER_MIN + FIX_COST_PER_MIN) / 2
+        )
+        estimated_cost = total_minutes * rate
+        cost_per_call = np.where(calls > 0, estimated_cost / calls, 0.0)
 
-    # Merge data
-    ranked = []
-    for lst in lists:
-        list_id = lst["list_id"]
-        perf = next((p for p in list_performance if p["list_id"] == list_id), {})
-
-        total_leads = lst.get("total_leads", 0)
-        never_called = lst.get("never_called", 0)
-        calls = perf.get("calls", 0)
-        avg_duration = perf.get("avg_duration", 0)
-        total_minutes = perf.get("total_minutes", 0)
-
-        # Calculate metrics
-        available_leads = never_called + (total_leads * 0.3)  # 30% can be recycled
-        calls_per_lead = (calls / total_leads) if total_leads > 0 else 0
-
-        # Estimate phone type from list name
-        is_mobile_list = "MOBILE" in lst["list_name"].upper()
-        is_fix_list = "FIX" in lst["list_name"].upper()
-
-        # Calculate cost
-        if is_mobile_list:
-            estimated_cost = total_minutes * MOBILE_COST_PER_MIN
-            cost_per_call = (estimated_cost / calls) if calls > 0 else 0
-        elif is_fix_list:
-            estimated_cost = total_minutes * FIX_COST_PER_MIN
-            cost_per_call = (estimated_cost / calls) if calls > 0 else 0
-        else:
-            # Mixed - use average
-            avg_cost_per_min = (MOBILE_COST_PER_MIN + FIX_COST_PER_MIN) / 2
-            estimated_cost = total_minutes * avg_cost_per_min
-            cost_per_call = (estimated_cost / calls) if calls > 0 else 0
-
-        # Quality score (0-10)
-        # Factors: volume, cost efficiency, utilization
-        volume_score = min(10, (available_leads / 50000) * 10) if available_leads > 0 else 0
-        cost_score = 10 if is_fix_list else 5 if is_mobile_list else 7
-        utilization_score = min(10, calls_per_lead * 2)
-
-        quality_score = (volume_score * 0.4 + cost_score * 0.3 + utilization_score * 0.3)
+    # Quality score (0-10)
+    # Factors: volume, cost efficiency, utilization
+    volume_score = np.where(available_leads > 0, np.minimum(10, (available_leads / 50000) * 10), 0.0)
+    cost_score = np.where(is_fix, 10, np.where(is_mobile, 5, 7))
+    utilization_score = np.minimum(10, calls_per_lead * 2)
+    quality_score = (volume_score * 0.4 + cost_score * 0.3 + utilization_score * 0.3)
 
+    ranked = []
+    for i, lst in enumerate(lists):
+        mobile = bool(is_mobile[i])
+        score = float(quality_score[i])
         ranked.append({
-            "list_id": list_id,
+            "list_id": lst["list_id"],
             "list_name": lst["list_name"],
-            "total_leads": int(total_leads),
-            "available_leads": int(available_leads),
-            "calls_7days": int(calls),
-            "avg_duration": round(avg_duration, 1),
-            "total_cost_7days": round(estimated_cost, 2),
-            "cost_per_call": round(cost_per_call, 4),
-            "phone_type": "MOBILE" if is_mobile_list else "FIX" if is_fix_list else "MIXED",
-            "quality_score": round(quality_score, 1),
-            "recommendation": get_list_recommendation(quality_score, available_leads, is_mobile_list)
+            "total_leads": int(total_leads[i]),
+            "available_leads": int(available_leads[i]),
+            "calls_7days": int(calls[i]),
+            "avg_duration": round(float(avg_duration[i]), 1) if has_avg[i] else 0,
+            "total_cost_7days": round(float(estimated_cost[i]), 2),
+            "cost_per_call": round(float(cost_per_call[i]), 4) if calls[i] > 0 else 0,
+            "phone_type": "MOBILE" if mobile else "FIX" if is_fix[i] else "MIXED",
+            "quality_score": round(score, 1),
+            "recommendation": get_list_recommendation(score, float(available_leads[i]), mobile)
         })
 
     # Sort by quality score
@@ -786,6 +832,18 @@ def analyze_lead_recycling_by_status(data: dict) -> dict:
     # Gjenerojmë SQL për CAMPAIGN LEAD RECYCLE
     recycle_configs = []
 
+    def _recycle_values(items):
+        return ', '.join(
+            f"('autobiz', '{item['status']}', '{item['attempt_delay']}', '{item['attempt_maximum']}', "
+            f"'{item['leads_at_limit']}', '{item['active']}', '{item['delete']}')"
+            for item in items
+        )
+
+    recycle_upsert = (
+        "ON DUPLICATE KEY UPDATE attempt_delay = VALUES(attempt_delay), attempt_maximum = VALUES(attempt_maximum), "
+        "leads_at_limit = VALUES(leads_at_limit), active = VALUES(active);"
+    )
+
     # High potential - ricikloj menjëherë
     if high_potential:
         recycle_configs.append({
@@ -796,8 +854,8 @@ def analyze_lead_recycling_by_status(data: dict) -> dict:
 -- HIGH POTENTIAL: Ricikloj menjëherë
 INSERT INTO vicidial_lead_recycle (campaign_id, status, attempt_delay, attempt_maximum, leads_at_limit, active, delete)
 VALUES
-{', '.join([f"('autobiz', '{item['status']}', '{item['attempt_delay']}', '{item['attempt_maximum']}', '{item['leads_at_limit']}', '{item['active']}', '{item['delete']}')" for item in high_potential])}
-ON DUPLICATE KEY UPDATE attempt_delay = VALUES(attempt_delay), attempt_maximum = VALUES(attempt_maximum), leads_at_limit = VALUES(leads_at_limit), active = VALUES(active);
+{_recycle_values(high_potential)}
+{recycle_upsert}
             """
         })
 
@@ -811,20 +869,21 @@ ON DUPLICATE KEY UPDATE attempt_delay = VALUES(attempt_delay), attempt_maximum =
 -- MEDIUM POTENTIAL: Ricikloj me vonesë
 INSERT INTO vicidial_lead_recycle (campaign_id, status, attempt_delay, attempt_maximum, leads_at_limit, active, delete)
 VALUES
-{', '.join([f"('autobiz', '{item['status']}', '{item['attempt_delay']}', '{item['attempt_maximum']}', '{item['leads_at_limit']}', '{item['active']}', '{item['delete']}')" for item in medium_potential])}
-ON DUPLICATE KEY UPDATE attempt_delay = VALUES(attempt_delay), attempt_maximum = VALUES(attempt_maximum), leads_at_limit = VALUES(leads_at_limit), active = VALUES(active);
+{_recycle_values(medium_potential)}
+{recycle_upsert}
             """
         })
 
     # Low potential - mos ricikloj
     if low_potential:
+        low_statuses = ', '.join(f"'{item['status']}'" for item in low_potential)
         recycle_configs.append({
             "priority": "LOW",
             "name": "No Recycling - Low Potential Statuses",
             "statuses": low_potential,
             "sql": f"""
 -- LOW POTENTIAL: Mos ricikloj këto status (ose ricikloj shumë rrallë)
--- DELETE FROM vicidial_lead_recycle WHERE campaign_id = 'autobiz' AND status IN ({', '.join([f"'{item['status']}'" for item in low_potential])});
+-- DELETE FROM vicidial_lead_recycle WHERE campaign_id = 'autobiz' AND status IN ({low_statuses});
             """
         })
 
@@ -838,7 +897,9 @@ ON DUPLICATE KEY UPDATE attempt_delay = VALUES(attempt_delay), attempt_maximum =
         "summary": {
             "total_calls_analyzed": sum(s["count"] for s in status_data),
             "recyclable_percentage": sum(s["percentage"] for s in high_potential + medium_potential),
-            "potential_efficiency_gain": f"+{round(sum(s['percentage'] for s in high_potential) * 0.3, 1)}% more contacts"
+            "potential_efficiency_gain": (
+                f"+{round(sum(s['percentage'] for s in high_potential) * 0.3, 1)}% more contacts"
+            ),
         }
     }
 
@@ -900,7 +961,9 @@ def generate_time_list_filter_script(strategy_type: str, data: dict = None) -> s
     return condition
 
 
-def generate_time_and_place_filter_script(strategy_type: str, province_data: dict = None, hourly_data: dict = None) -> str:
+def generate_time_and_place_filter_script(
+    strategy_type: str, province_data: dict = None, hourly_data: dict = None
+) -> str:
     """
     Gjeneron një kusht (pa WHERE, pa komente) për LEAD FILTER LISTINGS.
     Bazuar në analizën e provincave dhe orëve për maksimizimin e Press 1 rate.
@@ -1079,7 +1142,10 @@ def analyze_list_based_strategy(data: dict) -> dict:
 
     # Fallback orët nëse nuk ka të dhëna
     if not best_hours:
-        best_hours = [(9, {"efficiency_score": 100}), (10, {"efficiency_score": 90}), (14, {"efficiency_score": 80}), (15, {"efficiency_score": 70}), (16, {"efficiency_score": 60})]
+        best_hours = [
+            (9, {"efficiency_score": 100}), (10, {"efficiency_score": 90}), (14, {"efficiency_score": 80}),
+            (15, {"efficiency_score": 70}), (16, {"efficiency_score": 60}),
+        ]
 
     return {
         "list_categories": {
@@ -1184,7 +1250,13 @@ def generate_scenarios(data: dict, analysis: dict) -> dict:
     return scenarios
 
 
-def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
+def generate_vicidial_recommendations(
+    data: dict,
+    analysis: dict,
+    recycling_analysis: Optional[dict] = None,
+    province_analysis: Optional[dict] = None,
+    hourly_analysis: Optional[dict] = None,
+) -> dict:
     """
     Gjeneron 6 strategji kryesore bazuar në:
     1. STATUS-BASED Analysis (3 strategji për CAMPAIGN LEAD RECYCLE LISTINGS - tabela me vlera)
@@ -1195,6 +1267,8 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
     Args:
         data: Raw Vicidial data
         analysis: Analyzed data
+        recycling_analysis, province_analysis, hourly_analysis: Rezultatet e
+            llogaritura më parë (nga grafi i analizës); None = llogariten këtu
 
     Returns:
         dict: 6 strategji me tabela/rekomandime dhe skenare
@@ -1210,11 +1284,14 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
     mobile_list_ids = [str(int(l["list_id"])) for l in top_mobile_lists]
 
     # Analizë e lead recycling
-    recycling_analysis = analyze_lead_recycling_by_status(data)
+    if recycling_analysis is None:
+        recycling_analysis = analyze_lead_recycling_by_status(data)
 
     # Analizë e provincave dhe orëve
-    province_analysis = analyze_province_performance(data)
-    hourly_analysis = analyze_hourly_performance_by_province(data)
+    if province_analysis is None:
+        province_analysis = analyze_province_performance(data)
+    if hourly_analysis is None:
+        hourly_analysis = analyze_hourly_performance_by_province(data)
 
     # Gjenerojmë skenare
     scenarios = generate_scenarios(data, analysis)
@@ -1224,19 +1301,28 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "A",
                 "name": "STATUS-BASED Konservative",
-                "goal": "Optimizim i sigurt bazuar në performancën e statuseve. Fokusohet në riciklimin e leads sipas status që japin rezultat me risk të ulët.",
+                "goal": (
+                    "Optimizim i sigurt bazuar në performancën e statuseve. Fokusohet në riciklimin e leads sipas "
+                    "status që japin rezultat me risk të ulët."
+                ),
                 "recycle_table": [
                     {
                         "STATUS": "PU",
                         "ATTEMPT DELAY": "2",
                         "ATTEMPT MAXIMUM": "2",
-                        "Arsyeja": "Klienti u përgjigj por nuk foli - mund të jetë i zënë. Riprovo pas 2 orësh, maksimum 2 tentativa."
+                        "Arsyeja": (
+                            "Klienti u përgjigj por nuk foli - mund të jetë i zënë. Riprovo pas 2 orësh, maksimum 2 "
+                            "tentativa."
+                        )
                     },
                     {
                         "STATUS": "BUSY",
                         "ATTEMPT DELAY": "1",
                         "ATTEMPT MAXIMUM": "2",
-                        "Arsyeja": "Line busy - klienti është aktiv. Riprovo pas 1 ore, maksimum 2 tentativa për të ruajtur budget."
+                        "Arsyeja": (
+                            "Line busy - klienti është aktiv. Riprovo pas 1 ore, maksimum 2 tentativa për të ruajtur "
+                            "budget."
+                        )
                     },
                     {
                         "STATUS": "NOINT",
@@ -1248,7 +1334,10 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
                         "STATUS": "NA",
                         "ATTEMPT DELAY": "6",
                         "ATTEMPT MAXIMUM": "1",
-                        "Arsyeja": "Nuk përgjigjet - mund të jetë i zënë. Riprovo pas 6 orësh, vetëm 1 tentativë tjetër për të kursyer budget."
+                        "Arsyeja": (
+                            "Nuk përgjigjet - mund të jetë i zënë. Riprovo pas 6 orësh, vetëm 1 tentativë tjetër për "
+                            "të kursyer budget."
+                        )
                     },
                     {
                         "STATUS": "DISCONN",
@@ -1279,19 +1368,28 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "B",
                 "name": "STATUS-BASED Balanced",
-                "goal": "Optimizim i balancuar bazuar në performancën e statuseve. Fokusohet në riciklimin e leads sipas status që japin rezultat me risk të mesëm.",
+                "goal": (
+                    "Optimizim i balancuar bazuar në performancën e statuseve. Fokusohet në riciklimin e leads sipas "
+                    "status që japin rezultat me risk të mesëm."
+                ),
                 "recycle_table": [
                     {
                         "STATUS": "PU",
                         "ATTEMPT DELAY": "2",
                         "ATTEMPT MAXIMUM": "3",
-                        "Arsyeja": "Klienti u përgjigj por nuk foli - mund të jetë i zënë. Riprovo pas 2 orësh, 3 tentativa për të maksimizuar shanset."
+                        "Arsyeja": (
+                            "Klienti u përgjigj por nuk foli - mund të jetë i zënë. Riprovo pas 2 orësh, 3 tentativa "
+                            "për të maksimizuar shanset."
+                        )
                     },
                     {
                         "STATUS": "BUSY",
                         "ATTEMPT DELAY": "1",
                         "ATTEMPT MAXIMUM": "4",
-                        "Arsyeja": "Line busy - klienti është aktiv. Riprovo pas 1 ore, 4 tentativa sepse ka probabilitet të lartë përgjigje."
+                        "Arsyeja": (
+                            "Line busy - klienti është aktiv. Riprovo pas 1 ore, 4 tentativa sepse ka probabilitet të "
+                            "lartë përgjigje."
+                        )
                     },
                     {
                         "STATUS": "NOINT",
@@ -1303,7 +1401,10 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
                         "STATUS": "NA",
                         "ATTEMPT DELAY": "6",
                         "ATTEMPT MAXIMUM": "2",
-                        "Arsyeja": "Nuk përgjigjet - mund të jetë i zënë. Riprovo pas 6 orësh, 2 tentativa për të kapur momentin e duhur."
+                        "Arsyeja": (
+                            "Nuk përgjigjet - mund të jetë i zënë. Riprovo pas 6 orësh, 2 tentativa për të kapur "
+                            "momentin e duhur."
+                        )
                     },
                     {
                         "STATUS": "DISCONN",
@@ -1334,19 +1435,28 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "C",
                 "name": "STATUS-BASED Agresive",
-                "goal": "Optimizim maksimal bazuar në performancën e statuseve. Fokusohet në riciklimin maksimal të leads sipas status që japin rezultat me risk të lartë.",
+                "goal": (
+                    "Optimizim maksimal bazuar në performancën e statuseve. Fokusohet në riciklimin maksimal të leads "
+                    "sipas status që japin rezultat me risk të lartë."
+                ),
                 "recycle_table": [
                     {
                         "STATUS": "PU",
                         "ATTEMPT DELAY": "2",
                         "ATTEMPT MAXIMUM": "5",
-                        "Arsyeja": "Klienti u përgjigj por nuk foli - mund të jetë i zënë. Riprovo pas 2 orësh, 5 tentativa për të shfrytëzuar maksimalisht çdo lead."
+                        "Arsyeja": (
+                            "Klienti u përgjigj por nuk foli - mund të jetë i zënë. Riprovo pas 2 orësh, 5 tentativa "
+                            "për të shfrytëzuar maksimalisht çdo lead."
+                        )
                     },
                     {
                         "STATUS": "BUSY",
                         "ATTEMPT DELAY": "1",
                         "ATTEMPT MAXIMUM": "6",
-                        "Arsyeja": "Line busy - klienti është aktiv. Riprovo pas 1 ore, 6 tentativa sepse line busy është shenjë e numrit aktiv."
+                        "Arsyeja": (
+                            "Line busy - klienti është aktiv. Riprovo pas 1 ore, 6 tentativa sepse line busy është "
+                            "shenjë e numrit aktiv."
+                        )
                     },
                     {
                         "STATUS": "NOINT",
@@ -1358,13 +1468,19 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
                         "STATUS": "NA",
                         "ATTEMPT DELAY": "6",
                         "ATTEMPT MAXIMUM": "3",
-                        "Arsyeja": "Nuk përgjigjet - mund të jetë i zënë. Riprovo pas 6 orësh, 3 tentativa për të testuar orare të ndryshme."
+                        "Arsyeja": (
+                            "Nuk përgjigjet - mund të jetë i zënë. Riprovo pas 6 orësh, 3 tentativa për të testuar "
+                            "orare të ndryshme."
+                        )
                     },
                     {
                         "STATUS": "DISCONN",
                         "ATTEMPT DELAY": "24",
                         "ATTEMPT MAXIMUM": "2",
-                        "Arsyeja": "Numri i shkëputur - riprovo pas 24 orësh, 2 tentativa për të kapur riaktivizime të mundshme."
+                        "Arsyeja": (
+                            "Numri i shkëputur - riprovo pas 24 orësh, 2 tentativa për të kapur riaktivizime të "
+                            "mundshme."
+                        )
                     },
                     {
                         "STATUS": "SALE",
@@ -1389,7 +1505,10 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "G",
                 "name": "TIME AND LIST BASED Konservative",
-                "goal": "Optimizim i sigurt bazuar në performancën e listave dhe orëve. Fokusohet në listat më të mira dhe orët optimale për numrat fiks/celularë me risk të ulët.",
+                "goal": (
+                    "Optimizim i sigurt bazuar në performancën e listave dhe orëve. Fokusohet në listat më të mira dhe "
+                    "orët optimale për numrat fiks/celularë me risk të ulët."
+                ),
                 "sql_script": generate_time_list_filter_script(
                     "conservative",
                     data
@@ -1404,7 +1523,10 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "H",
                 "name": "TIME AND LIST BASED Balanced",
-                "goal": "Optimizim i balancuar bazuar në performancën e listave dhe orëve. Fokusohet në listat më të mira dhe orët optimale për numrat fiks/celularë me risk të mesëm.",
+                "goal": (
+                    "Optimizim i balancuar bazuar në performancën e listave dhe orëve. Fokusohet në listat më të mira "
+                    "dhe orët optimale për numrat fiks/celularë me risk të mesëm."
+                ),
                 "sql_script": generate_time_list_filter_script(
                     "balanced",
                     data
@@ -1419,7 +1541,10 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "I",
                 "name": "TIME AND LIST BASED Agresive",
-                "goal": "Optimizim maksimal bazuar në performancën e listave dhe orëve. Fokusohet në listat më të mira dhe orët optimale për numrat fiks/celularë me risk të lartë.",
+                "goal": (
+                    "Optimizim maksimal bazuar në performancën e listave dhe orëve. Fokusohet në listat më të mira dhe "
+                    "orët optimale për numrat fiks/celularë me risk të lartë."
+                ),
                 "sql_script": generate_time_list_filter_script(
                     "aggressive",
                     data
@@ -1434,7 +1559,10 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "D",
                 "name": "TIME AND PLACE BASED Konservative",
-                "goal": "Optimizim i sigurt bazuar në performancën e provincave dhe orëve. Fokusohet në 15 provincat më të mira dhe orët më efektive me risk të ulët.",
+                "goal": (
+                    "Optimizim i sigurt bazuar në performancën e provincave dhe orëve. Fokusohet në 15 provincat më të "
+                    "mira dhe orët më efektive me risk të ulët."
+                ),
                 "sql_script": generate_time_and_place_filter_script(
                     "conservative",
                     province_analysis,
@@ -1450,7 +1578,10 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "E",
                 "name": "TIME AND PLACE BASED Balanced",
-                "goal": "Optimizim i balancuar bazuar në performancën e provincave dhe orëve. Fokusohet në 20 provincat më të mira dhe orët më efektive me risk të mesëm.",
+                "goal": (
+                    "Optimizim i balancuar bazuar në performancën e provincave dhe orëve. Fokusohet në 20 provincat më "
+                    "të mira dhe orët më efektive me risk të mesëm."
+                ),
                 "sql_script": generate_time_and_place_filter_script(
                     "balanced",
                     province_analysis,
@@ -1466,7 +1597,10 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
             {
                 "strategy": "F",
                 "name": "TIME AND PLACE BASED Agresive",
-                "goal": "Optimizim maksimal bazuar në performancën e provincave dhe orëve. Fokusohet në 30 provincat më të mira dhe orët më efektive me risk të lartë.",
+                "goal": (
+                    "Optimizim maksimal bazuar në performancën e provincave dhe orëve. Fokusohet në 30 provincat më të "
+                    "mira dhe orët më efektive me risk të lartë."
+                ),
                 "sql_script": generate_time_and_place_filter_script(
                     "aggressive",
                     province_analysis,
@@ -1486,60 +1620,110 @@ def generate_vicidial_recommendations(data: dict, analysis: dict) -> dict:
     return strategies
 
 
+# ================== Analysis DAG ==================
+# Çdo nyje deklaron seksionet që lexon; memo-ja çelësohet me hash-in e tyre
+ANALYSIS_NODES: List[AnalysisNode] = [
+    # Tabela e tipizuar e prefikseve ndahet nga mobile_vs_fix dhe province_analysis
+    # (prefix_hour_status me rezolucion të plotë; prefix_status_analysis për JSON të vjetër)
+    AnalysisNode(
+        "prefix_table", build_best_prefix_table, reads=("prefix_hour_status", "prefix_status_analysis"),
+    ),
+    AnalysisNode(
+        "mobile_vs_fix", lambda data, prefix_table: analyze_mobile_vs_fix(data, prefix_table),
+        deps=("prefix_table",),
+    ),
+    AnalysisNode(
+        "province_analysis", lambda data, prefix_table: analyze_province_performance(data, prefix_table),
+        deps=("prefix_table",),
+    ),
+    AnalysisNode("hourly_analysis", analyze_hourly_performance_by_province, reads=("hourly_performance",)),
+    # Parametrat empirikë të simulimit Monte Carlo (core/scenario_simulator.py)
+    AnalysisNode(
+        "simulation_inputs", lambda data, prefix_table: build_simulation_inputs(data, prefix_table),
+        reads=(
+            "hourly_performance", "status_distribution", "daily_performance", "closer_log",
+            "campaign_config", "analysis_period_days", "collection_date",
+        ),
+        deps=("prefix_table",),
+    ),
+    AnalysisNode(
+        "scenario_simulation", lambda data, simulation_inputs: simulate_default_scenarios(simulation_inputs),
+        deps=("simulation_inputs",),
+    ),
+    AnalysisNode("press1_funnel", analyze_press1_conversion, reads=("status_distribution",)),
+    AnalysisNode(
+        "volume_requirements",
+        lambda data: calculate_list_requirements_for_dial_level(
+            dial_level=700, working_hours=8, avg_call_duration_sec=30
+        ),
+    ),
+    AnalysisNode("ranked_lists", rank_lists_by_performance, reads=("active_lists", "list_performance")),
+    AnalysisNode("lead_recycling_analysis", analyze_lead_recycling_by_status, reads=("status_distribution",)),
+    AnalysisNode(
+        "vicidial_recommendations",
+        lambda data, ranked_lists, lead_recycling_analysis, province_analysis, hourly_analysis: (
+            generate_vicidial_recommendations(
+                data, ranked_lists,
+                recycling_analysis=lead_recycling_analysis,
+                province_analysis=province_analysis,
+                hourly_analysis=hourly_analysis,
+            )
+        ),
+        reads=("campaign_config", "active_lists"),
+        deps=("ranked_lists", "lead_recycling_analysis", "province_analysis", "hourly_analysis"),
+    ),
+]
+
+_ANALYSIS_GRAPH = AnalysisGraph(ANALYSIS_NODES)
+
+
+def run_analysis(data: dict, targets: Optional[List[str]] = None) -> GraphRun:
+    """Ekzekuton grafin e analizës mbi `data` (dict ose Snapshot).
+
+    Nyjet me seksione të pandryshuara merren nga memo (në proces, mes
+    rerun-eve të Streamlit). GraphRun.recomputed / .reused tregojnë çfarë u
+    rillogarit.
+
+    Args:
+        data: Të dhënat e load_vicidial_data()
+        targets: Vetëm këto nyje (+ varësitë e tyre); None = të gjitha
+    """
+    return _ANALYSIS_GRAPH.run(data, targets)
+
+
 def generate_report(data_file: str = "vicidial_analysis_data.json") -> dict:
     """
     Gjeneron raportin e plotë me analiza dhe rekomandime.
 
+    Analizat ekzekutohen përmes grafit (run_analysis): në thirrjet e
+    njëpasnjëshme rillogariten vetëm ato, seksionet e të cilave kanë ndryshuar.
+
     Args:
         data_file: Path to collected data
 
     Returns:
         dict: Complete analysis report
     """
-    # Load data
-    data = load_vicidial_data(data_file)
-
-    # Analyze mobile vs fix
-    mobile_fix_analysis = analyze_mobile_vs_fix(data)
-
-    # Analyze province performance
-    province_analysis = analyze_province_performance(data)
-
-    # Analyze hourly performance by province
-    hourly_analysis = analyze_hourly_performance_by_province(data)
-
-    # Analyze press1 conversion
-    press1_analysis = analyze_press1_conversion(data)
-
-    # Calculate requirements
-    volume_requirements = calculate_list_requirements_for_dial_level(
-        dial_level=700,
-        working_hours=8,
-        avg_call_duration_sec=30
-    )
-
-    # Rank lists
-    ranked_lists = rank_lists_by_performance(data)
-
-    # Generate recommendations
-    recommendations = generate_vicidial_recommendations(data, ranked_lists)
-
-    # Analyze lead recycling
-    recycling_analysis = analyze_lead_recycling_by_status(data)
+    # Load data (vetëm vlerat skalare mbahen pasi snapshot-i mbyllet)
+    with open_vicidial_data(data_file) as data:
+        run = run_analysis(data)
+        meta = {k: data.get(k) for k in ("campaign_id", "analysis_period_days")}
+    results = run.results
 
     # Compile full report
     report = {
         "generated_at": datetime.now().isoformat(),
-        "campaign_id": data.get("campaign_id"),
-        "analysis_period": f"Last {data.get('analysis_period_days')} days",
-        "mobile_vs_fix": mobile_fix_analysis,
-        "province_analysis": province_analysis,
-        "hourly_analysis": hourly_analysis,
-        "press1_funnel": press1_analysis,
-        "volume_requirements": volume_requirements,
-        "ranked_lists": ranked_lists,
-        "lead_recycling_analysis": recycling_analysis,
-        "vicidial_recommendations": recommendations,
+        "campaign_id": meta["campaign_id"],
+        "analysis_period": f"Last {meta['analysis_period_days']} days",
+        "mobile_vs_fix": results["mobile_vs_fix"],
+        "province_analysis": results["province_analysis"],
+        "hourly_analysis": results["hourly_analysis"],
+        "press1_funnel": results["press1_funnel"],
+        "volume_requirements": results["volume_requirements"],
+        "scenario_simulation": results["scenario_simulation"],
+        "ranked_lists": results["ranked_lists"],
+        "lead_recycling_analysis": results["lead_recycling_analysis"],
+        "vicidial_recommendations": results["vicidial_recommendations"],
         "action_plan": {
             "immediate_actions": [
                 {
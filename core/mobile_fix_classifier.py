@@ -15,10 +15,14 @@ Author: Protrade AI
 Last Updated: 2025-10-14
 """
 
-from typing import Tuple, Optional, Dict, List
+from typing import Any, Iterable, Tuple, Optional, Dict, List
 import json
 from pathlib import Path
 
+import numpy as np
+
+from core.phone_numbers import normalize_it_number
+
 # VoIP Costs (€/minute)
 MOBILE_COST_PER_MIN = 0.0105
 FIX_COST_PER_MIN = 0.0032
@@ -106,15 +110,8 @@ def classify_phone_number(phone: str, lead_province: str = None) -> Tuple[str, O
         >>> classify_phone_number("1234567890")
         ("UNKNOWN", "UNKNOWN", None)  # Numër i panjohur
     """
-    phone = phone.strip()
-
-    # Heq kodin e vendit pa hequr 0-në e prefiksit fiks
-    if phone.startswith("+"):
-        phone = phone[1:]
-    if phone.startswith("0039"):
-        phone = phone[4:]
-    elif phone.startswith("39") and len(phone) > 2:
-        phone = phone[2:]
+    # Numri kombëtar (core/phone_numbers.py): pa ndarës dhe pa kodin e vendit
+    phone = normalize_it_number(phone)
 
     if not phone:
         return ("UNKNOWN", "UNKNOWN", None)
@@ -150,6 +147,220 @@ def classify_phone_number(phone: str, lead_province: str = None) -> Tuple[str, O
     return ("UNKNOWN", "UNKNOWN", None)
 
 
+# ==================== BATCH (VEKTORIZUAR) ====================
+# Numrat më të gjatë se kaq, ose me karaktere jo-shifra (hapësira, shkronja,
+# unicode), klasifikohen me classify_phone_number() rresht për rresht.
+_MAX_FAST_LEN = 24
+
+_FIX_TABLES: Dict[str, Any] = {"src": None, "tables": None, "provinces": None, "zones": None}
+_MOBILE_TABLE = np.zeros(1000, dtype=bool)
+for _p in ITALIAN_MOBILE_PREFIXES:
+    _MOBILE_TABLE[int(_p)] = True
+
+
+def _fix_prefix_tables():
+    """Tabelat e lookup-it për prefikset fiks, një për çdo gjatësi (1-4 shifra).
+
+    tables[m][kod] = indeksi në provinces/zones, ose -1. tables["best4"][kod]
+    është rezultati i provës 4 → 3 → 2 shifra për numrat me të paktën 4 shifra,
+    kështu që ata zgjidhen me një lookup të vetëm. Rindërtohen kur
+    ITALIAN_FIX_PREFIXES zëvendësohet (p.sh. load_italian_prefix_data()).
+    """
+    src = ITALIAN_FIX_PREFIXES
+    if _FIX_TABLES["src"] is not src:
+        tables = {m: np.full(10 ** m, -1, dtype=np.int32) for m in range(1, 5)}
+        provinces: List[Optional[str]] = []
+        zones: List[Optional[str]] = []
+        for key, info in src.items():
+            if 1 <= len(key) <= 4 and key.isascii() and key.isdigit():
+                tables[len(key)][int(key)] = len(provinces)
+                provinces.append(info.get("province"))
+                zones.append(info.get("zone"))
+        code4 = np.arange(10 ** 4)
+        best4 = tables[4].copy()
+        for m in (3, 2):
+            shorter = tables[m][code4 // 10 ** (4 - m)]
+            best4 = np.where(best4 >= 0, best4, shorter)
+        tables["best4"] = best4
+        _FIX_TABLES.update(
+            src=src,
+            tables=tables,
+            provinces=np.array(provinces + [None], dtype=object),
+            zones=np.array(zones + [None], dtype=object),
+        )
+    return _FIX_TABLES["tables"], _FIX_TABLES["provinces"], _FIX_TABLES["zones"]
+
+
+def _mobile_province_label(lead_province: Optional[str]) -> str:
+    """Provinca për numrat mobile, njësoj si te classify_phone_number()."""
+    if lead_province and lead_province.strip():
+        p = lead_province.strip().upper()
+        return p if p in VALID_PROVINCES else "UNKNOWN MOBILE"
+    return "UNKNOWN MOBILE"
+
+
+class _LabelCodes(dict):
+    """{vlera → indeks në `labels`}; etiketat e reja shtohen në fund të listës."""
+
+    def __init__(self, labels: List[Any], make_label):
+        super().__init__()
+        self.labels = labels
+        self._make_label = make_label
+        self._index = {lbl: i for i, lbl in enumerate(labels)}
+
+    def __missing__(self, value: Any) -> int:
+        label = self._make_label(value)
+        code = self._index.get(label)
+        if code is None:
+            code = self._index[label] = len(self.labels)
+            self.labels.append(label)
+        self[value] = code
+        return code
+
+
+_TYPE_LABELS = np.array(["UNKNOWN", "FIX", "MOBILE"], dtype=object)
+_T_UNKNOWN, _T_FIX, _T_MOBILE = 0, 1, 2
+
+
+def classify_phone_numbers(
+    phones: Iterable[str],
+    provinces: Optional[Iterable[Optional[str]]] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Klasifikon një kolonë të tërë numrash njëherësh (version batch i classify_phone_number).
+
+    Numrat normalizohen dhe klasifikohen me operacione NumPy mbi matricën e
+    karaktereve (heqja e +/0039/39, prefikset 4/3/2 shifra me tabela lookup,
+    prefikset mobile 3XX). Rreshtat që nuk janë vetëm shifra (hapësira,
+    shkronja, unicode) ose janë shumë të gjatë kalojnë te funksioni scalar,
+    kështu rezultati është identik me classify_phone_number() për çdo string.
+
+    Args:
+        phones: Numrat (list, np.ndarray ose pandas.Series)
+        provinces: Provinca nga Vicidial për çdo numër (opsionale, e njëjta gjatësi)
+
+    Returns:
+        (types, provinces, zones): tre np.ndarray me dtype=object, me të njëjtat
+        vlera si classify_phone_number(phone, province)[0/1/2].
+        Vlerat që nuk janë string (p.sh. None) kthehen ("UNKNOWN", "UNKNOWN", None).
+
+    Example:
+        >>> t, p, z = classify_phone_numbers(["0612345678", "3331234567"], [None, "MI"])
+        >>> list(zip(t, p, z))
+        [("FIX", "RM", "Roma"), ("MOBILE", "MI", None)]
+    """
+    phone_list = phones.tolist() if hasattr(phones, "tolist") else list(phones)
+    n = len(phone_list)
+    if provinces is None:
+        prov_list: Optional[List[Any]] = None
+    else:
+        prov_list = provinces.tolist() if hasattr(provinces, "tolist") else list(provinces)
+        if len(prov_list) != n:
+            raise ValueError("phones dhe provinces duhet të kenë të njëjtën gjatësi")
+    if n == 0:
+        empty = np.empty(0, dtype=object)
+        return empty, empty.copy(), empty.copy()
+
+    # 0 = rrugë e shpejtë, 1 = scalar (string i gjatë), 2 = jo-string
+    if set(map(type, phone_list)) <= {str}:
+        src = phone_list
+        lengths = np.fromiter(map(len, src), dtype=np.int64, count=n)
+        kinds = (lengths > _MAX_FAST_LEN).astype(np.int8)
+        if kinds.any():
+            src = [p if k == 0 else "" for p, k in zip(phone_list, kinds)]
+            lengths[kinds != 0] = 0
+    else:
+        kinds = np.fromiter(
+            (0 if (type(p) is str and len(p) <= _MAX_FAST_LEN) else (1 if isinstance(p, str) else 2)
+             for p in phone_list),
+            dtype=np.int8, count=n,
+        )
+        src = [p if k == 0 else "" for p, k in zip(phone_list, kinds)]
+        lengths = np.fromiter(map(len, src), dtype=np.int64, count=n)
+
+    # Kodet e rezultatit; etiketat vendosen në fund me një indeksim të vetëm
+    tables, fix_provs, fix_zones = _fix_prefix_tables()
+    prov_labels: List[Any] = ["UNKNOWN", "UNKNOWN FIX", "UNKNOWN MOBILE"]
+    type_code = np.zeros(n, dtype=np.int8)
+    prov_code = np.zeros(n, dtype=np.int64)  # >= 0: prov_labels, < 0: fix_provs[-1 - kod]
+    zone_idx = np.full(n, len(fix_zones) - 1, dtype=np.int64)  # fundi = None
+
+    u = np.asarray(src, dtype=np.str_)
+    width = u.dtype.itemsize // 4
+    fast = kinds == 0
+    if width > 0:
+        mat = u.view(np.uint32).reshape(n, width)
+        # Vetëm shifra ASCII, me "+" të lejuar në fillim. (c - 48) <= 9 në uint32
+        # përjashton edhe NUL-in: një NUL brenda stringut e prish numërimin → scalar
+        plus = mat[:, 0] == 43
+        ndig = np.count_nonzero((mat - np.uint32(48)) <= 9, axis=1)
+        fast &= ndig + plus == lengths
+
+        # Mjaftojnë 9 karakteret e para: "+0039" + 4 shifra prefiksi
+        head = np.zeros((n, 9), dtype=np.uint8)
+        head[:, :min(width, 9)] = np.minimum(mat[:, :9], 255)
+        # windows[i, k] = head[i, k:k + 4]; zhvendosja maksimale është 5 ("+0039")
+        windows = np.lib.stride_tricks.sliding_window_view(head, 4, axis=1)
+        rows = np.arange(n)
+
+        off = plus.astype(np.int64)
+        c = windows[rows, off]
+        has0039 = (c[:, 0] == 48) & (c[:, 1] == 48) & (c[:, 2] == 51) & (c[:, 3] == 57)
+        # "39" pa "+": vetëm para një numri fiks ose kur ka > 10 shifra (normalize_it_number)
+        has39 = ~has0039 & (c[:, 0] == 51) & (c[:, 1] == 57) & (lengths - off > 2) & (
+            (off == 1) | (c[:, 2] == 48) | (lengths - off > 10)
+        )
+        off += 4 * has0039 + 2 * has39
+        rest = lengths - off
+
+        d = windows[rows, off].astype(np.int32) - 48
+        codes = {1: d[:, 0]}
+        for m in range(2, 5):
+            codes[m] = codes[m - 1] * 10 + d[:, m - 1]
+
+        # ---- FIX: 0X/0XX/0XXX, provat 4 → 3 → 2 si te funksioni scalar ----
+        is_fix = fast & (rest > 0) & (d[:, 0] == 0)
+        idx = np.full(n, -1, dtype=np.int64)
+        long_fix = is_fix & (rest >= 4)
+        idx[long_fix] = tables["best4"][codes[4][long_fix]]
+        short_fix = np.flatnonzero(is_fix & (rest < 4))
+        if len(short_fix):
+            # 1-3 shifra: prefix[:4] (dhe prefix[:3] për 1-2 shifra) është i gjithë numri
+            for m in (3, 2, 1):
+                sel = short_fix[(idx[short_fix] < 0) & (rest[short_fix] >= m)]
+                if m == 1:
+                    sel = sel[rest[sel] == 1]
+                idx[sel] = tables[m][codes[m][sel]]
+        fix_hit = is_fix & (idx >= 0)
+        type_code[is_fix] = _T_FIX
+        prov_code[is_fix] = 1
+        prov_code[fix_hit] = -1 - idx[fix_hit]  # negativ = indeks në fix_provs
+        zone_idx[fix_hit] = idx[fix_hit]
+
+        # ---- MOBILE: 3XX me 10 shifra dhe prefiks i njohur ----
+        is_mobile = fast & (rest == 10) & (d[:, 0] == 3)
+        is_mobile[is_mobile] = _MOBILE_TABLE[codes[3][is_mobile]]
+        mobile_rows = np.flatnonzero(is_mobile)
+        type_code[mobile_rows] = _T_MOBILE
+        if prov_list is None or len(mobile_rows) == 0:
+            prov_code[mobile_rows] = 2
+        else:
+            lookup = _LabelCodes(prov_labels, _mobile_province_label)
+            sub = np.asarray(prov_list, dtype=object)[mobile_rows].tolist()
+            prov_code[mobile_rows] = np.fromiter(map(lookup.__getitem__, sub), dtype=np.int64, count=len(sub))
+
+    out_type = _TYPE_LABELS[type_code]
+    label_arr = np.array(prov_labels, dtype=object)
+    out_prov = np.where(prov_code >= 0, label_arr[np.maximum(prov_code, 0)], fix_provs[np.maximum(-1 - prov_code, 0)])
+    out_zone = fix_zones[zone_idx]
+
+    # ---- Rreshtat e tjerë: funksioni scalar ----
+    for i in np.flatnonzero(~fast & (kinds != 2)):
+        t, pr, z = classify_phone_number(phone_list[i], None if prov_list is None else prov_list[i])
+        out_type[i], out_prov[i], out_zone[i] = t, pr, z
+    return out_type, out_prov, out_zone
+
+
 def calculate_voip_cost(
     phone_type: str,
     duration_seconds: int
@@ -0,0 +1,195 @@
+"""
+core/phone_aggregates.py
+
+PURPOSE:
+    Agregim inkremental i rreshtave per-phone për Smart Report
+    (pages/3_Rezultatet_e_Listave.py).
+
+    Faqja ndërtonte phone_stats dhe 02_Prefix_Province nga listat e plota të
+    fetch_dials_by_phone / fetch_inbound_by_phone. Akumuluesit këtu marrin
+    rreshtat në batch-e (p.sh. nga db_vicidial.iter_dials_by_phone_split), kështu
+    që me streaming memoria kufizohet nga madhësia e batch-it dhe jo nga numri
+    i rreshtave. Rezultati është i njëjtë me logjikën e mëparshme të faqes.
+
+KEY FEATURES:
+    - InboundPhoneMaps: inbound per telefon (shuma për phone_stats, vlera e fundit
+      për 02_Prefix_Province, si në kodin origjinal)
+    - FixProvinceAccumulator: phone_stats → prefix_analysis për analysis JSON
+    - ProvinceCostAccumulator: rreshtat e 02_Prefix_Province të grupuar sipas provincës
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.phone_numbers import lookup_phone
+
+Row = Dict[str, Any]
+Classifier = Callable[[str, Optional[str]], Tuple[str, Optional[str], Optional[str]]]
+
+
+def classify_phone_cached(phone: Any, province: Optional[str] = None) -> Tuple[str, Optional[str], Optional[str]]:
+    """classify_phone_number() përmes memo-s së core.phone_numbers.lookup_phone."""
+    info = lookup_phone(phone, province)
+    return info.type, info.province, info.zone
+
+
+class InboundPhoneMaps:
+    """Inbound per telefon, i ndërtuar nga batch-e të fetch/iter_inbound_by_phone."""
+
+    def __init__(self):
+        self.sum_by_phone: Dict[Any, int] = {}   # çelësi: phone_number siç vjen nga DB
+        self.last_by_phone: Dict[str, int] = {}  # çelësi: str(phone_number), vlera e fundit
+
+    def add_rows(self, rows: Iterable[Row]) -> None:
+        for row in rows:
+            phone = row.get("phone_number", "")
+            inbound_calls = row.get("inbound_calls", 0)
+            self.sum_by_phone[phone] = self.sum_by_phone.get(phone, 0) + inbound_calls
+            self.last_by_phone[str(row.get("phone_number"))] = int(row.get("inbound_calls") or 0)
+
+
+class FixProvinceAccumulator:
+    """phone_stats → prefix_analysis (vetëm numrat FIX me provincë).
+
+    Çdo telefon klasifikohet në rreshtin e parë ku shfaqet; thirrjet dhe
+    sekondat e rreshtave të tjerë të tij i shtohen të njëjtës provincë.
+
+    Args:
+        inbound_by_phone: InboundPhoneMaps.sum_by_phone
+        sorted_by_phone: True kur rreshtat vijnë të renditur sipas phone_number
+            (streaming): mbahet në memorie vetëm telefoni aktual.
+    """
+
+    def __init__(
+        self,
+        inbound_by_phone: Dict[Any, int],
+        sorted_by_phone: bool = False,
+        classify: Classifier = classify_phone_cached,
+    ):
+        self._inbound = inbound_by_phone
+        self._sorted = sorted_by_phone
+        self._classify = classify
+        self._phones: Dict[Any, List[Any]] = {}
+        self._current: Optional[List[Any]] = None
+        self._provinces: Dict[str, Dict[str, Any]] = {}
+
+    def add_rows(self, rows: Iterable[Row]) -> None:
+        for row in rows:
+            phone = row.get("phone_number", "")
+            if not phone:
+                continue
+            calls = row.get("dials", 0)
+            total_sec = row.get("total_sec", 0)
+            if self._sorted:
+                if self._current is None or self._current[0] != phone:
+                    self._flush(self._current)
+                    self._current = self._new_phone(phone, row.get("province", ""))
+                stats = self._current
+            else:
+                stats = self._phones.get(phone)
+                if stats is None:
+                    stats = self._phones[phone] = self._new_phone(phone, row.get("province", ""))
+            stats[3] += calls
+            stats[4] += total_sec
+
+    def _new_phone(self, phone: Any, province: Any) -> List[Any]:
+        phone_type, province_code, _zone = self._classify(phone, province)
+        return [phone, phone_type, province_code, 0, 0]
+
+    def _flush(self, stats: Optional[List[Any]]) -> None:
+        if stats is None:
+            return
+        phone, phone_type, province, calls, total_sec = stats
+        if phone_type != "FIX" or not province:
+            return
+        p = self._provinces.setdefault(province, {"calls": 0, "total_minutes": 0, "inbound_calls": 0})
+        p["calls"] += calls
+        p["total_minutes"] += total_sec / 60
+        p["inbound_calls"] += self._inbound.get(phone, 0)
+
+    def finish(self) -> List[Row]:
+        """Kthen listën prefix_analysis (një rresht për provincë)."""
+        if self._sorted:
+            self._flush(self._current)
+            self._current = None
+        else:
+            for stats in self._phones.values():
+                self._flush(stats)
+            self._phones = {}
+        return [
+            {
+                "prefix_2": "",
+                "prefix_3": "",
+                "prefix_4": "",
+                "calls": p["calls"],
+                "avg_duration": p["total_minutes"] / p["calls"] if p["calls"] > 0 else 0,
+                "total_minutes": p["total_minutes"],
+                "inbound_calls": p["inbound_calls"],
+            }
+            for p in self._provinces.values()
+        ]
+
+
+class ProvinceCostAccumulator:
+    """Rreshtat e 02_Prefix_Province, të mbledhur sipas provincës gjatë leximit.
+
+    Vlerat për rresht rrumbullakohen si më parë (total_min, voip_cost_eur me 3
+    shifra) dhe pastaj mblidhen, njësoj si groupby(["provincia"]).sum() mbi
+    rreshtat individualë. Provincat None anashkalohen (si te groupby).
+
+    Args:
+        inbound_by_phone: InboundPhoneMaps.last_by_phone
+        fix_rate, mobile_rate: €/min
+    """
+
+    def __init__(
+        self,
+        inbound_by_phone: Dict[str, int],
+        fix_rate: float,
+        mobile_rate: float,
+        classify: Classifier = classify_phone_cached,
+    ):
+        self._inbound = inbound_by_phone
+        self._fix_rate = fix_rate
+        self._mobile_rate = mobile_rate
+        self._other_rate = max(mobile_rate, fix_rate)
+        self._classify = classify
+        self._provinces: Dict[str, List[float]] = {}
+
+    def add_rows(self, rows: Iterable[Row]) -> None:
+        for r in rows:
+            phone = str(r.get("phone_number"))
+            dials = int(r.get("dials") or 0)
+            total_min = float(r.get("total_sec") or 0) / 60.0
+            inbound_calls = int(self._inbound.get(phone, 0))
+            phone_type, provincia, _zone = self._classify(phone, r.get("province", ""))
+            if provincia is None:
+                continue
+            if phone_type == "FIX":
+                rate = self._fix_rate
+            elif phone_type == "MOBILE":
+                rate = self._mobile_rate
+            else:
+                rate = self._other_rate
+            acc = self._provinces.get(provincia)
+            if acc is None:
+                acc = self._provinces[provincia] = [0, 0, 0.0, 0.0]
+            acc[0] += dials
+            acc[1] += inbound_calls
+            acc[2] += round(total_min, 3)
+            acc[3] += round(total_min * rate, 3)
+
+    def records(self) -> List[Row]:
+        """Një rresht për provincë, i renditur sipas provincës (si groupby)."""
+        return [
+            {
+                "provincia": prov,
+                "total_dials": acc[0],
+                "inbound_calls": acc[1],
+                "total_min": acc[2],
+                "voip_cost_eur": acc[3],
+            }
+            for prov, acc in sorted(self._provinces.items())
+        ]
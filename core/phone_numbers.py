@@ -0,0 +1,205 @@
+"""
+core/phone_numbers.py
+
+PURPOSE:
+    Një vend i vetëm për normalizimin dhe klasifikimin e numrave telefonikë.
+
+    Normalizimi ishte i shkruar në tre mënyra: prefix_it.normalize_it_number,
+    heqja inline e +/0039/39 te mobile_fix_classifier.classify_phone_number dhe
+    normalize_phone te local_vici_downloader_oauth.py. Tani ka një rregull të
+    vetëm, normalize_it_number(), që e përdorin prefix_it, classifier-i (edhe
+    versioni i vektorizuar classify_phone_numbers) dhe downloader-i.
+
+KEY FEATURES:
+    - digits_only(): vetëm shifrat
+    - normalize_it_number(): numri kombëtar (pa ndarës dhe pa kodin 39)
+    - lookup_phone(): numri kombëtar + tipi + provinca + zona, me memo LRU mbi
+      stringun origjinal (numrat përsëriten shumë në dials dhe IVR)
+    - normalize_it_numbers(): normalize_it_number() për një kolonë të tërë (NumPy)
+    - lookup_phones(): të katër kolonat e lookup_phone() për një kolonë të tërë,
+      në një kalim (normalize_it_numbers + classify_phone_numbers)
+
+RREGULLI I KODIT TË VENDIT:
+    "+39" dhe "0039" hiqen gjithmonë. "39" pa "+" hiqet vetëm kur pas tij vjen
+    një numër fiks (0...) ose kur numri ka më shumë se 10 shifra: numrat
+    kombëtarë 39X (p.sh. mobile 393...) kanë 10 shifra dhe mbeten të paprekur.
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Sa kombinime (numër, provincë) mbahen në memo
+LOOKUP_CACHE_SIZE = 200_000
+
+_NON_DIGITS = re.compile(r"\D+")
+
+
+class PhoneInfo(NamedTuple):
+    """Rezultati i lookup_phone()."""
+    normalized: str          # numri kombëtar (pa +/0039/39)
+    type: str                # "MOBILE", "FIX", "UNKNOWN"
+    province: Optional[str]  # si te classify_phone_number()
+    zone: Optional[str]
+
+
+def digits_only(s: Optional[str]) -> str:
+    """Mban vetëm shifrat: "+39 06-123" → "3906123"."""
+    return _NON_DIGITS.sub("", s or "")
+
+
+def normalize_it_number(num: Optional[str]) -> str:
+    """Numri kombëtar italian: vetëm shifrat, pa +39/0039/39; 0-ja e numrave fiks mbetet.
+
+    Example:
+        >>> normalize_it_number("+39 06-1234 5678")
+        '0612345678'
+        >>> normalize_it_number("3931234567")   # mobile 393, jo kodi i vendit
+        '3931234567'
+    """
+    s = (num or "").strip()
+    plus = s.startswith("+")
+    s = digits_only(s)
+    if s.startswith("0039"):
+        return s[4:]
+    if s.startswith("39") and len(s) > 2 and (plus or s[2] == "0" or len(s) > 10):
+        return s[2:]
+    return s
+
+
+def _as_text(raw: Any) -> str:
+    if raw is None:
+        return ""
+    return raw if isinstance(raw, str) else str(raw)
+
+
+def _as_list(values: Iterable[Any]) -> List[Any]:
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def normalize_it_numbers(phones: Iterable[Any]) -> np.ndarray:
+    """normalize_it_number() për një kolonë të tërë (list, np.ndarray, pandas.Series).
+
+    Punon mbi matricën e karaktereve: shifrat ngjishen majtas, pastaj hiqet
+    0039/39 sipas të njëjtit rregull. Rreshtat me karaktere jo-ASCII (p.sh.
+    shifra unicode ose hapësira të veçanta) kalojnë te funksioni scalar.
+    None → "", vlerat jo-string → str() (si te lookup_phone()).
+
+    Returns:
+        np.ndarray me dtype=object me numrat kombëtarë
+    """
+    texts = [_as_text(p) for p in _as_list(phones)]
+    n = len(texts)
+    out = np.empty(n, dtype=object)
+    if n == 0:
+        return out
+
+    u = np.asarray(texts, dtype=np.str_)
+    width = u.dtype.itemsize // 4
+    if width == 0:
+        out[:] = ""
+        return out
+    mat = u.view(np.uint32).reshape(n, width)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=n)
+    # NUL brenda stringut ose karaktere jo-ASCII → scalar
+    scalar = (mat > 127).any(axis=1) | (np.count_nonzero(mat, axis=1) != lengths)
+
+    # "+" i parë pas hapësirave fillestare (si .strip().startswith("+"))
+    space = (mat == 32) | ((mat >= 9) & (mat <= 13))
+    first = np.argmax(~space, axis=1)
+    plus = mat[np.arange(n), first] == 43
+
+    digit = (mat >= 48) & (mat <= 57)
+    dig = np.where(digit, mat, 0)
+    mixed = ~digit.all(axis=1) & digit.any(axis=1)
+    if mixed.any():
+        # Shifrat ngjishen majtas pa ndryshuar renditjen
+        order = np.argsort(~digit[mixed], axis=1, kind="stable")
+        dig[mixed] = np.take_along_axis(dig[mixed], order, axis=1)
+    ndig = digit.sum(axis=1)
+
+    pad = np.zeros((n, width + 4), dtype=np.uint32)
+    pad[:, :width] = dig
+    has0039 = (pad[:, 0] == 48) & (pad[:, 1] == 48) & (pad[:, 2] == 51) & (pad[:, 3] == 57)
+    has39 = ~has0039 & (pad[:, 0] == 51) & (pad[:, 1] == 57) & (ndig > 2) & (
+        plus | (pad[:, 2] == 48) | (ndig > 10)
+    )
+    off = 4 * has0039 + 2 * has39
+    cols = np.minimum(np.arange(width)[None, :] + off[:, None], width + 3)
+    shifted = np.ascontiguousarray(np.take_along_axis(pad, cols, axis=1))
+    out[:] = shifted.view(f"<U{width}").ravel().tolist()
+
+    for i in np.flatnonzero(scalar):
+        out[i] = normalize_it_number(texts[i])
+    return out
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _lookup(raw: str, province: Optional[str]) -> PhoneInfo:
+    # Import vonë: mobile_fix_classifier importon këtë modul
+    from core.mobile_fix_classifier import classify_phone_number
+
+    phone_type, prov, zone = classify_phone_number(raw, province)
+    return PhoneInfo(normalize_it_number(raw), phone_type, prov, zone)
+
+
+def lookup_phone(raw: Any, province: Optional[str] = None) -> PhoneInfo:
+    """Normalizon dhe klasifikon një numër (rezultati ruhet në memo LRU).
+
+    Args:
+        raw: Numri siç vjen nga DB/CSV (None → "", jo-string → str())
+        province: Provinca nga Vicidial (përdoret vetëm për mobile)
+
+    Example:
+        >>> lookup_phone("+390612345678")
+        PhoneInfo(normalized='0612345678', type='FIX', province='RM', zone='Roma')
+    """
+    return _lookup(_as_text(raw), province if isinstance(province, str) else None)
+
+
+def lookup_phones(
+    phones: Iterable[Any],
+    provinces: Optional[Iterable[Optional[str]]] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """lookup_phone() për një kolonë të tërë, në një kalim dhe pa memo-n LRU.
+
+    Args:
+        phones: Numrat (list, np.ndarray ose pandas.Series)
+        provinces: Provinca nga Vicidial për çdo numër (opsionale, e njëjta gjatësi)
+
+    Returns:
+        (normalized, types, provinces, zones): katër np.ndarray me dtype=object,
+        rreshti i-të i barabartë me fushat e lookup_phone(phones[i], provinces[i]).
+
+    Example:
+        >>> norm, t, p, z = lookup_phones(["+390612345678", "3331234567"], [None, "MI"])
+        >>> list(zip(norm, t, p, z))
+        [('0612345678', 'FIX', 'RM', 'Roma'), ('3331234567', 'MOBILE', 'MI', None)]
+    """
+    # Import vonë: mobile_fix_classifier importon këtë modul
+    from core.mobile_fix_classifier import classify_phone_numbers
+
+    texts = [_as_text(p) for p in _as_list(phones)]
+    prov_list = None
+    if provinces is not None:
+        prov_list = [p if isinstance(p, str) else None for p in _as_list(provinces)]
+        if len(prov_list) != len(texts):
+            raise ValueError("phones dhe provinces duhet të kenë të njëjtën gjatësi")
+    types, provs, zones = classify_phone_numbers(texts, prov_list)
+    return normalize_it_numbers(texts), types, provs, zones
+
+
+def lookup_cache_info() -> Dict[str, int]:
+    """Statistikat e memo-s (hits, misses, size)."""
+    info = _lookup.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize or 0}
+
+
+def clear_lookup_cache() -> None:
+    """Pastron memo-n (p.sh. pas ndryshimit të prefikseve në data/)."""
+    _lookup.cache_clear()
@@ -1,7 +1,9 @@
 import csv
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.phone_numbers import normalize_it_number
 
 
 DATA_DIR = Path.cwd() / "data"
@@ -56,24 +58,46 @@ def load_prefix_map() -> list[tuple[str, str, str]]:
     return items
 
 
-def normalize_it_number(num: str) -> str:
-    s = (num or "").strip()
-    s = s.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-    if s.startswith("+39"):
-        s = s[3:]
-    if s.startswith("0039"):
-        s = s[4:]
-    # keep leading zero for fixed lines
-    return s
+class PrefixIndex:
+    """Indeks i kompiluar: një hash table për çdo gjatësi prefiksi.
+
+    match() provon gjatësitë nga më e gjata te më e shkurtra, pra kushton
+    O(gjatësi të ndryshme) ≤ O(shifra) në vend të O(prefikse). Kur i njëjti
+    prefiks shfaqet disa herë në skedar fiton i pari, si te skanimi linear.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, str, str]]):
+        self._tables: Dict[int, Dict[str, Tuple[str, str, str]]] = {}
+        for item in items:
+            self._tables.setdefault(len(item[0]), {}).setdefault(item[0], item)
+        self._lengths = sorted(self._tables, reverse=True)
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self._tables.values())
+
+    def match(self, normalized: str) -> Optional[Tuple[str, str, str]]:
+        """(prefix, city, provincia) për një numër tashmë të normalizuar."""
+        n = len(normalized)
+        for length in self._lengths:
+            if length <= n:
+                hit = self._tables[length].get(normalized[:length])
+                if hit is not None:
+                    return hit
+        return None
+
+
+@lru_cache(maxsize=1)
+def load_prefix_index() -> PrefixIndex:
+    """PrefixIndex i ndërtuar një herë nga load_prefix_map()."""
+    return PrefixIndex(load_prefix_map())
 
 
 def match_prefix(num: str) -> Optional[Tuple[str, str, str]]:
     """Return (prefix, city, provincia) best match for normalized number."""
-    s = normalize_it_number(num)
-    for p, city, prov in load_prefix_map():
-        if s.startswith(p):
-            return p, city, prov
-    return None
-
+    return load_prefix_index().match(normalize_it_number(num))
 
 
+def match_prefixes(nums: Iterable[str]) -> List[Optional[Tuple[str, str, str]]]:
+    """match_prefix() për një kolonë të tërë (list, Series...), me indeksin e ngarkuar një herë."""
+    match = load_prefix_index().match
+    return [match(normalize_it_number(num)) for num in nums]
@@ -0,0 +1,179 @@
+"""
+core/prefix_table.py
+
+PURPOSE:
+    Tabelë e tipizuar (pandas) për seksionet sipas prefiksit, si
+    prefix_hour_status (prefix_4 × status × orë, rezolucion i plotë) ose
+    prefix_status_analysis, për analizat e core/list_analyzer.py.
+
+    analyze_province_performance, analyze_mobile_vs_fix etj. klasifikonin çdo
+    rresht me classify_phone_number() dhe mblidhnin në dict-e të ndërthurura.
+    Këtu rreshtat bëhen një DataFrame me kolona të tipizuara dhe
+    klasifikimi bëhet një herë për çdo çift unik (prefiks, provincë), me
+    classify_phone_numbers() të vektorizuar. Analizat bëhen group-by mbi kolona.
+
+KEY FEATURES:
+    - build_prefix_table(): DataFrame nga lista dict-esh ose direkt nga
+      kolonat e Snapshot.table() (pa krijuar dict për rresht)
+    - Kolonat: prefix, status, lead_province (category), calls, total_minutes
+      (float64), is_svyclm (bool), phone_type / province / zone / province_name
+      (category, klasifikimi)
+    - Kolona opsionale (p.sh. hour) kalojnë të pandryshuara
+    - total_minutes llogaritet nga total_sec kur seksioni ka sekonda
+      (prefix_hour_status), pa rrumbullakim për rresht
+    - build_best_prefix_table(): prefix_hour_status kur ekziston, përndryshe
+      prefix_status_analysis (JSON të vjetër)
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.mobile_fix_classifier import classify_phone_numbers
+
+PREFIX_TABLE_COLUMNS = [
+    "prefix", "status", "lead_province", "calls", "total_minutes",
+    "is_svyclm", "phone_type", "province", "zone", "province_name",
+]
+
+# Prefiksi plotësohet me zero në një numër 10-shifror për klasifikim (si te
+# list_analyzer); prefix_4 mobile me 11 shifra do të dilte UNKNOWN
+_PHONE_LEN = 10
+
+
+def _section_columns(data: Mapping, key: str) -> Optional[Dict[str, Any]]:
+    """Kolonat e seksionit kur `data` është Snapshot dhe seksioni është tabelë."""
+    table = getattr(data, "table", None)
+    if table is None or key not in data:
+        return None
+    try:
+        return table(key)
+    except TypeError:  # seksion JSON (jo tabelë)
+        return None
+
+
+def _object_column(values: Sequence[Any], blank: Any) -> np.ndarray:
+    """Kolonë object ku None/NaN zëvendësohen me `blank`."""
+    values = values.tolist() if hasattr(values, "tolist") else list(values)
+    if not set(map(type, values)) <= {str}:
+        values = [blank if v is None or v != v else v for v in values]
+    return np.array(values, dtype=object)
+
+
+def _categorical(values: np.ndarray, codes: np.ndarray) -> pd.Categorical:
+    """Categorical me vlerat `values[codes]`, pa krijuar string për rresht."""
+    value_codes, categories = pd.factorize(values, sort=False)
+    return pd.Categorical.from_codes(value_codes[codes], categories=categories)
+
+
+def _factorized(values: np.ndarray) -> Tuple[np.ndarray, pd.Categorical]:
+    """(kodet, Categorical) me një factorize të vetëm; None/NaN → kod -1."""
+    codes, uniques = pd.factorize(values, sort=False)
+    return codes, pd.Categorical.from_codes(codes, categories=uniques)
+
+
+def _classify_unique(
+    prefix_codes: np.ndarray,
+    prefixes: np.ndarray,
+    province_codes: np.ndarray,
+    provinces: np.ndarray,
+) -> Dict[str, pd.Categorical]:
+    """Klasifikon vetëm çiftet unike (prefiks, provincë) dhe i shpërndan te rreshtat."""
+    pair = prefix_codes.astype(np.int64) * (len(provinces) + 1) + (province_codes + 1)
+    _, first, codes = np.unique(pair, return_index=True, return_inverse=True)
+    codes = codes.reshape(-1)
+
+    phones = [prefixes[c].ljust(_PHONE_LEN, "0") for c in prefix_codes[first]]
+    leads = [provinces[c] if c >= 0 else None for c in province_codes[first]]
+    types, classified, zones = classify_phone_numbers(phones, leads)
+    # Emri i provincës për numrat FIX me provincë: zona (nga CSV) ose kodi
+    names = np.array([
+        (z or p) if t == "FIX" and p else None for t, p, z in zip(types, classified, zones)
+    ], dtype=object)
+    return {
+        "phone_type": _categorical(types, codes),
+        "province": _categorical(classified, codes),
+        "zone": _categorical(zones, codes),
+        "province_name": _categorical(names, codes),
+    }
+
+
+def build_prefix_table(
+    data: Mapping,
+    key: str = "prefix_status_analysis",
+    prefix_column: str = "prefix_3",
+    extra_columns: Sequence[str] = (),
+) -> pd.DataFrame:
+    """DataFrame i tipizuar me klasifikimin FIX/MOBILE për çdo rresht të seksionit.
+
+    Kolonat tekst (prefix, status, phone_type, province, zone, province_name)
+    janë `category`: krahasimet dhe group-by punojnë mbi kodet, jo mbi stringje.
+
+    Args:
+        data: Të dhënat e analizës (dict ose Snapshot)
+        key: Seksioni (rreshta me prefix_column, status, calls, total_minutes
+            ose total_sec, province)
+        prefix_column: Kolona e prefiksit (p.sh. "prefix_3" ose "prefix_4")
+        extra_columns: Kolona shtesë që kopjohen (p.sh. ("hour",))
+
+    Returns:
+        DataFrame me PREFIX_TABLE_COLUMNS + extra_columns, në radhën e rreshtave
+        të seksionit. Bosh (me kolonat) kur seksioni mungon.
+    """
+    names = [prefix_column, "status", "calls", "total_minutes", "total_sec", "province", *extra_columns]
+    cols = _section_columns(data, key)
+    if cols is None:
+        rows = data.get(key) or []
+        present = set().union(*(r.keys() for r in rows[:1000])) if rows else set()
+        cols = {c: [r.get(c) for r in rows] for c in names if c in present}
+    n = len(next(iter(cols.values()), ()))
+
+    def _number(name: str) -> np.ndarray:
+        if name not in cols:
+            return np.zeros(n, dtype="float64")
+        values = cols[name]
+        if isinstance(values, np.ndarray) and values.dtype.kind in "if":
+            return np.nan_to_num(values.astype("float64"), nan=0.0)
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").fillna(0).to_numpy(dtype="float64")
+
+    prefix_codes, prefix = _factorized(_object_column(cols.get(prefix_column, [""] * n), ""))
+    _, status = _factorized(_object_column(cols.get("status", [""] * n), ""))
+    province_codes, lead_province = _factorized(_object_column(cols.get("province", [None] * n), None))
+
+    out: Dict[str, Any] = {
+        "prefix": prefix,
+        "status": status,
+        "lead_province": lead_province,
+        "calls": _number("calls"),
+        "total_minutes": _number("total_minutes") if "total_minutes" in cols or "total_sec" not in cols
+        else _number("total_sec") / 60.0,
+        "is_svyclm": np.asarray(status == "SVYCLM"),
+    }
+    if n:
+        out.update(_classify_unique(
+            prefix_codes, np.asarray(prefix.categories, dtype=object),
+            province_codes, np.asarray(lead_province.categories, dtype=object),
+        ))
+    else:
+        out.update({c: pd.Categorical([]) for c in ("phone_type", "province", "zone", "province_name")})
+    for name in extra_columns:
+        out[name] = cols[name] if name in cols else np.full(n, np.nan)
+    return pd.DataFrame(out, columns=PREFIX_TABLE_COLUMNS + list(extra_columns))
+
+
+def build_best_prefix_table(data: Mapping) -> pd.DataFrame:
+    """Tabela e prefikseve nga seksioni me rezolucionin më të lartë që ka `data`.
+
+    prefix_hour_status (prefix_4 × status × orë, pa HAVING/LIMIT) jep
+    provinca dhe kosto të sakta; prefix_status_analysis (prefix_3, top 500
+    me > 20 thirrje) përdoret për JSON-et që nuk e kanë.
+    """
+    key = "prefix_hour_status"
+    # Snapshot: kolonat lexohen nga mmap pa dekoduar rreshtat në dict
+    if key in data and (_section_columns(data, key) or data.get(key)):
+        return build_prefix_table(data, key=key, prefix_column="prefix_4", extra_columns=("hour",))
+    return build_prefix_table(data)
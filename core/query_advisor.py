@@ -0,0 +1,587 @@
+"""
+core/query_advisor.py
+
+PURPOSE:
+    Diagnostikë e planeve të query-ve tona mbi Vicidial.
+
+    Raportet e ngadalta vijnë nga pak forma query-sh mbi vicidial_log
+    (call_date, campaign_id, status, list_id, phone_number),
+    vicidial_ivr_response (campaign, created, response, lead_id) dhe
+    recording_log (start_time, lead_id). Ky modul mbledh të gjitha query-t e
+    core/db_vicidial.py, të rollup-it ditor dhe të collect_vicidial_data.py,
+    ekzekuton EXPLAIN (opsionalisht EXPLAIN ANALYZE) mbi një DB të dhënë dhe
+    sugjeron indekse mbuluese për tabelat që skanohen të plota ose renditen
+    me filesort.
+
+KEY FEATURES:
+    - QueryCase: (burimi, label, sql, params) — një query e katalogut
+    - build_catalog(): query-t e db_vicidial (capture_queries, pa ekzekutim),
+      rollup_store.TABLES dhe seksionet e collector-it (të lidhura me parametra)
+    - explain_case(): EXPLAIN tabelor (MySQL dhe MariaDB); EXPLAIN ANALYZE
+      (MySQL 8.0.18+) ose ANALYZE (MariaDB) me analyze=True
+    - Flamuj: full_scan (type=ALL), full_index_scan (type=index), filesort,
+      temporary, no_index (ka possible_keys por key=NULL)
+    - suggest_indexes(): kolonat e barazisë → kolona e intervalit → GROUP/ORDER
+      BY → kolonat e tjera të lexuara (mbulues), duke anashkaluar indekset që
+      ekzistojnë tashmë (SHOW INDEX)
+    - format_advice_report(): raport tekst; AdviceResult.to_dict() për JSON
+
+KUFIZIME:
+    - Analiza e SQL-it është heuristike (regex + nën-query në kllapa), jo parser
+      i plotë; kolonat brenda funksioneve (DATE(call_date), RIGHT(...)) nuk
+      konsiderohen të indeksueshme, si edhe në MySQL
+    - rows_examined është vlerësimi i optimizer-it (produkt i `rows` për
+      SELECT), jo numri real; me analyze=True shtohet output-i real
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Kolonat e njohura të tabelave Vicidial (për kolonat pa prefiks alias-i)
+KNOWN_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "vicidial_log": (
+        "uniqueid", "lead_id", "list_id", "campaign_id", "call_date", "start_epoch", "end_epoch",
+        "length_in_sec", "status", "phone_code", "phone_number", "user", "comments", "processed",
+        "user_group", "term_reason", "alt_dial", "called_count",
+    ),
+    "vicidial_ivr_response": ("lead_id", "uniqueid", "campaign", "created", "response", "question", "menu_id"),
+    "recording_log": (
+        "recording_id", "channel", "server_ip", "extension", "start_time", "start_epoch", "end_time",
+        "end_epoch", "length_in_sec", "length_in_min", "filename", "location", "lead_id", "user", "vicidial_id",
+    ),
+    "vicidial_list": (
+        "lead_id", "entry_date", "modify_date", "status", "user", "vendor_lead_code", "source_id", "list_id",
+        "gmt_offset_now", "called_since_last_reset", "phone_code", "phone_number", "title", "first_name",
+        "last_name", "address1", "city", "state", "province", "postal_code", "country_code", "gender",
+        "called_count", "last_local_call_time", "rank", "owner",
+    ),
+    "vicidial_lists": (
+        "list_id", "list_name", "campaign_id", "active", "list_description", "list_changedate", "list_lastcalldate",
+    ),
+    "vicidial_closer_log": (
+        "closecallid", "lead_id", "list_id", "campaign_id", "call_date", "start_epoch", "end_epoch",
+        "length_in_sec", "status", "phone_code", "phone_number", "user", "queue_seconds", "term_reason",
+    ),
+    "vicidial_hopper": (
+        "hopper_id", "lead_id", "campaign_id", "status", "user", "list_id", "gmt_offset_now", "state",
+        "alt_dial", "priority", "source", "vendor_lead_code",
+    ),
+    "vicidial_campaign_statuses": ("status", "status_name", "campaign_id", "selectable", "human_answered", "sale"),
+}
+
+# Sa kolona lejohen në një indeks të sugjeruar para se të hiqet pjesa mbuluese
+MAX_INDEX_COLUMNS = 8
+# Mbi këtë numër rreshtash të vlerësuar, tabela sugjerohet edhe pa full scan
+ROWS_THRESHOLD = 10_000
+
+_SQL_KEYWORDS = {
+    "select", "from", "where", "and", "or", "not", "on", "as", "in", "is", "null", "join", "inner", "left",
+    "right", "outer", "cross", "group", "order", "by", "having", "limit", "between", "like", "case", "when",
+    "then", "else", "end", "distinct", "asc", "desc", "interval", "day", "hour", "using", "exists", "union",
+    "all", "regexp", "straight_join",
+}
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+([\w.]+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE,
+)
+_PREDICATE = re.compile(
+    r"(?<![\w.])(?:(\w+)\.)?(\w+)\s*(<=>|>=|<=|<>|!=|=|<|>|\bIN\s*\(|\bBETWEEN\b)", re.IGNORECASE,
+)
+_JOIN_RHS = re.compile(r"\s*(\w+)\.(\w+)\b(?!\s*\()")
+_QUALIFIED = re.compile(r"\b(\w+)\.(\w+)\b")
+_IDENT = re.compile(r"\b([A-Za-z_]\w*)\b")
+_SUBQUERY = re.compile(r"\(\s*SELECT\b", re.IGNORECASE)
+_CLAUSE = re.compile(r"\b(WHERE|GROUP\s+BY|HAVING|ORDER\s+BY|LIMIT)\b", re.IGNORECASE)
+_ON = re.compile(
+    r"\bON\b(.*?)(?=\b(?:INNER|LEFT|RIGHT|CROSS|JOIN|WHERE|GROUP|ORDER|HAVING|LIMIT)\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@dataclass
+class QueryCase:
+    """Një query e katalogut."""
+    source: str          # "db_vicidial", "rollup", "collector"
+    label: str
+    sql: str
+    params: Tuple[Any, ...] = ()
+
+
+@dataclass
+class PlanRow:
+    """Një rresht i EXPLAIN."""
+    select_id: Any
+    table: Optional[str]
+    access_type: Optional[str]
+    possible_keys: Optional[str]
+    key: Optional[str]
+    rows: int
+    extra: str
+    flags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class IndexSuggestion:
+    """Indeksi i sugjeruar për një tabelë."""
+    table: str
+    columns: List[str]
+    covering: bool
+    reason: str
+    rows_examined: int
+    key_length: int = 0  # kolonat e para që përdoren për kërkim (pjesa tjetër vetëm mbulon)
+
+    @property
+    def ddl(self) -> str:
+        name = "idx_" + "_".join(c[:12] for c in self.columns[:4])
+        cols = ", ".join(f"`{c}`" for c in self.columns)
+        return f"ALTER TABLE `{self.table}` ADD INDEX `{name[:64]}` ({cols});"
+
+
+@dataclass
+class AdviceResult:
+    """Plani, flamujt dhe sugjerimet për një QueryCase."""
+    case: QueryCase
+    plan: List[PlanRow] = field(default_factory=list)
+    rows_examined: int = 0
+    suggestions: List[IndexSuggestion] = field(default_factory=list)
+    analyze_output: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def flags(self) -> List[str]:
+        return sorted({f for row in self.plan for f in row.flags})
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["flags"] = self.flags
+        out["suggestions"] = [dict(asdict(s), ddl=s.ddl) for s in self.suggestions]
+        return out
+
+
+# ==================== Katalogu i query-ve ====================
+def _window(days_back: int, now: Optional[datetime] = None) -> Tuple[str, str]:
+    now = now or datetime.now()
+    start = (now - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start.strftime("%Y-%m-%d %H:%M:%S"), now.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def db_vicidial_cases(
+    campaign_id: str,
+    days_back: int = 7,
+    ivr_code: str = "1",
+    statuses: Sequence[str] = ("A", "B", "NA"),
+) -> List[QueryCase]:
+    """Query-t e core/db_vicidial.py, të kapura me capture_queries() (pa ekzekutim)."""
+    from core import db_vicidial as db
+
+    from_ts, to_ts = _window(days_back)
+    statuses = list(statuses)
+    with db.capture_queries() as captured:
+        db.fetch_outbound_by_list(from_ts, to_ts)
+        db.fetch_inbound_by_list(from_ts, to_ts, campaign_id, ivr_code)
+        db.fetch_outbound_by_list_statuses(from_ts, to_ts, campaign_id, statuses)
+        db.fetch_list_names([1001, 1002, 1003])
+        db._fetch_status_distribution_by_list_live(from_ts, to_ts, campaign_id)
+        db._fetch_time_buckets_by_list_live(from_ts, to_ts, campaign_id)
+        db._fetch_inbound_buckets_by_list_live(from_ts, to_ts, campaign_id, ivr_code)
+        db._fetch_dials_by_phone_live(from_ts, to_ts, campaign_id, None)
+        db._fetch_dials_by_phone_live(from_ts, to_ts, campaign_id, statuses)
+        db._fetch_dials_by_phone_split_live(from_ts, to_ts, campaign_id, statuses)
+        db._fetch_inbound_by_phone_live(from_ts, to_ts, campaign_id, ivr_code)
+        db.fetch_svyclm_by_list(from_ts, to_ts, campaign_id)
+        db.fetch_svyclm_timeout_by_list(from_ts, to_ts, campaign_id, ["TIMEOUT"])
+        db.list_recordings(from_ts, to_ts, campaign_id, limit=1000)
+    return [QueryCase("db_vicidial", label, sql, params) for label, sql, params in captured]
+
+
+def rollup_cases(campaign_id: str) -> List[QueryCase]:
+    """SQL-i ditor i ingestion-it të rollup-it (core/rollup_store.TABLES) për dje."""
+    from core.rollup_store import TABLES
+
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    params = (campaign_id, day.strftime("%Y-%m-%d %H:%M:%S"), (day + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S"))
+    return [QueryCase("rollup", f"rollup:{name}", spec["source_sql"], params) for name, spec in TABLES.items()]
+
+
+def collector_cases(
+    campaign_id: str,
+    days_back: int = 7,
+    campaign_ids: Optional[Sequence[str]] = None,
+) -> List[QueryCase]:
+    """Seksionet e collect_vicidial_data.py (dhe query-t e përbashkëta kur jepen disa kampanja)."""
+    import collect_vicidial_data as collector
+
+    cases = [
+        QueryCase("collector", job.key, job.sql, tuple(job.params))
+        for job in collector.build_collection_jobs(campaign_id, days_back)
+    ]
+    if campaign_ids and len(campaign_ids) > 1:
+        cases += [
+            QueryCase("collector", f"shared:{job.key}", job.sql, tuple(job.params))
+            for job, _ in collector.build_shared_jobs(list(campaign_ids), days_back)
+        ]
+    return cases
+
+
+def build_catalog(
+    campaign_id: str,
+    days_back: int = 7,
+    ivr_code: str = "1",
+    statuses: Sequence[str] = ("A", "B", "NA"),
+    campaign_ids: Optional[Sequence[str]] = None,
+    sources: Iterable[str] = ("db_vicidial", "rollup", "collector"),
+) -> List[QueryCase]:
+    """Të gjitha query-t që do të kalojnë nga EXPLAIN."""
+    sources = set(sources)
+    cases: List[QueryCase] = []
+    if "db_vicidial" in sources:
+        cases += db_vicidial_cases(campaign_id, days_back, ivr_code, statuses)
+    if "rollup" in sources:
+        cases += rollup_cases(campaign_id)
+    if "collector" in sources:
+        cases += collector_cases(campaign_id, days_back, campaign_ids)
+    return cases
+
+
+# ==================== Analiza e SQL-it ====================
+@dataclass
+class _TableUsage:
+    table: str
+    equality: List[str] = field(default_factory=list)
+    ranges: List[str] = field(default_factory=list)
+    joins: List[str] = field(default_factory=list)
+    group_by: List[str] = field(default_factory=list)
+    order_by: List[str] = field(default_factory=list)
+    referenced: List[str] = field(default_factory=list)
+    select_star: bool = False
+
+
+def _strip_literals(sql: str) -> str:
+    return re.sub(r"'(?:[^'\\]|\\.)*'", "''", sql)
+
+
+def _split_subqueries(sql: str) -> List[str]:
+    """Blloqet SELECT: query-ja kryesore (me nën-query të zëvendësuara me `(%s)`) + çdo nën-query."""
+    blocks: List[str] = []
+    out: List[str] = []
+    i = 0
+    while i < len(sql):
+        m = _SUBQUERY.match(sql, i)
+        if m:
+            depth, j = 0, i
+            while j < len(sql):
+                if sql[j] == "(":
+                    depth += 1
+                elif sql[j] == ")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                j += 1
+            blocks.extend(_split_subqueries(sql[i + 1:j]))
+            out.append("(%s)")
+            i = j + 1
+            continue
+        out.append(sql[i])
+        i += 1
+    return ["".join(out)] + blocks
+
+
+def _clauses(block: str) -> Dict[str, str]:
+    marks = [(m.start(), re.sub(r"\s+", " ", m.group(1).upper())) for m in _CLAUSE.finditer(block)]
+    out: Dict[str, str] = {"head": block[:marks[0][0]] if marks else block}
+    for n, (pos, name) in enumerate(marks):
+        end = marks[n + 1][0] if n + 1 < len(marks) else len(block)
+        out[name] = block[pos + len(name):end]
+    return out
+
+
+def _resolve(aliases: Dict[str, str], qualifier: Optional[str], column: str) -> Optional[str]:
+    """Tabela e kolonës (nga alias-i ose nga KNOWN_COLUMNS kur s'ka alias)."""
+    column_l = column.lower()
+    if column_l in _SQL_KEYWORDS:
+        return None
+    if qualifier:
+        return aliases.get(qualifier.lower())
+    tables = list(dict.fromkeys(aliases.values()))
+    known = [t for t in tables if column_l in KNOWN_COLUMNS.get(t, ())]
+    if len(known) == 1:
+        return known[0]
+    if len(tables) == 1 and tables[0] not in KNOWN_COLUMNS:
+        return tables[0]
+    return None
+
+
+def analyze_sql(sql: str) -> Dict[str, _TableUsage]:
+    """Për çdo tabelë: kolonat e barazisë, intervalit, GROUP/ORDER BY dhe ato të lexuara."""
+    usage: Dict[str, _TableUsage] = {}
+    for block in _split_subqueries(_strip_literals(sql)):
+        aliases: Dict[str, str] = {}
+        for m in _TABLE_REF.finditer(block):
+            table, alias = m.group(1), m.group(2)
+            if "." in table or table.lower() in _SQL_KEYWORDS:
+                continue
+            table = table.lower()
+            aliases[table] = table
+            if alias and alias.lower() not in _SQL_KEYWORDS:
+                aliases[alias.lower()] = table
+        if not aliases:
+            continue
+        for table in set(aliases.values()):
+            usage.setdefault(table, _TableUsage(table))
+
+        def _add(target: str, qualifier: Optional[str], column: str) -> None:
+            table = _resolve(aliases, qualifier, column)
+            if table is not None:
+                lst = getattr(usage[table], target)
+                if column not in lst:
+                    lst.append(column)
+
+        parts = _clauses(block)
+        predicates = [parts.get("WHERE", "")] + [m.group(1) for m in _ON.finditer(parts["head"])]
+        for text in predicates:
+            for m in _PREDICATE.finditer(text):
+                op = m.group(3).upper()
+                rhs = _JOIN_RHS.match(text, m.end())
+                if rhs and op in ("=", "<=>"):
+                    # a.x = b.y: çelës join-i për të dyja anët
+                    _add("joins", m.group(1), m.group(2))
+                    _add("joins", rhs.group(1), rhs.group(2))
+                elif op.startswith("IN") or op in ("=", "<=>"):
+                    _add("equality", m.group(1), m.group(2))
+                elif op in (">=", "<=", "<", ">", "BETWEEN"):
+                    _add("ranges", m.group(1), m.group(2))
+        for clause, target in (("GROUP BY", "group_by"), ("ORDER BY", "order_by")):
+            for item in parts.get(clause, "").split(","):
+                m = re.fullmatch(r"\s*(?:(\w+)\.)?(\w+)(?:\s+(?:ASC|DESC))?\s*", item, re.IGNORECASE)
+                if m:
+                    _add(target, m.group(1), m.group(2))
+        if re.search(r"\bSELECT\s+(?:DISTINCT\s+)?(?:\w+\.)?\*", block, re.IGNORECASE):
+            for table in set(aliases.values()):
+                usage[table].select_star = True
+        for m in _QUALIFIED.finditer(block):
+            _add("referenced", m.group(1), m.group(2))
+        for m in _IDENT.finditer(_QUALIFIED.sub(" ", block)):
+            column = m.group(1)
+            table = _resolve(aliases, None, column)
+            if table is not None and column.lower() in KNOWN_COLUMNS.get(table, ()):
+                _add("referenced", None, column)
+    return usage
+
+
+def index_columns(u: _TableUsage) -> Tuple[List[str], bool, int]:
+    """Rendi i kolonave: barazi (ose join) → një interval → GROUP/ORDER BY → mbulues.
+
+    Kthen (kolonat, covering, key_length).
+    """
+    cols: List[str] = []
+
+    def _push(names: Iterable[str]) -> None:
+        for c in names:
+            if c not in cols:
+                cols.append(c)
+
+    # Tabela që arrihet vetëm përmes JOIN: çelësi i join-it del i pari
+    _push(u.equality if (u.equality or u.ranges) else u.joins)
+    if u.ranges:
+        _push(u.ranges[:1])
+    else:
+        _push(u.group_by or u.order_by)
+    key_cols = list(cols)
+    _push(u.ranges[1:] + u.group_by + u.order_by + u.joins + u.referenced)
+    covering = not u.select_star and len(cols) <= MAX_INDEX_COLUMNS
+    return (cols if covering else key_cols), covering, len(key_cols)
+
+
+# ==================== EXPLAIN ====================
+def _row_flags(access_type: Optional[str], possible_keys: Optional[str], key: Optional[str], extra: str) -> List[str]:
+    flags = []
+    if access_type == "ALL":
+        flags.append("full_scan")
+    elif access_type == "index":
+        flags.append("full_index_scan")
+    if "filesort" in extra:
+        flags.append("filesort")
+    if "temporary" in extra:
+        flags.append("temporary")
+    if possible_keys and not key:
+        flags.append("no_index")
+    return flags
+
+
+def _plan_row(r: Dict[str, Any]) -> PlanRow:
+    access_type = r.get("type")
+    extra = r.get("Extra") or ""
+    return PlanRow(
+        select_id=r.get("id"),
+        table=r.get("table"),
+        access_type=access_type,
+        possible_keys=r.get("possible_keys"),
+        key=r.get("key"),
+        rows=int(r.get("rows") or 0),
+        extra=extra,
+        flags=_row_flags(access_type, r.get("possible_keys"), r.get("key"), extra),
+    )
+
+
+def estimate_rows_examined(plan: Sequence[PlanRow]) -> int:
+    """Produkti i `rows` brenda një SELECT (nested loop), shuma mbi SELECT-et."""
+    per_select: Dict[Any, int] = {}
+    for row in plan:
+        per_select[row.select_id] = per_select.get(row.select_id, 1) * max(1, row.rows)
+    return sum(per_select.values())
+
+
+def _run(cur: Any, sql: str, params: Sequence[Any]) -> List[Dict[str, Any]]:
+    cur.execute(sql, tuple(params) or None)
+    return list(cur.fetchall())
+
+
+def _explain_analyze(cur: Any, sql: str, params: Sequence[Any]) -> str:
+    """EXPLAIN ANALYZE (MySQL 8.0.18+) ose ANALYZE (MariaDB 10.1+). Query-ja ekzekutohet realisht."""
+    try:
+        rows = _run(cur, "EXPLAIN ANALYZE " + sql, params)
+        return "\n".join(str(v) for r in rows for v in r.values())
+    except Exception:
+        pass
+    rows = _run(cur, "ANALYZE " + sql, params)
+    lines = []
+    for r in rows:
+        lines.append(
+            f"{r.get('table')}: type={r.get('type')} key={r.get('key')} "
+            f"rows={r.get('rows')} r_rows={r.get('r_rows')} filtered={r.get('r_filtered')} {r.get('Extra') or ''}"
+        )
+    return "\n".join(lines)
+
+
+class IndexCatalog:
+    """Indekset ekzistuese (SHOW INDEX), të lexuara një herë për tabelë."""
+
+    def __init__(self, cursor: Any):
+        self._cur = cursor
+        self._cache: Dict[str, List[List[str]]] = {}
+
+    def indexes(self, table: str) -> List[List[str]]:
+        if table not in self._cache:
+            try:
+                rows = _run(self._cur, f"SHOW INDEX FROM `{table}`", ())
+            except Exception:
+                rows = []
+            by_name: Dict[str, List[Tuple[int, str]]] = {}
+            for r in rows:
+                by_name.setdefault(r["Key_name"], []).append((int(r["Seq_in_index"]), r["Column_name"]))
+            self._cache[table] = [[c for _, c in sorted(cols)] for cols in by_name.values()]
+        return self._cache[table]
+
+    def has_prefix(self, table: str, columns: Sequence[str]) -> bool:
+        want = [c.lower() for c in columns]
+        return any([c.lower() for c in idx[:len(want)]] == want for idx in self.indexes(table))
+
+
+def suggest_indexes(sql: str, plan: Sequence[PlanRow], catalog: Optional[IndexCatalog] = None) -> List[IndexSuggestion]:
+    """Indekse për tabelat me full scan / filesort / shumë rreshta në plan."""
+    usage = analyze_sql(sql)
+    by_table: Dict[str, List[PlanRow]] = {}
+    for row in plan:
+        if row.table:
+            by_table.setdefault(row.table.lower(), []).append(row)
+    # EXPLAIN tregon alias-in; lidhe me tabelën përmes rendit të shfaqjes në SQL
+    alias_map = {m.group(2).lower(): m.group(1).lower() for m in _TABLE_REF.finditer(sql) if m.group(2)}
+
+    out: List[IndexSuggestion] = []
+    seen = set()
+    for name, rows in by_table.items():
+        table = alias_map.get(name, name)
+        u = usage.get(table)
+        if u is None or table in seen:
+            continue
+        flags = {f for r in rows for f in r.flags}
+        examined = max(r.rows for r in rows)
+        if not (flags & {"full_scan", "full_index_scan", "filesort", "no_index"}) and examined < ROWS_THRESHOLD:
+            continue
+        columns, covering, key_length = index_columns(u)
+        if not columns:
+            continue
+        if catalog is not None and catalog.has_prefix(table, columns):
+            continue
+        seen.add(table)
+        reason = ", ".join(sorted(flags)) or f"rows≈{examined}"
+        out.append(IndexSuggestion(table, columns, covering, reason, examined, key_length))
+    return out
+
+
+def explain_case(
+    cursor: Any,
+    case: QueryCase,
+    analyze: bool = False,
+    catalog: Optional[IndexCatalog] = None,
+) -> AdviceResult:
+    """EXPLAIN (dhe opsionalisht ANALYZE) për një query + sugjerimet e indekseve."""
+    result = AdviceResult(case)
+    try:
+        result.plan = [_plan_row(r) for r in _run(cursor, "EXPLAIN " + case.sql, case.params)]
+        result.rows_examined = estimate_rows_examined(result.plan)
+        result.suggestions = suggest_indexes(case.sql, result.plan, catalog)
+        if analyze:
+            result.analyze_output = _explain_analyze(cursor, case.sql, case.params)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def advise(conn: Any, cases: Sequence[QueryCase], analyze: bool = False) -> List[AdviceResult]:
+    """explain_case() për të gjithë katalogun mbi një lidhje pymysql (DictCursor)."""
+    with conn.cursor() as cur:
+        catalog = IndexCatalog(cur)
+        return [explain_case(cur, case, analyze, catalog) for case in cases]
+
+
+def merge_suggestions(results: Sequence[AdviceResult]) -> List[IndexSuggestion]:
+    """Bashkon sugjerimet me të njëjtën tabelë dhe të njëjtat kolona kërkimi.
+
+    Kolonat mbuluese bashkohen (një indeks për disa query) derisa të kalojnë
+    MAX_INDEX_COLUMNS; rows_examined është maksimumi. Më të rëndat sipër.
+    """
+    merged: Dict[Tuple[str, Tuple[str, ...]], IndexSuggestion] = {}
+    for res in results:
+        for s in res.suggestions:
+            key = (s.table, tuple(s.columns[:s.key_length]))
+            cur = merged.get(key)
+            if cur is None:
+                merged[key] = IndexSuggestion(
+                    s.table, list(s.columns), s.covering, s.reason, s.rows_examined, s.key_length
+                )
+                continue
+            columns = cur.columns + [c for c in s.columns if c not in cur.columns]
+            covering = cur.covering and s.covering and len(columns) <= MAX_INDEX_COLUMNS
+            cur.columns = columns if covering else columns[:cur.key_length]
+            cur.covering = covering
+            cur.reason = ", ".join(sorted(set(cur.reason.split(", ")) | set(s.reason.split(", "))))
+            cur.rows_examined = max(cur.rows_examined, s.rows_examined)
+    return sorted(merged.values(), key=lambda s: s.rows_examined, reverse=True)
+
+
+def format_advice_report(results: Sequence[AdviceResult]) -> str:
+    """Tabela për query (flamujt, rreshtat e vlerësuar) + lista e indekseve të sugjeruara."""
+    ordered = sorted(results, key=lambda r: r.rows_examined, reverse=True)
+    width = max([len(r.case.label) for r in ordered] + [5])
+    lines = [f"{'query':<{width}}  {'source':<11}  {'rows_examined':>14}  flags"]
+    lines.append("-" * (width + 50))
+    for r in ordered:
+        status = f"ERROR {r.error}" if r.error else (", ".join(r.flags) or "ok")
+        lines.append(f"{r.case.label:<{width}}  {r.case.source:<11}  {r.rows_examined:>14,}  {status}")
+    suggestions = merge_suggestions(results)
+    lines.append("")
+    lines.append(f"Suggested indexes ({len(suggestions)}):")
+    for s in suggestions:
+        kind = "covering" if s.covering else "key only"
+        lines.append(f"  {s.ddl}  -- {kind}; {s.reason}; rows≈{s.rows_examined:,}")
+    for r in ordered:
+        if r.analyze_output:
+            lines.append("")
+            lines.append(f"== ANALYZE {r.case.label} ==")
+            lines.append(r.analyze_output)
+    return "\n".join(lines)
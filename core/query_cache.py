@@ -0,0 +1,268 @@
+"""
+core/query_cache.py
+
+PURPOSE:
+    Cache në disk për rezultatet e query-ve agregate të Vicidial
+    (fetch_* në core/db_vicidial.py), nën out_analysis/query_cache/.
+
+    Analistët e rinisin Smart Report me të njëjtën kampanjë, IVR dhe interval
+    shumë herë në ditë. Me cache-in, ekzekutimi i dytë lexon rezultatin nga
+    disku në vend që të godasë sërish MySQL-in e prodhimit.
+
+KEY FEATURES:
+    - Çelësi: fingerprint i SQL-it (whitespace i normalizuar) + parametrat + db_key
+    - TTL i konfigurueshëm për intervalet që përfshijnë ditën e sotme
+    - Intervalet plotësisht në të kaluarën (to_ts <= sot 00:00) nuk skadojnë kurrë:
+      ditët e mbyllura nuk ndryshojnë. Vlen vetëm pasi të kenë kaluar
+      closed_grace_hours nga to_ts (default 6 orë), që rreshtat e vonuar
+      (thirrje në mbyllje, replica me vonesë, ora e DB ≠ ora lokale) të mos
+      ngrijnë një rezultat të paplotë
+    - Kufi madhësie (MB) me eviction LRU sipas mtime (mtime rifreskohet në çdo hit)
+    - Shkrim atomik (tmp + os.replace), i sigurt me thread-e paralele
+
+Cilësimet lexohen nga config/settings.json (core/status_settings.get_query_cache_settings).
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+CACHE_DIR = Path.cwd() / "out_analysis" / "query_cache"
+_SUFFIX = ".pkl"
+
+_TS_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+# Sa orë pas to_ts një interval i mbyllur konsiderohet përfundimtar
+DEFAULT_CLOSED_GRACE_HOURS = 6.0
+
+
+def query_fingerprint(sql: str) -> str:
+    """Hash i SQL-it pa dallime whitespace (indentimi nuk ndryshon çelësin)."""
+    normalized = re.sub(r"\s+", " ", sql).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(sql: str, params: Optional[Sequence[Any]], db_key: str) -> str:
+    """Çelësi i cache-it për (SQL, parametrat, db_key)."""
+    payload = repr((query_fingerprint(sql), tuple(params or ()), db_key))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        return None
+    for fmt in _TS_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def is_closed_window(
+    window_end: Any,
+    now: Optional[datetime] = None,
+    grace_hours: float = DEFAULT_CLOSED_GRACE_HOURS,
+) -> bool:
+    """True nëse intervali mbaron para fillimit të ditës së sotme (ora lokale)
+    dhe kanë kaluar të paktën `grace_hours` nga fundi i tij.
+
+    Periudha e pritjes mbulon rreshtat që shkruhen me vonesë (thirrjet që
+    mbyllen pas mesnatës, vonesa e replikës) dhe diferencën mes orës lokale
+    dhe orës së serverit MySQL.
+
+    Args:
+        window_end: to_ts i query-t ("YYYY-MM-DD HH:MM:SS") ose None
+        now: Koha aktuale (për teste); default datetime.now()
+        grace_hours: Orët pas to_ts para se rezultati të ruhet pa skadim
+    """
+    end = _parse_ts(window_end)
+    if end is None:
+        return False
+    now = now or datetime.now()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return end <= today_start and now - end >= timedelta(hours=max(0.0, float(grace_hours)))
+
+
+class QueryCache:
+    """Cache në disk, një skedar pickle për çelës.
+
+    Args:
+        root: Dosja e cache-it
+        ttl_sec: Jetëgjatësia e hyrjeve për intervale të hapura
+        max_bytes: Madhësia maksimale totale; mbi të fshihen hyrjet më të vjetra (LRU)
+        closed_grace_hours: Pritja para se një interval i mbyllur të ruhet pa skadim
+    """
+
+    def __init__(
+        self,
+        root: Path = CACHE_DIR,
+        ttl_sec: float = 900.0,
+        max_bytes: int = 256 * 1024 * 1024,
+        closed_grace_hours: float = DEFAULT_CLOSED_GRACE_HOURS,
+    ):
+        self.root = Path(root)
+        self.ttl_sec = float(ttl_sec)
+        self.max_bytes = int(max_bytes)
+        self.closed_grace_hours = float(closed_grace_hours)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Kthen (found, rows). Hyrjet e skaduara ose të dëmtuara fshihen."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            self._count("misses")
+            return False, None
+        except Exception:
+            _safe_unlink(path)
+            self._count("misses")
+            return False, None
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and time.time() >= expires_at:
+            _safe_unlink(path)
+            self._count("misses")
+            return False, None
+        try:
+            os.utime(path, None)  # LRU: hit e bën hyrjen "të re"
+        except OSError:
+            pass
+        self._count("hits")
+        return True, entry.get("rows")
+
+    def put(self, key: str, rows: Any, closed: bool = False) -> None:
+        """Ruan rezultatin. closed=True → pa skadim (interval i mbyllur)."""
+        entry = {
+            "created": time.time(),
+            "expires_at": None if closed else time.time() + self.ttl_sec,
+            "rows": rows,
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            # Cache-i nuk duhet të rrëzojë kurrë raportin
+            return
+        self._count("writes")
+        self.enforce_limit()
+
+    def enforce_limit(self) -> None:
+        """Fshin hyrjet më pak të përdorura derisa totali të jetë nën max_bytes."""
+        with self._lock:
+            files = []
+            total = 0
+            for p in self.root.glob(f"*{_SUFFIX}"):
+                try:
+                    st_ = p.stat()
+                except OSError:
+                    continue
+                files.append((st_.st_mtime, st_.st_size, p))
+                total += st_.st_size
+            if total <= self.max_bytes:
+                return
+            files.sort()
+            for _, size, p in files:
+                if total <= self.max_bytes:
+                    break
+                _safe_unlink(p)
+                total -= size
+                self.evicted += 1
+
+    def clear(self) -> int:
+        """Fshin të gjitha hyrjet; kthen numrin e skedarëve të fshirë."""
+        n = 0
+        with self._lock:
+            for p in self.root.glob(f"*{_SUFFIX}"):
+                if _safe_unlink(p):
+                    n += 1
+        return n
+
+    def stats(self) -> Dict[str, Any]:
+        entries = 0
+        size = 0
+        for p in self.root.glob(f"*{_SUFFIX}"):
+            try:
+                size += p.stat().st_size
+                entries += 1
+            except OSError:
+                continue
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evicted": self.evicted,
+                "entries": entries,
+                "size_mb": round(size / (1024 * 1024), 2),
+                "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "ttl_sec": self.ttl_sec,
+            }
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+def _safe_unlink(path: Path) -> bool:
+    try:
+        path.unlink()
+        return True
+    except OSError:
+        return False
+
+
+# -------------------- Instanca e procesit --------------------
+_CACHE: Optional[QueryCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_query_cache() -> Optional[QueryCache]:
+    """Kthen cache-in e procesit, ose None kur është çaktivizuar në settings."""
+    global _CACHE
+    from core.status_settings import get_query_cache_settings
+
+    cfg = get_query_cache_settings()
+    if not cfg["enabled"]:
+        return None
+    with _CACHE_LOCK:
+        max_bytes = int(cfg["max_mb"] * 1024 * 1024)
+        if _CACHE is None:
+            _CACHE = QueryCache(
+                CACHE_DIR, ttl_sec=cfg["ttl_sec"], max_bytes=max_bytes,
+                closed_grace_hours=cfg["closed_grace_hours"],
+            )
+        else:
+            _CACHE.ttl_sec = float(cfg["ttl_sec"])
+            _CACHE.max_bytes = max_bytes
+            _CACHE.closed_grace_hours = float(cfg["closed_grace_hours"])
+        return _CACHE
+
+
+def clear_query_cache() -> int:
+    """Fshin gjithë cache-in në disk (p.sh. pas korrigjimeve manuale në DB)."""
+    return QueryCache(CACHE_DIR).clear()
@@ -0,0 +1,239 @@
+"""
+core/query_metrics.py
+
+PURPOSE:
+    Regjistër në proces për kohën dhe madhësinë e çdo query-je të Vicidial
+    (fetch_* / iter_* në core/db_vicidial.py).
+
+    Kur Smart Report është i ngadaltë, duhet ditur nëse koha shkoi te DB-ja,
+    te rrjeti apo te puna me pandas në faqe. Çdo query që kalon nga get_conn()
+    regjistrohet këtu me kohët e ndara sipas fazës, rreshtat dhe bajtet.
+
+KEY FEATURES:
+    - QueryRecord: label, db_key, burimi (db/cache/memo/stream), route
+      (primary/replica, core/db_replica.py), wait_ms (pritje
+      për lidhje në pool), exec_ms (DB + rrjeti), fetch_ms, convert_ms (DataFrame),
+      total_ms, rows, bytes, gabimi
+    - Regjistër thread-safe me kufi (MAX_RECORDS); seq rritës që faqja të
+      shfaqë vetëm query-t e ekzekutimit të saj (mark() / records(since=...))
+    - Përmbledhje sipas label (count, total, p50, max, rows, bytes)
+    - Eksport JSON lines për analizë offline (to_jsonl / dump_jsonl)
+
+KUFIZIME:
+    - pymysql nuk numëron bajtet e socket-it: `bytes` është madhësia e vlerave
+      në protokollin tekst (gjatësia e vlerës + 1 bajt gjatësie), afër payload-it
+      real; mbi BYTES_SAMPLE_ROWS rreshta ekstrapolohet nga mostra. Leximet
+      nga cache/memo nuk numërojnë bajte (nuk kalojnë nga rrjeti).
+    - Me cursor-in DictCursor (buffered) i gjithë rezultati lexohet brenda
+      execute(): exec_ms përfshin edhe transferimin, fetch_ms është ~0.
+      Për streaming (SSDictCursor) transferimi bie te fetch_ms.
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+MAX_RECORDS = 5000
+BYTES_SAMPLE_ROWS = 2000
+
+SOURCES = ("db", "cache", "memo", "stream")
+
+
+@dataclass
+class QueryRecord:
+    """Një query e vetme (ose një lexim nga cache/memo)."""
+    label: str
+    db_key: str
+    source: str = "db"
+    route: str = ""
+    started_at: str = ""
+    wait_ms: float = 0.0
+    exec_ms: float = 0.0
+    fetch_ms: float = 0.0
+    convert_ms: float = 0.0
+    total_ms: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    error: Optional[str] = None
+    thread: str = ""
+    seq: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _value_bytes(value: Any) -> int:
+    if value is None:
+        return 1
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + 1
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "replace")) + 1
+    return len(str(value)) + 1
+
+
+def estimate_bytes(rows: Any, sample: int = BYTES_SAMPLE_ROWS) -> int:
+    """Madhësia e përafërt në wire e rreshtave (dict, tuple ose DataFrame).
+
+    Mbi `sample` rreshta mesatarja e mostrës shumëzohet me numrin e rreshtave,
+    që matja të mos kushtojë sa vetë query-ja për rezultatet per-phone.
+    """
+    if rows is None:
+        return 0
+    n = count_rows(rows)
+    if hasattr(rows, "itertuples"):
+        rows = rows.head(sample).itertuples(index=False, name=None)
+    total = seen = 0
+    for r in rows:
+        if seen >= sample:
+            break
+        values = r.values() if isinstance(r, dict) else r
+        total += sum(_value_bytes(v) for v in values)
+        seen += 1
+    if seen and n > seen:
+        return int(total / seen * n)
+    return total
+
+
+def count_rows(rows: Any) -> int:
+    """Numri i rreshtave për listë, DataFrame ose dict (p.sh. {list_id: n})."""
+    try:
+        return len(rows)
+    except TypeError:
+        return 0
+
+
+class _Span:
+    """Matës për fazat e një query-je; krijohet nga MetricsRegistry.span()."""
+
+    def __init__(self, record: QueryRecord):
+        self.record = record
+        self._t0 = self._last = time.perf_counter()
+        self._skipped = 0.0
+
+    def lap(self, phase: str) -> None:
+        """Shton kohën që nga lap-i i fundit te `<phase>_ms`."""
+        now = time.perf_counter()
+        attr = f"{phase}_ms"
+        setattr(self.record, attr, round(getattr(self.record, attr) + (now - self._last) * 1000.0, 3))
+        self._last = now
+
+    def skip(self) -> None:
+        """Koha që nga lap-i i fundit nuk i shkon asnjë faze (p.sh. konsumuesi i batch-it)."""
+        now = time.perf_counter()
+        self._skipped += now - self._last
+        self._last = now
+
+    def result(self, rows: Any, count_bytes: bool = True) -> None:
+        self.record.rows += count_rows(rows)
+        if count_bytes and not isinstance(rows, dict):
+            self.record.bytes += estimate_bytes(rows)
+
+
+class MetricsRegistry:
+    """Regjistër thread-safe i QueryRecord, me kufi MAX_RECORDS (FIFO)."""
+
+    def __init__(self, max_records: int = MAX_RECORDS):
+        self._lock = threading.Lock()
+        self._records: Deque[QueryRecord] = deque(maxlen=max(1, int(max_records)))
+        self._seq = 0
+
+    def mark(self) -> int:
+        """Seq aktual: records(since=mark) kthen vetëm query-t pas kësaj pike."""
+        with self._lock:
+            return self._seq
+
+    def add(self, record: QueryRecord) -> QueryRecord:
+        with self._lock:
+            self._seq += 1
+            record.seq = self._seq
+            self._records.append(record)
+        return record
+
+    def span(self, label: str, db_key: str, source: str = "db") -> "_Span":
+        return _Span(QueryRecord(
+            label=label or "query",
+            db_key=db_key,
+            source=source,
+            started_at=datetime.now().isoformat(timespec="milliseconds"),
+            thread=threading.current_thread().name,
+        ))
+
+    def finish(self, span: "_Span", error: Optional[BaseException] = None) -> QueryRecord:
+        """Mbyll span-in (total_ms) dhe e shton në regjistër."""
+        rec = span.record
+        rec.total_ms = round((time.perf_counter() - span._t0 - span._skipped) * 1000.0, 3)
+        if error is not None:
+            rec.error = f"{type(error).__name__}: {error}"
+        return self.add(rec)
+
+    def records(self, since: int = 0) -> List[QueryRecord]:
+        with self._lock:
+            return [r for r in self._records if r.seq > since]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def summary(self, since: int = 0) -> List[Dict[str, Any]]:
+        """Përmbledhje sipas (label, source), renditur sipas kohës totale."""
+        groups: Dict[tuple, List[QueryRecord]] = {}
+        for r in self.records(since):
+            groups.setdefault((r.label, r.source), []).append(r)
+        out = []
+        for (label, source), recs in groups.items():
+            times = sorted(r.total_ms for r in recs)
+            out.append({
+                "label": label,
+                "source": source,
+                "count": len(recs),
+                "total_ms": round(sum(times), 3),
+                "p50_ms": times[len(times) // 2],
+                "max_ms": times[-1],
+                "wait_ms": round(sum(r.wait_ms for r in recs), 3),
+                "exec_ms": round(sum(r.exec_ms for r in recs), 3),
+                "fetch_ms": round(sum(r.fetch_ms for r in recs), 3),
+                "convert_ms": round(sum(r.convert_ms for r in recs), 3),
+                "rows": sum(r.rows for r in recs),
+                "bytes": sum(r.bytes for r in recs),
+                "errors": sum(1 for r in recs if r.error),
+            })
+        out.sort(key=lambda d: d["total_ms"], reverse=True)
+        return out
+
+    def to_jsonl(self, since: int = 0) -> str:
+        return "".join(json.dumps(r.to_dict(), ensure_ascii=False) + "\n" for r in self.records(since))
+
+    def dump_jsonl(self, path: Path, since: int = 0, append: bool = True) -> int:
+        """Shkruan query-t si JSON lines; kthen numrin e rreshtave të shkruar."""
+        records = self.records(since)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a" if append else "w", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(r.to_dict(), ensure_ascii=False) + "\n")
+        return len(records)
+
+
+def load_jsonl(path: Path) -> Iterable[QueryRecord]:
+    """Lexon një file të shkruar nga dump_jsonl (për analizë offline)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield QueryRecord(**json.loads(line))
+
+
+_REGISTRY = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _REGISTRY
@@ -0,0 +1,244 @@
+"""
+core/query_templates.py
+
+PURPOSE:
+    Query SQL me parametra të lidhur (bound), për skriptet që ndërtonin SQL
+    me f-string (collect_vicidial_data.py, local_vici_downloader_oauth.py,
+    analyze_campaign_flow.py).
+
+    Template-i shkruhet një herë me vende të emërtuara `%(emri)s`; vlerat
+    kalojnë te driver-i si parametra, kurrë të ngjitura në tekst. Listat
+    (campaign_id IN (...), lead_id IN (...)) zgjerohen në `%s, %s, ...` me
+    madhësi të rrumbullakuara në "bucket" (8, 16, 32, ...), kështu që një
+    template prodhon pak forma të ndryshme SQL dhe teksti i zgjeruar ruhet
+    në cache në vend që të rindërtohet për çdo thirrje.
+
+KEY FEATURES:
+    - QueryTemplate: SQL me `%(emri)s`; `%` literale (LIKE '%x%') ruhen të sakta
+    - bind(): (sql, args) gati për cursor.execute, me IN të zgjeruar në bucket
+    - execute(): bind + execute + fetchall
+    - iter_chunked(): listë e madhe ID-sh → disa query me IN të kufizuar
+    - temp_id_table(): ID-të në një tabelë TEMPORARY (MEMORY) për JOIN;
+      fetch_with_id_set() zgjedh vetë chunk ose tabelë të përkohshme; pa
+      privilegjin CREATE TEMPORARY TABLES kthehet te IN në copa
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+# Madhësia minimale e bucket-it për listat IN
+_MIN_BUCKET = 8
+
+# Mbi këtë numër ID-sh, fetch_with_id_set() përdor tabelë të përkohshme
+TEMP_TABLE_THRESHOLD = 5000
+# Copa sa një bucket (fuqi e 2-shit), që copa të plota të mos kenë vende të mbushura
+DEFAULT_CHUNK_SIZE = 1024
+
+# Kodet MySQL për "access denied" (1044 DB, 1142 tabelë, 1227 privilegj global)
+_PRIVILEGE_ERRORS = frozenset({1044, 1142, 1227})
+
+
+@dataclass(frozen=True)
+class QueryTemplate:
+    """SQL me vende të emërtuara `%(emri)s`.
+
+    Args:
+        name: Emri (për log / metrika)
+        sql: Teksti; `IN (%(ids)s)` pranon listë vlerash
+    """
+    name: str
+    sql: str
+    params: Tuple[str, ...] = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "params", tuple(dict.fromkeys(_PLACEHOLDER.findall(self.sql))))
+
+
+def bucket_size(n: int) -> int:
+    """Madhësia e listës IN pas rrumbullakimit: 8, 16, 32, ... (≥ n)."""
+    size = _MIN_BUCKET
+    while size < n:
+        size *= 2
+    return size
+
+
+@lru_cache(maxsize=512)
+def _split(sql: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """(copat e tekstit, emrat) — copat kanë `%` literale të dyfishuara për driver-in."""
+    texts: List[str] = []
+    names: List[str] = []
+    pos = 0
+    for m in _PLACEHOLDER.finditer(sql):
+        texts.append(sql[pos:m.start()].replace("%", "%%"))
+        names.append(m.group(1))
+        pos = m.end()
+    texts.append(sql[pos:].replace("%", "%%"))
+    return tuple(texts), tuple(names)
+
+
+@lru_cache(maxsize=2048)
+def _render(sql: str, shape: Tuple[int, ...]) -> str:
+    """Teksti përfundimtar për një formë (0 = skalar, n = listë me n vende)."""
+    texts, _ = _split(sql)
+    out = [texts[0]]
+    for width, text in zip(shape, texts[1:]):
+        out.append("%s" if width == 0 else ", ".join(["%s"] * width))
+        out.append(text)
+    return "".join(out)
+
+
+def _is_list(value: Any) -> bool:
+    return isinstance(value, (list, tuple, set, frozenset))
+
+
+def bind(
+    template: "QueryTemplate | str",
+    params: Optional[Mapping[str, Any]] = None,
+    **kwargs: Any,
+) -> Tuple[str, Optional[Tuple[Any, ...]]]:
+    """Kthen (sql, args) për cursor.execute.
+
+    Listat zgjerohen në bucket-in e tyre duke përsëritur vlerën e fundit
+    (IN nuk ndryshon rezultatin). Kur template-i nuk ka parametra, args=None
+    dhe SQL kthehet i pandryshuar.
+
+    `%` literale dyfishohen (stili pymysql, ku SQL formatohet me `%`);
+    për mysql.connector, template-t me parametra nuk duhet të kenë `%` literale.
+
+    Raises:
+        KeyError: kur mungon një parametër
+        ValueError: kur një listë është bosh
+    """
+    sql = template.sql if isinstance(template, QueryTemplate) else template
+    values: Dict[str, Any] = dict(params or {}, **kwargs)
+    _, names = _split(sql)
+    if not names:
+        return sql, None
+    shape: List[int] = []
+    args: List[Any] = []
+    for name in names:
+        value = values[name]
+        if _is_list(value):
+            items = list(value)
+            if not items:
+                raise ValueError(f"Lista '{name}' është bosh (IN () nuk është SQL i vlefshëm)")
+            width = bucket_size(len(items))
+            args.extend(items)
+            args.extend([items[-1]] * (width - len(items)))
+            shape.append(width)
+        else:
+            args.append(value)
+            shape.append(0)
+    return _render(sql, tuple(shape)), tuple(args)
+
+
+def execute(
+    cursor: Any,
+    template: "QueryTemplate | str",
+    params: Optional[Mapping[str, Any]] = None,
+    **kwargs: Any,
+) -> List[Any]:
+    """bind() + cursor.execute() + fetchall()."""
+    sql, args = bind(template, params, **kwargs)
+    cursor.execute(sql, args)
+    return list(cursor.fetchall())
+
+
+def iter_chunked(
+    cursor: Any,
+    template: "QueryTemplate | str",
+    list_param: str,
+    values: Sequence[Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **params: Any,
+) -> Iterator[List[Any]]:
+    """Ekzekuton template-in për çdo copë të `values` (IN i kufizuar); jep rreshtat e çdo cope."""
+    items = list(values)
+    for i in range(0, len(items), max(1, int(chunk_size))):
+        yield execute(cursor, template, params, **{list_param: items[i:i + chunk_size]})
+
+
+@contextmanager
+def temp_id_table(
+    cursor: Any,
+    values: Sequence[Any],
+    name: str = "_tmp_ids",
+    column_type: str = "BIGINT",
+    batch_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Tabelë TEMPORARY (id PRIMARY KEY) me `values`, e fshirë në dalje.
+
+    Tabelat TEMPORARY janë për lidhje, ndaj cursor-i duhet të mbetet në të
+    njëjtën lidhje gjatë gjithë bllokut.
+
+    Kërkon privilegjin CREATE TEMPORARY TABLES në databazën aktuale
+    (përdoruesit read-only të raportimit shpesh nuk e kanë); pa të, CREATE
+    dështon me gabimin e driver-it (1044/1142) para se blloku të fillojë.
+    fetch_with_id_set() e kap këtë rast dhe kalon te IN në copa.
+
+    Example:
+        >>> with temp_id_table(cur, lead_ids) as tmp:
+        ...     cur.execute(f"SELECT r.* FROM recording_log r JOIN {tmp} t ON t.id = r.lead_id")
+    """
+    if not re.fullmatch(r"\w+", name) or not re.fullmatch(r"[\w() ]+", column_type):
+        raise ValueError("Emër tabele ose tip kolone i pavlefshëm")
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {name}")
+    cursor.execute(f"CREATE TEMPORARY TABLE {name} (id {column_type} NOT NULL PRIMARY KEY) ENGINE=MEMORY")
+    try:
+        items = list(dict.fromkeys(values))
+        for i in range(0, len(items), batch_size):
+            cursor.executemany(f"INSERT INTO {name} (id) VALUES (%s)", [(v,) for v in items[i:i + batch_size]])
+        yield name
+    finally:
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {name}")
+
+
+def fetch_with_id_set(
+    cursor: Any,
+    template: "QueryTemplate | str",
+    list_param: str,
+    values: Sequence[Any],
+    threshold: int = TEMP_TABLE_THRESHOLD,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    column_type: str = "BIGINT",
+    **params: Any,
+) -> List[Any]:
+    """Rreshtat për `... IN (%(list_param)s)` me një listë ID-sh të çfarëdoshme.
+
+    Deri në `threshold` ID: query me IN në copa. Mbi të: ID-të futen në një
+    tabelë të përkohshme dhe `IN (%(list_param)s)` zëvendësohet me
+    `IN (SELECT id FROM tabela)`, pra një query e vetme. Kur përdoruesi nuk ka
+    privilegjin CREATE TEMPORARY TABLES, përdoret sërish IN në copa.
+    """
+    items = list(dict.fromkeys(values))
+    if not items:
+        return []
+    if len(items) > threshold:
+        sql = template.sql if isinstance(template, QueryTemplate) else template
+        try:
+            with temp_id_table(cursor, items, name=f"_tmp_{list_param}", column_type=column_type) as tmp:
+                joined = sql.replace(f"%({list_param})s", f"SELECT id FROM {tmp}")
+                return execute(cursor, joined, params)
+        except Exception as e:
+            if not _is_privilege_error(e):
+                raise
+    rows: List[Any] = []
+    for part in iter_chunked(cursor, template, list_param, items, chunk_size, **params):
+        rows.extend(part)
+    return rows
+
+
+def _is_privilege_error(exc: BaseException) -> bool:
+    """True për "access denied" nga MySQL (pymysql: args[0], mysql.connector: errno)."""
+    code = getattr(exc, "errno", None)
+    if code is None and exc.args:
+        code = exc.args[0]
+    return code in _PRIVILEGE_ERRORS
@@ -0,0 +1,283 @@
+"""
+core/report_frames.py
+
+PURPOSE:
+    Llogaritje kolonore (pandas/NumPy) për tabelat e Smart Report
+    (pages/3_Rezultatet_e_Listave.py).
+
+    Faqja ndërtonte 01_List_Cost dhe 02_Status_Mix_Cost me cikle Python mbi
+    lista dict-esh (kosto, resa %, kosto/inbound rresht për rresht) dhe vetëm
+    në fund thërriste pd.DataFrame.from_records. Këtu e njëjta llogaritje bëhet
+    me operacione vektoriale mbi kolona.
+
+KEY FEATURES:
+    - frame_from_cursor(): DataFrame me tipe (int64/float64) direkt nga
+      cursor-i pymysql (tuple), pa krijuar një dict për rresht
+    - build_list_cost_frame(): 01_List_Cost + totalet për KPI
+    - build_status_mix_frame(): 02_Status_Mix_Cost (pivot list × status)
+    - build_svyclm_quality_frame(): 03_SVYCLM_Quality me join të indeksuar
+      sipas list_id (timeout, dials, inbound, emri) në vend të lookup-eve për rresht
+    - Pranojnë si hyrje si DataFrame (modaliteti kolonor) ashtu edhe listë dict-esh
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import re
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Rows = Sequence[Dict[str, Any]]
+RowsOrFrame = Union[Rows, pd.DataFrame]
+
+MOBILE_LIST_RE = r"(?:mobile|cell|cellulare|gsm|mob)"
+FIX_LIST_RE = r"(?:fix|fisso|landline|fixed)"
+
+LIST_COST_COLUMNS = [
+    "list_id", "list_name", "list_type", "total_dials", "inbound_calls",
+    "resa_%", "total_min", "voip_cost_eur", "cost_per_inbound_eur",
+]
+
+SVYCLM_QUALITY_COLUMNS = [
+    "list_id", "list_name", "total_dials", "svyclm_calls", "svyclm_timeout",
+    "svyclm_timeout_ratio", "inbound_calls", "resa_%", "notes",
+]
+
+# Kodet e tipeve të pymysql (pymysql.constants.FIELD_TYPE), pa e importuar pymysql këtu
+_INT_TYPES = {1, 2, 3, 8, 9, 13}   # TINY, SHORT, LONG, LONGLONG, INT24, YEAR
+_FLOAT_TYPES = {0, 4, 5, 246}      # DECIMAL, FLOAT, DOUBLE, NEWDECIMAL
+
+
+def infer_list_type(list_name: str) -> str:
+    """Lloji i listës nga emri: "mobile", "fix" ose "unknown"."""
+    n = (list_name or "").lower()
+    if re.search(MOBILE_LIST_RE, n):
+        return "mobile"
+    if re.search(FIX_LIST_RE, n):
+        return "fix"
+    return "unknown"
+
+
+def frame_from_cursor(description: Sequence[Sequence[Any]], rows: Sequence[Sequence[Any]]) -> pd.DataFrame:
+    """DataFrame me tipe nga cursor.description + rreshtat tuple të cursor-it.
+
+    Kolonat DECIMAL/SUM() bëhen float64, kolonat e plota int64 (ose Int64 kur ka NULL).
+    """
+    columns = [d[0] for d in description]
+    df = pd.DataFrame.from_records(list(rows), columns=columns)
+    for d in description:
+        name, type_code = d[0], d[1]
+        if type_code in _FLOAT_TYPES:
+            df[name] = pd.to_numeric(df[name], errors="coerce").astype("float64")
+        elif type_code in _INT_TYPES:
+            col = pd.to_numeric(df[name], errors="coerce")
+            df[name] = col.astype("Int64") if col.isna().any() else col.astype("int64")
+    return df
+
+
+def _as_frame(data: Optional[RowsOrFrame], columns: Sequence[str]) -> pd.DataFrame:
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame.from_records(list(data or []), columns=list(columns))
+
+
+def _map_inbound(list_ids: pd.Series, inbound_map: Mapping[int, int]) -> pd.Series:
+    return list_ids.astype("int64").map(inbound_map).fillna(0).astype("int64")
+
+
+def build_list_cost_frame(
+    outbound: Optional[RowsOrFrame],
+    inbound_map: Mapping[int, int],
+    mobile_rate: float,
+    fix_rate: float,
+    type_filter: str = "all",
+) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """01_List_Cost: kosto VoIP, resa % dhe kosto/inbound për çdo listë.
+
+    Args:
+        outbound: Rreshtat e fetch_outbound_by_list_statuses (list_id, list_name,
+            total_dials, total_sec), si listë dict-esh ose DataFrame
+        inbound_map: {list_id: inbound_calls}
+        mobile_rate, fix_rate: €/min
+        type_filter: "all", "mobile" ose "fix"
+
+    Returns:
+        (df, totals): df me LIST_COST_COLUMNS, i renditur sipas kosto/inbound
+        (bosh në fund) dhe resa % zbritëse; totals me total_dials, inbound_calls,
+        total_voip_cost, total_minutes të llogaritura pas filtrit të tipit.
+    """
+    ob = _as_frame(outbound, ["list_id", "list_name", "total_dials", "total_sec"])
+    if ob.empty:
+        df = pd.DataFrame(columns=LIST_COST_COLUMNS)
+        return df, {"total_dials": 0, "inbound_calls": 0, "total_voip_cost": 0.0, "total_minutes": 0.0}
+
+    names = ob["list_name"].fillna("").astype(str).str.lower()
+    is_mobile = names.str.contains(MOBILE_LIST_RE, regex=True).to_numpy()
+    is_fix = ~is_mobile & names.str.contains(FIX_LIST_RE, regex=True).to_numpy()
+    list_type = np.select([is_mobile, is_fix], ["mobile", "fix"], "unknown")
+    rate = np.select([is_mobile, is_fix], [mobile_rate, fix_rate], max(mobile_rate, fix_rate)).astype("float64")
+
+    total_dials = pd.to_numeric(ob["total_dials"], errors="coerce").fillna(0).astype("int64").to_numpy()
+    total_sec = pd.to_numeric(ob["total_sec"], errors="coerce").fillna(0).astype("float64").to_numpy()
+    inbound = _map_inbound(ob["list_id"], inbound_map).to_numpy()
+
+    total_min = total_sec / 60.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        voip_cost = np.where(rate != 0, total_min * rate, np.nan)
+        resa_pct = np.where(total_dials != 0, inbound / total_dials * 100.0, np.nan)
+        cpi = np.where((inbound != 0) & ~np.isnan(voip_cost), voip_cost / inbound, np.nan)
+
+    df = pd.DataFrame({
+        "list_id": ob["list_id"].to_numpy(),
+        "list_name": ob["list_name"].to_numpy(),
+        "list_type": list_type,
+        "total_dials": total_dials,
+        "inbound_calls": inbound,
+        "resa_%": np.round(resa_pct, 2),
+        "total_min": np.round(total_min, 2),
+        "voip_cost_eur": np.round(voip_cost, 4),
+        "cost_per_inbound_eur": np.round(cpi, 4),
+    })
+
+    # Renditja: kosto/inbound rritëse (pa kosto në fund), pastaj resa % zbritëse
+    order = np.lexsort((
+        -df["resa_%"].fillna(0.0).to_numpy(),
+        df["cost_per_inbound_eur"].fillna(1e9).to_numpy(),
+    ))
+    df = df.iloc[order].reset_index(drop=True)
+
+    if type_filter != "all":
+        df = df[df["list_type"] == type_filter].reset_index(drop=True)
+
+    totals = {
+        "total_dials": int(df["total_dials"].sum()),
+        "inbound_calls": int(df["inbound_calls"].sum()),
+        "total_voip_cost": float(df["voip_cost_eur"].fillna(0).sum()),
+        "total_minutes": float(df["total_min"].sum()),
+    }
+    return df, totals
+
+
+def build_status_mix_frame(
+    distribution: Optional[RowsOrFrame],
+    name_map: Mapping[int, str],
+    inbound_map: Mapping[int, int],
+    status_costs: Mapping[str, float],
+) -> pd.DataFrame:
+    """02_Status_Mix_Cost: thirrjet sipas statusit për çdo listë dhe kosto e statuseve.
+
+    Args:
+        distribution: Rreshtat e fetch_status_distribution_by_list (list_id, status,
+            calls, total_sec), si listë dict-esh ose DataFrame
+        name_map: {list_id: list_name}
+        inbound_map: {list_id: inbound_calls}
+        status_costs: {STATUS: € për thirrje}
+
+    Returns:
+        DataFrame: list_id, total_dials, total_sec, <STATUS>_calls..., list_name,
+        inbound_calls, status_cost_total_eur, status_cost_per_dial_eur,
+        status_cost_per_inbound_eur. Bosh (pa kolona) kur nuk ka të dhëna.
+    """
+    dist = _as_frame(distribution, ["list_id", "status", "calls", "total_sec"])
+    if dist.empty:
+        return pd.DataFrame()
+
+    base = pd.DataFrame({
+        "list_id": dist["list_id"].astype("int64").to_numpy(),
+        "status": dist["status"].fillna("").astype(str).str.upper().to_numpy(),
+        "calls": pd.to_numeric(dist["calls"], errors="coerce").fillna(0).astype("int64").to_numpy(),
+        "total_sec": pd.to_numeric(dist["total_sec"], errors="coerce").fillna(0).astype("float64").to_numpy(),
+    })
+
+    # Listat dhe statuset sipas radhës së shfaqjes së parë
+    list_order = base["list_id"].drop_duplicates()
+    status_order = base["status"].drop_duplicates().tolist()
+
+    totals = base.groupby("list_id", sort=False)[["calls", "total_sec"]].sum()
+    totals = totals.rename(columns={"calls": "total_dials"})
+    calls = base.pivot_table(index="list_id", columns="status", values="calls", aggfunc="sum", sort=False)
+    calls = calls.reindex(columns=status_order)
+
+    costs = np.array([float(status_costs.get(s, 0.0)) for s in status_order], dtype="float64")
+    total_cost = calls.fillna(0).to_numpy(dtype="float64") @ costs
+
+    calls.columns = [f"{s}_calls" for s in status_order]
+    out = totals.join(calls).reindex(list_order.to_numpy())
+    out.index.name = "list_id"
+    out = out.reset_index()
+
+    lids = out["list_id"]
+    out["list_name"] = lids.map(name_map)
+    missing = out["list_name"].isna()
+    out.loc[missing, "list_name"] = "LIST " + lids[missing].astype(str)
+    out["inbound_calls"] = _map_inbound(lids, inbound_map)
+
+    total_cost = pd.Series(total_cost, index=out.index)
+    td = out["total_dials"]
+    ib = out["inbound_calls"]
+    out["status_cost_total_eur"] = total_cost.round(4)
+    out["status_cost_per_dial_eur"] = (total_cost / td).where(td != 0).round(6)
+    out["status_cost_per_inbound_eur"] = (total_cost / ib).where(ib != 0).round(6)
+    return out
+
+
+def _index_by_list_id(frame: pd.DataFrame, column: str) -> pd.Series:
+    """Seria {list_id: column} me indeks unik (për dublikatat mbetet e fundit, si dict())."""
+    values = pd.to_numeric(frame[column], errors="coerce").fillna(0).to_numpy()
+    idx = pd.Series(values, index=frame["list_id"].astype("int64").to_numpy())
+    return idx[~idx.index.duplicated(keep="last")]
+
+
+def build_svyclm_quality_frame(
+    svyclm: Optional[RowsOrFrame],
+    timeouts: Optional[RowsOrFrame],
+    list_cost: pd.DataFrame,
+    name_map: Mapping[int, str],
+    inbound_map: Mapping[int, int],
+    warn_ratio: float,
+) -> pd.DataFrame:
+    """03_SVYCLM_Quality: SVYCLM, timeout-et dhe resa % për çdo listë.
+
+    Args:
+        svyclm: Rreshtat e fetch_svyclm_by_list (list_id, svyclm_calls)
+        timeouts: Rreshtat e fetch_svyclm_timeout_by_list (list_id, svyclm_timeout)
+        list_cost: DataFrame i build_list_cost_frame (burimi i total_dials)
+        name_map: {list_id: list_name}
+        inbound_map: {list_id: inbound_calls}
+        warn_ratio: Pragu i timeout/SVYCLM për shënimin "⚠ high timeout"
+
+    Returns:
+        DataFrame me SVYCLM_QUALITY_COLUMNS, një rresht për çdo rresht të svyclm.
+    """
+    sv = _as_frame(svyclm, ["list_id", "svyclm_calls"])
+    if sv.empty:
+        return pd.DataFrame(columns=SVYCLM_QUALITY_COLUMNS)
+
+    lids = sv["list_id"].astype("int64").reset_index(drop=True)
+    sv_calls = pd.to_numeric(sv["svyclm_calls"], errors="coerce").fillna(0).astype("int64").to_numpy()
+
+    to = _as_frame(timeouts, ["list_id", "svyclm_timeout"])
+    sv_timeout = lids.map(_index_by_list_id(to, "svyclm_timeout")).fillna(0).astype("int64").to_numpy()
+    total_dials = lids.map(_index_by_list_id(list_cost, "total_dials")).fillna(0).astype("int64").to_numpy()
+    inbound = _map_inbound(lids, inbound_map).to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(sv_calls != 0, sv_timeout / sv_calls, np.nan)
+        resa_pct = np.where(total_dials != 0, inbound / total_dials * 100.0, np.nan)
+
+    names = lids.map(name_map).astype(object)
+    names = names.where(names.notna(), "LIST " + lids.astype(str))
+
+    return pd.DataFrame({
+        "list_id": lids.to_numpy(),
+        "list_name": names.to_numpy(),
+        "total_dials": total_dials,
+        "svyclm_calls": sv_calls,
+        "svyclm_timeout": sv_timeout,
+        "svyclm_timeout_ratio": np.round(ratio, 3),
+        "inbound_calls": inbound,
+        "resa_%": np.round(resa_pct, 2),
+        "notes": np.where(ratio >= warn_ratio, "⚠ high timeout", ""),
+    })
@@ -0,0 +1,221 @@
+"""
+core/report_queries.py
+
+PURPOSE:
+    Ekzekutim paralel i query-ve të Smart Report (pages/3_Rezultatet_e_Listave.py).
+
+    Me "Raport i Plotë" faqja bënte 8 query të pavarura njëra pas tjetrës
+    (outbound, inbound, status mix, per-phone, SVYCLM...). Secila është një
+    agregat i veçantë mbi vicidial_log ose vicidial_ivr_response, ndaj këtu
+    ekzekutohen njëkohësisht, secila në lidhjen e vet nga pool-i
+    (core/db_pool.py). Koha totale bëhet sa query-ja më e ngadaltë.
+
+    Gjithë ekzekutimi bëhet brenda db_vicidial.report_scope(), kështu që
+    query identike (p.sh. per-phone) ekzekutohen vetëm një herë, dhe
+    per-phone ALL/të filtruara merren nga një skanim i vetëm.
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import contextvars
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.db_vicidial import (
+    fetch_outbound_by_list_statuses,
+    get_inbound_calls_by_list,
+    fetch_status_distribution_by_list,
+    fetch_dials_by_phone_split,
+    fetch_inbound_by_phone,
+    fetch_svyclm_by_list,
+    fetch_svyclm_timeout_by_list,
+    report_scope,
+)
+from core.status_settings import get_db_pool_limits, get_columnar_results
+from core.time_slices import serial_slices, slice_progress
+
+Rows = Sequence[Dict[str, Any]]
+
+# Kodet e IVR që numërohen si timeout në 03_SVYCLM_Quality
+DEFAULT_TIMEOUT_CODES: List[str] = ["TIMEOUT", "t", "TIME-OUT"]
+
+
+@dataclass
+class SmartReportData:
+    """Rezultatet e të gjitha query-ve të një ekzekutimi të Smart Report.
+
+    Fushat e raportit të plotë mbeten bosh kur full=False. Me columnar=True,
+    outbound_by_list dhe status_distribution janë pandas.DataFrame.
+    """
+    outbound_by_list: Rows = field(default_factory=list)
+    inbound_by_list: Dict[int, int] = field(default_factory=dict)
+    status_distribution: Rows = field(default_factory=list)
+    dials_by_phone_filtered: Rows = field(default_factory=list)
+    dials_by_phone_all: Rows = field(default_factory=list)
+    inbound_by_phone: Rows = field(default_factory=list)
+    svyclm_by_list: Rows = field(default_factory=list)
+    svyclm_timeout_by_list: Rows = field(default_factory=list)
+    timings_sec: Dict[str, float] = field(default_factory=dict)
+    wall_time_sec: float = 0.0
+
+
+def _build_jobs(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    ivr_code: str,
+    dial_statuses: Optional[Sequence[str]],
+    full: bool,
+    timeout_codes: Sequence[str],
+    stream_phone_rows: bool = False,
+    columnar: bool = False,
+) -> List[Tuple[str, Tuple[str, ...], Callable[[], Any]]]:
+    """Lista e query-ve si (emri, fushat në SmartReportData, thirrja).
+
+    Kur një query mbush disa fusha, thirrja kthen një tuple me të njëjtin rend.
+    Me stream_phone_rows, query-të per-phone nuk përfshihen: faqja i lexon me
+    db_vicidial.iter_* pas këtij hapi.
+    """
+    jobs: List[Tuple[str, Tuple[str, ...], Callable[[], Any]]] = [
+        ("outbound_by_list", ("outbound_by_list",),
+         lambda: fetch_outbound_by_list_statuses(from_ts, to_ts, campaign_id, dial_statuses, as_frame=columnar)),
+        ("inbound_by_list", ("inbound_by_list",),
+         lambda: get_inbound_calls_by_list(from_ts, to_ts, campaign_id, ivr_code)),
+    ]
+    if full:
+        jobs += [
+            ("status_distribution", ("status_distribution",),
+             lambda: fetch_status_distribution_by_list(from_ts, to_ts, campaign_id, as_frame=columnar)),
+            ("svyclm_by_list", ("svyclm_by_list",),
+             lambda: fetch_svyclm_by_list(from_ts, to_ts, campaign_id)),
+            ("svyclm_timeout_by_list", ("svyclm_timeout_by_list",),
+             lambda: fetch_svyclm_timeout_by_list(from_ts, to_ts, campaign_id, timeout_codes)),
+        ]
+        if not stream_phone_rows:
+            jobs += [
+                # Një skanim i vetëm për per-phone ALL + të filtruara
+                ("dials_by_phone", ("dials_by_phone_all", "dials_by_phone_filtered"),
+                 lambda: fetch_dials_by_phone_split(from_ts, to_ts, campaign_id, dial_statuses)),
+                ("inbound_by_phone", ("inbound_by_phone",),
+                 lambda: fetch_inbound_by_phone(from_ts, to_ts, campaign_id, ivr_code)),
+            ]
+    return jobs
+
+
+class _SliceTracker:
+    """Progresi i slice-eve kohore (core/time_slices.py) nga thread-et e query-ve.
+
+    Worker-at vetëm përditësojnë numëruesit; thread-i kryesor i lexon dhe
+    thërret progress(), sepse Streamlit nuk lejon UI nga thread-e të tjerë.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[str, Tuple[int, int]] = {}
+        self._version = 0
+
+    def update(self, label: str, done: int, total: int) -> None:
+        with self._lock:
+            self._runs[label] = (done, total)
+            self._version += 1
+
+    def snapshot(self) -> Tuple[int, int, int]:
+        """(version, slice të kryera, slice gjithsej)."""
+        with self._lock:
+            done = sum(d for d, _ in self._runs.values())
+            total = sum(t for _, t in self._runs.values())
+            return self._version, done, total
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def fetch_smart_report_data(
+    from_ts: str,
+    to_ts: str,
+    campaign_id: str,
+    ivr_code: str,
+    dial_statuses: Optional[Sequence[str]],
+    full: bool = True,
+    timeout_codes: Sequence[str] = DEFAULT_TIMEOUT_CODES,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    stream_phone_rows: bool = False,
+    columnar: Optional[bool] = None,
+) -> SmartReportData:
+    """Ekzekuton paralelisht query-të e Smart Report dhe kthen një SmartReportData.
+
+    Args:
+        from_ts, to_ts: Intervali [from_ts, to_ts)
+        campaign_id: Kampanja
+        ivr_code: Kodi i IVR për inbound
+        dial_statuses: Statuset për 01_List_Cost (None = ALL)
+        full: True për "Raport i Plotë" (status mix, per-phone, SVYCLM)
+        timeout_codes: Kodet e IVR për SVYCLM timeout
+        max_workers: Query paralele (default = madhësia e pool-it)
+        progress: Callback(done, total, emri) i thirrur nga thread-i kryesor
+        stream_phone_rows: Mos lexo per-phone këtu (lexohen me streaming nga faqja)
+        columnar: DataFrame për listat (default nga settings "columnar_results")
+
+    Raises:
+        Gabimin e parë të ndonjë query-je (pasi të kenë mbaruar të tjerat).
+    """
+    if columnar is None:
+        columnar = get_columnar_results()
+    jobs = _build_jobs(
+        from_ts, to_ts, campaign_id, ivr_code, dial_statuses, full, timeout_codes,
+        stream_phone_rows=stream_phone_rows, columnar=columnar,
+    )
+    workers = max_workers or int(get_db_pool_limits()["max_size"])
+    workers = max(1, min(workers, len(jobs)))
+
+    out = SmartReportData()
+    errors: List[Tuple[str, BaseException]] = []
+    tracker = _SliceTracker()
+    seen_version = 0
+    done = 0
+    t0 = time.perf_counter()
+    # Çdo worker mban një lidhje: slice-et e një job-i ekzekutohen serialisht
+    with report_scope(), slice_progress(tracker.update), serial_slices(), \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smart-report") as ex:
+        # Çdo thread merr kopje të kontekstit, që të ndajë memo-n e report_scope()
+        futures = {
+            ex.submit(contextvars.copy_context().run, _timed, fn): (name, fields)
+            for name, fields, fn in jobs
+        }
+        pending = set(futures)
+        while pending:
+            finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                done += 1
+                name, fields = futures[fut]
+                try:
+                    result, elapsed = fut.result()
+                    values = result if len(fields) > 1 else (result,)
+                    for fname, value in zip(fields, values):
+                        if value is None:
+                            value = {} if fname == "inbound_by_list" else []
+                        setattr(out, fname, value)
+                    out.timings_sec[name] = round(elapsed, 3)
+                except Exception as e:
+                    errors.append((name, e))
+                if progress is not None:
+                    progress(done, len(jobs), name)
+            # Intervalet e gjata ndahen në slice-e: trego progresin edhe mes query-ve
+            version, slices_done, slices_total = tracker.snapshot()
+            if progress is not None and not finished and version != seen_version and slices_total:
+                progress(done, len(jobs), f"slice {slices_done}/{slices_total}")
+            seen_version = version
+    out.wall_time_sec = round(time.perf_counter() - t0, 3)
+
+    if errors:
+        name, err = errors[0]
+        raise RuntimeError(f"Query '{name}' dështoi: {err}") from err
+    return out
@@ -0,0 +1,471 @@
+"""
+core/rollup_store.py
+
+PURPOSE:
+    Rollup ditor lokal (SQLite) për agregatet e vicidial_log dhe
+    vicidial_ivr_response, në out_analysis/rollups.sqlite.
+
+    Pa rollup, çdo raport rillogarit GROUP BY list_id/status/orë/telefon nga
+    rreshtat bruto për të gjithë intervalin: një raport 30-ditor skanon 30 ditë
+    vicidial_log çdo herë. Këtu ruhen agregatet për ditë; për ditët e mbyllura
+    lexohet SQLite, dhe live në MySQL pyetet vetëm pjesa e hapur e intervalit
+    (zakonisht dita e sotme).
+
+KEY FEATURES:
+    - Tabela ditore: list×status, list×orë×weekday, telefon×provincë×status,
+      IVR list×orë×weekday×response, IVR telefon×provincë×response
+    - Ingestion vetëm për ditët e mbyllura që mungojnë (loaded_days), një ditë
+      për transaksion: ndërprerja nuk lë ditë gjysmë të ngarkuara
+    - split_window(): intervali ndahet në ditë të plota të mbyllura (rollup)
+      dhe koka/bishti live. Një ditë ngrihet në rollup vetëm pasi të kenë
+      kaluar closed_grace_hours nga mesnata e saj (si te core/query_cache.py):
+      rreshtat e vonuar (thirrje që mbyllen pas mesnatës, replica me vonesë,
+      ora e DB ≠ ora lokale) përndryshe do të humbnin përgjithmonë
+    - merge_additive_rows(): bashkon rreshtat rollup + live duke mbledhur masat
+
+SHËNIM:
+    Provinca e telefonit ngrihet në momentin e ingestion-it (join me
+    vicidial_list). Nëse provinca e lead-it ndryshon më vonë, ditët e ngarkuara
+    mbajnë vlerën e vjetër; fshi rollups.sqlite për t'i rindërtuar.
+
+Moduli nuk varet nga Streamlit as nga pymysql: merr një `fetch(sql, params)`
+që ekzekuton query-në në MySQL (core/db_vicidial.py).
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.query_cache import DEFAULT_CLOSED_GRACE_HOURS, is_closed_window
+
+ROLLUP_PATH = Path.cwd() / "out_analysis" / "rollups.sqlite"
+
+Rows = Sequence[Dict[str, Any]]
+Fetch = Callable[[str, Sequence[Any]], Rows]
+Window = Tuple[str, str]
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+# -------------------- Skema --------------------
+# Për çdo tabelë: kolonat çelës, masat dhe SQL-i i MySQL për një ditë.
+# Parametrat e SQL-it: (campaign_id, day_start, day_end).
+TABLES: Dict[str, Dict[str, Any]] = {
+    "log_list_status": {
+        "keys": ["list_id", "status"],
+        "measures": ["calls", "total_sec"],
+        "source_sql": '''
+            SELECT vl.list_id,
+                   vl.status,
+                   COUNT(*) AS calls,
+                   COALESCE(SUM(vl.length_in_sec), 0) AS total_sec
+            FROM vicidial_log vl
+            WHERE vl.campaign_id = %s
+              AND vl.call_date >= %s AND vl.call_date < %s
+            GROUP BY vl.list_id, vl.status
+        ''',
+    },
+    "log_list_hour": {
+        "keys": ["list_id", "hour_bucket", "weekday"],
+        "measures": ["dials", "total_sec"],
+        "source_sql": '''
+            SELECT vl.list_id,
+                   DATE_FORMAT(vl.call_date, '%%H') AS hour_bucket,
+                   DAYOFWEEK(vl.call_date) AS weekday,
+                   COUNT(*) AS dials,
+                   COALESCE(SUM(vl.length_in_sec), 0) AS total_sec
+            FROM vicidial_log vl
+            WHERE vl.campaign_id = %s
+              AND vl.call_date >= %s AND vl.call_date < %s
+            GROUP BY vl.list_id, hour_bucket, weekday
+        ''',
+    },
+    "log_phone": {
+        "keys": ["phone_number", "province", "status"],
+        "measures": ["dials", "total_sec"],
+        "source_sql": '''
+            SELECT vl.phone_number,
+                   vli.province,
+                   vl.status,
+                   COUNT(*) AS dials,
+                   COALESCE(SUM(vl.length_in_sec), 0) AS total_sec
+            FROM vicidial_log vl
+            LEFT JOIN vicidial_list vli ON vl.lead_id = vli.lead_id
+            WHERE vl.campaign_id = %s
+              AND vl.call_date >= %s AND vl.call_date < %s
+            GROUP BY vl.phone_number, vli.province, vl.status
+        ''',
+    },
+    "ivr_list_hour": {
+        "keys": ["list_id", "hour_bucket", "weekday", "response"],
+        "measures": ["inbound_calls"],
+        "source_sql": '''
+            SELECT vls.list_id AS list_id,
+                   DATE_FORMAT(vir.created, '%%H') AS hour_bucket,
+                   DAYOFWEEK(vir.created) AS weekday,
+                   vir.response,
+                   COUNT(*) AS inbound_calls
+            FROM vicidial_ivr_response vir
+            INNER JOIN vicidial_list vl ON vir.lead_id = vl.lead_id
+            INNER JOIN vicidial_lists vls ON vls.list_id = vl.list_id
+            WHERE vir.campaign = %s
+              AND vir.created >= %s AND vir.created < %s
+            GROUP BY vls.list_id, hour_bucket, weekday, vir.response
+        ''',
+    },
+    "ivr_phone": {
+        "keys": ["phone_number", "province", "response"],
+        "measures": ["inbound_calls"],
+        "source_sql": '''
+            SELECT vl.phone_number,
+                   vli.province,
+                   vir.response,
+                   COUNT(*) AS inbound_calls
+            FROM vicidial_ivr_response vir
+            INNER JOIN vicidial_list vl ON vir.lead_id = vl.lead_id
+            LEFT JOIN vicidial_list vli ON vl.lead_id = vli.lead_id
+            WHERE vir.campaign = %s
+              AND vir.created >= %s AND vir.created < %s
+            GROUP BY vl.phone_number, vli.province, vir.response
+        ''',
+    },
+}
+
+
+# -------------------- Ndarja e intervalit --------------------
+def _parse_ts(value: str) -> datetime:
+    value = value.strip()
+    if len(value) == 10:
+        return datetime.strptime(value, "%Y-%m-%d")
+    if len(value) == 16:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M")
+    return datetime.strptime(value, _TS_FMT)
+
+
+def split_window(
+    from_ts: str,
+    to_ts: str,
+    now: Optional[datetime] = None,
+    grace_hours: float = DEFAULT_CLOSED_GRACE_HOURS,
+) -> Tuple[List[str], List[Window]]:
+    """Ndan [from_ts, to_ts) në ditë të plota të mbyllura dhe intervale live.
+
+    Args:
+        now: Koha aktuale (për teste); default datetime.now()
+        grace_hours: Orët pas mesnatës së një dite para se ajo të ngrihet në rollup
+
+    Returns:
+        (days, live_windows): days = ["YYYY-MM-DD", ...] të njëpasnjëshme që
+        mbulohen tërësisht nga intervali dhe janë të mbyllura sipas
+        query_cache.is_closed_window(); live_windows = [(from, to), ...] pjesa
+        tjetër (koka dhe/ose bishti).
+    """
+    start = _parse_ts(from_ts)
+    end = _parse_ts(to_ts)
+    if end <= start:
+        return [], [(from_ts, to_ts)]
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    first_full = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    if first_full < start:
+        first_full += timedelta(days=1)
+    closed_end = min(end.replace(hour=0, minute=0, second=0, microsecond=0), today)
+    # Dita e djeshme mbetet live derisa të kalojë periudha e pritjes
+    while closed_end > first_full and not is_closed_window(closed_end, now=now, grace_hours=grace_hours):
+        closed_end -= timedelta(days=1)
+
+    if closed_end <= first_full:
+        return [], [(from_ts, to_ts)]
+
+    days: List[str] = []
+    d = first_full
+    while d < closed_end:
+        days.append(d.strftime("%Y-%m-%d"))
+        d += timedelta(days=1)
+
+    live: List[Window] = []
+    if start < first_full:
+        live.append((from_ts, first_full.strftime(_TS_FMT)))
+    if closed_end < end:
+        live.append((closed_end.strftime(_TS_FMT), to_ts))
+    return days, live
+
+
+# -------------------- Bashkimi i rreshtave --------------------
+def merge_additive_rows(
+    parts: Iterable[Rows],
+    keys: Sequence[str],
+    measures: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """Bashkon disa lista rreshtash me të njëjtat kolona, duke mbledhur masat.
+
+    Rreshtat me të njëjtat vlera në `keys` bëhen një; kolonat e tjera
+    (jo-masa) merren nga rreshti i parë. Masat kthehen si int.
+    """
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for rows in parts:
+        for r in rows or []:
+            k = tuple(_norm_key(r.get(c)) for c in keys)
+            acc = merged.get(k)
+            if acc is None:
+                acc = dict(r)
+                for m in measures:
+                    acc[m] = int(r.get(m) or 0)
+                merged[k] = acc
+            else:
+                for m in measures:
+                    acc[m] += int(r.get(m) or 0)
+    return list(merged.values())
+
+
+def _norm_key(v: Any) -> Any:
+    # MySQL mund të kthejë list_id si int ose str; weekday si int
+    if isinstance(v, (bytes, bytearray)):
+        return v.decode("utf-8", "replace")
+    return v
+
+
+# -------------------- Store --------------------
+class RollupStore:
+    """Rollup ditor në SQLite, i ndarë sipas (db_key, campaign_id, day).
+
+    Args:
+        path: Skedari SQLite
+        closed_grace_hours: Pritja pas mesnatës para se një ditë të ngrihet në rollup
+    """
+
+    def __init__(self, path: Path = ROLLUP_PATH, closed_grace_hours: float = DEFAULT_CLOSED_GRACE_HOURS):
+        self.path = Path(path)
+        self.closed_grace_hours = float(closed_grace_hours)
+        # Një lock për (tabelë, db_key, kampanjë, ditë): ditët e ndryshme ngarkohen paralelisht
+        self._day_locks: Dict[Tuple[str, str, str, str], threading.Lock] = {}
+        self._day_locks_guard = threading.Lock()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS loaded_days (
+                    tbl TEXT NOT NULL, db_key TEXT NOT NULL, campaign_id TEXT NOT NULL,
+                    day TEXT NOT NULL, rows INTEGER NOT NULL, loaded_at TEXT NOT NULL,
+                    PRIMARY KEY (tbl, db_key, campaign_id, day)
+                )
+            ''')
+            for name, spec in TABLES.items():
+                key_cols = ", ".join(f"{c} TEXT" for c in spec["keys"])
+                measure_cols = ", ".join(f"{m} INTEGER NOT NULL DEFAULT 0" for m in spec["measures"])
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} ("
+                    f"db_key TEXT NOT NULL, campaign_id TEXT NOT NULL, day TEXT NOT NULL, "
+                    f"{key_cols}, {measure_cols})"
+                )
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS ix_{name}_day ON {name} (db_key, campaign_id, day)"
+                )
+
+    # -------------------- Ingestion --------------------
+    def missing_days(self, table: str, db_key: str, campaign_id: str, days: Sequence[str]) -> List[str]:
+        if not days:
+            return []
+        with closing(self._connect()) as conn:
+            loaded = {
+                r["day"] for r in conn.execute(
+                    "SELECT day FROM loaded_days WHERE tbl = ? AND db_key = ? AND campaign_id = ? "
+                    "AND day >= ? AND day <= ?",
+                    (table, db_key, campaign_id, min(days), max(days)),
+                )
+            }
+        return [d for d in days if d not in loaded]
+
+    def _day_lock(self, table: str, db_key: str, campaign_id: str, day: str) -> threading.Lock:
+        key = (table, db_key, campaign_id, day)
+        with self._day_locks_guard:
+            lock = self._day_locks.get(key)
+            if lock is None:
+                lock = self._day_locks[key] = threading.Lock()
+            return lock
+
+    def ensure_loaded(
+        self,
+        table: str,
+        db_key: str,
+        campaign_id: str,
+        days: Sequence[str],
+        fetch: Fetch,
+    ) -> int:
+        """Ngarkon nga MySQL ditët e mbyllura që mungojnë; kthen numrin e ditëve të reja.
+
+        Çdo ditë ngarkohet nën lock-un e vet: dy query paralele të raportit nuk e
+        ngarkojnë të njëjtën ditë dy herë, por tabelat dhe ditët e ndryshme nuk
+        presin njëra-tjetrën gjatë fetch-it në MySQL.
+        """
+        missing = self.missing_days(table, db_key, campaign_id, days)
+        if not missing:
+            return 0
+        spec = TABLES[table]
+        cols = spec["keys"] + spec["measures"]
+        insert_sql = (
+            f"INSERT INTO {table} (db_key, campaign_id, day, {', '.join(cols)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' * len(cols))})"
+        )
+        loaded = 0
+        for day in missing:
+            with self._day_lock(table, db_key, campaign_id, day):
+                # Një thread tjetër mund ta ketë ngarkuar ndërkohë
+                if not self.missing_days(table, db_key, campaign_id, [day]):
+                    continue
+                day_start = f"{day} 00:00:00"
+                day_end = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime(_TS_FMT)
+                rows = fetch(spec["source_sql"], (campaign_id, day_start, day_end))
+                values = [
+                    (db_key, campaign_id, day,
+                     *[_to_text(r.get(c)) for c in spec["keys"]],
+                     *[int(r.get(m) or 0) for m in spec["measures"]])
+                    for r in rows or []
+                ]
+                with closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE db_key = ? AND campaign_id = ? AND day = ?",
+                        (db_key, campaign_id, day),
+                    )
+                    conn.executemany(insert_sql, values)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO loaded_days (tbl, db_key, campaign_id, day, rows, loaded_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (table, db_key, campaign_id, day, len(values), datetime.now().isoformat(timespec="seconds")),
+                    )
+                loaded += 1
+        return loaded
+
+    # -------------------- Lexim --------------------
+    def select(
+        self,
+        table: str,
+        db_key: str,
+        campaign_id: str,
+        days: Sequence[str],
+        group_by: Sequence[str],
+        where: str = "",
+        params: Sequence[Any] = (),
+        measure_exprs: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Agregon ditët [min(days), max(days)] sipas `group_by`.
+
+        Args:
+            where: Kusht shtesë SQLite (p.sh. "status IN (?, ?)")
+            measure_exprs: {alias: shprehje}; default SUM(masa) për çdo masë të tabelës
+        """
+        spec = TABLES[table]
+        exprs = measure_exprs or {m: f"SUM({m})" for m in spec["measures"]}
+        select_cols = ", ".join(list(group_by) + [f"{e} AS {a}" for a, e in exprs.items()])
+        sql = (
+            f"SELECT {select_cols} FROM {table} "
+            f"WHERE db_key = ? AND campaign_id = ? AND day >= ? AND day <= ?"
+            f"{' AND ' + where if where else ''} "
+            f"GROUP BY {', '.join(group_by)}"
+        )
+        with closing(self._connect()) as conn:
+            cur = conn.execute(sql, (db_key, campaign_id, min(days), max(days), *params))
+            return [dict(r) for r in cur.fetchall()]
+
+    def combine(
+        self,
+        table: str,
+        db_key: str,
+        campaign_id: str,
+        from_ts: str,
+        to_ts: str,
+        fetch: Fetch,
+        live: Callable[[str, str], Rows],
+        group_by: Sequence[str],
+        where: str = "",
+        params: Sequence[Any] = (),
+        measure_exprs: Optional[Dict[str, str]] = None,
+        key_types: Optional[Dict[str, Callable[[Any], Any]]] = None,
+    ) -> Rows:
+        """Rollup për ditët e mbyllura + `live(a, b)` për pjesën e hapur, të bashkuara.
+
+        key_types konverton kolonat çelës (të ruajtura si TEXT) në tipin që kthen
+        MySQL, që rreshtat rollup dhe live të bashkohen saktë (p.sh. list_id → int).
+        """
+        days, live_windows = split_window(from_ts, to_ts, grace_hours=self.closed_grace_hours)
+        if not days:
+            return live(from_ts, to_ts)
+
+        self.ensure_loaded(table, db_key, campaign_id, days, fetch)
+        rolled = self.select(table, db_key, campaign_id, days, group_by, where, params, measure_exprs)
+        _apply_key_types(rolled, key_types)
+        parts: List[Rows] = [rolled]
+        for a, b in live_windows:
+            live_rows = [dict(r) for r in live(a, b) or []]
+            _apply_key_types(live_rows, key_types)
+            parts.append(live_rows)
+        measures = list((measure_exprs or {m: "" for m in TABLES[table]["measures"]}).keys())
+        return merge_additive_rows(parts, group_by, measures)
+
+    def stats(self) -> Dict[str, Any]:
+        with closing(self._connect()) as conn:
+            out: Dict[str, Any] = {}
+            for r in conn.execute(
+                "SELECT tbl, COUNT(*) AS days, COALESCE(SUM(rows), 0) AS rows FROM loaded_days GROUP BY tbl"
+            ):
+                out[r["tbl"]] = {"days": r["days"], "rows": r["rows"]}
+        return out
+
+
+def _to_text(v: Any) -> Optional[str]:
+    if v is None:
+        return None
+    if isinstance(v, (bytes, bytearray)):
+        return v.decode("utf-8", "replace")
+    return str(v)
+
+
+def _apply_key_types(rows: List[Dict[str, Any]], key_types: Optional[Dict[str, Callable[[Any], Any]]]) -> None:
+    if not key_types:
+        return
+    for r in rows:
+        for col, conv in key_types.items():
+            v = r.get(col)
+            if v is None:
+                continue
+            try:
+                r[col] = conv(v)
+            except (TypeError, ValueError):
+                pass
+
+
+# -------------------- Instanca e procesit --------------------
+_STORE: Optional[RollupStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_rollup_store() -> Optional[RollupStore]:
+    """Kthen rollup store-in e procesit, ose None kur është çaktivizuar në settings."""
+    global _STORE
+    from core.status_settings import get_query_cache_settings, get_rollup_enabled
+
+    if not get_rollup_enabled():
+        return None
+    # E njëjta pritje si për cache-in e query-ve (query_cache_closed_grace_hours)
+    grace = get_query_cache_settings()["closed_grace_hours"]
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = RollupStore(ROLLUP_PATH, closed_grace_hours=grace)
+        else:
+            _STORE.closed_grace_hours = float(grace)
+        return _STORE
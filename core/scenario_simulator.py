@@ -0,0 +1,528 @@
+"""
+core/scenario_simulator.py
+
+PURPOSE:
+    Simulim Monte Carlo i skenarëve për dial level dhe volumin e listave.
+
+    calculate_list_requirements_for_dial_level() dhe generate_scenarios() te
+    core/list_analyzer.py japin një përgjigje statike me konstante (dial level
+    700, 8 orë, 30 sek). Këtu parametrat merren nga të dhënat e kampanjës
+    (snapshot ose JSON): dials për orë për njësi dial level, connect rate,
+    pjesa SVYCLM dhe sekondat për dial sipas orës, press 1 për SVYCLM dhe
+    pjesa mobile e minutave. Për çdo skenar ekzekutohen mijëra prova të
+    vektorizuara (matrica provë × orë në NumPy) dhe kthehen shpërndarjet e
+    lead burn, kostos dhe press 1.
+
+KEY FEATURES:
+    - build_simulation_inputs(): SimulationInputs empirike (24 orë) nga
+      tabela e prefikseve (prefix_hour_status: thirrje, status, sekonda sipas
+      orës), përndryshe hourly_performance + status_distribution; volumi ditor
+      dhe CV-të nga daily_performance; press 1 nga closer_log; dial level
+      aktual nga campaign_config
+    - Scenario: dial_level, orët, leads në dispozicion, tentativa për lead,
+      shumëzues press 1, pjesa mobile
+    - simulate_scenarios(): common random numbers — një rrjedhë e farës për
+      çdo (komponent, orë), e njëjtë për çdo skenar (krahasim i drejtë);
+      ScenarioResult.summary() → mesatare, p5/p50/p95, P(press1 ≥ target)
+    - Pasiguria: volumi dhe kohëzgjatja ditore (CV nga daily_performance),
+      normat me Beta (luhatja relative ditore rate_cv, jo më e ngushtë se
+      numri i vëzhgimeve), thirrjet me Binomial/Poisson
+
+KUFIZIME:
+    - Kapaciteti shkallëzohet linearisht me dial level (dials/orë për njësi
+      dial level nga auto_dial_level); pa kufij trunk-u apo hopper-i
+    - Orët pa thirrje (ose me < 50% të orës mediane) marrin kapacitetin median
+      dhe normat mesatare të kampanjës
+    - Pa closer_log, press 1 = 0.55% e SVYCLM (si te list_analyzer), me
+      luhatje më të gjerë (DEFAULT_PRESS1_CV)
+    - Lead burn = dials / tentativa mesatare për lead (parametër i skenarit)
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.mobile_fix_classifier import FIX_COST_PER_MIN, MOBILE_COST_PER_MIN
+from core.prefix_table import build_best_prefix_table
+
+HOURS = 24
+DEFAULT_DIAL_LEVEL = 700.0
+DEFAULT_PRESS1_PER_SVYCLM = 0.0055  # 0.55% e SVYCLM (si analyze_hourly_performance_by_province)
+DEFAULT_MOBILE_SHARE = 0.5          # 50% FIX / 50% MOBILE kur nuk ka prefikse
+DEFAULT_CV = 0.10                   # CV ditor kur daily_performance ka < 3 ditë të plota
+DEFAULT_PRESS1_CV = 0.25           # luhatja relative kur press 1 nuk vjen nga closer_log
+DEFAULT_TRIALS = 5000
+DEFAULT_RATE_CV = 0.05
+CONNECT_STATUSES = ("PU", "SVYCLM")
+
+# Ora me më pak thirrje se kjo në dritare merr normat mesatare të kampanjës
+_MIN_HOUR_CALLS = 500
+
+
+@dataclass(frozen=True)
+class SimulationInputs:
+    """Parametrat empirikë të kampanjës, të indeksuar sipas orës (0-23).
+
+    Args:
+        dials_per_level: Dials në ditë në orën h për një njësi dial level
+        connect_rate: (PU + SVYCLM) / dials
+        svyclm_share: SVYCLM / (PU + SVYCLM)
+        sec_per_dial: Sekonda të faturuara për dial
+        observations: Dials në dritare (forca e Beta për normat e orës; totali
+            për orët që marrin mesataren e kampanjës)
+        observed_hours: Orët me aktivitet të plotë në të dhëna
+        press1_per_svyclm: Press 1 / SVYCLM
+        press1_observations: SVYCLM në dritare (0 kur press 1 është supozim)
+        mobile_share: Pjesa mobile e minutave
+        volume_cv: CV i dials ditore (ditët e plota)
+        duration_cv: CV i minutave për dial (ditët e plota)
+        base_dial_level: Dial level i konfigurimit (auto_dial_level)
+        active_days: Ditë ekuivalente me aktivitet të plotë në dritare
+        sources: Burimi i çdo parametri (për UI)
+    """
+    dials_per_level: np.ndarray
+    connect_rate: np.ndarray
+    svyclm_share: np.ndarray
+    sec_per_dial: np.ndarray
+    observations: np.ndarray
+    observed_hours: Tuple[int, ...]
+    press1_per_svyclm: float
+    press1_observations: float
+    mobile_share: float
+    volume_cv: float
+    duration_cv: float
+    base_dial_level: float
+    active_days: float
+    sources: Dict[str, str] = field(default_factory=dict)
+
+    def hourly_frame(self) -> pd.DataFrame:
+        """Parametrat sipas orës si DataFrame (vetëm orët me të dhëna)."""
+        hours = list(self.observed_hours)
+        return pd.DataFrame({
+            "hour": hours,
+            "dials_per_day": np.round(self.dials_per_level[hours] * self.base_dial_level, 0),
+            "connect_rate_%": np.round(self.connect_rate[hours] * 100, 2),
+            "svyclm_share_%": np.round(self.svyclm_share[hours] * 100, 2),
+            "sec_per_dial": np.round(self.sec_per_dial[hours], 2),
+        })
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Një skenar planifikimi.
+
+    Args:
+        name: Emri në UI/raport
+        dial_level: Dial level i simuluar
+        hours: Orët e thirrjeve; None = orët me aktivitet në të dhëna
+        leads_available: Leads të thirrshëm në lista; None = pa llogaritur ditët e furnizimit
+        attempts_per_lead: Tentativa mesatare për lead (recycle multiplier)
+        press1_multiplier: Shumëzues i press 1 / SVYCLM (p.sh. 1.2 për audio IVR më të mirë)
+        mobile_share: Pjesa mobile e minutave; None = empirike
+    """
+    name: str
+    dial_level: float
+    hours: Optional[Tuple[int, ...]] = None
+    leads_available: Optional[float] = None
+    attempts_per_lead: float = 2.5
+    press1_multiplier: float = 1.0
+    mobile_share: Optional[float] = None
+
+
+@dataclass
+class ScenarioResult:
+    """Shpërndarjet ditore të një skenari (një vlerë për provë)."""
+    scenario: Scenario
+    dials: np.ndarray
+    lead_burn: np.ndarray
+    minutes: np.ndarray
+    cost: np.ndarray
+    press1: np.ndarray
+    days_of_supply: Optional[np.ndarray] = None
+
+    def summary(self, press1_target: Optional[float] = None) -> Dict[str, Any]:
+        """Mesatarja dhe percentilet (p5/p50/p95) për çdo metrikë, si dict JSON."""
+        metrics = {
+            "dials_per_day": self.dials,
+            "lead_burn_per_day": self.lead_burn,
+            "minutes_per_day": self.minutes,
+            "cost_per_day": self.cost,
+            "press1_per_day": self.press1,
+        }
+        if self.days_of_supply is not None:
+            metrics["days_of_supply"] = self.days_of_supply
+        with np.errstate(divide="ignore", invalid="ignore"):
+            metrics["cost_per_press1"] = np.where(self.press1 > 0, self.cost / np.maximum(self.press1, 1), np.nan)
+        out: Dict[str, Any] = {
+            "name": self.scenario.name,
+            "dial_level": self.scenario.dial_level,
+            "trials": int(len(self.dials)),
+        }
+        for name, values in metrics.items():
+            out[name] = _distribution(values)
+        if press1_target is not None:
+            out["press1_target"] = press1_target
+            out["prob_press1_target"] = round(float(np.mean(self.press1 >= press1_target)), 4)
+        return out
+
+
+def _distribution(values: np.ndarray) -> Dict[str, Optional[float]]:
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {"mean": None, "p5": None, "p50": None, "p95": None}
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    return {"mean": round(float(values.mean()), 2), "p5": round(float(p5), 2),
+            "p50": round(float(p50), 2), "p95": round(float(p95), 2)}
+
+
+# ================== Parametrat empirikë ==================
+def _num(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _parse_day(value: Any) -> Optional[date]:
+    try:
+        return datetime.fromisoformat(str(value)[:10]).date()
+    except ValueError:
+        return None
+
+
+def _daily_profile(data: Mapping) -> Tuple[Optional[float], float, float]:
+    """(ditë aktive në dritare, CV i volumit, CV i minutave/dial) nga daily_performance.
+
+    Dita me më pak thirrje se mediana (p.sh. dita e sotme e pambyllur)
+    numërohet si pjesë e një dite.
+    """
+    rows = [r for r in data.get("daily_performance", []) or [] if _num(r.get("total_calls")) > 0]
+    if not rows:
+        return None, DEFAULT_CV, DEFAULT_CV
+    calls = np.array([_num(r.get("total_calls")) for r in rows])
+    minutes = np.array([_num(r.get("total_minutes")) for r in rows])
+    median = float(np.median(calls))
+    full = calls >= 0.5 * median
+
+    period = _num(data.get("analysis_period_days")) or 7
+    days = [_parse_day(r.get("date")) for r in rows]
+    end = _parse_day(data.get("collection_date")) or max((d for d in days if d), default=None)
+    in_window = np.array([d is not None and end is not None and d >= end - timedelta(days=period) for d in days])
+    active = float(np.minimum(calls[in_window] / median, 1.0).sum()) if in_window.any() else None
+
+    volume_cv, duration_cv = DEFAULT_CV, DEFAULT_CV
+    if full.sum() >= 3:
+        volume_cv = float(np.std(calls[full]) / np.mean(calls[full]))
+        per_dial = minutes[full] / calls[full]
+        if per_dial.mean() > 0:
+            duration_cv = float(np.std(per_dial) / per_dial.mean())
+    return active, volume_cv, duration_cv
+
+
+def _hourly_counts(data: Mapping, table: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, str]:
+    """(dials, connected, svyclm, sekonda) sipas orës dhe burimi."""
+    if "hour" in table.columns and len(table):
+        hour = pd.to_numeric(table["hour"], errors="coerce").to_numpy(dtype="float64")
+        valid = np.isfinite(hour) & (hour >= 0) & (hour < HOURS)
+        h = hour[valid].astype(np.int64)
+        calls = table["calls"].to_numpy(dtype="float64")[valid]
+        status = table["status"][valid]
+        connected = np.asarray(status.isin(CONNECT_STATUSES), dtype=bool)
+        svyclm = np.asarray(table["is_svyclm"], dtype=bool)[valid]
+        seconds = table["total_minutes"].to_numpy(dtype="float64")[valid] * 60.0
+        return (
+            np.bincount(h, weights=calls, minlength=HOURS),
+            np.bincount(h, weights=calls * connected, minlength=HOURS),
+            np.bincount(h, weights=calls * svyclm, minlength=HOURS),
+            np.bincount(h, weights=seconds, minlength=HOURS),
+            "prefix_hour_status",
+        )
+
+    dials, connected, svyclm, seconds = (np.zeros(HOURS) for _ in range(4))
+    hourly = [r for r in data.get("hourly_performance", []) or [] if 0 <= _num(r.get("hour")) < HOURS]
+    has_status = bool(hourly) and all("pu_count" in r and "svyclm_count" in r for r in hourly)
+    for r in hourly:
+        h = int(_num(r.get("hour")))
+        dials[h] += _num(r.get("total_calls"))
+        seconds[h] += _num(r.get("total_minutes")) * 60.0
+        if has_status:
+            connected[h] += _num(r.get("pu_count")) + _num(r.get("svyclm_count"))
+            svyclm[h] += _num(r.get("svyclm_count"))
+    if has_status:
+        return dials, connected, svyclm, seconds, "hourly_performance"
+
+    # Pa ndarje sipas statusit për orë: normat e kampanjës nga status_distribution
+    by_status = {r.get("status"): _num(r.get("count")) for r in data.get("status_distribution", []) or []}
+    total = sum(by_status.values())
+    conn = sum(by_status.get(s, 0.0) for s in CONNECT_STATUSES)
+    connected = dials * (conn / total if total else 0.0)
+    svyclm = dials * (by_status.get("SVYCLM", 0.0) / total if total else 0.0)
+    return dials, connected, svyclm, seconds, "hourly_performance + status_distribution"
+
+
+def _press1_rate(data: Mapping, svyclm_total: float) -> Tuple[float, float, str]:
+    """(press 1 / SVYCLM, forca, burimi); closer_log = transfer-at pas Press 1."""
+    press1 = sum(_num(r.get("count")) for r in data.get("closer_log", []) or [])
+    if press1 > 0 and svyclm_total > 0:
+        return min(press1 / svyclm_total, 1.0), svyclm_total, "closer_log"
+    return DEFAULT_PRESS1_PER_SVYCLM, 0.0, "default 0.55%"
+
+
+def _mobile_share(table: pd.DataFrame) -> Tuple[float, str]:
+    source = "prefix_hour_status" if "hour" in table.columns else "prefix_status_analysis"
+    if not len(table):
+        return DEFAULT_MOBILE_SHARE, "default 50%"
+    minutes = table["total_minutes"].to_numpy(dtype="float64")
+    phone_type = table["phone_type"]
+    mobile = float(minutes[np.asarray(phone_type == "MOBILE", dtype=bool)].sum())
+    fix = float(minutes[np.asarray(phone_type == "FIX", dtype=bool)].sum())
+    if mobile + fix <= 0:
+        return DEFAULT_MOBILE_SHARE, "default 50%"
+    return mobile / (mobile + fix), source
+
+
+def _dial_level(data: Mapping) -> Tuple[float, str]:
+    config = data.get("campaign_config") or {}
+    level = _num(config.get("auto_dial_level")) if isinstance(config, dict) else 0.0
+    if level > 0:
+        return level, "campaign_config.auto_dial_level"
+    return DEFAULT_DIAL_LEVEL, "default 700"
+
+
+def build_simulation_inputs(data: Mapping, table: Optional[pd.DataFrame] = None) -> SimulationInputs:
+    """Parametrat empirikë të simulimit nga të dhënat e analizës.
+
+    Args:
+        data: Të dhënat e load_vicidial_data() (dict ose Snapshot)
+        table: build_best_prefix_table(data) i llogaritur më parë (opsionale)
+
+    Returns:
+        SimulationInputs
+    """
+    if table is None:
+        table = build_best_prefix_table(data)
+    dials, connected, svyclm, seconds, hourly_source = _hourly_counts(data, table)
+    active_days, volume_cv, duration_cv = _daily_profile(data)
+    period = _num(data.get("analysis_period_days")) or 7
+    days = active_days if active_days and active_days > 0 else period
+    base_level, level_source = _dial_level(data)
+
+    # Orët e plota: aktivitet ≥ 50% e orës mediane (pa pushimin e drekës etj.)
+    active = dials > 0
+    median_hour = float(np.median(dials[active])) if active.any() else 0.0
+    full = active & (dials >= 0.5 * median_hour)
+    per_level = dials / days / base_level
+    per_level = np.where(full, per_level, float(np.median(per_level[full])) if full.any() else 0.0)
+
+    # Normat e orës vetëm kur ka mjaftueshëm thirrje; përndryshe mesatarja e kampanjës
+    total_dials, total_conn = dials.sum(), connected.sum()
+    mean_connect = total_conn / total_dials if total_dials else 0.0
+    mean_svyclm = svyclm.sum() / total_conn if total_conn else 0.0
+    mean_sec = seconds.sum() / total_dials if total_dials else 0.0
+    enough = dials >= _MIN_HOUR_CALLS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        connect_rate = np.where(enough, connected / np.where(dials > 0, dials, 1), mean_connect)
+        svyclm_share = np.where(enough & (connected > 0), svyclm / np.where(connected > 0, connected, 1), mean_svyclm)
+        sec_per_dial = np.where(enough, seconds / np.where(dials > 0, dials, 1), mean_sec)
+
+    press1_rate, press1_obs, press1_source = _press1_rate(data, float(svyclm.sum()))
+    mobile_share, mobile_source = _mobile_share(table)
+    return SimulationInputs(
+        dials_per_level=per_level,
+        connect_rate=np.clip(connect_rate, 0.0, 1.0),
+        svyclm_share=np.clip(svyclm_share, 0.0, 1.0),
+        sec_per_dial=np.maximum(sec_per_dial, 0.0),
+        observations=np.where(enough, dials, total_dials),
+        observed_hours=tuple(int(h) for h in np.flatnonzero(full)),
+        press1_per_svyclm=float(press1_rate),
+        press1_observations=float(press1_obs),
+        mobile_share=float(mobile_share),
+        volume_cv=float(volume_cv),
+        duration_cv=float(duration_cv),
+        base_dial_level=float(base_level),
+        active_days=float(days),
+        sources={
+            "hourly": hourly_source,
+            "press1": press1_source,
+            "mobile_share": mobile_source,
+            "dial_level": level_source,
+        },
+    )
+
+
+# ================== Simulimi ==================
+def _beta(
+    rng: np.random.Generator,
+    mean: np.ndarray,
+    observations: np.ndarray,
+    rate_cv: float,
+    size: Tuple[int, ...],
+) -> np.ndarray:
+    """Norma Beta me mesatare `mean` dhe luhatje relative ≈ rate_cv.
+
+    Forca e Beta (α + β) zgjidhet që CV të jetë rate_cv, por jo më e madhe
+    se numri i vëzhgimeve (normat nga pak thirrje luhaten më shumë).
+    """
+    mean = np.clip(np.broadcast_to(mean, size), 1e-9, 1 - 1e-9)
+    strength = (1.0 - mean) / (mean * max(rate_cv, 1e-6) ** 2)
+    strength = np.maximum(np.minimum(strength, np.broadcast_to(observations, size)), 2.0)
+    return rng.beta(mean * strength, (1.0 - mean) * strength)
+
+
+def _scenario_hours(inputs: SimulationInputs, scenario: Scenario) -> np.ndarray:
+    hours = scenario.hours if scenario.hours is not None else inputs.observed_hours
+    return np.array(sorted({int(h) for h in hours if 0 <= int(h) < HOURS}), dtype=np.int64)
+
+
+# Rrjedhat e numrave të rastit: një për çdo (komponent, orë)
+_S_VOLUME, _S_DURATION, _S_PRESS1_RATE, _S_PRESS1 = 0, 1, 2, 3
+_S_DIALS, _S_CONNECT_RATE, _S_CONNECTED, _S_SVYCLM_RATE, _S_SVYCLM = 10, 11, 12, 13, 14
+
+
+def _stream(seed: int, component: int, hour: int = -1) -> np.random.Generator:
+    """Gjeneratori i komponentit (dhe i orës) për `seed`.
+
+    Çdo hap i simulimit lexon nga rrjedha e vet, e pavarur nga skenari: dy
+    skenarë me të njëjtën farë marrin të njëjtat luhatje (volumi, normat,
+    kohëzgjatja) dhe të njëjtën rrjedhë për çdo orë, edhe kur kanë orë të
+    ndryshme. Kjo është teknika "common random numbers".
+    """
+    return np.random.default_rng(np.random.SeedSequence(int(seed), spawn_key=(component, hour + 1)))
+
+
+def simulate_scenario(
+    inputs: SimulationInputs,
+    scenario: Scenario,
+    trials: int = DEFAULT_TRIALS,
+    seed: int = 0,
+    rate_cv: float = DEFAULT_RATE_CV,
+    mobile_rate: float = MOBILE_COST_PER_MIN,
+    fix_rate: float = FIX_COST_PER_MIN,
+) -> ScenarioResult:
+    """Simulon `trials` ditë të skenarit; çdo hap është vektorial mbi provat.
+
+    Me të njëjtën `seed`, skenarët ndajnë numrat e rastit (common random
+    numbers, shih _stream): volumi, normat ditore dhe kohëzgjatja janë
+    identike për provën i, dhe dials/connect/SVYCLM/press 1 e një ore vijnë
+    nga e njëjta rrjedhë. Diferenca mes dy skenarëve mbetet kështu efekti i
+    parametrave, jo zhurma e provave. Numërimet Poisson/Binomial me parametra
+    të ndryshëm janë të korreluara, jo identike (NumPy përdor rejection
+    sampling), ndaj press 1 ruan një pjesë të zhurmës binomiale.
+
+    Args:
+        inputs: build_simulation_inputs(data)
+        scenario: Skenari
+        trials: Numri i provave (ditëve të simuluara)
+        seed: Fara e rrjedhave të numrave të rastit
+        rate_cv: Luhatja relative ditore e normave (connect, SVYCLM, press 1)
+        mobile_rate / fix_rate: €/min
+
+    Returns:
+        ScenarioResult me një vlerë ditore për provë
+    """
+    hours = _scenario_hours(inputs, scenario)
+    t = int(trials)
+    level = float(scenario.dial_level)
+
+    # Volumi ditor: një faktor për provë (i njëjtë për të gjitha orët)
+    volume = np.clip(_stream(seed, _S_VOLUME).normal(1.0, inputs.volume_cv, t), 0.0, None)
+
+    dials = np.zeros((t, len(hours)), dtype=np.int64)
+    svyclm = np.zeros(t, dtype=np.int64)
+    for j, h in enumerate(hours.tolist()):
+        obs = inputs.observations[h]
+        dials[:, j] = _stream(seed, _S_DIALS, h).poisson(inputs.dials_per_level[h] * level * volume)
+        connect_rate = _beta(_stream(seed, _S_CONNECT_RATE, h), inputs.connect_rate[h], obs, rate_cv, (t,))
+        connected = _stream(seed, _S_CONNECTED, h).binomial(dials[:, j], connect_rate)
+        svyclm_rate = _beta(
+            _stream(seed, _S_SVYCLM_RATE, h), inputs.svyclm_share[h], obs * inputs.connect_rate[h], rate_cv, (t,),
+        )
+        svyclm += _stream(seed, _S_SVYCLM, h).binomial(connected, svyclm_rate)
+
+    rate_rng = _stream(seed, _S_PRESS1_RATE)
+    if inputs.press1_observations > 0:
+        press1_rate = _beta(rate_rng, inputs.press1_per_svyclm, inputs.press1_observations, rate_cv, (t,))
+    else:
+        press1_rate = _beta(rate_rng, inputs.press1_per_svyclm, np.inf, DEFAULT_PRESS1_CV, (t,))
+    press1 = _stream(seed, _S_PRESS1).binomial(svyclm, np.clip(press1_rate * scenario.press1_multiplier, 0.0, 1.0))
+
+    # Kohëzgjatja: faktor lognormal me mesatare 1 për provë
+    sigma = float(np.sqrt(np.log1p(inputs.duration_cv ** 2)))
+    duration = _stream(seed, _S_DURATION).lognormal(-0.5 * sigma ** 2, sigma, t)
+    minutes = (dials * inputs.sec_per_dial[hours]).sum(axis=1) / 60.0 * duration
+
+    share = inputs.mobile_share if scenario.mobile_share is None else float(scenario.mobile_share)
+    cost = minutes * (share * mobile_rate + (1.0 - share) * fix_rate)
+    total_dials = dials.sum(axis=1).astype("float64")
+    lead_burn = total_dials / max(float(scenario.attempts_per_lead), 1e-9)
+
+    days_of_supply = None
+    if scenario.leads_available is not None:
+        with np.errstate(divide="ignore"):
+            days_of_supply = np.where(
+                lead_burn > 0, float(scenario.leads_available) / np.maximum(lead_burn, 1e-9), np.inf
+            )
+    return ScenarioResult(
+        scenario=scenario,
+        dials=total_dials,
+        lead_burn=lead_burn,
+        minutes=minutes,
+        cost=cost,
+        press1=press1.astype("float64"),
+        days_of_supply=days_of_supply,
+    )
+
+
+def simulate_scenarios(
+    inputs: SimulationInputs,
+    scenarios: Sequence[Scenario],
+    trials: int = DEFAULT_TRIALS,
+    seed: int = 0,
+    **kwargs: Any,
+) -> Dict[str, ScenarioResult]:
+    """Simulon disa skenarë me të njëjtën farë (common random numbers, shih simulate_scenario).
+
+    Diferencat mes skenarëve vijnë nga parametrat, jo nga zhurma e provave.
+    kwargs kalojnë te simulate_scenario (rate_cv, mobile_rate, fix_rate).
+    """
+    return {s.name: simulate_scenario(inputs, s, trials=trials, seed=seed, **kwargs) for s in scenarios}
+
+
+def default_scenarios(inputs: SimulationInputs) -> List[Scenario]:
+    """Skenarët standardë të raportit rreth dial level aktual."""
+    level = inputs.base_dial_level
+    return [
+        Scenario(f"Dial level {level:.0f} (aktual)", level),
+        Scenario(f"Dial level {level * 0.7:.0f} (-30%)", round(level * 0.7)),
+        Scenario(f"Dial level {level * 1.3:.0f} (+30%)", round(level * 1.3)),
+        Scenario("IVR audio më e shkurtër (press 1 +20%)", level, press1_multiplier=1.2),
+    ]
+
+
+def simulate_default_scenarios(
+    inputs: SimulationInputs,
+    trials: int = DEFAULT_TRIALS,
+    press1_target: Optional[float] = 150,
+    rate_cv: float = DEFAULT_RATE_CV,
+) -> Dict[str, Any]:
+    """Përmbledhja (JSON) e default_scenarios() për raportin e list_analyzer."""
+    results = simulate_scenarios(inputs, default_scenarios(inputs), trials=trials, rate_cv=rate_cv)
+    return {
+        "inputs": {
+            "base_dial_level": inputs.base_dial_level,
+            "active_days": round(inputs.active_days, 2),
+            "observed_hours": list(inputs.observed_hours),
+            "press1_per_svyclm": round(inputs.press1_per_svyclm, 5),
+            "mobile_share": round(inputs.mobile_share, 4),
+            "volume_cv": round(inputs.volume_cv, 4),
+            "duration_cv": round(inputs.duration_cv, 4),
+            "sources": dict(inputs.sources),
+        },
+        "scenarios": [r.summary(press1_target) for r in results.values()],
+    }
@@ -0,0 +1,408 @@
+"""
+core/snapshot.py
+
+PURPOSE:
+    Format binar i versionuar (.vcsnap) për vicidial_analysis_data*.json.
+
+    JSON-i i collector-it (150KB+, pretty-printed) rilexohej i tëri nga
+    list_analyzer.load_vicidial_data në çdo rerun të Streamlit, dhe rritet
+    shpejt kur ngrihen limitet e prefix/sample_leads. Snapshot-i ruan çdo
+    seksion si tabelë kolonore; loader-i e hap skedarin me mmap dhe dekodon
+    një seksion vetëm kur kërkohet.
+
+FORMATI (versioni 2):
+    [8]  magic b"VCSNAP\\x00\\x01"
+    [8]  gjatësia e indeksit (uint64 little-endian)
+    [N]  indeksi JSON: meta (vlerat skalare), rendi i çelësave, seksionet
+    [..] blloqet e të dhënave, secili i rreshtuar në 8 bajt:
+         - kolona "i8"/"f8": int64/float64 little-endian (lexohen pa kopjim me
+           np.frombuffer mbi mmap) + maskë uint8 kur ka NULL
+         - kolona "dict": string-je me pak vlera unike (p.sh. prefix_4, status):
+           kodet int32 (-1 = NULL) + listë JSON e vlerave unike
+         - kolona "json": listë JSON e vlerave (string, vlera të përziera)
+         - seksione jo-tabelë (p.sh. campaign_config): një bllok JSON
+
+KEY FEATURES:
+    - write_snapshot(): dict → .vcsnap (shkrim atomik)
+    - Snapshot: Mapping read-only; snap["active_lists"] kthen listën e dict-eve
+      si JSON-i, snap.table("active_lists") kthen kolonat (NumPy për numrat)
+    - export_json(): .vcsnap → JSON për lexim nga njerëzit
+    - section_digest(): hash i një seksioni direkt nga bajtet (pa dekodim)
+    - read_snapshot_meta(): vetëm vlerat skalare (db_key, campaign_id...) nga
+      indeksi, pa mmap
+    - snapshot_path_for(): vicidial_analysis_data_db.json → vicidial_analysis_data_db.vcsnap
+
+Vlerat rikthehen identike me JSON-in (int mbetet int, float mbetet float).
+Versioni 1 (pa kolona "dict") lexohet ende.
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b"VCSNAP\x00\x01"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_SUFFIX = ".vcsnap"
+
+_HEADER = struct.Struct("<8sQ")
+_ALIGN = 8
+_INT64_MIN, _INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+# Kodim fjalori për kolonat string me të paktën kaq rreshta dhe ≤ 50% vlera unike
+_DICT_MIN_ROWS = 64
+
+PathLike = Union[str, Path]
+
+
+def snapshot_path_for(json_path: PathLike) -> Path:
+    """Path-i i snapshot-it pranë JSON-it (i njëjti emër, prapashtesë .vcsnap)."""
+    return Path(json_path).with_suffix(SNAPSHOT_SUFFIX)
+
+
+# -------------------- Shkrimi --------------------
+def _column_encoding(values: Sequence[Any]) -> str:
+    present = [v for v in values if v is not None]
+    if not present:
+        return "json"
+    if all(type(v) is int and _INT64_MIN <= v <= _INT64_MAX for v in present):
+        return "i8"
+    if all(type(v) is float for v in present):
+        return "f8"
+    if (
+        len(values) >= _DICT_MIN_ROWS
+        and all(type(v) is str for v in present)
+        and len(set(present)) * 2 <= len(values)
+    ):
+        return "dict"
+    return "json"
+
+
+def _table_columns(rows: Sequence[Any]) -> Optional[List[str]]:
+    """Kolonat kur të gjithë rreshtat janë dict me të njëjtët çelësa në të njëjtin rend."""
+    if not rows or not all(isinstance(r, dict) for r in rows):
+        return None
+    columns = list(rows[0].keys())
+    if not all(isinstance(c, str) for c in columns):
+        return None
+    for r in rows:
+        if len(r) != len(columns) or list(r.keys()) != columns:
+            return None
+    return columns
+
+
+class _BlobWriter:
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> Tuple[int, int]:
+        """Shton bllokun (i rreshtuar në 8 bajt); kthen (offset relativ, gjatësia)."""
+        pad = (-self.size) % _ALIGN
+        if pad:
+            self.parts.append(b"\x00" * pad)
+            self.size += pad
+        offset = self.size
+        self.parts.append(data)
+        self.size += len(data)
+        return offset, len(data)
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _encode_column(values: List[Any], blobs: _BlobWriter) -> Dict[str, Any]:
+    enc = _column_encoding(values)
+    col: Dict[str, Any] = {"enc": enc}
+    if enc == "json":
+        col["offset"], col["length"] = blobs.add(_json_bytes(values))
+        return col
+    if enc == "dict":
+        uniques = list(dict.fromkeys(v for v in values if v is not None))
+        codes_of = {v: i for i, v in enumerate(uniques)}
+        codes = np.fromiter((-1 if v is None else codes_of[v] for v in values), dtype="<i4", count=len(values))
+        col["offset"], col["length"] = blobs.add(codes.tobytes())
+        col["values_offset"], col["values_length"] = blobs.add(_json_bytes(uniques))
+        return col
+    nulls = np.fromiter((v is None for v in values), dtype=np.uint8, count=len(values))
+    dtype = "<i8" if enc == "i8" else "<f8"
+    fill = 0 if enc == "i8" else 0.0
+    arr = np.array([fill if v is None else v for v in values], dtype=dtype)
+    col["offset"], col["length"] = blobs.add(arr.tobytes())
+    if nulls.any():
+        col["null_offset"], col["null_length"] = blobs.add(nulls.tobytes())
+    return col
+
+
+def write_snapshot(data: Mapping, path: PathLike) -> Path:
+    """Shkruan `data` (struktura e vicidial_analysis_data.json) si snapshot.
+
+    Vlerat duhet të jenë tashmë të serializueshme në JSON (p.sh. pas
+    convert_decimals te collect_vicidial_data.py).
+    """
+    path = Path(path)
+    blobs = _BlobWriter()
+    meta: Dict[str, Any] = {}
+    sections: Dict[str, Any] = {}
+    for key, value in data.items():
+        if not isinstance(value, (list, dict)):
+            meta[key] = value
+            continue
+        columns = _table_columns(value) if isinstance(value, list) else None
+        if columns is None:
+            offset, length = blobs.add(_json_bytes(value))
+            sections[key] = {"kind": "json", "offset": offset, "length": length}
+            continue
+        sections[key] = {
+            "kind": "table",
+            "rows": len(value),
+            "columns": [
+                dict(name=c, **_encode_column([r[c] for r in value], blobs)) for c in columns
+            ],
+        }
+
+    index = {
+        "version": SNAPSHOT_VERSION,
+        "order": list(data.keys()),
+        "meta": meta,
+        "sections": sections,
+    }
+    index_bytes = _json_bytes(index)
+    head = _HEADER.size + len(index_bytes)
+    data_start = head + ((-head) % _ALIGN)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        f.write(b"\x00" * (data_start - head))
+        # Offset-et në indeks janë relative ndaj fillimit të blloqeve
+        for part in blobs.parts:
+            f.write(part)
+    os.replace(tmp, path)
+    return path
+
+
+# -------------------- Leximi --------------------
+class Snapshot(Mapping):
+    """Snapshot i hapur me mmap; seksionet dekodohen herën e parë që lexohen.
+
+    Sillet si dict-i i JSON-it (get, [], keys, items), por është read-only.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{self.path} nuk është snapshot i vlefshëm")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} nuk është snapshot i vlefshëm (magic)")
+        index = json.loads(bytes(self._mm[_HEADER.size:_HEADER.size + index_len]).decode("utf-8"))
+        if int(index.get("version", 0)) > SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"{self.path}: versioni {index.get('version')} nuk mbështetet")
+        head = _HEADER.size + index_len
+        self._base = head + ((-head) % _ALIGN)
+        self.version = int(index["version"])
+        self._order: List[str] = list(index["order"])
+        self._meta: Dict[str, Any] = index["meta"]
+        self._sections: Dict[str, Dict[str, Any]] = index["sections"]
+        self._decoded: Dict[str, Any] = {}
+        self._digests: Dict[str, str] = {}
+
+    # ---- Mapping ----
+    def __getitem__(self, key: str) -> Any:
+        if key in self._meta:
+            return self._meta[key]
+        if key not in self._sections:
+            raise KeyError(key)
+        if key not in self._decoded:
+            self._decoded[key] = self._decode_section(key)
+        return self._decoded[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._meta or key in self._sections
+
+    # ---- Kolonat ----
+    def section_rows(self, key: str) -> int:
+        """Numri i rreshtave të seksionit pa e dekoduar."""
+        sec = self._sections[key]
+        if sec["kind"] == "table":
+            return int(sec["rows"])
+        value = self[key]
+        return len(value) if isinstance(value, (list, dict)) else 0
+
+    def table(self, key: str) -> Dict[str, Any]:
+        """Seksioni si {kolona: np.ndarray (numrat) ose list}; NULL → NaN/None.
+
+        Kolonat int me NULL kthehen si float64 me NaN; kolonat "dict" si
+        np.ndarray me dtype=object (vlerat unike të indeksuara me kodet).
+        """
+        sec = self._sections[key]
+        if sec["kind"] != "table":
+            raise TypeError(f"Seksioni '{key}' nuk është tabelë")
+        out: Dict[str, Any] = {}
+        for col in sec["columns"]:
+            if col["enc"] == "json":
+                out[col["name"]] = self._json_at(col["offset"], col["length"])
+                continue
+            if col["enc"] == "dict":
+                out[col["name"]] = self._dict_values(col)
+                continue
+            arr = self._array(col)
+            nulls = self._nulls(col)
+            if nulls is not None:
+                arr = arr.astype("float64")
+                arr[nulls] = np.nan
+            out[col["name"]] = arr
+        return out
+
+    def _decode_section(self, key: str) -> Any:
+        sec = self._sections[key]
+        if sec["kind"] == "json":
+            return self._json_at(sec["offset"], sec["length"])
+        names = [c["name"] for c in sec["columns"]]
+        columns = []
+        for col in sec["columns"]:
+            if col["enc"] == "json":
+                values = self._json_at(col["offset"], col["length"])
+            elif col["enc"] == "dict":
+                values = self._dict_values(col).tolist()
+            else:
+                values = self._array(col).tolist()
+                nulls = self._nulls(col)
+                if nulls is not None:
+                    for i in np.flatnonzero(nulls).tolist():
+                        values[i] = None
+            columns.append(values)
+        return [dict(zip(names, vals)) for vals in zip(*columns)]
+
+    def _array(self, col: Dict[str, Any]) -> np.ndarray:
+        dtype = np.dtype({"i8": "<i8", "f8": "<f8", "dict": "<i4"}[col["enc"]])
+        count = col["length"] // dtype.itemsize
+        return np.frombuffer(self._mm, dtype=dtype, count=count, offset=self._base + col["offset"])
+
+    def _dict_values(self, col: Dict[str, Any]) -> np.ndarray:
+        # Kodi -1 (NULL) indeksohet te None i shtuar në fund të vlerave unike
+        uniques = self._json_at(col["values_offset"], col["values_length"])
+        lookup = np.empty(len(uniques) + 1, dtype=object)
+        lookup[:-1] = uniques
+        return lookup[self._array(col)]
+
+    def _nulls(self, col: Dict[str, Any]) -> Optional[np.ndarray]:
+        if "null_offset" not in col:
+            return None
+        mask = np.frombuffer(self._mm, dtype=np.uint8, count=col["null_length"], offset=self._base + col["null_offset"])
+        return mask.astype(bool)
+
+    def section_digest(self, key: str) -> str:
+        """Hash i përmbajtjes së seksionit pa e dekoduar (memo në core/analysis_graph.py).
+
+        Hash-i mbulon kolonat dhe bajtet e blloqeve, jo offset-et: ndryshimi i
+        një seksioni tjetër nuk e ndryshon digest-in e këtij.
+        """
+        digest = self._digests.get(key)
+        if digest is not None:
+            return digest
+        h = hashlib.blake2b(digest_size=16)
+        if key in self._meta:
+            h.update(b"meta:" + _json_bytes(self._meta[key]))
+        elif key in self._sections:
+            sec = self._sections[key]
+            ranges = [(sec["offset"], sec["length"])] if sec["kind"] == "json" else []
+            shape = {k: v for k, v in sec.items() if k != "columns" and "offset" not in k and "length" not in k}
+            for col in sec.get("columns", []):
+                shape.setdefault("cols", []).append(
+                    {k: v for k, v in col.items() if "offset" not in k and "length" not in k}
+                )
+                ranges.append((col["offset"], col["length"]))
+                if "null_offset" in col:
+                    ranges.append((col["null_offset"], col["null_length"]))
+                if "values_offset" in col:
+                    ranges.append((col["values_offset"], col["values_length"]))
+            h.update(_json_bytes(shape))
+            for offset, length in ranges:
+                start = self._base + offset
+                h.update(self._mm[start:start + length])
+        else:
+            h.update(b"missing")
+        digest = self._digests[key] = h.hexdigest()
+        return digest
+
+    def _json_at(self, offset: int, length: int) -> Any:
+        start = self._base + offset
+        return json.loads(bytes(self._mm[start:start + length]).decode("utf-8"))
+
+    # ---- Konvertime / mbyllja ----
+    def to_dict(self) -> Dict[str, Any]:
+        """Gjithë snapshot-i si dict (i njëjtë me JSON-in origjinal)."""
+        return {key: self[key] for key in self._order}
+
+    def close(self) -> None:
+        mm, self._mm = getattr(self, "_mm", None), None
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                # Ka ende array NumPy që i referohen mmap-it; mbyllet nga GC
+                pass
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_snapshot(path: PathLike) -> Snapshot:
+    """Hap një .vcsnap (pa dekoduar seksionet). Thirrësi e mbyll me close() ose `with`."""
+    return Snapshot(path)
+
+
+def read_snapshot_meta(path: PathLike) -> Dict[str, Any]:
+    """Vlerat skalare të snapshot-it (db_key, campaign_id, collection_date...).
+
+    Lexon vetëm header-in dhe indeksin me read() të zakonshëm: nuk hap mmap,
+    kështu që nuk bllokon os.replace() të write_snapshot() (Windows).
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            raise ValueError(f"{path} nuk është snapshot i vlefshëm")
+        magic, index_len = _HEADER.unpack(head)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} nuk është snapshot i vlefshëm (magic)")
+        index = json.loads(f.read(index_len).decode("utf-8"))
+    if int(index.get("version", 0)) > SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: versioni {index.get('version')} nuk mbështetet")
+    return dict(index["meta"])
+
+
+def export_json(snapshot: Union[Snapshot, PathLike], json_path: PathLike, indent: int = 2) -> Path:
+    """Shkruan snapshot-in si JSON të lexueshëm (formati i collect_vicidial_data.py)."""
+    snap = snapshot if isinstance(snapshot, Snapshot) else load_snapshot(snapshot)
+    json_path = Path(json_path)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(snap.to_dict(), f, indent=indent, ensure_ascii=False, default=str)
+    return json_path
@@ -220,3 +220,192 @@ def update_network_limits(max_parallel_downloads: int, throttle_kbps: int) -> Di
     _write_settings(data)
     return get_network_limits()
 
+
+
+# ================== DB Connection Pool (persistent) ==================
+def get_db_pool_limits() -> Dict[str, float]:
+    """Lexon limitet e pool-it të lidhjeve MySQL nga config/settings.json.
+
+    Returns:
+        {
+          "max_size": int,               # default 8 lidhje për db_key
+          "max_idle_sec": float,         # default 300 (lidhjet idle mbyllen pas 5 min)
+          "ping_after_sec": float,       # default 5 (ping në checkout pas 5s idle)
+          "checkout_timeout_sec": float  # default 30
+        }
+    """
+    data = _read_settings()
+    defaults = {"max_size": 8, "max_idle_sec": 300.0, "ping_after_sec": 5.0, "checkout_timeout_sec": 30.0}
+    out: Dict[str, float] = {}
+    for k, default in defaults.items():
+        try:
+            out[k] = type(default)(data.get(f"db_pool_{k}", default))
+        except Exception:
+            out[k] = default
+    out["max_size"] = max(1, int(out["max_size"]))
+    for k in ("max_idle_sec", "ping_after_sec", "checkout_timeout_sec"):
+        out[k] = max(0.0, float(out[k]))
+    return out
+
+
+# ================== Query Result Cache (persistent) ==================
+def get_query_cache_settings() -> Dict[str, Any]:
+    """Lexon cilësimet e cache-it të query-ve (core/query_cache.py) nga config/settings.json.
+
+    Returns:
+        {
+          "enabled": bool,    # default True
+          "ttl_sec": float,   # default 900 (15 min) për intervalet që përfshijnë sot
+          "max_mb": float,    # default 256 MB në out_analysis/query_cache
+          "closed_grace_hours": float  # default 6: pritja para se një ditë e mbyllur të ruhet pa skadim
+                                       # (vlen edhe për rollup-in ditor, core/rollup_store.py)
+        }
+    """
+    data = _read_settings()
+    enabled = bool(data.get("query_cache_enabled", True))
+    try:
+        ttl = float(data.get("query_cache_ttl_sec", 900))
+    except Exception:
+        ttl = 900.0
+    try:
+        max_mb = float(data.get("query_cache_max_mb", 256))
+    except Exception:
+        max_mb = 256.0
+    try:
+        grace = float(data.get("query_cache_closed_grace_hours", 6))
+    except Exception:
+        grace = 6.0
+    return {
+        "enabled": enabled,
+        "ttl_sec": max(0.0, ttl),
+        "max_mb": max(1.0, max_mb),
+        "closed_grace_hours": max(0.0, grace),
+    }
+
+
+# ================== Daily Rollup Store (persistent) ==================
+def get_rollup_enabled() -> bool:
+    """A përdoret rollup-i ditor (out_analysis/rollups.sqlite) për ditët e mbyllura.
+
+    Lexon "rollup_enabled" nga config/settings.json (default True).
+    """
+    data = _read_settings()
+    return bool(data.get("rollup_enabled", True))
+
+
+# ================== Per-phone streaming (persistent) ==================
+def get_phone_rows_streaming() -> bool:
+    """A lexohen rreshtat per-phone me cursor server-side (streaming) në Smart Report.
+
+    Lexon "phone_rows_streaming" nga config/settings.json (default False).
+    Me streaming, memoria kufizohet nga madhësia e batch-it, por query-të
+    per-phone nuk kalojnë nga cache-i dhe rollup-i ditor.
+    """
+    data = _read_settings()
+    return bool(data.get("phone_rows_streaming", False))
+
+
+def get_stream_batch_size() -> int:
+    """Madhësia e batch-it për streaming (default 5000 rreshta)."""
+    data = _read_settings()
+    try:
+        v = int(data.get("stream_batch_size", 5000))
+    except Exception:
+        v = 5000
+    return max(100, v)
+
+
+# ================== Columnar results (persistent) ==================
+def get_columnar_results() -> bool:
+    """A kthehen rezultatet e listave si pandas.DataFrame direkt nga cursor-i.
+
+    Lexon "columnar_results" nga config/settings.json (default False).
+    """
+    data = _read_settings()
+    return bool(data.get("columnar_results", False))
+
+
+# ================== Data Collector (persistent) ==================
+def get_collector_settings() -> Dict[str, Any]:
+    """Cilësimet e collect_vicidial_data.py (core/collector.py) nga config/settings.json.
+
+    Returns:
+        {
+          "workers": int,                 # default 4 query paralele
+          "section_timeout_sec": float    # default 300 për seksion
+        }
+    """
+    data = _read_settings()
+    try:
+        workers = int(data.get("collector_workers", 4))
+    except Exception:
+        workers = 4
+    try:
+        timeout = float(data.get("collector_section_timeout_sec", 300))
+    except Exception:
+        timeout = 300.0
+    return {"workers": max(1, workers), "section_timeout_sec": max(1.0, timeout)}
+
+
+# ================== Time-sliced report queries (persistent) ==================
+def get_report_slicing() -> Dict[str, Any]:
+    """Cilësimet e ekzekutimit në slice-e kohore (core/time_slices.py) nga config/settings.json.
+
+    Returns:
+        {
+          "enabled": bool,            # default False
+          "unit": str,                # "day" (default) ose "hour"
+          "size": int,                # default 1 njësi për slice
+          "max_workers": int,         # default 4 slice paralele
+          "min_window_days": float,   # default 7: intervalet më të shkurtra nuk ndahen
+          "retries": int              # default 1 riprovë për slice
+        }
+    """
+    data = _read_settings()
+    unit = str(data.get("report_slice_unit", "day")).lower()
+    try:
+        size = int(data.get("report_slice_size", 1))
+    except Exception:
+        size = 1
+    try:
+        workers = int(data.get("report_slice_workers", 4))
+    except Exception:
+        workers = 4
+    try:
+        min_days = float(data.get("report_slice_min_window_days", 7))
+    except Exception:
+        min_days = 7.0
+    try:
+        retries = int(data.get("report_slice_retries", 1))
+    except Exception:
+        retries = 1
+    return {
+        "enabled": bool(data.get("report_slicing_enabled", False)),
+        "unit": unit if unit in ("day", "hour") else "day",
+        "size": max(1, size),
+        "max_workers": max(1, workers),
+        "min_window_days": max(0.0, min_days),
+        "retries": max(0, retries),
+    }
+
+
+# ================== Scenario simulation (persistent) ==================
+def get_simulation_settings() -> Dict[str, Any]:
+    """Cilësimet e simulimit Monte Carlo (core/scenario_simulator.py) nga config/settings.json.
+
+    Returns:
+        {
+          "trials": int,        # default 5000 prova për skenar
+          "rate_cv": float      # default 0.05: luhatja relative ditore e normave
+        }
+    """
+    data = _read_settings()
+    try:
+        trials = int(data.get("simulation_trials", 5000))
+    except Exception:
+        trials = 5000
+    try:
+        rate_cv = float(data.get("simulation_rate_cv", 0.05))
+    except Exception:
+        rate_cv = 0.05
+    return {"trials": min(max(100, trials), 200_000), "rate_cv": min(max(0.001, rate_cv), 1.0)}
@@ -0,0 +1,318 @@
+"""
+core/time_slices.py
+
+PURPOSE:
+    Ekzekutim i query-ve agregate në copa kohore (ditë ose orë) për intervale
+    të gjata raportesh.
+
+    Një interval 60-ditor në fetch_dials_by_phone ose
+    fetch_status_distribution_by_list është një GROUP BY i vetëm gjigant që mban
+    lock-e dhe mund të kalojë timeout-in. Këtu [from_ts, to_ts) ndahet në
+    slice-e, slice-et ekzekutohen me paralelizëm të kufizuar dhe agregatet
+    aditive (COUNT, SUM(length_in_sec)) bashkohen në klient.
+
+KEY FEATURES:
+    - split_slices(): slice-e të rreshtuara në kufijtë e ditës/orës
+    - MergeSpec: kolonat çelës + masat aditive; bashkim për rreshta dict
+      (rollup_store.merge_additive_rows) ose pandas.DataFrame
+    - run_sliced(): ThreadPoolExecutor me max_workers, retry për slice,
+      callback progresi në thread-in thirrës
+    - slice_limiter(): semafor i përbashkët për çdo db_key, me madhësinë e
+      pool-it të lidhjeve; kufizon slice-et njëkohëse nga të gjitha thirrjet
+    - serial_slices(): brenda një fan-out (core/report_queries.py) slice-et
+      ekzekutohen njëri pas tjetrit, që një job të mos zërë më shumë se një lidhje
+    - Resume: kur një slice dështon, slice-et e kryera mbahen në memorie
+      (sipas resume_key); thirrja e radhës me të njëjtin çelës ekzekuton vetëm
+      slice-et që mungojnë
+    - slice_progress(): callback progresi i kalueshëm përmes contextvars, që
+      faqja të shohë progresin e slice-eve edhe nga thellësia e fetch_*
+
+KUFIZIME:
+    Vetëm agregatet aditive bashkohen saktë. COUNT(DISTINCT ...), AVG, MIN/MAX
+    mbi kohën nuk mund të ndahen kështu; ato query mbeten pa slice.
+
+Author: Protrade AI
+Last Updated: 2025-10-16
+"""
+
+import contextvars
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.rollup_store import merge_additive_rows
+
+Window = Tuple[str, str]
+SliceFetch = Callable[[str, str], Any]
+Progress = Callable[[str, int, int], None]
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+_UNITS = {"day": timedelta(days=1), "hour": timedelta(hours=1)}
+
+# Sa ekzekutime të pjesshme mbahen për resume
+MAX_PENDING_RUNS = 16
+
+
+def _parse_ts(value: str) -> datetime:
+    value = value.strip()
+    if len(value) == 10:
+        return datetime.strptime(value, "%Y-%m-%d")
+    if len(value) == 16:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M")
+    return datetime.strptime(value, _TS_FMT)
+
+
+def _floor(ts: datetime, unit: str) -> datetime:
+    if unit == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def window_length(from_ts: str, to_ts: str) -> timedelta:
+    return _parse_ts(to_ts) - _parse_ts(from_ts)
+
+
+def split_slices(from_ts: str, to_ts: str, unit: str = "day", size: int = 1) -> List[Window]:
+    """Ndan [from_ts, to_ts) në slice-e [a, b) me `size` njësi secila.
+
+    Kufijtë rreshtohen në fillim të ditës/orës: koka dhe bishti mund të jenë
+    më të shkurtra. Slice-i i parë mban from_ts origjinal dhe i fundit to_ts.
+    """
+    if unit not in _UNITS:
+        raise ValueError(f"Njësi e panjohur '{unit}' (lejohen: {', '.join(_UNITS)})")
+    start, end = _parse_ts(from_ts), _parse_ts(to_ts)
+    if end <= start:
+        return [(from_ts, to_ts)]
+    step = _UNITS[unit] * max(1, int(size))
+    out: List[Window] = []
+    a, a_text = start, from_ts
+    b = _floor(start, unit) + step
+    while b < end:
+        b_text = b.strftime(_TS_FMT)
+        out.append((a_text, b_text))
+        a, a_text = b, b_text
+        b = a + step
+    out.append((a_text, to_ts))
+    return out
+
+
+@dataclass(frozen=True)
+class MergeSpec:
+    """Si bashkohen rezultatet e slice-eve: rreshtat me të njëjtat `keys` mbledhin `measures`."""
+    keys: Tuple[str, ...]
+    measures: Tuple[str, ...]
+
+    def merge(self, parts: Sequence[Any]) -> Any:
+        """Bashkon rezultatet e slice-eve (lista dict-esh ose DataFrame)."""
+        frames = [p for p in parts if hasattr(p, "groupby")]
+        if frames:
+            import pandas as pd
+
+            frame = pd.concat(frames, ignore_index=True)
+            if frame.empty:
+                return frame
+            others = [c for c in frame.columns if c not in self.keys and c not in self.measures]
+            agg = {m: "sum" for m in self.measures}
+            agg.update({c: "first" for c in others})
+            out = frame.groupby(list(self.keys), dropna=False, sort=False, as_index=False).agg(agg)
+            return out[list(frame.columns)]
+        return merge_additive_rows(parts, self.keys, self.measures)
+
+
+@dataclass
+class SlicedRun:
+    """Gjendja e një ekzekutimi në slice-e: rezultatet e kryera dhe gabimet."""
+    label: str
+    slices: List[Window]
+    results: Dict[Window, Any] = field(default_factory=dict)
+    errors: Dict[Window, str] = field(default_factory=dict)
+
+    @property
+    def pending(self) -> List[Window]:
+        return [s for s in self.slices if s not in self.results]
+
+    @property
+    def done(self) -> int:
+        return len(self.results)
+
+
+class SliceError(RuntimeError):
+    """Disa slice-e dështuan; `run` mban slice-et e kryera për resume."""
+
+    def __init__(self, run: SlicedRun):
+        first = next(iter(run.errors.items()), (("?", "?"), ""))
+        super().__init__(
+            f"{run.label or 'query'}: {len(run.errors)}/{len(run.slices)} slice dështuan "
+            f"(p.sh. {first[0][0]} → {first[0][1]}: {first[1]}). "
+            f"Rinis raportin për të vazhduar nga slice-et që mungojnë."
+        )
+        self.run = run
+
+
+# -------------------- Resume (ekzekutimet e pjesshme) --------------------
+_PENDING: "OrderedDict[tuple, SlicedRun]" = OrderedDict()
+_PENDING_LOCK = threading.Lock()
+
+
+def _take_pending(key: Optional[tuple], label: str, slices: List[Window]) -> SlicedRun:
+    if key is not None:
+        with _PENDING_LOCK:
+            run = _PENDING.pop(key, None)
+        if run is not None and run.slices == slices:
+            run.errors.clear()
+            return run
+    return SlicedRun(label, slices)
+
+
+def _keep_pending(key: Optional[tuple], run: SlicedRun) -> None:
+    if key is None:
+        return
+    with _PENDING_LOCK:
+        _PENDING[key] = run
+        while len(_PENDING) > MAX_PENDING_RUNS:
+            _PENDING.popitem(last=False)
+
+
+def pending_runs() -> List[Dict[str, Any]]:
+    """Ekzekutimet e pjesshme që presin resume (për diagnostikë)."""
+    with _PENDING_LOCK:
+        runs = list(_PENDING.values())
+    return [{"label": r.label, "done": r.done, "total": len(r.slices), "failed": len(r.errors)} for r in runs]
+
+
+def clear_pending_runs() -> None:
+    with _PENDING_LOCK:
+        _PENDING.clear()
+
+
+# -------------------- Kufiri i paralelizmit --------------------
+_LIMITERS: Dict[str, Tuple[int, threading.BoundedSemaphore]] = {}
+_LIMITERS_LOCK = threading.Lock()
+_SERIAL: contextvars.ContextVar[bool] = contextvars.ContextVar("slice_serial", default=False)
+
+
+def slice_limiter(name: str, size: int) -> threading.BoundedSemaphore:
+    """Semafori i përbashkët i slice-eve për `name` (zakonisht db_key).
+
+    Të gjitha run_sliced() me të njëjtin limiter ndajnë `size` vende, pra slice-et
+    njëkohëse të një db_key nuk kalojnë madhësinë e pool-it të lidhjeve. Kur
+    `size` ndryshon (settings), krijohet semafor i ri.
+    """
+    size = max(1, int(size))
+    with _LIMITERS_LOCK:
+        entry = _LIMITERS.get(name)
+        if entry is None or entry[0] != size:
+            entry = (size, threading.BoundedSemaphore(size))
+            _LIMITERS[name] = entry
+        return entry[1]
+
+
+@contextmanager
+def serial_slices() -> Iterator[None]:
+    """Brenda bllokut run_sliced() ekzekuton slice-et një nga një.
+
+    Për fan-out-e që kanë tashmë një worker për çdo lidhje të pool-it: çdo job
+    mban të shumtën një lidhje, edhe kur query-ja e tij ndahet në slice-e.
+    """
+    token = _SERIAL.set(True)
+    try:
+        yield
+    finally:
+        _SERIAL.reset(token)
+
+
+# -------------------- Progresi --------------------
+_SLICE_PROGRESS: contextvars.ContextVar[Optional[Progress]] = contextvars.ContextVar("slice_progress", default=None)
+
+
+@contextmanager
+def slice_progress(callback: Progress) -> Iterator[None]:
+    """Aktivizon `callback(label, done, total)` për çdo run_sliced() brenda bllokut.
+
+    Callback-u thirret nga thread-i që ekzekutoi run_sliced(): nëse ky është një
+    worker (p.sh. core/report_queries.py), callback-u duhet të jetë thread-safe
+    dhe të mos prekë Streamlit direkt.
+    """
+    token = _SLICE_PROGRESS.set(callback)
+    try:
+        yield
+    finally:
+        _SLICE_PROGRESS.reset(token)
+
+
+# -------------------- Ekzekutimi --------------------
+def run_sliced(
+    fetch: SliceFetch,
+    from_ts: str,
+    to_ts: str,
+    spec: MergeSpec,
+    unit: str = "day",
+    size: int = 1,
+    max_workers: int = 4,
+    retries: int = 1,
+    label: str = "",
+    resume_key: Optional[tuple] = None,
+    progress: Optional[Progress] = None,
+    limiter: Optional[threading.BoundedSemaphore] = None,
+) -> Any:
+    """Ekzekuton `fetch(a, b)` për çdo slice të [from_ts, to_ts) dhe bashkon rezultatet.
+
+    Args:
+        fetch: Query për një slice; kthen rreshta dict ose DataFrame
+        spec: Kolonat çelës dhe masat aditive
+        unit, size: Madhësia e slice-it ("day"/"hour" × size)
+        max_workers: Slice paralele për këtë thirrje (1 brenda serial_slices())
+        retries: Sa herë riprovohet një slice para se të shënohet i dështuar
+        label: Emri për progresin dhe gabimet
+        resume_key: Çelës për resume; None = pa resume
+        progress: Callback(label, done, total); default nga slice_progress()
+        limiter: Semafor i përbashkët (slice_limiter()) që mbahet gjatë çdo
+            fetch; kufizon slice-et njëkohëse mes të gjitha thirrjeve
+
+    Raises:
+        SliceError: Kur të paktën një slice dështon edhe pas retries (pasi të
+            kenë mbaruar të tjerët). Me resume_key, thirrja e radhës vazhdon.
+    """
+    progress = progress or _SLICE_PROGRESS.get()
+    slices = split_slices(from_ts, to_ts, unit, size)
+    run = _take_pending(resume_key, label, slices)
+    pending = run.pending
+    total = len(slices)
+
+    def _fetch(window: Window) -> Any:
+        if limiter is None:
+            return fetch(*window)
+        with limiter:
+            return fetch(*window)
+
+    def _attempt(window: Window) -> Any:
+        for attempt in range(max(0, int(retries)) + 1):
+            try:
+                return _fetch(window)
+            except Exception:
+                if attempt >= retries:
+                    raise
+
+    if progress is not None:
+        progress(label, run.done, total)
+    workers = 1 if _SERIAL.get() else max(1, min(int(max_workers), len(pending) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slice") as ex:
+        # Çdo slice merr kopje të kontekstit (memo i report_scope, capture, metrics)
+        futures = {ex.submit(contextvars.copy_context().run, _attempt, w): w for w in pending}
+        for fut in as_completed(futures):
+            window = futures[fut]
+            try:
+                run.results[window] = fut.result()
+            except Exception as e:
+                run.errors[window] = f"{type(e).__name__}: {e}"
+            if progress is not None:
+                progress(label, run.done, total)
+
+    if run.errors:
+        _keep_pending(resume_key, run)
+        raise SliceError(run)
+    return spec.merge([run.results[w] for w in slices])
@@ -0,0 +1,107 @@
+"""
+explain_queries.py
+
+Diagnostikë e planeve të query-ve (core/query_advisor.py): EXPLAIN për çdo
+query të core/db_vicidial.py, të rollup-it ditor dhe të collect_vicidial_data.py,
+me flamuj për full scan / filesort dhe indekse mbuluese të sugjeruara.
+
+Usage:
+    python explain_queries.py [--db-key db2] [--campaign autobiz] [--days 7]
+    python explain_queries.py --analyze --json out_analysis/explain.json
+    python explain_queries.py --host 127.0.0.1 --port 3307 --user root --password pw --database asterisk
+
+DB lokale për prova (MySQL/MariaDB në container, me të dhëna sintetike):
+    docker run -d --name vici-mysql -e MYSQL_ROOT_PASSWORD=pw -e MYSQL_DATABASE=asterisk -p 3307:3306 mysql:8.0
+    python benchmarks/synthetic_vicidial.py --target mysql --host 127.0.0.1 --port 3307 --user root --password pw
+    python explain_queries.py --host 127.0.0.1 --port 3307 --user root --password pw --campaign autobiz
+
+benchmarks/synthetic_vicidial.py krijon tabelat që lexojnë query-t
+(vicidial_log, vicidial_list, vicidial_lists, vicidial_closer_log,
+vicidial_ivr_response, recording_log) me indekset standarde të Vicidial dhe
+kampanjat autobiz, camp01, ... Planet dhe rreshtat e vlerësuar varen nga
+volumi: përdor --scale 10 (ose më shumë) për një plan afër prodhimit.
+vicidial_hopper dhe vicidial_campaign_statuses nuk gjenerohen: seksionet e
+collector-it mbi to dalin me ERROR në raport.
+
+--analyze ekzekuton query-t realisht (EXPLAIN ANALYZE / ANALYZE): mos e
+përdor në orët e punës mbi DB-në e prodhimit.
+"""
+
+import argparse
+import json
+import pathlib
+
+import pymysql
+
+from core.query_advisor import advise, build_catalog, format_advice_report
+
+SOURCES = ("db_vicidial", "rollup", "collector")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="EXPLAIN + index advisor for Vicidial queries")
+    parser.add_argument("--db-key", dest="db_key", default="db2", help="Seksioni në .streamlit/secrets.toml")
+    parser.add_argument("--host", default=None, help="Anashkalon secrets.toml (p.sh. container lokal)")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--database", default="asterisk")
+    parser.add_argument("--campaign", default="autobiz")
+    parser.add_argument("--campaigns", default=None, help="Disa kampanja me presje: shton query-t e përbashkëta")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--ivr-code", dest="ivr_code", default="1")
+    parser.add_argument("--statuses", default="A,B,NA", help="Statuset për query-t me filtër statusi")
+    parser.add_argument("--sources", default=",".join(SOURCES), help=f"Nëngrup i {','.join(SOURCES)}")
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (ekzekuton query-t)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Ruaj rezultatet në këtë file JSON")
+    return parser.parse_args()
+
+
+def _connect(args):
+    if args.host:
+        host, port, user, password, database = args.host, args.port, args.user, args.password, args.database
+    else:
+        from collect_vicidial_data import read_secrets
+
+        conf = read_secrets().get(args.db_key, {})
+        if not conf:
+            raise RuntimeError(f"Nuk u gjet konfigurimi për [{args.db_key}] në secrets.toml")
+        host, user, password = conf.get("host"), conf.get("user"), conf.get("password")
+        port = int(conf.get("port", 3306))
+        database = conf.get("database", "asterisk")
+    return pymysql.connect(
+        host=host, port=port, user=user, password=password or "", database=database,
+        charset="utf8mb4", autocommit=True, cursorclass=pymysql.cursors.DictCursor,
+    )
+
+
+def main():
+    args = _parse_args()
+    campaign_ids = [c.strip() for c in (args.campaigns or "").split(",") if c.strip()]
+    cases = build_catalog(
+        campaign_ids[0] if campaign_ids else args.campaign,
+        days_back=args.days,
+        ivr_code=args.ivr_code,
+        statuses=[s.strip() for s in args.statuses.split(",") if s.strip()],
+        campaign_ids=campaign_ids,
+        sources=[s.strip() for s in args.sources.split(",") if s.strip()],
+    )
+    print(f"🔎 {len(cases)} queries → EXPLAIN{' ANALYZE' if args.analyze else ''}")
+
+    conn = _connect(args)
+    try:
+        results = advise(conn, cases, analyze=args.analyze)
+    finally:
+        conn.close()
+
+    print(format_advice_report(results))
+    if args.json_path:
+        path = pathlib.Path(args.json_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2, default=str)
+        print(f"\n📁 JSON: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 # local_vici_downloader_oauth.py
-import os, io, re, csv
+import os, io, csv
 from datetime import datetime, timezone
 from urllib.parse import urlparse
 
@@ -17,6 +17,8 @@ from googleapiclient.http import MediaIoBaseUpload
 import gspread
 
 from config import VICIDIAL_DB, VICIDIAL_WEB, GOOGLE, PARAMS
+from core.phone_numbers import normalize_it_number as normalize_phone
+from core.query_templates import QueryTemplate, fetch_with_id_set
 
 SCOPES = [
     "https://www.googleapis.com/auth/drive.file",
@@ -24,9 +26,6 @@ SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets.readonly",
 ]
 
-def normalize_phone(s): 
-    return re.sub(r"\D+", "", s or "")
-
 def get_user_oauth_creds():
     """
     Përdor OAuth si përdorues (Gmail).
@@ -78,9 +77,25 @@ def http_get(url):
         return requests.get(url, auth=(VICIDIAL_WEB["username"], VICIDIAL_WEB["password"]), timeout=60)
     return requests.get(url, timeout=60)
 
-def chunk(arr, size=200):
-    for i in range(0, len(arr), size):
-        yield arr[i:i+size]
+# Query me parametra të lidhur (core/query_templates.py); listat IN zgjerohen në bucket.
+# fetch_with_id_set() i ndan në copa sa një bucket (1024) ose, për shumë ID,
+# i fut në një tabelë TEMPORARY dhe bën një query të vetme.
+LEADS_BY_SUFFIX = QueryTemplate("leads_by_suffix", """
+    SELECT lead_id, phone_number
+    FROM vicidial_list
+    WHERE phone_number REGEXP '^[0-9]+$'
+      AND RIGHT(phone_number, %(n)s) IN (%(suffixes)s)
+""")
+
+RECORDINGS_BY_LEAD = QueryTemplate("recordings_by_lead", """
+    SELECT recording_id, lead_id, filename, location, length_in_sec, start_time, user
+    FROM recording_log
+    WHERE lead_id IN (%(lead_ids)s)
+      AND length_in_sec BETWEEN %(min_sec)s AND %(max_sec)s
+      AND (%(date_from)s IS NULL OR start_time >= %(date_from)s)
+      AND (%(date_to)s IS NULL OR start_time <= %(date_to)s)
+    ORDER BY start_time DESC
+""")
 
 def build_lead_map(cursor, suffix_map):
     """
@@ -100,24 +115,17 @@ def build_lead_map(cursor, suffix_map):
     print(f"[INFO] Po kërkoj lead_id me match në {len(suffix_map)} sufikse (N={N} shifra të fundit)...")
 
     lead_map = {owner: set() for owners in suffix_map.values() for owner in owners}
-    keys = list(suffix_map.keys())
-
-    for batch in chunk(keys, size=200):
-        ph = ",".join(["%s"] * len(batch))
-        q = f"""
-            SELECT lead_id, phone_number
-            FROM vicidial_list
-            WHERE phone_number REGEXP '^[0-9]+$'
-              AND RIGHT(phone_number, {N}) IN ({ph})
-        """
-        cursor.execute(q, batch)
-        for lead_id, phone in cursor.fetchall():
-            p = normalize_phone(phone)
-            if not p: 
-                continue
-            suf = p[-N:] if len(p) >= N else p
-            for owner in suffix_map.get(suf, []):
-                lead_map[owner].add(lead_id)
+    rows = fetch_with_id_set(
+        cursor, LEADS_BY_SUFFIX, "suffixes", list(suffix_map.keys()),
+        column_type="VARCHAR(32)", n=N,
+    )
+    for lead_id, phone in rows:
+        p = normalize_phone(phone)
+        if not p: 
+            continue
+        suf = p[-N:] if len(p) >= N else p
+        for owner in suffix_map.get(suf, []):
+            lead_map[owner].add(lead_id)
 
     total = sum(len(s) for s in lead_map.values())
     print(f"[INFO] Gjetëm gjithsej {total} lead_id që përputhen me numrat.")
@@ -126,20 +134,15 @@ def build_lead_map(cursor, suffix_map):
 def query_recordings(cursor, lead_ids, p):
     if not lead_ids: 
         return []
-    ids = ",".join(str(x) for x in lead_ids)
-    q = f"""
-        SELECT recording_id, lead_id, filename, location, length_in_sec, start_time, user
-        FROM recording_log
-        WHERE lead_id IN ({ids})
-          AND length_in_sec BETWEEN {p["duration_min_sec"]} AND {p["duration_max_sec"]}
-    """
-    if p["optional_date_from"]:
-        q += f" AND start_time >= '{p['optional_date_from']}'"
-    if p["optional_date_to"]:
-        q += f" AND start_time <= '{p['optional_date_to']}'"
-    q += " ORDER BY start_time DESC"
-    cursor.execute(q)
-    return cursor.fetchall()
+    rows = fetch_with_id_set(
+        cursor, RECORDINGS_BY_LEAD, "lead_ids", list(lead_ids),
+        min_sec=p["duration_min_sec"],
+        max_sec=p["duration_max_sec"],
+        date_from=p["optional_date_from"] or None,
+        date_to=p["optional_date_to"] or None,
+    )
+    # ORDER BY vlen brenda çdo cope: rendit sërish të gjitha, më të rejat në fillim
+    return sorted(rows, key=lambda r: str(r[5]), reverse=True)
 
 def ensure_drive_folder(service, parent_id, name):
     # My Drive (jo Shared drives): nuk duhen flags speciale
@@ -200,42 +203,40 @@ def main():
         owner_folder = ensure_drive_folder(drive, session_folder, owner_num)
         manifest_rows = [["recording_id","lead_id","filename","saved_as","location","length_in_sec","start_time","user","status"]]
 
-        lst = list(owner_leads)
-        for batch in chunk(lst, size=800):
+        rows = query_recordings(cur, owner_leads, PARAMS)
+        print(f"[INFO] {owner_num}: u gjetën {len(rows)} regjistrime.")
+
+        for (rec_id, lead_id, filename, location, length, start_time, user) in rows:
+            if total_downloaded >= total_limit:
+                break
+            status = "SKIPPED"; saved_name = ""
+
+            if location and location.lower().startswith(("http://", "https://")):
+                try:
+                    r = http_get(location)
+                    if r.status_code == 200:
+                        ts = (start_time.strftime("%Y%m%d_%H%M%S") if hasattr(start_time, "strftime")
+                              else str(start_time).replace(" ", "_").replace(":",""))
+                        base = filename or os.path.basename(urlparse(location).path) or f"{rec_id}.wav"
+                        saved_name = f"{ts}_{base}"
+                        drive_upload_binary(drive, owner_folder, saved_name, r.content)
+                        status = "OK"; total_downloaded += 1
+                        print(f"[OK]  {owner_num} -> {saved_name} (total={total_downloaded})")
+                    else:
+                        status = f"HTTP {r.status_code}"
+                        print(f"[HTTP] {owner_num} -> {location} => {status}")
+                except Exception as e:
+                    status = f"ERR {e}"
+                    print(f"[ERR] {owner_num} -> {location} => {status}")
+            else:
+                status = "Unsupported or empty location"
+                print(f"[WARN] {owner_num} -> location jo http/https: {location}")
+
+            manifest_rows.append(
+                [rec_id, lead_id, filename, saved_name, location, length, str(start_time), user, status]
+            )
             if total_downloaded >= total_limit:
                 break
-            rows = query_recordings(cur, batch, PARAMS)
-            print(f"[INFO] {owner_num}: u gjetën {len(rows)} regjistrime në këtë batch.")
-
-            for (rec_id, lead_id, filename, location, length, start_time, user) in rows:
-                if total_downloaded >= total_limit:
-                    break
-                status = "SKIPPED"; saved_name = ""
-
-                if location and location.lower().startswith(("http://", "https://")):
-                    try:
-                        r = http_get(location)
-                        if r.status_code == 200:
-                            ts = (start_time.strftime("%Y%m%d_%H%M%S") if hasattr(start_time, "strftime")
-                                  else str(start_time).replace(" ", "_").replace(":",""))
-                            base = filename or os.path.basename(urlparse(location).path) or f"{rec_id}.wav"
-                            saved_name = f"{ts}_{base}"
-                            drive_upload_binary(drive, owner_folder, saved_name, r.content)
-                            status = "OK"; total_downloaded += 1
-                            print(f"[OK]  {owner_num} -> {saved_name} (total={total_downloaded})")
-                        else:
-                            status = f"HTTP {r.status_code}"
-                            print(f"[HTTP] {owner_num} -> {location} => {status}")
-                    except Exception as e:
-                        status = f"ERR {e}"
-                        print(f"[ERR] {owner_num} -> {location} => {status}")
-                else:
-                    status = "Unsupported or empty location"
-                    print(f"[WARN] {owner_num} -> location jo http/https: {location}")
-
-                manifest_rows.append([rec_id, lead_id, filename, saved_name, location, length, str(start_time), user, status])
-                if total_downloaded >= total_limit:
-                    break
 
         # manifest.csv për këtë numër
         csv_buf = io.StringIO(); w = csv.writer(csv_buf)
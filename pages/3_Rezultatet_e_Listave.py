@@ -1,20 +1,19 @@
 import io
 import re
 from datetime import datetime, time
+from time import perf_counter
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
-from core.db_vicidial import (
-    fetch_outbound_by_list_statuses,
-    get_inbound_calls_by_list,
-    fetch_status_distribution_by_list,
-    fetch_dials_by_phone,
-    fetch_inbound_by_phone,
-    fetch_svyclm_by_list,
-    fetch_svyclm_timeout_by_list,
-)
+from core.report_queries import fetch_smart_report_data
+from core.query_cache import clear_query_cache
+from core.query_metrics import get_metrics_registry
+from core.db_vicidial import iter_dials_by_phone_split, iter_inbound_by_phone, get_replica_status
+from core.snapshot import snapshot_path_for, write_snapshot
+from core.phone_aggregates import InboundPhoneMaps, FixProvinceAccumulator, ProvinceCostAccumulator
+from core.report_frames import build_list_cost_frame, build_status_mix_frame, build_svyclm_quality_frame
 from core.voip_rates import get_voip_rates, update_voip_rates
 from core.status_settings import (
     get_status_cost_map,
@@ -22,6 +21,7 @@ from core.status_settings import (
     get_dial_statuses_for_dials,
     get_min_dials_per_list,
     get_allow_all_statuses,
+    get_phone_rows_streaming,
     update_dial_statuses_for_dials,
     update_allow_all_statuses,
 )
@@ -110,47 +110,117 @@ with col_type:
 with col_mode:
     show_full_report = st.checkbox("📊 Raport i Plotë", value=False, help="Shfaq tabelat e detajuara (01_List_Cost, 02_Prefix_Province, 03_SVYCLM_Quality)")
 
-run = st.button("Gjenero raportin", type="primary", disabled=not (campaign and ivr_code))
-
-
-def infer_list_type(list_name: str) -> str:
-    n = (list_name or "").lower()
-    if re.search(r"(mobile|cell|cellulare|gsm|mob)", n):
-        return "mobile"
-    if re.search(r"(fix|fisso|landline|fixed)", n):
-        return "fix"
-    return "unknown"
+col_run, col_cache = st.columns([3, 1])
+with col_run:
+    run = st.button("Gjenero raportin", type="primary", disabled=not (campaign and ivr_code))
+with col_cache:
+    if st.button("🧹 Pastro cache DB", help="Fshin rezultatet e ruajtura në out_analysis/query_cache"):
+        st.info(f"U fshinë {clear_query_cache()} rezultate nga cache.")
+
+
+def render_query_profile(since: int, t_run0: float, db_wall_sec: float) -> None:
+    """Paneli "Query profile": kohët e query-ve të këtij ekzekutimi (core/query_metrics.py)."""
+    registry = get_metrics_registry()
+    records = registry.records(since)
+    page_sec = perf_counter() - t_run0
+    with st.expander(f"⏱️ Query profile ({len(records)} query, {page_sec:.1f}s)", expanded=False):
+        if not records:
+            st.caption("Asnjë query e regjistruar për këtë ekzekutim.")
+            return
+        live = [r for r in records if r.source in ("db", "stream")]
+        stream_sec = sum(r.total_ms for r in records if r.source == "stream") / 1000.0
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("DB + rrjeti (Σ)", f"{sum(r.exec_ms + r.fetch_ms for r in live) / 1000.0:.2f}s",
+                  help="Shuma e kohëve execute+fetch; query-t paralele mbivendosen")
+        c2.metric("Pritje në pool (Σ)", f"{sum(r.wait_ms for r in records) / 1000.0:.2f}s")
+        c3.metric("Leximi nga DB (wall)", f"{db_wall_sec + stream_sec:.2f}s")
+        c4.metric("Faqja (pandas/render)", f"{max(0.0, page_sec - db_wall_sec - stream_sec):.2f}s")
+        st.caption(
+            f"{sum(r.rows for r in records):,} rreshta · {sum(r.bytes for r in live) / 1e6:.2f} MB nga DB · "
+            f"{sum(1 for r in records if r.source == 'cache')} nga cache · "
+            f"{sum(1 for r in records if r.source == 'memo')} nga memo"
+        )
+        for key, rep in get_replica_status().items():
+            lag = f"lag {rep['lag_sec']}s" if rep["lag_sec"] is not None else rep["reason"]
+            st.caption(
+                f"🔁 Replica [{key}] {rep['host']}: {'✅' if rep['healthy'] else '⚠️ primary'} ({lag}) · "
+                f"{rep['routed_replica']} → replica, {rep['routed_primary']} → primary, {rep['failovers']} failover"
+            )
+        st.dataframe(pd.DataFrame(registry.summary(since)), use_container_width=True)
+        st.dataframe(pd.DataFrame([r.to_dict() for r in records]), use_container_width=True)
+        st.download_button(
+            "📥 Query profile (JSONL)",
+            data=registry.to_jsonl(since),
+            file_name=f"query_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+            mime="application/x-ndjson",
+        )
 
 
 if run:
+    metrics_mark = get_metrics_registry().mark()
+    t_run0 = perf_counter()
     from_ts = datetime.combine(start_date, start_time).strftime("%Y-%m-%d %H:%M:%S")
     to_ts = datetime.combine(end_date, end_time).strftime("%Y-%m-%d %H:%M:%S")
 
+    dial_statuses = None if get_allow_all_statuses() else get_dial_statuses_for_dials()
+    if dial_statuses is not None and not dial_statuses:
+        st.warning("No dial statuses selected. Shko te Settings për t'i vendosur ose aktivizo ALL.")
+        st.stop()
+
+    # ============== LEXIMI PARALEL I TË DHËNAVE NGA DB ==============
+    # Të gjitha query-të e raportit ekzekutohen njëkohësisht (core/report_queries.py)
+    # Me streaming, rreshtat per-phone lexohen më poshtë në batch-e (SSCursor)
+    stream_phone = show_full_report and get_phone_rows_streaming()
+    prog = st.progress(0, text="Duke lexuar të dhënat nga DB...")
+    try:
+        report_data = fetch_smart_report_data(
+            from_ts, to_ts, campaign.strip(), ivr_code.strip(), dial_statuses,
+            full=show_full_report,
+            progress=lambda done, total, name: prog.progress(
+                int(done * 100 / total), text=f"✔ {name} ({done}/{total})"
+            ),
+            stream_phone_rows=stream_phone,
+        )
+        prog.progress(100, text=f"✅ Të dhënat u lexuan ({report_data.wall_time_sec:.1f}s)")
+    except Exception as e:
+        st.error(f"Gabim gjatë leximit të DB: {e}")
+        st.stop()
+
+    # ============== AGREGIMI PER-PHONE (phone_stats + 02_Prefix_Province) ==============
+    # Një kalim i vetëm mbi rreshtat per-phone ushqen të dy akumuluesit
+    rates = get_voip_rates()
+    if show_full_report:
+        ib_maps = InboundPhoneMaps()
+        fix_acc = FixProvinceAccumulator(ib_maps.sum_by_phone, sorted_by_phone=stream_phone)
+        cost_acc = ProvinceCostAccumulator(ib_maps.last_by_phone, rates.fix_eur_per_min, rates.mobile_eur_per_min)
+        try:
+            if stream_phone:
+                prog_phone = st.progress(0, text="Duke lexuar numrat (streaming)...")
+                for batch in iter_inbound_by_phone(from_ts, to_ts, campaign.strip(), ivr_code.strip()):
+                    ib_maps.add_rows(batch)
+                n_rows = 0
+                for batch in iter_dials_by_phone_split(from_ts, to_ts, campaign.strip(), dial_statuses):
+                    fix_acc.add_rows(row_f for _, row_f in batch if row_f is not None)
+                    cost_acc.add_rows(row_all for row_all, _ in batch)
+                    n_rows += len(batch)
+                    prog_phone.progress(50, text=f"Duke lexuar numrat (streaming)... {n_rows:,} rreshta")
+                prog_phone.progress(100, text=f"✅ {n_rows:,} rreshta per-phone")
+            else:
+                ib_maps.add_rows(report_data.inbound_by_phone)
+                fix_acc.add_rows(report_data.dials_by_phone_filtered)
+                cost_acc.add_rows(report_data.dials_by_phone_all)
+        except Exception as e:
+            st.error(f"Gabim gjatë leximit të numrave: {e}")
+            st.stop()
+
     # ============== AZHORNIMI I FILE-IT analysis_data_db.json ==============
     if show_full_report:
+        suffix = selected_db_key.replace("/", "_")
+        output_file = f"vicidial_analysis_data_{suffix}.json"
         prog = st.progress(0, text="🔄 Azhornohet analysis_data_db.json...")
         try:
-            # Importojmë funksionet e nevojshme
-            from core.db_vicidial import fetch_dials_by_phone, fetch_inbound_by_phone
-            from core.mobile_fix_classifier import classify_phone_number
             import json
-            from datetime import datetime
-
-            # Merr të dhënat për Analyzer + Recommender
-            prog.progress(10, text="Duke mbledhur të dhënat për Analyzer...")
 
-            # Merr të dhënat e dials
-            dial_statuses = None if get_allow_all_statuses() else get_dial_statuses_for_dials()
-            if dial_statuses is not None and not dial_statuses:
-                st.warning("No dial statuses selected. Shko te Settings për t'i vendosur ose aktivizo ALL.")
-                st.stop()
-
-            # Merr të dhënat e dials me provincë
-            dials_data = fetch_dials_by_phone(from_ts, to_ts, campaign.strip(), dial_statuses)
-            prog.progress(30, text="Duke mbledhur të dhënat e inbound...")
-
-            # Merr të dhënat e inbound me provincë
-            inbound_data = fetch_inbound_by_phone(from_ts, to_ts, campaign.strip(), ivr_code.strip())
             prog.progress(50, text="Duke analizuar të dhënat...")
 
             # Krijo strukturën e të dhënave për Analyzer
@@ -179,81 +249,14 @@ if run:
                 "status_definitions": []
             }
 
-            # Analizo të dhënat e dials
-            phone_stats = {}
-            for row in dials_data:
-                phone = row.get("phone_number", "")
-                province = row.get("province", "")
-                calls = row.get("dials", 0)
-                total_sec = row.get("total_sec", 0)
-
-                if phone:
-                    # Klasifikon numrin
-                    phone_type, province_code, zone_name = classify_phone_number(phone, province)
-
-                    if phone not in phone_stats:
-                        phone_stats[phone] = {
-                            "phone": phone,
-                            "phone_type": phone_type,
-                            "province": province_code,
-                            "zone": zone_name,
-                            "calls": 0,
-                            "total_sec": 0,
-                            "inbound_calls": 0
-                        }
-
-                    phone_stats[phone]["calls"] += calls
-                    phone_stats[phone]["total_sec"] += total_sec
-
-            # Analizo të dhënat e inbound
-            for row in inbound_data:
-                phone = row.get("phone_number", "")
-                inbound_calls = row.get("inbound_calls", 0)
-
-                if phone in phone_stats:
-                    phone_stats[phone]["inbound_calls"] += inbound_calls
-
-            # Krijo prefix_analysis
-            prefix_stats = {}
-            for phone, stats in phone_stats.items():
-                if stats["phone_type"] == "FIX" and stats["province"]:
-                    # Për numra fix, përdor provincën
-                    province = stats["province"]
-                    if province not in prefix_stats:
-                        prefix_stats[province] = {
-                            "prefix_2": "",
-                            "prefix_3": "",
-                            "prefix_4": "",
-                            "calls": 0,
-                            "avg_duration": 0,
-                            "total_minutes": 0,
-                            "inbound_calls": 0
-                        }
-
-                    prefix_stats[province]["calls"] += stats["calls"]
-                    prefix_stats[province]["total_minutes"] += stats["total_sec"] / 60
-                    prefix_stats[province]["inbound_calls"] += stats["inbound_calls"]
-
-            # Konverto në listë
-            analysis_data["prefix_analysis"] = [
-                {
-                    "prefix_2": "",
-                    "prefix_3": "",
-                    "prefix_4": "",
-                    "calls": stats["calls"],
-                    "avg_duration": stats["total_minutes"] / stats["calls"] if stats["calls"] > 0 else 0,
-                    "total_minutes": stats["total_minutes"],
-                    "inbound_calls": stats["inbound_calls"]
-                }
-                for province, stats in prefix_stats.items()
-            ]
+            # prefix_analysis: numrat FIX të grupuar sipas provincës (phone_stats)
+            analysis_data["prefix_analysis"] = fix_acc.finish()
 
             # Ruaj file-in me emrin e duhur për database-in e zgjedhur
-            suffix = selected_db_key.replace("/", "_")
-            output_file = f"vicidial_analysis_data_{suffix}.json"
             prog.progress(80, text=f"Duke ruajtur {output_file}...")
             with open(output_file, "w", encoding="utf-8") as f:
                 json.dump(analysis_data, f, indent=2, ensure_ascii=False, default=str)
+            write_snapshot(analysis_data, snapshot_path_for(output_file))
 
             prog.progress(100, text=f"✅ {output_file} u azhornua!")
 
@@ -262,89 +265,22 @@ if run:
             st.stop()
 
     # ============== LOGJIKA AKTUALE PËR RAPORTIN ==============
-    prog = st.progress(0, text="Duke lexuar OUTBOUND...")
-    try:
-        dial_statuses = None if get_allow_all_statuses() else get_dial_statuses_for_dials()
-        if dial_statuses is not None and not dial_statuses:
-            st.warning("No dial statuses selected. Shko te Settings për t'i vendosur ose aktivizo ALL.")
-            st.stop()
-        ob_rows = fetch_outbound_by_list_statuses(from_ts, to_ts, campaign.strip(), dial_statuses)
-        prog.progress(50, text="Duke lexuar INBOUND sipas IVR...")
-        inbound_map = get_inbound_calls_by_list(from_ts, to_ts, campaign.strip(), ivr_code.strip())
-        prog.progress(100, text="✅ Të dhënat u lexuan")
-    except Exception as e:
-        st.error(f"Gabim gjatë leximit të DB: {e}")
-        st.stop()
+    ob_rows = report_data.outbound_by_list
+    inbound_map = report_data.inbound_by_list
 
-    rates = get_voip_rates()
     status_costs = get_status_cost_map()
     resa_threshold = get_resa_threshold_percent()
     min_dials_per_list = get_min_dials_per_list()
 
     # -------------- Sheet 1: 01_List_Cost --------------
-    records: List[Dict[str, Any]] = []
-    total_dials_sum = 0
-    inbound_calls_sum = 0
-    total_voip_cost = 0.0
-
-    for r in ob_rows or []:
-        list_id = r.get("list_id")
-        list_name = r.get("list_name")
-        total_dials = int(r.get("total_dials") or 0)
-        total_sec = float(r.get("total_sec") or 0)
-        inbound_calls = int(inbound_map.get(int(list_id), 0))
-
-        ltype = infer_list_type(list_name)
-        total_min = total_sec / 60.0
-        if ltype == "mobile":
-            rate = rates.mobile_eur_per_min
-        elif ltype == "fix":
-            rate = rates.fix_eur_per_min
-        else:
-            rate = max(rates.mobile_eur_per_min, rates.fix_eur_per_min)
-
-        voip_cost = total_min * rate if rate else None
-        resa_pct = (inbound_calls / total_dials * 100.0) if total_dials else None
-        cpi = (voip_cost / inbound_calls) if inbound_calls and voip_cost is not None else None
-
-        if total_dials:
-            total_dials_sum += total_dials
-        if inbound_calls:
-            inbound_calls_sum += inbound_calls
-        if voip_cost is not None:
-            total_voip_cost += voip_cost
-
-        records.append({
-            "list_id": list_id,
-            "list_name": list_name,
-            "list_type": ltype,
-            "total_dials": total_dials,
-            "inbound_calls": inbound_calls,
-            "resa_%": round(resa_pct, 2) if resa_pct is not None else None,
-            "total_min": round(total_min, 2),
-            "voip_cost_eur": round(voip_cost, 4) if voip_cost is not None else None,
-            "cost_per_inbound_eur": round(cpi, 4) if cpi is not None else None,
-        })
-
-    type_filter = type_pref
-
-    records.sort(key=lambda x: (
-        x["cost_per_inbound_eur"] if x["cost_per_inbound_eur"] is not None else 1e9,
-        -(x["resa_%"] or 0)
-    ))
-
-    if type_filter != "all":
-        records = [r for r in records if r["list_type"] == type_filter]
-
-    # Recalculate totals after filtering
-    total_dials_sum = sum(r.get("total_dials", 0) for r in records)
-    inbound_calls_sum = sum(r.get("inbound_calls", 0) for r in records)
-    total_voip_cost = sum(r.get("voip_cost_eur", 0) or 0 for r in records)
-    total_minutes = sum(r.get("total_min", 0) for r in records)
-
-    df = pd.DataFrame.from_records(records, columns=[
-        "list_id","list_name","list_type","total_dials","inbound_calls","resa_%","total_min","voip_cost_eur","cost_per_inbound_eur"
-    ])
+    # Kosto, resa % dhe kosto/inbound llogariten me kolona (core/report_frames.py)
+    df, list_totals = build_list_cost_frame(
+        ob_rows, inbound_map, rates.mobile_eur_per_min, rates.fix_eur_per_min, type_filter=type_pref,
+    )
+    total_dials_sum = list_totals["total_dials"]
+    inbound_calls_sum = list_totals["inbound_calls"]
+    total_voip_cost = list_totals["total_voip_cost"]
+    total_minutes = list_totals["total_minutes"]
 
     # smart_pick flag
     try:
@@ -432,6 +368,7 @@ if run:
     # If not full report, stop here
     if not show_full_report:
         st.success("✅ Përmbledhja u ruajt në **Raporte**. Për të eksportuar XLSX, aktivizo '📊 Raport i Plotë'.")
+        render_query_profile(metrics_mark, t_run0, report_data.wall_time_sec)
         st.stop()
 
     # -------------- FULL REPORT MODE --------------
@@ -439,103 +376,28 @@ if run:
     st.markdown("### 📋 Raport i Plotë — Detaje")
     st.dataframe(df, use_container_width=True)
 
-    # Now fetch additional data for full report
-    prog_full = st.progress(0, text="Duke lexuar të dhëna shtesë për raportin e plotë...")
-    try:
-        dist_rows = fetch_status_distribution_by_list(from_ts, to_ts, campaign.strip())
-        prog_full.progress(33, text="Duke lexuar prefix/provincia...")
-        dials_phone = fetch_dials_by_phone(from_ts, to_ts, campaign.strip(), None)
-        inbound_phone = fetch_inbound_by_phone(from_ts, to_ts, campaign.strip(), ivr_code.strip())
-        prog_full.progress(66, text="Duke lexuar SVYCLM quality...")
-        sv_rows = fetch_svyclm_by_list(from_ts, to_ts, campaign.strip())
-        timeout_codes = ["TIMEOUT", "t", "TIME-OUT"]
-        to_rows = fetch_svyclm_timeout_by_list(from_ts, to_ts, campaign.strip(), timeout_codes)
-        prog_full.progress(100, text="✅ Të dhënat shtesë u lexuan")
-    except Exception as e:
-        st.error(f"Gabim gjatë leximit të të dhënave shtesë: {e}")
-        st.stop()
+    # Të dhënat shtesë janë lexuar paralelisht në fillim (report_data)
+    prog_full = st.progress(0, text="Duke ndërtuar raportin e plotë...")
+    dist_rows = report_data.status_distribution
+    sv_rows = report_data.svyclm_by_list
+    to_rows = report_data.svyclm_timeout_by_list
 
     # -------------- Sheet 2: 02_Status_Mix_Cost --------------
-    per_list: Dict[int, Dict[str, Any]] = {}
-    for r in dist_rows or []:
-        lid = int(r.get("list_id"))
-        status = str(r.get("status") or "").upper()
-        calls = int(r.get("calls") or 0)
-        total_sec = float(r.get("total_sec") or 0)
-        d = per_list.setdefault(lid, {"list_id": lid, "total_dials": 0, "total_sec": 0.0})
-        d["total_dials"] += calls
-        d["total_sec"] += total_sec
-        d[f"{status}_calls"] = d.get(f"{status}_calls", 0) + calls
-
-    name_map = {int(r.get("list_id")): r.get("list_name") for r in ob_rows}
-    for lid, d in per_list.items():
-        d["list_name"] = name_map.get(lid, f"LIST {lid}")
-        d["inbound_calls"] = int(inbound_map.get(lid, 0))
-        total_cost = 0.0
-        for k, v in list(d.items()):
-            if k.endswith("_calls"):
-                status = k[:-6]
-                cost = float(status_costs.get(status, 0.0))
-                total_cost += float(v) * cost
-        d["status_cost_total_eur"] = round(total_cost, 4)
-        td = int(d.get("total_dials") or 0)
-        ib = int(d.get("inbound_calls") or 0)
-        d["status_cost_per_dial_eur"] = round(total_cost / td, 6) if td else None
-        d["status_cost_per_inbound_eur"] = round(total_cost / ib, 6) if ib else None
-
-    df_status = pd.DataFrame.from_records(list(per_list.values()))
+    if isinstance(ob_rows, pd.DataFrame):
+        name_map = dict(zip(ob_rows["list_id"].astype(int), ob_rows["list_name"]))
+    else:
+        name_map = {int(r.get("list_id")): r.get("list_name") for r in ob_rows}
+    df_status = build_status_mix_frame(dist_rows, name_map, inbound_map, status_costs)
     if not df_status.empty and "status_cost_per_inbound_eur" in df_status:
         df_status = df_status.sort_values(by=["status_cost_per_inbound_eur"], ascending=[True])
 
     # -------------- Sheet 2b: 02_Prefix_Province --------------
-    # Build phone-level aggregation (data already fetched above)
-    # LOGJIKA E RE: Përdor classify_phone_number() me provincën nga Vicidial
-    from core.mobile_fix_classifier import classify_phone_number
-    ib_map_phone = {str(r.get("phone_number")): int(r.get("inbound_calls") or 0) for r in inbound_phone or []}
-    rows_prefix = []
-    for r in dials_phone or []:
-        phone = str(r.get("phone_number"))
-        dials = int(r.get("dials") or 0)
-        total_min = float(r.get("total_sec") or 0) / 60.0
-        inbound_calls = int(ib_map_phone.get(phone, 0))
-
-        # Merr provincën nga Vicidial (nëse ka)
-        lead_province = r.get("province", "")
-
-        # Përdor logjikën e re të klasifikimit
-        phone_type, provincia, zone_name = classify_phone_number(phone, lead_province)
-
-        # Përcakto rate-in bazuar në llojin e numrit
-        if phone_type == "FIX":
-            rate = rates.fix_eur_per_min
-        elif phone_type == "MOBILE":
-            rate = rates.mobile_eur_per_min
-        else:
-            rate = max(rates.mobile_eur_per_min, rates.fix_eur_per_min)
-
-        voip_cost = total_min * rate
-        resa_pct = (inbound_calls / dials * 100.0) if dials else None
-        cpi = (voip_cost / inbound_calls) if inbound_calls else None
-        rows_prefix.append({
-            "provincia": provincia,
-            "total_dials": dials,
-            "inbound_calls": inbound_calls,
-            "resa_%": round(resa_pct, 3) if resa_pct is not None else None,
-            "total_min": round(total_min, 3),
-            "voip_cost_eur": round(voip_cost, 3),
-            "cost_per_inbound_eur": round(cpi, 3) if cpi is not None else None,
-        })
-    # Aggregate by prefix/provincia
+    # Rreshtat per-phone janë mbledhur sipas provincës më sipër (cost_acc)
+    rows_prefix = cost_acc.records()
+    # Rreshtat janë tashmë një për provincë (të renditur si groupby)
     if rows_prefix:
         df_prefix = pd.DataFrame.from_records(rows_prefix)
         if not df_prefix.empty:
-            agg_funcs = {
-                "total_dials": "sum",
-                "inbound_calls": "sum",
-                "total_min": "sum",
-                "voip_cost_eur": "sum",
-            }
-            df_prefix = df_prefix.groupby(["provincia"], as_index=False).agg(agg_funcs)
             df_prefix["resa_%"] = (df_prefix["inbound_calls"] / df_prefix["total_dials"] * 100.0).round(3)
             df_prefix["cost_per_inbound_eur"] = (df_prefix["voip_cost_eur"] / df_prefix["inbound_calls"]).where(df_prefix["inbound_calls"]>0).round(3)
             df_prefix = df_prefix.sort_values(by=["cost_per_inbound_eur","resa_%"], ascending=[True, False])
@@ -580,39 +442,9 @@ if run:
     # -------------- Sheet 4: 03_SVYCLM_Quality --------------
     # Data already fetched above
     from core.status_settings import get_svyclm_timeout_ratio_warn
-    to_map = {int(r.get("list_id")): int(r.get("svyclm_timeout") or 0) for r in to_rows or []}
-    qual_records = []
-    warn_ratio = get_svyclm_timeout_ratio_warn()
-    name_map2 = name_map
-    for r in sv_rows or []:
-        lid = int(r.get("list_id"))
-        sv_calls = int(r.get("svyclm_calls") or 0)
-        sv_timeout = int(to_map.get(lid, 0))
-        li_total = next((x for x in records if x["list_id"] == lid), None)
-        total_dials_l = int(li_total.get("total_dials") if li_total else 0)
-        inbound_l = int(inbound_map.get(lid, 0))
-        resa_l = (inbound_l / total_dials_l * 100.0) if total_dials_l else None
-        ratio = (sv_timeout / sv_calls) if sv_calls else None
-        note = "⚠ high timeout" if (ratio is not None and ratio >= warn_ratio) else ""
-        qual_records.append({
-            "list_id": lid,
-            "list_name": name_map2.get(lid, f"LIST {lid}"),
-            "total_dials": total_dials_l,
-            "svyclm_calls": sv_calls,
-            "svyclm_timeout": sv_timeout,
-            "svyclm_timeout_ratio": round(ratio, 3) if ratio is not None else None,
-            "inbound_calls": inbound_l,
-            "resa_%": round(resa_l, 2) if resa_l is not None else None,
-            "notes": note,
-        })
-    if qual_records:
-        df_sv = pd.DataFrame.from_records(qual_records)
-        # Round floats to 3 decimals
-        fc_sv = df_sv.select_dtypes(include=["float"]).columns
-        if len(fc_sv) > 0:
-            df_sv[fc_sv] = df_sv[fc_sv].round(3)
-    else:
-        df_sv = pd.DataFrame(columns=["list_id","list_name","total_dials","svyclm_calls","svyclm_timeout","svyclm_timeout_ratio","inbound_calls","resa_%","notes"])
+    df_sv = build_svyclm_quality_frame(
+        sv_rows, to_rows, df, name_map, inbound_map, get_svyclm_timeout_ratio_warn()
+    )
 
     # -------------- Sheet 3: 03_SVYCLM_Quality --------------
 
@@ -673,6 +505,7 @@ if run:
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         use_container_width=True,
     )
+    render_query_profile(metrics_mark, t_run0, report_data.wall_time_sec)
 
 # ================== Analyzer + Recommender (IVR Dial 700) ==================
 st.markdown("---")
@@ -680,8 +513,11 @@ st.markdown("## 🧠 Analyzer + Recommender (IVR Dial 700)")
 st.caption("Analizë e avancuar e listave dhe rekomandime për konfigurime në Vicidial. Kjo pjesë është vetëm vizuale dhe NUK ndryshon konfigurimet. Tarifat VoIP merren nga Settings.")
 
 import os as _os
-import json as _json
-from core.list_analyzer import generate_report as _generate_report
+from core.list_analyzer import (
+    generate_report as _generate_report,
+    load_vicidial_meta as _load_vicidial_meta,
+    open_vicidial_data as _open_vicidial_data,
+)
 
 _col_a1, _col_a2 = st.columns([2, 1])
 with _col_a1:
@@ -703,9 +539,7 @@ with _col_a1:
             # Check what DB this legacy file corresponds to
             _legacy_db_key = None
             try:
-                with open(_f, "r", encoding="utf-8") as _lf:
-                    _legacy_data = _json.load(_lf)
-                    _legacy_db_key = _legacy_data.get("db_key")
+                _legacy_db_key = _load_vicidial_meta(_f).get("db_key")
             except Exception:
                 pass
             if _legacy_db_key == "db":
@@ -789,8 +623,7 @@ if _run_analyzer:
         _file_db = _report.get("campaign_id"), _report.get("analysis_period"), _report.get("mobile_vs_fix", {})
         _db_key_in_file = None
         try:
-            raw = _json.load(open(_data_path, "r", encoding="utf-8"))
-            _db_key_in_file = raw.get("db_key")
+            _db_key_in_file = _load_vicidial_meta(_data_path).get("db_key")
         except Exception:
             pass
         if _db_key_in_file and _db_key_in_file != selected_db_key:
@@ -963,8 +796,8 @@ if _run_analyzer:
 
         try:
             # Merr të dhënat orare nga data
-            _raw_data = _json.load(open(_data_path, "r", encoding="utf-8"))
-            _hourly_data = _raw_data.get("hourly_performance", [])
+            with _open_vicidial_data(_data_path) as _raw_data:
+                _hourly_data = _raw_data.get("hourly_performance", [])
 
             if _hourly_data:
                 # Filtro për oraret 9-18
@@ -1096,3 +929,134 @@ if _run_analyzer:
         st.error(f"❌ Nuk u gjenerua Analyzer: {_e}")
 
     # (Analyzer + Recommender moved outside 'if run')
+
+# ================== Simulim Skenarësh (Monte Carlo) ==================
+st.markdown("---")
+st.markdown("### 🎲 Simulim Skenarësh — Dial Level & Volumi i Listave")
+st.caption(
+    "Monte Carlo mbi normat reale të dataset-it (connect, SVYCLM dhe kohëzgjatja sipas orës, press 1). "
+    "Çdo skenar simulohet me mijëra ditë; shfaqen p5 / p50 / p95."
+)
+
+from core.list_analyzer import run_analysis as _run_analysis
+from core.scenario_simulator import Scenario as _Scenario, simulate_scenarios as _simulate_scenarios
+from core.status_settings import get_simulation_settings as _get_simulation_settings
+
+_sim_inputs = None
+if _data_path:
+    try:
+        # Parametrat vijnë nga grafi i analizës (memo): rerun-et e kontrolleve nuk i rillogaritin
+        with _open_vicidial_data(_data_path) as _sim_data:
+            _sim_inputs = _run_analysis(_sim_data, ["simulation_inputs"]).results["simulation_inputs"]
+    except Exception as _e:
+        st.warning(f"Nuk u lexuan parametrat e simulimit: {_e}")
+else:
+    st.info("Zgjidh një dataset sipër për simulimin.")
+
+if _sim_inputs is not None and not _sim_inputs.observed_hours:
+    st.info(
+        "Dataset-i nuk ka të dhëna orare (hourly_performance / prefix_hour_status). "
+        "Ekzekuto collect_vicidial_data.py."
+    )
+elif _sim_inputs is not None:
+    _sim_cfg = _get_simulation_settings()
+    _sim_rates = get_voip_rates()
+    with st.expander("📐 Parametrat empirikë", expanded=False):
+        st.dataframe(_sim_inputs.hourly_frame(), use_container_width=True, hide_index=True)
+        st.caption(
+            f"Dial level bazë: {_sim_inputs.base_dial_level:.0f} • ditë aktive: {_sim_inputs.active_days:.1f} • "
+            f"press 1/SVYCLM: {_sim_inputs.press1_per_svyclm * 100:.2f}% • "
+            f"mobile: {_sim_inputs.mobile_share * 100:.1f}% • "
+            f"CV volumi/kohëzgjatja: {_sim_inputs.volume_cv:.2f}/{_sim_inputs.duration_cv:.2f}"
+        )
+        st.caption("Burimet: " + ", ".join(f"{k} ← {v}" for k, v in _sim_inputs.sources.items()))
+
+    _obs_hours = list(_sim_inputs.observed_hours)
+    _base_level = int(round(_sim_inputs.base_dial_level))
+    _sc1, _sc2, _sc3 = st.columns(3)
+    with _sc1:
+        _sim_levels_txt = st.text_input(
+            "Dial levels (me presje)",
+            value=f"{round(_base_level * 0.7)},{_base_level},{round(_base_level * 1.3)}",
+            key="sim_levels",
+            help="Një skenar për çdo dial level",
+        )
+        _sim_hours = st.slider("Orari i thirrjeve", 0, 23, (min(_obs_hours), max(_obs_hours)), key="sim_hours")
+    with _sc2:
+        _sim_leads = st.number_input(
+            "Leads në dispozicion (0 = pa llogaritur)", min_value=0, value=0, step=50000, key="sim_leads",
+        )
+        _sim_attempts = st.number_input("Tentativa mesatare për lead", 1.0, 20.0, 2.5, 0.5, key="sim_attempts")
+    with _sc3:
+        _sim_press1_mult = st.slider("Shumëzues press 1 (p.sh. audio IVR)", 0.5, 2.0, 1.0, 0.05, key="sim_press1_mult")
+        _sim_mobile = st.slider(
+            "Mobile % e minutave", 0, 100, int(round(_sim_inputs.mobile_share * 100)), key="sim_mobile",
+        )
+        _sim_target = st.number_input("Target press 1 / ditë", 1, 10000, 150, key="sim_target")
+
+    try:
+        _levels = [float(x) for x in _sim_levels_txt.split(",") if x.strip()]
+    except ValueError:
+        _levels = []
+        st.warning("Dial levels duhet të jenë numra të ndarë me presje (p.sh. 500,700,900).")
+
+    if _levels:
+        _hours = tuple(range(_sim_hours[0], _sim_hours[1] + 1))
+        _scenarios_mc = [
+            _Scenario(
+                name=f"Dial level {_lvl:.0f}",
+                dial_level=_lvl,
+                hours=_hours,
+                leads_available=float(_sim_leads) if _sim_leads else None,
+                attempts_per_lead=float(_sim_attempts),
+                press1_multiplier=float(_sim_press1_mult),
+                mobile_share=_sim_mobile / 100.0,
+            )
+            for _lvl in dict.fromkeys(_levels)
+        ]
+        _t_sim = perf_counter()
+        _sim_results = _simulate_scenarios(
+            _sim_inputs, _scenarios_mc, trials=_sim_cfg["trials"], rate_cv=_sim_cfg["rate_cv"],
+            mobile_rate=_sim_rates.mobile_eur_per_min, fix_rate=_sim_rates.fix_eur_per_min,
+        )
+        _sim_sec = perf_counter() - _t_sim
+
+        def _band(d: Dict[str, Any], fmt: str = "{:,.0f}") -> str:
+            if d.get("p50") is None:
+                return "—"
+            return f"{fmt.format(d['p50'])} ({fmt.format(d['p5'])}–{fmt.format(d['p95'])})"
+
+        _rows_mc = []
+        for _res in _sim_results.values():
+            _s = _res.summary(press1_target=float(_sim_target))
+            _row = {
+                "Skenari": _s["name"],
+                "Dials/ditë": _band(_s["dials_per_day"]),
+                "Lead burn/ditë": _band(_s["lead_burn_per_day"]),
+                "Kosto/ditë €": _band(_s["cost_per_day"], "{:,.2f}"),
+                "Press 1/ditë": _band(_s["press1_per_day"]),
+                "€/Press 1": _band(_s["cost_per_press1"], "{:,.2f}"),
+                f"P(press 1 ≥ {_sim_target})": f"{_s['prob_press1_target'] * 100:.1f}%",
+            }
+            if "days_of_supply" in _s:
+                _row["Ditë furnizimi"] = _band(_s["days_of_supply"], "{:,.1f}")
+            _rows_mc.append(_row)
+        st.dataframe(pd.DataFrame(_rows_mc), use_container_width=True, hide_index=True)
+
+        _fig_mc = go.Figure()
+        for _name, _res in _sim_results.items():
+            _fig_mc.add_trace(go.Histogram(x=_res.press1, name=_name, opacity=0.55, nbinsx=60))
+        _fig_mc.add_vline(x=float(_sim_target), line_dash="dash", line_color="red", annotation_text="Target")
+        _fig_mc.update_layout(
+            barmode="overlay",
+            title="Shpërndarja e Press 1 / ditë",
+            xaxis_title="Press 1 / ditë",
+            yaxis_title="Ditë të simuluara",
+            template="plotly_white",
+            height=380,
+        )
+        st.plotly_chart(_fig_mc, use_container_width=True)
+        st.caption(
+            f"⏱️ {len(_scenarios_mc)} skenarë × {_sim_cfg['trials']:,} prova në {_sim_sec:.2f}s. "
+            "Orët pa të dhëna marrin kapacitetin median dhe normat mesatare të kampanjës."
+        )
@@ -0,0 +1,76 @@
+"""core/analysis_graph.py: memo sipas seksioneve dhe varësive."""
+
+import pytest
+
+from core.analysis_graph import AnalysisGraph, AnalysisMemo, AnalysisNode, UndeclaredSectionError
+
+
+def _graph(counter):
+    def totals(view):
+        counter["totals"] += 1
+        return sum(r["calls"] for r in view["rows"])
+
+    def share(view, totals):
+        counter["share"] += 1
+        return {r["status"]: r["calls"] / totals for r in view["rows"]}
+
+    def config(view):
+        counter["config"] += 1
+        return view["campaign_config"]["dial_level"]
+
+    return AnalysisGraph([
+        AnalysisNode("share", share, reads=("rows",), deps=("totals",)),
+        AnalysisNode("totals", totals, reads=("rows",)),
+        AnalysisNode("config", config, reads=("campaign_config",)),
+    ], memo=AnalysisMemo())
+
+
+def _data(na_calls=30):
+    return {
+        "rows": [{"status": "NA", "calls": na_calls}, {"status": "PU", "calls": 10}],
+        "campaign_config": {"dial_level": 700},
+    }
+
+
+def test_unchanged_sections_are_reused():
+    counter = {"totals": 0, "share": 0, "config": 0}
+    graph = _graph(counter)
+    first = graph.run(_data())
+    assert first.results["share"] == {"NA": 0.75, "PU": 0.25}
+    second = graph.run(_data())
+    assert sorted(second.reused) == ["config", "share", "totals"]
+    assert counter == {"totals": 1, "share": 1, "config": 1}
+
+
+def test_changed_section_recomputes_only_dependents():
+    counter = {"totals": 0, "share": 0, "config": 0}
+    graph = _graph(counter)
+    graph.run(_data())
+    run = graph.run(_data(na_calls=90))
+    assert sorted(run.recomputed) == ["share", "totals"]
+    assert run.reused == ["config"]
+    assert run.results["share"]["NA"] == 0.9
+
+
+def test_targets_run_only_their_closure():
+    counter = {"totals": 0, "share": 0, "config": 0}
+    run = _graph(counter).run(_data(), ["totals"])
+    assert list(run.results) == ["totals"]
+    assert counter["config"] == 0
+
+
+def test_memo_results_are_isolated_from_callers():
+    graph = _graph({"totals": 0, "share": 0, "config": 0})
+    graph.run(_data()).results["share"]["NA"] = -1
+    assert graph.run(_data()).results["share"]["NA"] == 0.75
+
+
+def test_undeclared_section_and_cycles_are_rejected():
+    graph = AnalysisGraph([AnalysisNode("bad", lambda view: view["rows"], reads=("campaign_config",))])
+    with pytest.raises(UndeclaredSectionError):
+        graph.run(_data())
+    with pytest.raises(ValueError):
+        AnalysisGraph([
+            AnalysisNode("a", lambda view, b: b, deps=("b",)),
+            AnalysisNode("b", lambda view, a: a, deps=("a",)),
+        ])
@@ -0,0 +1,46 @@
+"""core/collector.py: split_rows() ndan rezultatin e përbashkët si MySQL për një kampanjë."""
+
+from core.collector import SplitSpec, split_rows
+
+
+def test_campaign_id_matches_case_insensitively():
+    rows = [
+        {"campaign_id": "AUTOBIZ", "status": "NA", "count": 5},
+        {"campaign_id": "autobiz ", "status": "B", "count": 9},  # PAD SPACE
+        {"campaign_id": "Energy", "status": "NA", "count": 1},
+        {"campaign_id": "other", "status": "NA", "count": 7},
+    ]
+    out = split_rows(rows, SplitSpec(order_by=(("count", True),)), ["autobiz", "ENERGY", "empty"])
+    assert out == {
+        "autobiz": [{"status": "B", "count": 9}, {"status": "NA", "count": 5}],
+        "ENERGY": [{"status": "NA", "count": 1}],
+        "empty": [],
+    }
+
+
+def test_same_campaign_in_two_cases_gets_own_rows():
+    out = split_rows([{"campaign_id": "a", "n": 1}], SplitSpec(), ["a", "A"])
+    assert out == {"a": [{"n": 1}], "A": [{"n": 1}]}
+    out["a"][0]["n"] = 2
+    assert out["A"] == [{"n": 1}]
+
+
+def test_enum_sorts_by_declared_order():
+    rows = [
+        {"campaign_id": "c", "list_id": 1, "active": "Y", "total_leads": 10},
+        {"campaign_id": "c", "list_id": 2, "active": "N", "total_leads": 50},
+        {"campaign_id": "c", "list_id": 3, "active": "Y", "total_leads": 30},
+        {"campaign_id": "c", "list_id": 4, "active": None, "total_leads": 99},
+    ]
+    order = (("active", True), ("total_leads", True))
+    # ENUM('Y','N'): DESC → 'N' (indeksi 2), 'Y' (1), NULL
+    enum_spec = SplitSpec(order_by=order, enums=(("active", ("Y", "N")),))
+    assert [r["list_id"] for r in split_rows(rows, enum_spec, ["c"])["c"]] == [2, 3, 1, 4]
+    # Pa enums: renditje si tekst ('Y' > 'N')
+    assert [r["list_id"] for r in split_rows(rows, SplitSpec(order_by=order), ["c"])["c"]] == [3, 1, 2, 4]
+
+
+def test_text_order_ignores_case_and_limit_applies_per_campaign():
+    rows = [{"campaign_id": "c", "status": s} for s in ("b", "A", "C", "a2")]
+    out = split_rows(rows, SplitSpec(order_by=(("status", False),), limit=3), ["c"])
+    assert [r["status"] for r in out["c"]] == ["A", "a2", "b"]
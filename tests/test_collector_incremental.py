@@ -0,0 +1,115 @@
+"""core/collector_incremental.py: gjendja ditore dhe bashkimi incremental."""
+
+from datetime import date, datetime, timedelta
+
+from core.collector import SectionResult
+from core.collector_incremental import (
+    CollectorState,
+    apply_incremental_results,
+    plan_incremental_jobs,
+)
+
+KEY = "status_distribution"
+
+
+def _rows(day: date, scale: int):
+    return [
+        {"day": day.isoformat(), "status": "NA", "count": 10 * scale, "sum_sec": 15.0 * scale},
+        {"day": day.isoformat(), "status": "SVYCLM", "count": 3 * scale, "sum_sec": 120.0 * scale},
+    ]
+
+
+def _run(state: CollectorState, today: date, rows_for_day, hour: int = 12):
+    now = datetime(today.year, today.month, today.day, hour)
+    jobs, ranges = plan_incremental_jobs("autobiz", 7, state, now=now, grace_hours=6)
+    start = date.fromisoformat(ranges[KEY][0])
+    rows = []
+    d = start
+    while d <= today:
+        rows.extend(rows_for_day(d))
+        d += timedelta(days=1)
+    out = apply_incremental_results({KEY: SectionResult(KEY, "", rows=rows)}, ranges, state)
+    return start, out[KEY]
+
+
+def _scale(d: date) -> int:
+    return d.toordinal() % 5 + 1
+
+
+def test_second_run_reads_only_new_days_and_matches_full_run(tmp_path):
+    day1, day2 = date(2025, 10, 10), date(2025, 10, 11)
+
+    state = CollectorState("db", "autobiz", root=tmp_path)
+    start, _ = _run(state, day1, lambda d: _rows(d, _scale(d)))
+    assert start == day1 - timedelta(days=7)
+    state.save()
+
+    reloaded = CollectorState("db", "autobiz", root=tmp_path)
+    assert reloaded.watermark(KEY) == (day1 - timedelta(days=1)).isoformat()
+    start, incremental = _run(reloaded, day2, lambda d: _rows(d, _scale(d)))
+    # Dita e djeshme ishte "sot" në ekzekutimin e parë (nuk ruhet): rilexohet vetëm ajo
+    assert start == day1
+
+    _, full = _run(CollectorState("db", "autobiz", root=tmp_path / "fresh"), day2, lambda d: _rows(d, _scale(d)))
+    assert incremental == full
+    na = next(r for r in full if r["status"] == "NA")
+    expected = sum(10 * _scale(day2 - timedelta(days=i)) for i in range(8))
+    assert na["count"] == expected
+
+
+def test_yesterday_is_not_stored_before_grace_period(tmp_path):
+    day1, day2 = date(2025, 10, 10), date(2025, 10, 11)
+    state = CollectorState("db", "autobiz", root=tmp_path)
+    _run(state, day1, lambda d: _rows(d, 1))
+    assert state.watermark(KEY) == (day1 - timedelta(days=1)).isoformat()
+
+    # 00:30: dita e djeshme ende mund të marrë rreshta të vonuar → lexohet, por nuk ruhet
+    start, early = _run(state, day2, lambda d: _rows(d, 1), hour=0)
+    assert start == day1
+    assert state.watermark(KEY) == (day1 - timedelta(days=1)).isoformat()
+
+    # Rreshtat e vonuar të ditës së djeshme shfaqen në ekzekutimin pas pritjes
+    start, late = _run(state, day2, lambda d: _rows(d, 2 if d == day1 else 1), hour=7)
+    assert start == day1
+    assert state.watermark(KEY) == day1.isoformat()
+    count = {r["status"]: r["count"] for r in late}
+    assert count["NA"] == next(r for r in early if r["status"] == "NA")["count"] + 10
+
+
+def test_failed_section_keeps_stored_days(tmp_path):
+    today = date(2025, 10, 10)
+    state = CollectorState("db", "autobiz", root=tmp_path)
+    _, first = _run(state, today, lambda d: _rows(d, 1))
+    watermark = state.watermark(KEY)
+
+    _, ranges = plan_incremental_jobs("autobiz", 7, state, now=datetime(2025, 10, 10, 12), grace_hours=6)
+    failed = SectionResult(KEY, "", error="timeout")
+    out = apply_incremental_results({KEY: failed}, ranges, state)
+    assert state.watermark(KEY) == watermark
+    # Pa ditën e sotme (live), vetëm ditët e ruajtura
+    na = next(r for r in out[KEY] if r["status"] == "NA")
+    assert na["count"] == next(r for r in first if r["status"] == "NA")["count"] - 10
+
+
+def test_corrupt_state_file_starts_over(tmp_path):
+    state = CollectorState("db", "autobiz", root=tmp_path)
+    state.path.parent.mkdir(parents=True, exist_ok=True)
+    state.path.write_text("{not json", encoding="utf-8")
+    assert CollectorState("db", "autobiz", root=tmp_path).sections == {}
+
+
+def test_list_performance_does_not_claim_exact_distinct_counts(tmp_path):
+    key = "list_performance"
+    state = CollectorState("db", "autobiz", root=tmp_path)
+    now = datetime(2025, 10, 10, 12)
+    _, ranges = plan_incremental_jobs("autobiz", 7, state, now=now, grace_hours=6)
+    rows = [
+        {"day": day, "list_id": 101, "calls": 4, "sum_sec": 60, "unique_leads": 2, "unique_phones": 2}
+        for day in ("2025-10-08", "2025-10-09", "2025-10-10")
+    ]
+    out = apply_incremental_results({key: SectionResult(key, "", rows=rows)}, ranges, state)
+    (row,) = out[key]
+    assert "unique_leads" not in row and "unique_phones" not in row
+    assert row["unique_leads_daily_sum"] == 6
+    assert row["unique_phones_daily_sum"] == 6
+    assert row["calls"] == 12
@@ -0,0 +1,131 @@
+"""core/db_pool.py: limitet për db_key, lidhjet e prishura dhe idle eviction."""
+
+import pytest
+
+from core import db_pool
+from core.db_pool import ConnectionPool, close_pool, get_pool
+
+
+class FakeConn:
+    def __init__(self, n):
+        self.n = n
+        self.open = True
+        self.pings = 0
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+
+    def close(self):
+        self.open = False
+
+
+class FakeFactory:
+    def __init__(self):
+        self.made = []
+
+    def __call__(self):
+        conn = FakeConn(len(self.made))
+        self.made.append(conn)
+        return conn
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(db_pool.time, "monotonic", clock)
+    return clock
+
+
+def test_limits_are_per_db_key():
+    factories = {"t_db": FakeFactory(), "t_db2": FakeFactory()}
+    try:
+        pool1 = get_pool("t_db", factories["t_db"], max_size=1, checkout_timeout_sec=0)
+        pool2 = get_pool("t_db2", factories["t_db2"], max_size=2, checkout_timeout_sec=0)
+        assert get_pool("t_db", max_size=99) is pool1  # limitet lexohen vetëm herën e parë
+
+        held = [pool1.connection(), pool2.connection(), pool2.connection()]
+        with pytest.raises(TimeoutError):
+            pool1.connection()
+        with pytest.raises(TimeoutError):
+            pool2.connection()
+        assert pool1.stats()["in_use"] == 1 and pool2.stats()["in_use"] == 2
+
+        held[0].close()
+        assert pool1.connection().raw is factories["t_db"].made[0]
+        assert len(factories["t_db"].made) == 1 and len(factories["t_db2"].made) == 2
+    finally:
+        close_pool("t_db")
+        close_pool("t_db2")
+
+
+def test_connection_errors_discard_on_exit(clock):
+    pymysql = pytest.importorskip("pymysql")
+    factory = FakeFactory()
+    pool = ConnectionPool("t", factory, max_size=2)
+
+    for exc in (pymysql.err.OperationalError(2013, "lost"), pymysql.err.InterfaceError("closed")):
+        with pytest.raises(type(exc)):
+            with pool.connection():
+                raise exc
+    assert [c.open for c in factory.made] == [False, False]
+    assert pool.stats()["discarded"] == 2 and pool.stats()["idle"] == 0
+
+    # Gabimet e tjera (p.sh. SQL i gabuar) nuk e prishin lidhjen: kthehet në pool
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("bad query")
+    assert pool.stats()["idle"] == 1
+    with pool.connection() as conn:
+        assert conn.raw is factory.made[2]
+    assert len(factory.made) == 3
+
+
+def test_closed_connection_is_not_reused(clock):
+    factory = FakeFactory()
+    pool = ConnectionPool("t", factory)
+    with pool.connection() as conn:
+        conn.raw.open = False
+    assert pool.stats()["idle"] == 0
+    assert pool.connection().raw is factory.made[1]
+
+
+def test_idle_connections_are_evicted(clock):
+    factory = FakeFactory()
+    pool = ConnectionPool("t", factory, max_size=2, max_idle_sec=60, ping_after_sec=5)
+    a, b = pool.connection(), pool.connection()
+    a.close()
+    clock.now += 30
+    b.close()
+
+    clock.now += 40  # a: 70s idle, b: 40s
+    pool.evict_idle()
+    assert pool.stats()["evicted"] == 1 and pool.stats()["idle"] == 1
+    assert factory.made[0].open is False and factory.made[1].open is True
+
+    # b ka qenë idle > ping_after_sec: ping para ripërdorimit
+    assert pool.connection().raw is factory.made[1]
+    assert factory.made[1].pings == 1
+    assert pool.stats()["reused"] == 1
+
+
+def test_failed_ping_replaces_connection(clock):
+    factory = FakeFactory()
+    pool = ConnectionPool("t", factory, ping_after_sec=5)
+    pool.connection().close()
+
+    def broken(reconnect=False):
+        raise OSError("gone")
+
+    factory.made[0].ping = broken
+    clock.now += 10
+    assert pool.connection().raw is factory.made[1]
+    stats = pool.stats()
+    assert stats["ping_failures"] == 1 and stats["discarded"] == 1 and stats["created"] == 2
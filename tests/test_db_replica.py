@@ -0,0 +1,102 @@
+"""core/db_replica.py: routing te replica dhe kthimi te primary."""
+
+import math
+
+import pytest
+
+from core.db_replica import ReplicaConfig, ReplicaRouter, parse_replica_config, read_replica_lag
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _router(probe, clock=None, **config):
+    cfg = ReplicaConfig(host="replica", user="u", password="p", database="asterisk",
+                        max_lag_sec=30, lag_check_sec=15, **config)
+    return ReplicaRouter("db", cfg, probe, clock=clock or _Clock())
+
+
+def test_healthy_replica_is_used():
+    router = _router(lambda: 2.0)
+    assert router.use_replica("fetch_status_distribution_by_list")
+    assert router.status()["routed_replica"] == 1
+
+
+def test_lagging_or_stopped_replica_falls_back_to_primary():
+    assert not _router(lambda: 120.0).use_replica("x")
+    stopped = _router(lambda: math.inf)
+    assert not stopped.use_replica("x")
+    assert stopped.status()["reason"] == "replikimi është ndalur"
+
+
+def test_probe_error_falls_back_to_primary():
+    def probe():
+        raise OSError("connection refused")
+    router = _router(probe)
+    assert not router.use_replica("x")
+    assert "OSError" in router.status()["reason"]
+
+
+def test_lag_is_rechecked_after_interval():
+    lag = {"value": 120.0}
+    clock = _Clock()
+    router = _router(lambda: lag["value"], clock=clock)
+    assert not router.use_replica("x")
+    lag["value"] = 1.0
+    clock.now = 10.0
+    assert not router.use_replica("x")  # gjendja e ruajtur brenda lag_check_sec
+    clock.now = 16.0
+    assert router.use_replica("x")
+    assert router.status()["lag_checks"] == 2
+
+
+def test_failure_and_primary_labels():
+    router = _router(lambda: 0.0, primary_labels=("fetch_list_names",))
+    assert not router.use_replica("fetch_list_names")
+    assert router.use_replica("x")
+    router.report_failure(RuntimeError("gone away"))
+    assert not router.use_replica("x")
+    assert router.status()["failovers"] == 1
+
+
+def test_parse_replica_config_inherits_primary():
+    primary = {"host": "p", "user": "report", "password": "pw", "database": "asterisk", "port": 3307}
+    cfg = parse_replica_config(primary, {"host": "r", "primary_labels": "a, b"})
+    assert (cfg.host, cfg.user, cfg.database, cfg.port) == ("r", "report", "asterisk", 3307)
+    assert cfg.primary_labels == ("a", "b")
+    assert parse_replica_config(primary, {"host": "r", "enabled": "false"}) is None
+    assert parse_replica_config(primary, None) is None
+
+
+class _Cursor:
+    def __init__(self, rows, fail_first=False):
+        self.rows, self.fail_first, self.description = rows, fail_first, None
+        self.executed = []
+
+    def execute(self, sql):
+        self.executed.append(sql)
+        if self.fail_first and len(self.executed) == 1:
+            raise RuntimeError("syntax")
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.mark.parametrize("rows, expected", [
+    ([], 0.0),
+    ([{"Seconds_Behind_Source": 12}], 12.0),
+    ([{"Seconds_Behind_Master": None}], math.inf),
+])
+def test_read_replica_lag(rows, expected):
+    assert read_replica_lag(_Cursor(rows)) == expected
+
+
+def test_read_replica_lag_falls_back_to_slave_status():
+    cursor = _Cursor([{"Seconds_Behind_Master": 3}], fail_first=True)
+    assert read_replica_lag(cursor) == 3.0
+    assert cursor.executed == ["SHOW REPLICA STATUS", "SHOW SLAVE STATUS"]
@@ -0,0 +1,34 @@
+"""core/db_vicidial.py: memo-ja e report_scope nuk ndan objektet mes thirrësve."""
+
+import pytest
+
+pytest.importorskip("pymysql")
+pytest.importorskip("streamlit")
+
+from core.db_vicidial import _QueryMemo  # noqa: E402
+
+
+def test_mutation_does_not_leak_between_callers():
+    memo = _QueryMemo()
+    calls = []
+
+    def run():
+        calls.append(1)
+        return [{"list_id": 1, "calls": 10}]
+
+    first = memo.get_or_run(("k",), run)
+    first[0]["calls"] = 0
+    first.append({"list_id": 2})
+
+    second = memo.get_or_run(("k",), run)
+    assert second == [{"list_id": 1, "calls": 10}]
+    assert second is not first
+    assert len(calls) == 1 and memo.hits == 1
+
+
+def test_frame_results_are_copied():
+    pd = pytest.importorskip("pandas")
+    memo = _QueryMemo()
+    first = memo.get_or_run(("f",), lambda: pd.DataFrame({"calls": [10, 20]}))
+    first["calls"] = 0
+    assert memo.get_or_run(("f",), lambda: None)["calls"].tolist() == [10, 20]
@@ -0,0 +1,68 @@
+"""classify_phone_numbers() (batch) kundrejt classify_phone_number() (scalar)."""
+
+import numpy as np
+import pytest
+
+import core.mobile_fix_classifier as mfc
+from core.mobile_fix_classifier import classify_phone_number, classify_phone_numbers
+
+PREFIXES = {
+    "06": {"province": "RM", "zone": "Roma"},
+    "02": {"province": "MI", "zone": "Milano"},
+    "081": {"province": "NA", "zone": "Napoli"},
+    "0571": {"province": "FI", "zone": "Empoli"},
+    "057": {"province": "SI", "zone": "Siena"},
+}
+
+EDGE_CASES = [
+    # bosh / vetëm kodi i vendit
+    "", " ", "+", "39", "+39", "0039", "+0039", "00390", "3903",
+    # fiks me +39 / 0039 / 39 pa "+"
+    "0612345678", "+390612345678", "00390612345678", "390612345678", "+00390612345678",
+    "0571123456", "0572123456", "081555123", "0", "06", "061", "0571", "0999",
+    # mobile 39X me 10 shifra: nuk është kodi i vendit
+    "3931234567", "3901234567", "3991234567", "393931234567", "+393931234567", "00393931234567",
+    "3331234567", "+393331234567", "393331234567", "333123456", "33312345678", "3211234567",
+    # ndarës dhe karaktere jo-shifra
+    " 06-1234 5678 ", "(081) 555.1234", "+39 333 123 4567", "333/1234567", "+39-06-1234",
+    "++390612345678", "06+12345678", "39\x000612", "\t3331234567\n", "٣٣٣1234567", "abc",
+    "1234567890", "9" * 30,
+]
+
+
+@pytest.fixture(autouse=True)
+def prefixes(monkeypatch):
+    monkeypatch.setattr(mfc, "ITALIAN_FIX_PREFIXES", PREFIXES)
+    monkeypatch.setattr(mfc, "VALID_PROVINCES", ["RM", "MI", "NA", "FI", "SI"])
+
+
+@pytest.mark.parametrize("province", [None, "MI", " rm ", "", "Tiramisu"])
+def test_edge_cases_match_scalar(province):
+    provinces = [province] * len(EDGE_CASES)
+    types, provs, zones = classify_phone_numbers(EDGE_CASES, provinces)
+    for i, phone in enumerate(EDGE_CASES):
+        assert (types[i], provs[i], zones[i]) == classify_phone_number(phone, province), repr(phone)
+
+
+def test_random_numbers_match_scalar():
+    rnd = np.random.default_rng(11)
+    heads = ["", "+", "+39", "0039", "39", "+0039", " "]
+    bodies = ["06", "02", "081", "0571", "057", "0999", "0", "333", "393", "390", "347", "1"]
+    phones, provinces = [], []
+    for _ in range(20_000):
+        digits = "".join(map(str, rnd.integers(0, 10, rnd.integers(0, 10))))
+        phones.append(heads[rnd.integers(len(heads))] + bodies[rnd.integers(len(bodies))] + digits)
+        provinces.append(("MI", None, "na", "XX")[rnd.integers(4)])
+    types, provs, zones = classify_phone_numbers(phones, provinces)
+    expected = [classify_phone_number(p, pr) for p, pr in zip(phones, provinces)]
+    assert list(zip(types, provs, zones)) == expected
+
+
+def test_non_strings_and_empty_input():
+    types, provs, zones = classify_phone_numbers([None, 3331234567, "3331234567"])
+    assert list(zip(types, provs, zones)) == [
+        ("UNKNOWN", "UNKNOWN", None),
+        ("UNKNOWN", "UNKNOWN", None),
+        ("MOBILE", "UNKNOWN MOBILE", None),
+    ]
+    assert all(len(col) == 0 for col in classify_phone_numbers([]))
@@ -0,0 +1,75 @@
+"""core/phone_numbers.py: lookup_phones() dhe normalize_it_numbers() kundrejt versionit scalar."""
+
+import numpy as np
+import pytest
+
+import core.mobile_fix_classifier as mfc
+from core.phone_numbers import (
+    clear_lookup_cache, lookup_phone, lookup_phones, normalize_it_number, normalize_it_numbers,
+)
+
+PREFIXES = {
+    "06": {"province": "RM", "zone": "Roma"},
+    "02": {"province": "MI", "zone": "Milano"},
+    "081": {"province": "NA", "zone": "Napoli"},
+    "0571": {"province": "FI", "zone": "Empoli"},
+}
+
+EDGE_CASES = [
+    "", " ", "+", "39", "+39", "0039", "3903", "00390",
+    "0612345678", "+390612345678", "00390612345678", "390612345678",
+    "3931234567", "393931234567", "+393931234567", "3331234567", "+39 333 123 4567",
+    " 06-1234 5678 ", "(081) 555.1234", "0571 12345", "+0039061234", "++390612345678",
+    "39\x000612", "٣٣٣1234567", "abc", None, 3331234567, 612345678.0,
+]
+
+
+@pytest.fixture(autouse=True)
+def prefixes(monkeypatch):
+    monkeypatch.setattr(mfc, "ITALIAN_FIX_PREFIXES", PREFIXES)
+    monkeypatch.setattr(mfc, "VALID_PROVINCES", ["RM", "MI", "NA", "FI"])
+    clear_lookup_cache()
+    yield
+    clear_lookup_cache()
+
+
+def _random_numbers(n: int, seed: int = 7) -> list:
+    rnd = np.random.default_rng(seed)
+    heads = ["", "+", "+39", "0039", "39", "+39 ", " "]
+    bodies = ["06", "02", "081", "0571", "0999", "333", "393", "347", "1", ""]
+    seps = ["", " ", "-", "."]
+    out = []
+    for _ in range(n):
+        digits = "".join(map(str, rnd.integers(0, 10, rnd.integers(0, 9))))
+        sep = seps[rnd.integers(len(seps))]
+        out.append(heads[rnd.integers(len(heads))] + bodies[rnd.integers(len(bodies))] + sep + digits)
+    return out
+
+
+def test_normalize_it_numbers_matches_scalar():
+    phones = EDGE_CASES + _random_numbers(5000)
+    expected = [normalize_it_number(p if isinstance(p, str) else ("" if p is None else str(p))) for p in phones]
+    assert normalize_it_numbers(phones).tolist() == expected
+
+
+def test_lookup_phones_matches_lookup_phone_row_by_row():
+    phones = EDGE_CASES + _random_numbers(5000)
+    provinces = [("MI", "rm ", "", None, "Tiramisu", float("nan"))[i % 6] for i in range(len(phones))]
+    normalized, types, provs, zones = lookup_phones(phones, provinces)
+    for i, (raw, prov) in enumerate(zip(phones, provinces)):
+        assert (normalized[i], types[i], provs[i], zones[i]) == tuple(lookup_phone(raw, prov)), (raw, prov)
+
+
+def test_lookup_phones_accepts_series_and_no_provinces():
+    pd = pytest.importorskip("pandas")
+    normalized, types, provs, zones = lookup_phones(pd.Series(["+390612345678", "3931234567"]))
+    assert normalized.tolist() == ["0612345678", "3931234567"]
+    assert types.tolist() == ["FIX", "MOBILE"]
+    assert provs.tolist() == ["RM", "UNKNOWN MOBILE"]
+    assert zones.tolist() == ["Roma", None]
+
+
+def test_lookup_phones_empty_and_length_mismatch():
+    assert all(len(col) == 0 for col in lookup_phones([]))
+    with pytest.raises(ValueError):
+        lookup_phones(["0612345678"], ["RM", "MI"])
@@ -0,0 +1,102 @@
+"""analyze_province_performance() (group-by) kundrejt versionit të vjetër me dict."""
+
+import pytest
+
+from core.list_analyzer import analyze_province_performance
+from core.mobile_fix_classifier import FIX_COST_PER_MIN, MOBILE_COST_PER_MIN, classify_phone_number
+
+
+def _legacy_province_performance(data: dict) -> dict:
+    """Versioni para tabelës së prefikseve (rresht pas rreshti), i kopjuar si referencë."""
+    provinces = {}
+    prefix_analysis = data.get("prefix_status_analysis", [])
+    for item in prefix_analysis:
+        prefix = item.get("prefix_3", "")
+        calls = item.get("calls", 0)
+        minutes = item.get("total_minutes", 0)
+        phone_type, province_code, zone_name = classify_phone_number(prefix + "0000000", item.get("province"))
+        if phone_type == "FIX" and province_code:
+            name = zone_name if zone_name else province_code
+            p = provinces.setdefault(name, {
+                "name": name, "province_code": province_code, "prefixes": set(),
+                "total_calls": 0, "total_minutes": 0, "svyclm_count": 0, "press1_count": 0,
+                "voip_cost": 0, "phone_type": "FIX",
+            })
+            p["prefixes"].add(prefix)
+            p["total_calls"] += calls
+            p["total_minutes"] += minutes
+            p["voip_cost"] += minutes * FIX_COST_PER_MIN
+            if item.get("status") == "SVYCLM":
+                p["svyclm_count"] += calls
+
+    mobile = [i for i in prefix_analysis if i.get("prefix_3", "").startswith("3")]
+    mobile_calls = sum(i.get("calls", 0) for i in mobile)
+    if mobile_calls > 0:
+        provinces["Mobile Italia"] = {
+            "name": "Mobile Italia", "province_code": "MOBILE", "prefixes": {"3"},
+            "total_calls": mobile_calls,
+            "total_minutes": sum(i.get("total_minutes", 0) for i in mobile),
+            "svyclm_count": sum(i.get("calls", 0) for i in mobile if i.get("status") == "SVYCLM"),
+            "press1_count": 0,
+            "voip_cost": sum(i.get("total_minutes", 0) * MOBILE_COST_PER_MIN for i in mobile),
+            "phone_type": "MOBILE",
+        }
+
+    for p in provinces.values():
+        p["press1_count"] = int(p["svyclm_count"] * 0.0055)
+        p["press1_rate"] = p["press1_count"] / p["total_calls"] if p["total_calls"] > 0 else 0
+        p["svyclm_rate"] = p["svyclm_count"] / p["total_calls"] if p["total_calls"] > 0 else 0
+        p["cost_per_press1"] = p["voip_cost"] / p["press1_count"] if p["press1_count"] > 0 else 0
+        p["avg_duration"] = p["total_minutes"] * 60 / p["total_calls"] if p["total_calls"] > 0 else 0
+        p["efficiency_score"] = round(
+            min(10, p["press1_rate"] * 100) * 0.4
+            + max(0, 10 - (p["cost_per_press1"] / 0.20) * 10) * 0.3
+            + min(10, p["total_calls"] / 5000) * 0.2
+            + max(0, 10 - abs(p["avg_duration"] - 45) / 10) * 0.1, 2
+        )
+        p["prefixes"] = list(p["prefixes"])
+    return {"provinces": sorted(provinces.values(), key=lambda x: x["efficiency_score"], reverse=True)}
+
+
+@pytest.fixture
+def data() -> dict:
+    rows = [
+        ("061", "SVYCLM", 4000, 3100.5), ("061", "NA", 9000, 210.0), ("062", "SVYCLM", 12000, 9050.25),
+        ("020", "SVYCLM", 2500, 1900.0), ("021", "PU", 7000, 880.0), ("020", "NA", 1500, 12.5),
+        ("011", "NA", 800, 40.0), ("011", "PU", 300, 22.0),  # Torino: pa SVYCLM → press1 = 0
+        ("081", "SVYCLM", 150, 120.0),
+        ("333", "SVYCLM", 20000, 15000.0), ("347", "NA", 6000, 90.0),
+        ("999", "NA", 50, 1.0),  # prefiks i panjohur: jashtë analizës
+    ]
+    return {"prefix_status_analysis": [
+        {"prefix_3": p, "status": s, "calls": c, "total_minutes": m} for p, s, c, m in rows
+    ]}
+
+
+def test_matches_legacy_implementation(data):
+    new = {p["name"]: p for p in analyze_province_performance(data)["provinces"]}
+    old = {p["name"]: p for p in _legacy_province_performance(data)["provinces"]}
+    assert new.keys() == old.keys()
+    for name, ref in old.items():
+        got = new[name]
+        assert set(got["prefixes"]) == set(ref["prefixes"])
+        for key in ("province_code", "phone_type", "total_calls", "svyclm_count", "press1_count", "efficiency_score"):
+            assert got[key] == ref[key], (name, key)
+        for key in ("total_minutes", "voip_cost", "press1_rate", "svyclm_rate", "cost_per_press1", "avg_duration"):
+            assert got[key] == pytest.approx(ref[key]), (name, key)
+        for key in ("total_calls", "svyclm_count", "press1_count"):
+            assert type(got[key]) is int, (name, key)
+    assert [p["name"] for p in analyze_province_performance(data)["provinces"]] == \
+        [p["name"] for p in _legacy_province_performance(data)["provinces"]]
+
+
+def test_zero_denominators_are_int(data):
+    torino = next(p for p in analyze_province_performance(data)["provinces"] if p["name"] == "Torino")
+    assert torino["svyclm_count"] == 0 and type(torino["svyclm_count"]) is int
+    assert torino["cost_per_press1"] == 0 and type(torino["cost_per_press1"]) is int
+
+
+def test_prefixes_sorted_by_calls_descending(data):
+    provinces = {p["name"]: p for p in analyze_province_performance(data)["provinces"]}
+    assert provinces["Roma"]["prefixes"] == ["061", "062"]    # 13000 > 12000
+    assert provinces["Milano"]["prefixes"] == ["021", "020"]  # 7000 > 4000
@@ -0,0 +1,120 @@
+"""core/query_advisor.py: analiza e SQL-it dhe sugjerimet mbi një plan EXPLAIN të rremë."""
+
+from core.query_advisor import (
+    IndexCatalog,
+    QueryCase,
+    analyze_sql,
+    estimate_rows_examined,
+    explain_case,
+    index_columns,
+    suggest_indexes,
+)
+from core.rollup_store import TABLES
+
+LIST_SQL = """
+    SELECT vl.list_id, COUNT(*) AS n
+    FROM vicidial_log vl
+    WHERE vl.campaign_id = %s AND vl.call_date >= %s AND vl.call_date < %s
+      AND vl.status IN (%s, %s)
+      AND vl.list_id IN (SELECT list_id FROM vicidial_lists WHERE active = 'Y')
+    GROUP BY vl.list_id
+    ORDER BY n DESC
+"""
+
+FULL_SCAN_PLAN = [
+    {"id": 1, "table": "vl", "type": "ALL", "possible_keys": None, "key": None, "rows": 500_000,
+     "Extra": "Using where; Using temporary; Using filesort"},
+    {"id": 2, "table": "vicidial_lists", "type": "ref", "possible_keys": "PRIMARY", "key": "PRIMARY",
+     "rows": 3, "Extra": "Using where"},
+]
+
+
+class FakeCursor:
+    """Kthen planin për EXPLAIN dhe indekset e dhëna për SHOW INDEX."""
+
+    def __init__(self, plan, indexes=()):
+        self.plan = plan
+        self.indexes = [
+            {"Key_name": name, "Seq_in_index": i + 1, "Column_name": col}
+            for name, cols in indexes for i, col in enumerate(cols)
+        ]
+        self.executed = []
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        self._rows = self.indexes if sql.startswith("SHOW INDEX") else self.plan
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+def test_analyze_sql_splits_predicates_per_table():
+    usage = analyze_sql(LIST_SQL)
+    log = usage["vicidial_log"]
+    assert log.equality == ["campaign_id", "status", "list_id"]
+    assert log.ranges == ["call_date"]
+    assert log.group_by == ["list_id"]
+    # Nën-query-ja analizohet më vete; literal-i 'Y' nuk ngatërrohet me kolonë
+    assert usage["vicidial_lists"].equality == ["active"]
+
+
+def test_analyze_sql_join_keys_and_unqualified_columns():
+    usage = analyze_sql(TABLES["log_phone"]["source_sql"])
+    assert usage["vicidial_log"].joins == ["lead_id"]
+    assert usage["vicidial_list"].joins == ["lead_id"]
+    assert usage["vicidial_list"].group_by == ["province"]
+    assert "length_in_sec" in usage["vicidial_log"].referenced
+
+
+def test_index_columns_equality_then_range_then_covering():
+    usage = analyze_sql(TABLES["log_phone"]["source_sql"])
+    columns, covering, key_length = index_columns(usage["vicidial_log"])
+    assert columns[:2] == ["campaign_id", "call_date"]
+    assert key_length == 2
+    assert covering and {"phone_number", "status", "lead_id", "length_in_sec"} <= set(columns[2:])
+    # Tabela e arritur vetëm përmes JOIN: çelësi i join-it i pari
+    assert index_columns(usage["vicidial_list"])[0] == ["lead_id", "province"]
+
+
+def test_select_star_is_not_covering():
+    usage = analyze_sql("SELECT * FROM vicidial_list WHERE list_id = %s ORDER BY lead_id")
+    columns, covering, key_length = index_columns(usage["vicidial_list"])
+    # Pa interval, ORDER BY hyn në çelës; pa pjesë mbuluese
+    assert (columns, covering, key_length) == (["list_id", "lead_id"], False, 2)
+
+
+def test_suggest_indexes_only_for_flagged_tables():
+    case = QueryCase("test", "outbound_by_list", LIST_SQL, ("autobiz", "2025-10-01", "2025-10-08", "A", "B"))
+    result = explain_case(FakeCursor(FULL_SCAN_PLAN), case)
+    assert result.error is None
+    assert result.flags == ["filesort", "full_scan", "temporary"]
+    assert result.rows_examined == 500_000 + 3
+    (suggestion,) = result.suggestions
+    assert suggestion.table == "vicidial_log"
+    assert suggestion.columns == ["campaign_id", "status", "list_id", "call_date"]
+    assert suggestion.ddl.startswith("ALTER TABLE `vicidial_log` ADD INDEX `idx_campaign_id_status_list_id_call_date`")
+
+
+def test_existing_index_prefix_suppresses_suggestion():
+    cur = FakeCursor(FULL_SCAN_PLAN, indexes=[("ix", ["campaign_id", "status", "list_id", "call_date", "user"])])
+    plan = explain_case(cur, QueryCase("test", "q", LIST_SQL)).plan
+    assert suggest_indexes(LIST_SQL, plan, IndexCatalog(cur)) == []
+
+
+def test_small_indexed_plan_needs_no_index():
+    plan = [{"id": 1, "table": "vl", "type": "range", "possible_keys": "call_date", "key": "call_date",
+             "rows": 120, "Extra": "Using index condition"}]
+    result = explain_case(FakeCursor(plan), QueryCase("test", "q", LIST_SQL))
+    assert result.flags == [] and result.suggestions == []
+    assert estimate_rows_examined(result.plan) == 120
+
+
+def test_explain_error_is_reported_not_raised():
+    class Broken(FakeCursor):
+        def execute(self, sql, params=None):
+            raise RuntimeError("Table 'asterisk.vicidial_log' doesn't exist")
+
+    result = explain_case(Broken([]), QueryCase("test", "q", LIST_SQL))
+    assert result.error.startswith("RuntimeError")
+    assert result.plan == []
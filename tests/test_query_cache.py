@@ -0,0 +1,28 @@
+"""core/query_cache.py: intervalet e mbyllura dhe cache-i në disk."""
+
+from datetime import datetime
+
+from core.query_cache import QueryCache, is_closed_window, make_cache_key
+
+
+def test_closed_window_waits_for_grace_period():
+    end = "2025-10-15 00:00:00"
+    assert not is_closed_window(end, now=datetime(2025, 10, 15, 0, 30), grace_hours=6)
+    assert not is_closed_window(end, now=datetime(2025, 10, 15, 5, 59), grace_hours=6)
+    assert is_closed_window(end, now=datetime(2025, 10, 15, 6, 0), grace_hours=6)
+    assert is_closed_window(end, now=datetime(2025, 10, 15, 0, 30), grace_hours=0)
+
+
+def test_window_including_today_is_open():
+    now = datetime(2025, 10, 15, 12, 0)
+    assert not is_closed_window("2025-10-15 10:00:00", now=now, grace_hours=0)
+    assert not is_closed_window(None, now=now)
+
+
+def test_closed_entries_survive_ttl(tmp_path):
+    cache = QueryCache(tmp_path, ttl_sec=0.0)
+    closed, open_ = make_cache_key("SELECT 1", (1,), "db"), make_cache_key("SELECT 1", (2,), "db")
+    cache.put(closed, [{"n": 1}], closed=True)
+    cache.put(open_, [{"n": 2}], closed=False)
+    assert cache.get(closed) == (True, [{"n": 1}])
+    assert cache.get(open_)[0] is False
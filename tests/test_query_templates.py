@@ -0,0 +1,119 @@
+"""core/query_templates.py: bind() me bucket IN, `%` literale dhe fetch_with_id_set()."""
+
+import pytest
+
+from core.query_templates import QueryTemplate, bind, bucket_size, fetch_with_id_set
+
+LEADS = QueryTemplate(
+    "leads",
+    "SELECT lead_id FROM vicidial_list WHERE list_id = %(list_id)s AND lead_id IN (%(ids)s)",
+)
+
+
+class FakeDbError(Exception):
+    """Gabim si pymysql.err.*: kodi MySQL te args[0]."""
+
+
+class FakeCursor:
+    """Kthen ID-të e kërkuara; mban tabelat TEMPORARY në memorie."""
+
+    def __init__(self, deny_temp=False):
+        self.deny_temp = deny_temp
+        self.statements = []
+        self.tables = {}
+        self._rows = []
+
+    def execute(self, sql, args=None):
+        self.statements.append((sql, args))
+        words = sql.split()
+        if sql.startswith("CREATE TEMPORARY TABLE"):
+            if self.deny_temp:
+                raise FakeDbError(1044, "Access denied for user 'report'@'%' to database 'asterisk'")
+            self.tables[words[3]] = []
+        elif sql.startswith("DROP TEMPORARY TABLE"):
+            self.tables.pop(words[-1], None)
+        elif "SELECT id FROM" in sql:
+            self._rows = [(v,) for v in self.tables[sql.split("SELECT id FROM ")[1].split(")")[0]]]
+        else:
+            # args: list_id, pastaj ID-të (me mbushje në bucket)
+            self._rows = [(v,) for v in dict.fromkeys(args[1:])]
+
+    def executemany(self, sql, seq):
+        self.tables[sql.split()[2]].extend(v for (v,) in seq)
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_bucket_sizes():
+    assert [bucket_size(n) for n in (0, 1, 8, 9, 16, 17, 1000, 1024, 1025)] == [
+        8, 8, 8, 16, 16, 32, 1024, 1024, 2048,
+    ]
+
+
+def test_in_list_expands_to_bucket_with_last_value_repeated():
+    sql, args = bind(LEADS, list_id=101, ids=[5, 6, 7])
+    assert sql.endswith("IN (" + ", ".join(["%s"] * 8) + ")")
+    assert sql.startswith("SELECT lead_id FROM vicidial_list WHERE list_id = %s AND")
+    assert args == (101, 5, 6, 7, 7, 7, 7, 7, 7)
+
+    sql9, args9 = bind(LEADS, list_id=101, ids=list(range(9)))
+    assert sql9.count("%s") == 1 + 16 and len(args9) == 17
+    # Lista me të njëjtin bucket → i njëjti tekst SQL
+    assert bind(LEADS, list_id=1, ids=[1, 2])[0] == sql
+
+
+def test_empty_id_set():
+    with pytest.raises(ValueError):
+        bind(LEADS, list_id=101, ids=[])
+    with pytest.raises(KeyError):
+        bind(LEADS, list_id=101)
+    assert fetch_with_id_set(FakeCursor(), LEADS, "ids", [], list_id=101) == []
+
+
+def test_literal_percent_is_doubled_only_with_params():
+    tpl = "SELECT * FROM vicidial_list WHERE phone_number LIKE '39%' AND status IN (%(st)s)"
+    sql, args = bind(tpl, st=("NA", "B"))
+    assert "LIKE '39%%'" in sql
+    # pymysql formaton me `%`: `%%` kthehet në `%` literal
+    assert sql % tuple(repr(a) for a in args) == (
+        "SELECT * FROM vicidial_list WHERE phone_number LIKE '39%' AND status IN ("
+        + ", ".join(["'NA'"] + ["'B'"] * 7) + ")"
+    )
+    # Pa parametra: SQL i pandryshuar, args=None (driver-i nuk formaton)
+    plain = "SELECT 1 FROM dual WHERE 'a%' LIKE 'a%'"
+    assert bind(plain) == (plain, None)
+
+
+def test_fetch_with_id_set_chunks_below_threshold():
+    cur = FakeCursor()
+    ids = list(range(1, 21)) + [3, 4]  # dublikatat hiqen
+    rows = fetch_with_id_set(cur, LEADS, "ids", ids, threshold=100, chunk_size=8, list_id=101)
+    assert [r[0] for r in rows] == list(range(1, 21))
+    assert len(cur.statements) == 3  # 8 + 8 + 4
+    assert all(args[0] == 101 for _, args in cur.statements)
+
+
+def test_fetch_with_id_set_uses_temp_table_above_threshold():
+    cur = FakeCursor()
+    rows = fetch_with_id_set(cur, LEADS, "ids", range(50), threshold=10, list_id=101)
+    assert sorted(r[0] for r in rows) == list(range(50))
+    select = [s for s, _ in cur.statements if s.startswith("SELECT")]
+    assert select == [LEADS.sql.replace("%(ids)s", "SELECT id FROM _tmp_ids").replace("%(list_id)s", "%s")]
+    assert cur.tables == {}  # tabela fshihet në dalje
+
+
+def test_fetch_with_id_set_falls_back_without_temp_privilege():
+    cur = FakeCursor(deny_temp=True)
+    rows = fetch_with_id_set(cur, LEADS, "ids", range(50), threshold=10, chunk_size=16, list_id=101)
+    assert [r[0] for r in rows] == list(range(50))
+    assert sum(1 for s, _ in cur.statements if s.startswith("SELECT")) == 4
+
+
+def test_other_temp_table_errors_propagate():
+    class BrokenCursor(FakeCursor):
+        def executemany(self, sql, seq):
+            raise FakeDbError(2013, "Lost connection to MySQL server during query")
+
+    with pytest.raises(FakeDbError):
+        fetch_with_id_set(BrokenCursor(), LEADS, "ids", range(50), threshold=10, list_id=101)
@@ -0,0 +1,101 @@
+"""core/rollup_store.py: ndarja e intervalit rreth mesnatës dhe ingestion-i ditor."""
+
+from datetime import datetime
+
+from core.rollup_store import RollupStore, split_window
+
+
+def test_yesterday_stays_live_until_grace_period_passes():
+    from_ts, to_ts = "2025-10-13 00:00:00", "2025-10-15 12:00:00"
+
+    days, live = split_window(from_ts, to_ts, now=datetime(2025, 10, 15, 0, 30), grace_hours=6)
+    assert days == ["2025-10-13"]
+    assert live == [("2025-10-14 00:00:00", to_ts)]
+
+    days, live = split_window(from_ts, to_ts, now=datetime(2025, 10, 15, 6, 0), grace_hours=6)
+    assert days == ["2025-10-13", "2025-10-14"]
+    assert live == [("2025-10-15 00:00:00", to_ts)]
+
+
+def test_grace_longer_than_a_day_keeps_more_days_live():
+    days, live = split_window(
+        "2025-10-10 00:00:00", "2025-10-15 00:00:00", now=datetime(2025, 10, 15, 1, 0), grace_hours=30,
+    )
+    assert days == ["2025-10-10", "2025-10-11", "2025-10-12"]
+    assert live == [("2025-10-13 00:00:00", "2025-10-15 00:00:00")]
+
+
+def test_window_with_only_unsettled_days_is_all_live():
+    window = ("2025-10-14 00:00:00", "2025-10-15 00:00:00")
+    assert split_window(*window, now=datetime(2025, 10, 15, 0, 5), grace_hours=6) == ([], [window])
+    assert split_window(*window, now=datetime(2025, 10, 15, 0, 5), grace_hours=0) == (["2025-10-14"], [])
+
+
+def test_combine_reads_late_rows_for_yesterday_from_live(tmp_path, monkeypatch):
+    import core.rollup_store as rollup_store
+
+    store = RollupStore(tmp_path / "rollups.sqlite", closed_grace_hours=6)
+    real_split = rollup_store.split_window
+    monkeypatch.setattr(
+        rollup_store, "split_window",
+        lambda a, b, grace_hours: real_split(a, b, now=datetime(2025, 10, 15, 0, 30), grace_hours=grace_hours),
+    )
+    fetched, live_calls = [], []
+
+    def fetch(sql, params):
+        fetched.append(params[1][:10])
+        return [{"list_id": 1, "status": "A", "calls": 1, "total_sec": 10}]
+
+    def live(a, b):
+        live_calls.append((a, b))
+        return [{"list_id": 1, "status": "A", "calls": 5, "total_sec": 50}]
+
+    rows = store.combine(
+        "log_list_status", "db", "C1", "2025-10-13 00:00:00", "2025-10-15 00:00:00",
+        fetch, live, group_by=["list_id", "status"], key_types={"list_id": int},
+    )
+    assert fetched == ["2025-10-13"]
+    assert live_calls == [("2025-10-14 00:00:00", "2025-10-15 00:00:00")]
+    assert rows == [{"list_id": 1, "status": "A", "calls": 6, "total_sec": 60}]
+    assert store.missing_days("log_list_status", "db", "C1", ["2025-10-14"]) == ["2025-10-14"]
+
+
+def test_ingestion_of_different_tables_runs_in_parallel(tmp_path):
+    import threading
+
+    store = RollupStore(tmp_path / "rollups.sqlite")
+    both_fetching = threading.Barrier(2, timeout=5)
+
+    def fetch(sql, params):
+        both_fetching.wait()  # me një lock global të vetëm, thread-i i dytë nuk arrin kurrë këtu
+        return []
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda t=t: results.append(store.ensure_loaded(t, "db", "C1", ["2025-10-13"], fetch)))
+        for t in ("log_list_status", "log_list_hour")
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == [1, 1]
+
+
+def test_same_day_is_fetched_once_under_concurrency(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    store = RollupStore(tmp_path / "rollups.sqlite")
+    calls = []
+
+    def fetch(sql, params):
+        calls.append(params[1])
+        return [{"list_id": 1, "status": "A", "calls": 1, "total_sec": 1}]
+
+    with ThreadPoolExecutor(4) as pool:
+        loaded = list(pool.map(
+            lambda _: store.ensure_loaded("log_list_status", "db", "C1", ["2025-10-13", "2025-10-14"], fetch),
+            range(4),
+        ))
+    assert sorted(calls) == ["2025-10-13 00:00:00", "2025-10-14 00:00:00"]
+    assert sum(loaded) == 2
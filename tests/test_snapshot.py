@@ -0,0 +1,88 @@
+"""core/snapshot.py: .vcsnap round-trip, tabelat kolonore dhe digest-et."""
+
+import json
+
+import numpy as np
+import pytest
+
+from core.snapshot import export_json, load_snapshot, read_snapshot_meta, write_snapshot
+
+
+@pytest.fixture
+def data() -> dict:
+    statuses = ["NA", "PU", "SVYCLM", "B"]
+    return {
+        "db_key": "db2",
+        "campaign_id": "autobiz",
+        "analysis_period_days": 7,
+        "campaign_config": {"auto_dial_level": "700", "hopper_level": 1400},
+        "status_distribution": [
+            {"status": s, "count": c, "percentage": p, "avg_duration_sec": d}
+            for s, c, p, d in [("NA", 900, 60.0, None), ("PU", 400, 26.67, 12.5), ("SVYCLM", 200, 13.33, 41.0)]
+        ],
+        # ≥ 64 rreshta me pak vlera unike → kolonat prefix_4/status kodohen si "dict"
+        "prefix_hour_status": [
+            {"prefix_4": f"33{i % 7}", "status": statuses[i % 4], "hour": i % 24,
+             "calls": i * 3, "total_sec": i * 17 if i % 5 else None}
+            for i in range(200)
+        ],
+        "empty_section": [],
+    }
+
+
+def test_round_trip_matches_json(tmp_path, data):
+    path = write_snapshot(data, tmp_path / "data.vcsnap")
+    with load_snapshot(path) as snap:
+        assert list(snap.keys()) == list(data.keys())
+        assert snap.to_dict() == data
+        calls = snap["prefix_hour_status"][5]["calls"]
+        assert type(calls) is int
+
+
+def test_table_columns(tmp_path, data):
+    path = write_snapshot(data, tmp_path / "data.vcsnap")
+    with load_snapshot(path) as snap:
+        table = snap.table("prefix_hour_status")
+        assert table["calls"].dtype == np.int64
+        assert table["prefix_4"].dtype == object
+        assert table["prefix_4"].tolist() == [r["prefix_4"] for r in data["prefix_hour_status"]]
+        # int me NULL → float64 me NaN
+        assert table["total_sec"].dtype == np.float64
+        assert np.isnan(table["total_sec"][0]) and table["total_sec"][1] == 17
+        with pytest.raises(TypeError):
+            snap.table("campaign_config")
+
+
+def test_section_digest_tracks_section_content(tmp_path, data):
+    first = write_snapshot(data, tmp_path / "a.vcsnap")
+    changed = dict(data, status_distribution=data["status_distribution"][:2])
+    second = write_snapshot(changed, tmp_path / "b.vcsnap")
+    with load_snapshot(first) as a, load_snapshot(second) as b:
+        assert a.section_digest("prefix_hour_status") == b.section_digest("prefix_hour_status")
+        assert a.section_digest("campaign_id") == b.section_digest("campaign_id")
+        assert a.section_digest("status_distribution") != b.section_digest("status_distribution")
+
+
+def test_meta_reader_and_export(tmp_path, data):
+    path = write_snapshot(data, tmp_path / "data.vcsnap")
+    assert read_snapshot_meta(path) == {"db_key": "db2", "campaign_id": "autobiz", "analysis_period_days": 7}
+    out = export_json(path, tmp_path / "data.json")
+    assert json.loads(out.read_text(encoding="utf-8")) == data
+
+
+def test_rewrite_after_close(tmp_path, data):
+    path = write_snapshot(data, tmp_path / "data.vcsnap")
+    with load_snapshot(path) as snap:
+        snap.table("prefix_hour_status")
+    # Snapshot-i i mbyllur nuk bllokon os.replace() të shkrimit të radhës
+    write_snapshot(dict(data, db_key="db"), path)
+    assert read_snapshot_meta(path)["db_key"] == "db"
+
+
+def test_rejects_non_snapshot(tmp_path):
+    path = tmp_path / "bad.vcsnap"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+    with pytest.raises(ValueError):
+        read_snapshot_meta(path)
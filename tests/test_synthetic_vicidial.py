@@ -0,0 +1,24 @@
+"""benchmarks/synthetic_vicidial.py: skema dhe ngarkimi në SQLite."""
+
+import sqlite3
+from datetime import datetime
+
+from benchmarks.synthetic_vicidial import SCHEMA, SyntheticConfig, load_dataset
+
+
+def test_dataset_has_the_tables_the_collector_reads():
+    conn = sqlite3.connect(":memory:")
+    cfg = SyntheticConfig(calls=5_000, end=datetime(2025, 10, 15))
+    counts = load_dataset(conn, cfg, "sqlite")
+    assert set(counts) == set(SCHEMA)
+    assert counts["vicidial_log"] == 5_000
+    assert counts["vicidial_closer_log"] > 0
+
+    campaigns = {r[0] for r in conn.execute("SELECT DISTINCT campaign_id FROM vicidial_closer_log")}
+    assert campaigns <= set(cfg.campaign_ids)
+    # Çdo rresht closer i përket një thirrjeje në vicidial_log
+    orphans = conn.execute(
+        "SELECT COUNT(*) FROM vicidial_closer_log c LEFT JOIN vicidial_log l ON l.uniqueid = c.uniqueid "
+        "WHERE l.uniqueid IS NULL"
+    ).fetchone()[0]
+    assert orphans == 0
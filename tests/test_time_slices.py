@@ -0,0 +1,121 @@
+"""core/time_slices.py: ndarja, bashkimi, resume dhe kufiri i paralelizmit."""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from core.time_slices import (
+    MergeSpec,
+    SliceError,
+    clear_pending_runs,
+    pending_runs,
+    run_sliced,
+    serial_slices,
+    slice_limiter,
+    split_slices,
+)
+
+SPEC = MergeSpec(("status",), ("calls", "sec"))
+
+
+@pytest.fixture(autouse=True)
+def _no_pending():
+    clear_pending_runs()
+    yield
+    clear_pending_runs()
+
+
+def test_split_slices_aligns_to_day_boundaries():
+    assert split_slices("2025-10-01 12:00:00", "2025-10-03 06:00:00") == [
+        ("2025-10-01 12:00:00", "2025-10-02 00:00:00"),
+        ("2025-10-02 00:00:00", "2025-10-03 00:00:00"),
+        ("2025-10-03 00:00:00", "2025-10-03 06:00:00"),
+    ]
+    assert len(split_slices("2025-10-01", "2025-10-02", unit="hour", size=6)) == 4
+    with pytest.raises(ValueError):
+        split_slices("2025-10-01", "2025-10-02", unit="week")
+
+
+def _fetch(a, b):
+    day = int(a[8:10])
+    return [{"status": "NA", "calls": day, "sec": 10.0}, {"status": "PU", "calls": 1, "sec": day * 2.0}]
+
+
+def test_merge_equals_single_query():
+    merged = run_sliced(_fetch, "2025-10-01", "2025-10-06", SPEC, max_workers=3)
+    by_status = {r["status"]: r for r in merged}
+    assert by_status["NA"]["calls"] == 1 + 2 + 3 + 4 + 5
+    assert by_status["PU"]["sec"] == 2.0 * (1 + 2 + 3 + 4 + 5)
+
+
+def test_merge_dataframes():
+    frames = [pd.DataFrame(_fetch(f"2025-10-0{d}", "")) for d in (1, 2)]
+    out = SPEC.merge(frames)
+    assert out.set_index("status").loc["NA", "calls"] == 3
+
+
+def test_resume_runs_only_failed_slices():
+    calls = []
+    fail = {"2025-10-03 00:00:00"}
+
+    def fetch(a, b):
+        calls.append(a)
+        if a in fail:
+            raise RuntimeError("lock wait timeout")
+        return _fetch(a, b)
+
+    with pytest.raises(SliceError):
+        run_sliced(fetch, "2025-10-01", "2025-10-06", SPEC, retries=0, resume_key=("k",))
+    assert pending_runs() == [{"label": "", "done": 4, "total": 5, "failed": 1}]
+
+    calls.clear()
+    fail.clear()
+    merged = run_sliced(fetch, "2025-10-01", "2025-10-06", SPEC, retries=0, resume_key=("k",))
+    assert calls == ["2025-10-03 00:00:00"]
+    assert {r["status"]: r["calls"] for r in merged}["NA"] == 15
+    assert pending_runs() == []
+
+
+def _peak_concurrency(run):
+    state = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fetch(a, b):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.01)
+        with lock:
+            state["now"] -= 1
+        return _fetch(a, b)
+
+    run(fetch)
+    return state["peak"]
+
+
+def test_shared_limiter_bounds_concurrent_runs():
+    limiter = slice_limiter("test-db", 3)
+
+    def run(fetch):
+        threads = [
+            threading.Thread(target=run_sliced, args=(fetch, "2025-10-01", "2025-10-09", SPEC),
+                             kwargs={"max_workers": 4, "limiter": limiter})
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert _peak_concurrency(run) <= 3
+    assert slice_limiter("test-db", 3) is limiter
+
+
+def test_serial_slices_runs_one_at_a_time():
+    def run(fetch):
+        with serial_slices():
+            run_sliced(fetch, "2025-10-01", "2025-10-09", SPEC, max_workers=4)
+
+    assert _peak_concurrency(run) == 1